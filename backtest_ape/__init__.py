@@ -1,11 +1,48 @@
-from backtest_ape.base import BaseRunner
-from backtest_ape.curve.v2 import BaseCurveV2Runner, CurveV2LPRunner
-from backtest_ape.gearbox.v2 import BaseGearboxV2Runner, GearboxV2STETHRunner
-from backtest_ape.uniswap.v3 import (
-    BaseUniswapV3Runner,
-    UniswapV3LPBaseRunner,
-    UniswapV3LPTotalRunner,
-)
+from typing import TYPE_CHECKING
+
+from backtest_ape._lazy import lazy_module
+
+if TYPE_CHECKING:
+    from backtest_ape.base import BaseRunner
+    from backtest_ape.curve.v2 import (
+        BaseCurveV2Runner,
+        CurveV2LPRunner,
+        CurveV2MultiLPRunner,
+    )
+    from backtest_ape.gearbox.v2 import (
+        BaseGearboxV2Runner,
+        GearboxV2MultiSTETHRunner,
+        GearboxV2STETHRunner,
+    )
+    from backtest_ape.uniswap.v3 import (
+        BaseUniswapV3Runner,
+        UniswapV3LPBaseRunner,
+        UniswapV3LPDecomposedRunner,
+        UniswapV3LPFeeRunner,
+        UniswapV3LPLadderRunner,
+        UniswapV3LPPrincipalRunner,
+        UniswapV3LPRebalanceRunner,
+        UniswapV3LPTotalRunner,
+    )
+
+# NOTE: runners import ape on load, so defer until first attribute access
+_modules = {
+    "BaseRunner": "backtest_ape.base",
+    "BaseCurveV2Runner": "backtest_ape.curve.v2.base",
+    "BaseGearboxV2Runner": "backtest_ape.gearbox.v2.base",
+    "BaseUniswapV3Runner": "backtest_ape.uniswap.v3.base",
+    "CurveV2LPRunner": "backtest_ape.curve.v2.lp",
+    "CurveV2MultiLPRunner": "backtest_ape.curve.v2.multi",
+    "GearboxV2MultiSTETHRunner": "backtest_ape.gearbox.v2.multi",
+    "GearboxV2STETHRunner": "backtest_ape.gearbox.v2.steth",
+    "UniswapV3LPBaseRunner": "backtest_ape.uniswap.v3.lp.base",
+    "UniswapV3LPDecomposedRunner": "backtest_ape.uniswap.v3.lp.decomposed",
+    "UniswapV3LPFeeRunner": "backtest_ape.uniswap.v3.lp.fee",
+    "UniswapV3LPLadderRunner": "backtest_ape.uniswap.v3.lp.ladder",
+    "UniswapV3LPPrincipalRunner": "backtest_ape.uniswap.v3.lp.principal",
+    "UniswapV3LPRebalanceRunner": "backtest_ape.uniswap.v3.lp.rebalance",
+    "UniswapV3LPTotalRunner": "backtest_ape.uniswap.v3.lp.total",
+}
 
 __all__ = [
     "BaseRunner",
@@ -13,7 +50,17 @@ __all__ = [
     "BaseGearboxV2Runner",
     "BaseUniswapV3Runner",
     "CurveV2LPRunner",
+    "CurveV2MultiLPRunner",
+    "GearboxV2MultiSTETHRunner",
     "GearboxV2STETHRunner",
     "UniswapV3LPBaseRunner",
+    "UniswapV3LPDecomposedRunner",
+    "UniswapV3LPFeeRunner",
+    "UniswapV3LPLadderRunner",
+    "UniswapV3LPPrincipalRunner",
+    "UniswapV3LPRebalanceRunner",
     "UniswapV3LPTotalRunner",
 ]
+
+
+__getattr__, __dir__ = lazy_module(_modules, globals())
@@ -0,0 +1,35 @@
+import importlib
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+
+def lazy_module(
+    modules: Mapping[str, str], namespace: Dict[str, Any]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Gets the module __getattr__ and __dir__ of a package that imports its
+    attributes from their submodules on first access, per PEP 562.
+
+    Args:
+        modules (Mapping[str, str]): The submodule path by attribute name.
+        namespace (Dict[str, Any]): The globals of the package, to cache
+            imported attributes in.
+
+    Returns:
+        Tuple[Callable[[str], Any], Callable[[], List[str]]]: The
+        __getattr__ and __dir__ functions of the package.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in modules:
+            raise AttributeError(
+                f"module {namespace['__name__']!r} has no attribute {name!r}"
+            )
+
+        value = getattr(importlib.import_module(modules[name]), name)
+        namespace[name] = value  # cache so later lookups skip __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace.keys()).union(modules.keys()))
+
+    return __getattr__, __dir__
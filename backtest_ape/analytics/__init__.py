@@ -0,0 +1,31 @@
+from backtest_ape.analytics.base import (
+    get_drawdowns,
+    get_returns,
+    get_rolling_volatility,
+    summarize,
+)
+from backtest_ape.analytics.curve import analyze_curve_v2_lp, get_virtual_price
+from backtest_ape.analytics.gearbox import analyze_gearbox_v2_ca
+from backtest_ape.analytics.runners import RUNNER_ANALYZERS, analyze
+from backtest_ape.analytics.uniswap import (
+    analyze_uniswap_v3_lp,
+    get_fee_growth_below,
+    load_uniswap_v3_history,
+    sweep_uniswap_v3_lp,
+)
+
+__all__ = [
+    "RUNNER_ANALYZERS",
+    "analyze",
+    "analyze_curve_v2_lp",
+    "analyze_gearbox_v2_ca",
+    "analyze_uniswap_v3_lp",
+    "get_drawdowns",
+    "get_fee_growth_below",
+    "get_returns",
+    "get_rolling_volatility",
+    "get_virtual_price",
+    "load_uniswap_v3_history",
+    "summarize",
+    "sweep_uniswap_v3_lp",
+]
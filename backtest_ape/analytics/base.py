@@ -0,0 +1,165 @@
+from typing import Callable, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BLOCKS_PER_YEAR = 2628000  # 12 second blocks
+
+
+def get_periods_per_year(numbers: np.ndarray) -> float:
+    """
+    Gets the number of record periods per year from the recorded block numbers.
+
+    Args:
+        numbers (:class:`numpy.ndarray`): The recorded block numbers.
+
+    Returns:
+        float: The periods per year given the median step between records.
+    """
+    if len(numbers) < 2:
+        return float(BLOCKS_PER_YEAR)
+    return BLOCKS_PER_YEAR / float(np.median(np.diff(numbers)))
+
+
+def get_returns(values: np.ndarray, prev: Optional[float] = None) -> np.ndarray:
+    """
+    Gets the simple returns of a value series.
+
+    Args:
+        values (:class:`numpy.ndarray`): The values.
+        prev (Optional[float]): The last value of the prior chunk, if any.
+
+    Returns:
+        :class:`numpy.ndarray`: The returns, with nan for the first value
+        when there is no prior value.
+    """
+    prev = np.nan if prev is None else prev
+    prevs = np.concatenate([[prev], values[:-1]])
+    return values / prevs - 1.0
+
+
+def get_drawdowns(
+    values: np.ndarray, peak: float = -np.inf
+) -> Tuple[np.ndarray, float]:
+    """
+    Gets the drawdowns of a value series from its running peak.
+
+    Args:
+        values (:class:`numpy.ndarray`): The values.
+        peak (float): The running peak carried from the prior chunk.
+
+    Returns:
+        Tuple[:class:`numpy.ndarray`, float]: The drawdowns and the running
+        peak to carry into the next chunk.
+    """
+    peaks = np.maximum.accumulate(np.concatenate([[peak], values]))[1:]
+    if len(peaks) == 0:
+        return np.empty(0), peak
+    return values / peaks - 1.0, float(peaks[-1])
+
+
+def get_rolling_volatility(
+    returns: np.ndarray, window: int, history: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gets the rolling standard deviation of returns over a window.
+
+    Args:
+        returns (:class:`numpy.ndarray`): The returns.
+        window (int): The number of returns in each window.
+        history (Optional[:class:`numpy.ndarray`]): The last window - 1
+            returns carried from the prior chunk.
+
+    Returns:
+        Tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]: The rolling
+        volatility, nan until a full window is available, and the history to
+        carry into the next chunk.
+    """
+    history = np.empty(0) if history is None else history
+    x = np.nan_to_num(np.concatenate([history, returns]))
+    offset = len(history)
+
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+    ends = np.arange(offset + 1, len(x) + 1)
+    starts = ends - window
+
+    vol = np.full(len(returns), np.nan)
+    full = starts >= 0
+    n = float(window)
+    sums = s1[ends[full]] - s1[starts[full]]
+    sums2 = s2[ends[full]] - s2[starts[full]]
+    var = np.maximum(sums2 / n - (sums / n) ** 2, 0.0) * n / max(n - 1.0, 1.0)
+    vol[full] = np.sqrt(var)
+
+    keep = max(len(x) - (window - 1), 0) if window > 1 else len(x)
+    return vol, x[keep:]
+
+
+def summarize(
+    chunks: Iterator[Mapping[str, np.ndarray]],
+    value_column: str,
+    window: int = 24,
+    callback: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> Mapping[str, float]:
+    """
+    Computes performance analytics for a value column streamed in chunks.
+
+    Reduces each chunk to running aggregates carried into the next, so
+    memory stays bounded by the chunk size rather than the number of records.
+
+    Args:
+        chunks (Iterator[Mapping[str, :class:`numpy.ndarray`]]): The record
+            chunks, each with number and value columns. Other columns are
+            passed through to the per-record frames.
+        value_column (str): The name of the column to analyze.
+        window (int): The number of records in the rolling volatility window.
+        callback (Optional[Callable[[:class:`pandas.DataFrame`], None]]):
+            Called with the per-record chunk columns with returns, drawdowns
+            and rolling volatility of each chunk, e.g. to write them out.
+
+    Returns:
+        Mapping[str, float]: The summary statistics.
+    """
+    prev, peak, history = None, -np.inf, None
+    first, last = np.nan, np.nan
+    max_drawdown = np.inf
+    count, total, total2 = 0, 0.0, 0.0
+    periods_per_year = None
+    for chunk in chunks:
+        numbers = chunk["number"]
+        values = chunk[value_column]
+        if len(values) == 0:
+            continue
+
+        if periods_per_year is None:
+            periods_per_year = get_periods_per_year(numbers)
+            first = values[0]
+
+        returns = get_returns(values, prev)
+        drawdowns, peak = get_drawdowns(values, peak)
+        vol, history = get_rolling_volatility(returns, window, history)
+
+        finite = returns[np.isfinite(returns)]
+        count += len(finite)
+        total += float(np.sum(finite))
+        total2 += float(np.sum(finite * finite))
+        max_drawdown = min(max_drawdown, float(np.min(drawdowns)))
+        prev, last = values[-1], values[-1]
+
+        if callback is not None:
+            frame = pd.DataFrame(dict(chunk))
+            frame["return"] = returns
+            frame["drawdown"] = drawdowns
+            frame["rolling_volatility"] = vol
+            callback(frame)
+
+    periods_per_year = periods_per_year or float(BLOCKS_PER_YEAR)
+    mean = total / count if count > 0 else np.nan
+    std = np.sqrt(max(total2 / count - mean**2, 0.0)) if count > 0 else np.nan
+    return {
+        "total_return": last / first - 1.0,
+        "max_drawdown": max_drawdown if np.isfinite(max_drawdown) else np.nan,
+        "volatility": std * np.sqrt(periods_per_year),
+        "sharpe": mean / std * np.sqrt(periods_per_year) if std > 0 else np.nan,
+    }
@@ -0,0 +1,106 @@
+from typing import Callable, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backtest_ape.analytics.base import summarize
+from backtest_ape.results import iter_results, load_meta
+
+
+def get_virtual_price(
+    D: np.ndarray, prices: Sequence[np.ndarray], total_supply: np.ndarray
+) -> np.ndarray:
+    """
+    Gets the value of the pool invariant per LP token as the pool computes
+    its virtual price, i.e. the geometric mean of the balanced pool balances
+    at D over the total supply, which grows only with fees earned.
+
+    NOTE: Uses the price oracle recorded in place of the pool price scale,
+    so moves of the oracle away from the price scale also show here.
+
+    Args:
+        D (:class:`numpy.ndarray`): The pool invariant.
+        prices (Sequence[:class:`numpy.ndarray`]): The price of each coin
+            other than coin0 in coin0 terms.
+        total_supply (:class:`numpy.ndarray`): The LP token total supply.
+
+    Returns:
+        :class:`numpy.ndarray`: The virtual prices.
+    """
+    n = len(prices) + 1
+    product = np.prod(np.vstack([np.ones_like(D)] + list(prices)), axis=0)
+    xcp = D / n / np.power(product, 1.0 / n)
+    return xcp / total_supply
+
+
+def analyze_curve_v2_lp(
+    out_dir: str,
+    runner_kwargs: Mapping,
+    chunk_size: int = 1000000,
+    window: int = 24,
+    callback: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> Mapping[str, float]:
+    """
+    Analyzes saved CurveV2LPRunner results against holding the deposited
+    coins, with values in coin0 terms using the pool price oracle. Splits
+    the position value into fees, from the growth of the pool virtual price,
+    and principal to attribute fees earned and impermanent loss versus
+    holding.
+
+    Args:
+        out_dir (str): The directory the typed results were saved in.
+        runner_kwargs (Mapping): The kwargs the runner was initialized with.
+        chunk_size (int): The number of records per streamed chunk.
+        window (int): The number of records in the rolling volatility window.
+        callback (Optional[Callable[[:class:`pandas.DataFrame`], None]]):
+            Called with the per-record analytics of each chunk.
+
+    Returns:
+        Mapping[str, float]: The summary statistics.
+    """
+    amounts = runner_kwargs["amounts"]
+    num_coins = len(amounts)
+    meta = load_meta(out_dir)
+    holdings = [
+        amounts[i] / 10 ** meta["columns"][f"balances{i}"]["decimals"]
+        for i in range(num_coins)
+    ]
+    columns = ["number", "values0", "D", "total_supply"] + [
+        f"prices{i}" for i in range(num_coins - 1)
+    ]
+    ends = {}
+
+    def chunks() -> Iterator[Mapping[str, np.ndarray]]:
+        for chunk in iter_results(out_dir, columns, chunk_size):
+            prices = [chunk[f"prices{i}"] for i in range(num_coins - 1)]
+            value = chunk["values0"]
+            hold = holdings[0] + sum(
+                holdings[i] * prices[i - 1] for i in range(1, num_coins)
+            )
+            virtual_price = get_virtual_price(chunk["D"], prices, chunk["total_supply"])
+            if len(ends) == 0:
+                ends["hold0"] = hold[0]
+                ends["virtual_price0"] = virtual_price[0]
+
+            fees = value - value * ends["virtual_price0"] / virtual_price
+            ends["hold"] = hold[-1]
+            ends["fee_yield"] = fees[-1] / hold[-1]
+            ends["impermanent_loss"] = (value[-1] - fees[-1]) / hold[-1] - 1.0
+            yield {
+                "number": chunk["number"],
+                "value": value,
+                "hold": hold,
+                "lp_vs_hold": value / hold - 1.0,
+                "fees": fees,
+                "fee_yield": fees / hold,
+                "impermanent_loss": (value - fees) / hold - 1.0,
+            }
+
+    summary = summarize(chunks(), "value", window, callback)
+    if len(ends) > 0:
+        hold_return = ends["hold"] / ends["hold0"] - 1.0
+        summary["hold_return"] = hold_return
+        summary["excess_return_vs_hold"] = summary["total_return"] - hold_return
+        summary["fee_yield"] = float(ends["fee_yield"])
+        summary["impermanent_loss"] = float(ends["impermanent_loss"])
+    return summary
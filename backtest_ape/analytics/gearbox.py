@@ -0,0 +1,56 @@
+from typing import Callable, Iterator, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest_ape.analytics.base import summarize
+from backtest_ape.results import iter_results
+
+
+def analyze_gearbox_v2_ca(
+    out_dir: str,
+    runner_kwargs: Mapping,
+    chunk_size: int = 1000000,
+    window: int = 24,
+    threshold: float = 1.0,
+    callback: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> Mapping[str, float]:
+    """
+    Analyzes saved Gearbox V2 credit account runner results for the health
+    factor path and its approach to a liquidation threshold.
+
+    Args:
+        out_dir (str): The directory the typed results were saved in.
+        runner_kwargs (Mapping): The kwargs the runner was initialized with.
+        chunk_size (int): The number of records per streamed chunk.
+        window (int): The number of records in the rolling volatility window.
+        threshold (float): The health factor threshold to flag.
+        callback (Optional[Callable[[:class:`pandas.DataFrame`], None]]):
+            Called with the per-record analytics of each chunk.
+
+    Returns:
+        Mapping[str, float]: The summary statistics.
+    """
+    ends = {"count": 0, "below": 0, "min": np.inf, "first_below": np.nan}
+
+    def chunks() -> Iterator[Mapping[str, np.ndarray]]:
+        for chunk in iter_results(out_dir, ["number", "values0"], chunk_size):
+            below = chunk["values0"] < threshold
+            ends["count"] += len(below)
+            ends["below"] += int(np.sum(below))
+            ends["min"] = min(ends["min"], float(np.min(chunk["values0"])))
+            if np.isnan(ends["first_below"]) and below.any():
+                ends["first_below"] = float(chunk["number"][np.argmax(below)])
+
+            yield {
+                "number": chunk["number"],
+                "health_factor": chunk["values0"],
+                "below_threshold": below,
+            }
+
+    summary = summarize(chunks(), "health_factor", window, callback)
+    if ends["count"] > 0:
+        summary["min_health_factor"] = ends["min"]
+        summary["fraction_below_threshold"] = ends["below"] / ends["count"]
+        summary["first_below_threshold"] = ends["first_below"]
+    return summary
@@ -0,0 +1,50 @@
+from typing import Callable, Mapping, Optional
+
+import pandas as pd
+
+from backtest_ape.analytics.curve import analyze_curve_v2_lp
+from backtest_ape.analytics.gearbox import analyze_gearbox_v2_ca
+from backtest_ape.analytics.uniswap import analyze_uniswap_v3_lp
+
+RUNNER_ANALYZERS = {
+    "CurveV2LPRunner": analyze_curve_v2_lp,
+    "GearboxV2STETHRunner": analyze_gearbox_v2_ca,
+    "UniswapV3LPDecomposedRunner": analyze_uniswap_v3_lp,
+    "UniswapV3LPTotalRunner": analyze_uniswap_v3_lp,
+}
+
+
+def analyze(
+    runner_name: str,
+    out_dir: str,
+    runner_kwargs: Mapping,
+    chunk_size: int = 1000000,
+    window: int = 24,
+    callback: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> Mapping[str, float]:
+    """
+    Analyzes saved runner results with the analyzer for the runner type.
+
+    Args:
+        runner_name (str): The runner class name.
+        out_dir (str): The directory the typed results were saved in.
+        runner_kwargs (Mapping): The kwargs the runner was initialized with.
+        chunk_size (int): The number of records per streamed chunk.
+        window (int): The number of records in the rolling volatility window.
+        callback (Optional[Callable[[:class:`pandas.DataFrame`], None]]):
+            Called with the per-record analytics of each chunk.
+
+    Returns:
+        Mapping[str, float]: The summary statistics.
+    """
+    if runner_name not in RUNNER_ANALYZERS:
+        raise ValueError(f"no analyzer for runner {runner_name}.")
+
+    analyzer = RUNNER_ANALYZERS[runner_name]
+    return analyzer(
+        out_dir,
+        runner_kwargs,
+        chunk_size=chunk_size,
+        window=window,
+        callback=callback,
+    )
@@ -0,0 +1,404 @@
+from typing import Callable, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest_ape.analytics.base import summarize
+from backtest_ape.results import iter_results, load_int_columns, load_meta
+
+Q96 = 2.0**96
+Q128 = 2.0**128
+UINT256_MOD = 2**256
+SWEEP_CHUNK_SIZE = 1000  # candidate ranges evaluated per batch
+
+
+def get_sqrt_ratio_at_tick(tick: np.ndarray) -> np.ndarray:
+    """
+    Gets the sqrt price ratio (not Q64.96 scaled) at ticks as floats.
+
+    Args:
+        tick (:class:`numpy.ndarray`): The ticks.
+
+    Returns:
+        :class:`numpy.ndarray`: The sqrt price ratios.
+    """
+    return np.power(1.0001, np.asarray(tick, dtype=np.float64) / 2.0)
+
+
+def get_tick_at_sqrt_ratio(sqrt_ratio: np.ndarray) -> np.ndarray:
+    """
+    Gets the ticks at sqrt price ratios (not Q64.96 scaled) as floats.
+
+    Args:
+        sqrt_ratio (:class:`numpy.ndarray`): The sqrt price ratios.
+
+    Returns:
+        :class:`numpy.ndarray`: The ticks.
+    """
+    return np.floor(2.0 * np.log(sqrt_ratio) / np.log(1.0001))
+
+
+def get_liquidity_for_amounts(
+    sqrt_ratio: np.ndarray,
+    sqrt_ratio_a: np.ndarray,
+    sqrt_ratio_b: np.ndarray,
+    amount0: np.ndarray,
+    amount1: np.ndarray,
+) -> np.ndarray:
+    """
+    Gets the max liquidity received for amounts of token0, token1 given the
+    current sqrt price ratio and range sqrt price ratios as floats.
+
+    See https://github.com/Uniswap/v3-periphery/blob/main/contracts/libraries/LiquidityAmounts.sol  # noqa: E501
+
+    Returns:
+        :class:`numpy.ndarray`: The liquidity.
+    """
+    sp, sa, sb = np.broadcast_arrays(sqrt_ratio, sqrt_ratio_a, sqrt_ratio_b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        liquidity0 = amount0 * sa * sb / (sb - sa)
+        liquidity0_in = amount0 * sp * sb / (sb - sp)
+        liquidity1 = amount1 / (sb - sa)
+        liquidity1_in = amount1 / (sp - sa)
+
+    return np.where(
+        sp <= sa,
+        liquidity0,
+        np.where(sp < sb, np.minimum(liquidity0_in, liquidity1_in), liquidity1),
+    )
+
+
+def get_amounts_for_liquidity(
+    sqrt_ratio: np.ndarray,
+    sqrt_ratio_a: np.ndarray,
+    sqrt_ratio_b: np.ndarray,
+    liquidity: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gets the amounts of token0, token1 for liquidity given the current sqrt
+    price ratio and range sqrt price ratios as floats.
+
+    Returns:
+        Tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]: The amounts.
+    """
+    sp = np.clip(sqrt_ratio, sqrt_ratio_a, sqrt_ratio_b)
+    amount0 = liquidity * (sqrt_ratio_b - sp) / (sp * sqrt_ratio_b)
+    amount1 = liquidity * (sp - sqrt_ratio_a)
+    return amount0, amount1
+
+
+def get_fee_growth_inside(
+    tick: np.ndarray,
+    tick_lower: np.ndarray,
+    tick_upper: np.ndarray,
+    fee_growth_global: np.ndarray,
+    fee_growth_outside_lower: np.ndarray,
+    fee_growth_outside_upper: np.ndarray,
+) -> np.ndarray:
+    """
+    Gets the fee growth inside a tick range.
+
+    NOTE: Computed without modular wrap, which leaves differences in fee
+    growth inside over time unchanged.
+
+    See https://github.com/Uniswap/v3-core/blob/main/contracts/libraries/Tick.sol#L60  # noqa: E501
+
+    Returns:
+        :class:`numpy.ndarray`: The fee growth inside the range.
+    """
+    below = np.where(
+        tick >= tick_lower,
+        fee_growth_outside_lower,
+        fee_growth_global - fee_growth_outside_lower,
+    )
+    above = np.where(
+        tick < tick_upper,
+        fee_growth_outside_upper,
+        fee_growth_global - fee_growth_outside_upper,
+    )
+    return fee_growth_global - below - above
+
+
+def analyze_uniswap_v3_lp(
+    out_dir: str,
+    runner_kwargs: Mapping,
+    chunk_size: int = 1000000,
+    window: int = 24,
+    callback: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> Mapping[str, float]:
+    """
+    Analyzes saved UniswapV3LPTotalRunner results in token1 terms, splitting
+    the position value into principal and fees to attribute fees earned and
+    impermanent loss versus holding the initial token amounts.
+
+    Args:
+        out_dir (str): The directory the typed results were saved in.
+        runner_kwargs (Mapping): The kwargs the runner was initialized with.
+        chunk_size (int): The number of records per streamed chunk.
+        window (int): The number of records in the rolling volatility window.
+        callback (Optional[Callable[[:class:`pandas.DataFrame`], None]]):
+            Called with the per-record analytics of each chunk.
+
+    Returns:
+        Mapping[str, float]: The summary statistics.
+    """
+    tick_lower = runner_kwargs["tick_lower"]
+    tick_upper = runner_kwargs["tick_upper"]
+    meta = load_meta(out_dir)
+    d0 = meta["columns"]["values0"]["decimals"]
+    d1 = meta["columns"]["values1"]["decimals"]
+    sqrt_ratio_a = get_sqrt_ratio_at_tick(tick_lower)
+    sqrt_ratio_b = get_sqrt_ratio_at_tick(tick_upper)
+    columns = [
+        "number",
+        "values0",
+        "values1",
+        "sqrtPriceX96",
+        "feeGrowthGlobal0X128",
+        "feeGrowthGlobal1X128",
+        "tickLowerFeeGrowthOutside0X128",
+        "tickLowerFeeGrowthOutside1X128",
+        "tickUpperFeeGrowthOutside0X128",
+        "tickUpperFeeGrowthOutside1X128",
+    ]
+    init, ends = {}, {}
+
+    def chunks() -> Iterator[Mapping[str, np.ndarray]]:
+        for chunk in iter_results(out_dir, columns, chunk_size):
+            sqrt_ratio = chunk["sqrtPriceX96"] / Q96
+            tick = get_tick_at_sqrt_ratio(sqrt_ratio)
+            price = sqrt_ratio**2 * 10.0 ** (d0 - d1)  # token1 per token0
+            fgi = [
+                get_fee_growth_inside(
+                    tick,
+                    tick_lower,
+                    tick_upper,
+                    chunk[f"feeGrowthGlobal{i}X128"],
+                    chunk[f"tickLowerFeeGrowthOutside{i}X128"],
+                    chunk[f"tickUpperFeeGrowthOutside{i}X128"],
+                )
+                for i in range(2)
+            ]
+
+            # position liquidity and reference points from first record
+            if len(init) == 0:
+                init["amounts"] = (chunk["values0"][0], chunk["values1"][0])
+                init["fgi"] = (fgi[0][0], fgi[1][0])
+                init["liquidity"] = get_liquidity_for_amounts(
+                    sqrt_ratio[0],
+                    sqrt_ratio_a,
+                    sqrt_ratio_b,
+                    init["amounts"][0] * 10.0**d0,
+                    init["amounts"][1] * 10.0**d1,
+                )
+
+            liquidity = init["liquidity"]
+            fees0 = liquidity * (fgi[0] - init["fgi"][0]) / Q128 / 10.0**d0
+            fees1 = liquidity * (fgi[1] - init["fgi"][1]) / Q128 / 10.0**d1
+            value = chunk["values0"] * price + chunk["values1"]
+            fees = fees0 * price + fees1
+            hold = init["amounts"][0] * price + init["amounts"][1]
+            ends["fee_yield"] = fees[-1] / hold[-1]
+            ends["impermanent_loss"] = (value[-1] - fees[-1]) / hold[-1] - 1.0
+            yield {
+                "number": chunk["number"],
+                "price": price,
+                "value": value,
+                "hold": hold,
+                "fees0": fees0,
+                "fees1": fees1,
+                "fee_yield": fees / hold,
+                "impermanent_loss": (value - fees) / hold - 1.0,
+            }
+
+    summary = summarize(chunks(), "value", window, callback)
+    if len(ends) > 0:
+        summary["fee_yield"] = float(ends["fee_yield"])
+        summary["impermanent_loss"] = float(ends["impermanent_loss"])
+    return summary
+
+
+def get_fee_growth_below(
+    tick: np.ndarray, fee_growth_global: np.ndarray, ticks: np.ndarray
+) -> np.ndarray:
+    """
+    Gets the fee growth below each of the given ticks at each record from
+    the pool price and fee growth global alone.
+
+    Attributes the fee growth between consecutive records to the side of
+    each tick the price was on at the earlier record, as the fee growth
+    outside of a tick initialized at the first record and flipped on each
+    crossing between records would.
+
+    NOTE: Exact only to the resolution of records, so use records at each
+    block for ranges crossed within blocks.
+
+    Args:
+        tick (:class:`numpy.ndarray`): The pool tick at each record.
+        fee_growth_global (:class:`numpy.ndarray`): The fee growth global
+            at each record, relative to the first.
+        ticks (:class:`numpy.ndarray`): The ticks.
+
+    Returns:
+        :class:`numpy.ndarray`: The fee growth below each tick relative to
+        the first record of shape (len(tick), len(ticks)).
+    """
+    tick = np.asarray(tick)
+    fee_growth_global = np.asarray(fee_growth_global, dtype=np.float64)
+    ticks = np.asarray(ticks)
+
+    growth = np.diff(fee_growth_global)[:, np.newaxis]
+    below = tick[:-1, np.newaxis] < ticks[np.newaxis, :]
+    cumulative = np.cumsum(np.where(below, growth, 0.0), axis=0)
+    return np.vstack([np.zeros((1, len(ticks))), cumulative])
+
+
+def load_uniswap_v3_history(out_dir: str) -> Mapping[str, np.ndarray]:
+    """
+    Loads the pool history from saved Uniswap V3 LP runner results for
+    :func:`sweep_uniswap_v3_lp`.
+
+    Args:
+        out_dir (str): The directory the typed results were saved in.
+
+    Returns:
+        Mapping[str, :class:`numpy.ndarray`]: The block numbers, price, tick
+        and fee growth globals relative to the first record.
+    """
+    columns = load_int_columns(
+        out_dir,
+        ["number", "sqrtPriceX96", "feeGrowthGlobal0X128", "feeGrowthGlobal1X128"],
+    )
+    sqrt_price_x96 = np.array(columns["sqrtPriceX96"], dtype=np.float64)
+    history = {
+        "number": np.array(columns["number"], dtype=np.int64),
+        "sqrtPriceX96": sqrt_price_x96,
+        "tick": get_tick_at_sqrt_ratio(sqrt_price_x96 / Q96).astype(np.int64),
+    }
+    for k in ["feeGrowthGlobal0X128", "feeGrowthGlobal1X128"]:
+        values = columns[k]
+        history[k] = np.array(
+            [(v - values[0]) % UINT256_MOD for v in values], dtype=np.float64
+        )
+    return history
+
+
+def sweep_uniswap_v3_lp(
+    history: Mapping[str, np.ndarray],
+    tick_lower: np.ndarray,
+    tick_upper: np.ndarray,
+    amount0: np.ndarray,
+    amount1: np.ndarray,
+    decimals: Tuple[int, int] = (0, 0),
+    fee_growth_below: Optional[
+        Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+    ] = None,
+    chunk_size: int = SWEEP_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Evaluates passive LP positions in many candidate tick ranges over the
+    whole pool history at once, ranking by return in token1 terms.
+
+    Each position is entered at the first record with the given token
+    amounts. Fee growth inside each range is the difference of the fee
+    growth below its boundary ticks, computed once for all distinct ticks.
+
+    Args:
+        history (Mapping[str, :class:`numpy.ndarray`]): The pool history from
+            :func:`load_uniswap_v3_history` or
+            :meth:`backtest_ape.uniswap.v3.ticks.TickStore.get_history`.
+        tick_lower (:class:`numpy.ndarray`): The lower tick of each range.
+        tick_upper (:class:`numpy.ndarray`): The upper tick of each range.
+        amount0 (:class:`numpy.ndarray`): The amount of token0 to enter each
+            position with, in token0 wei.
+        amount1 (:class:`numpy.ndarray`): The amount of token1 to enter each
+            position with, in token1 wei.
+        decimals (Tuple[int, int]): The decimals of token0 and token1.
+        fee_growth_below (Optional[Callable]): Gets the fee growth below of
+            token0 and token1 for sorted ticks, e.g.
+            :meth:`backtest_ape.uniswap.v3.ticks.TickStore.get_fee_growth_below`.
+            If None, derives from history with :func:`get_fee_growth_below`.
+        chunk_size (int): The number of ranges evaluated per batch.
+
+    Returns:
+        :class:`pandas.DataFrame`: The final value, fees, value of holding,
+        return and max drawdown of each position in token1 terms, with the
+        fraction of records in range, sorted by return descending.
+    """
+    tick_lower, tick_upper, amount0, amount1 = [
+        np.broadcast_to(np.asarray(a), np.shape(tick_lower))
+        for a in [tick_lower, tick_upper, amount0, amount1]
+    ]
+    if np.any(tick_lower >= tick_upper):
+        raise ValueError("tick_lower not less than tick_upper.")
+
+    # fee growth below every distinct boundary tick, shared across ranges
+    ticks, index = np.unique(
+        np.concatenate([tick_lower, tick_upper]), return_inverse=True
+    )
+    index_lower, index_upper = np.split(index, [len(tick_lower)])
+    if fee_growth_below is None:
+        below = [
+            get_fee_growth_below(
+                history["tick"], history[f"feeGrowthGlobal{i}X128"], ticks
+            )
+            for i in range(2)
+        ]
+    else:
+        below = list(fee_growth_below(ticks))
+
+    tick = history["tick"][:, np.newaxis]
+    sqrt_ratio = (history["sqrtPriceX96"] / Q96)[:, np.newaxis]
+    price = sqrt_ratio**2  # token1 wei per token0 wei
+    scale1 = 10.0 ** decimals[1]
+
+    frames = []
+    for start in range(0, len(tick_lower), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        a0 = amount0[chunk].astype(np.float64)
+        a1 = amount1[chunk].astype(np.float64)
+        sqrt_ratio_a = get_sqrt_ratio_at_tick(tick_lower[chunk])
+        sqrt_ratio_b = get_sqrt_ratio_at_tick(tick_upper[chunk])
+        liquidity = get_liquidity_for_amounts(
+            sqrt_ratio[0, 0],
+            sqrt_ratio_a,
+            sqrt_ratio_b,
+            a0,
+            a1,
+        )
+
+        # principal amounts and fees at each record, in token1 terms
+        principal0, principal1 = get_amounts_for_liquidity(
+            sqrt_ratio, sqrt_ratio_a, sqrt_ratio_b, liquidity
+        )
+        fees0, fees1 = [
+            liquidity * (b[:, index_upper[chunk]] - b[:, index_lower[chunk]]) / Q128
+            for b in below
+        ]
+        fees = (fees0 * price + fees1) / scale1
+        values = (principal0 * price + principal1) / scale1 + fees
+        hold = (a0 * price[-1, 0] + a1) / scale1
+        drawdowns = values / np.maximum.accumulate(values, axis=0) - 1.0
+        in_range = (tick >= tick_lower[chunk]) & (tick < tick_upper[chunk])
+
+        frames.append(
+            pd.DataFrame(
+                {
+                    "tick_lower": tick_lower[chunk],
+                    "tick_upper": tick_upper[chunk],
+                    "amount0": amount0[chunk],
+                    "amount1": amount1[chunk],
+                    "liquidity": liquidity,
+                    "value": values[-1],
+                    "fees": fees[-1],
+                    "hold": hold,
+                    "return": values[-1] / values[0] - 1.0,
+                    "return_vs_hold": values[-1] / hold - 1.0,
+                    "max_drawdown": drawdowns.min(axis=0),
+                    "time_in_range": in_range.mean(axis=0),
+                }
+            )
+        )
+
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values("return", ascending=False, ignore_index=True)
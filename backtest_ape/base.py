@@ -1,8 +1,18 @@
-from typing import Any, ClassVar, List, Mapping, Optional
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+)
 
 import click
-import pandas as pd
-from ape import Contract, chain, networks, project
+from ape import chain, networks, project
 from ape.api.accounts import AccountAPI
 from ape.api.transactions import TransactionAPI
 from ape.contracts import ContractInstance
@@ -10,7 +20,25 @@ from ape.exceptions import ContractLogicError
 from ape.types import SnapshotID
 from pydantic import BaseModel, validator
 
-from backtest_ape.utils import fund_account, get_impersonated_account, get_test_account
+from backtest_ape.parallel import (
+    get_connection_name,
+    get_shard_path,
+    get_shards,
+    merge_records,
+    replay_shard,
+)
+from backtest_ape.registry import get_contract
+from backtest_ape.sinks import BaseSink, CSVSink
+from backtest_ape.utils import (
+    fund_account,
+    get_impersonated_account,
+    get_state_divergence,
+    get_test_account,
+    get_upstream_network_choice,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class BaseRunner(BaseModel):
@@ -18,6 +46,7 @@ class BaseRunner(BaseModel):
     acc_addr: Optional[str] = None
 
     _ref_keys: ClassVar[List[str]] = []
+    _ref_interfaces: ClassVar[Mapping[str, str]] = {}  # bundled interfaces by key
     _refs: Mapping[str, ContractInstance] = {}
     _ref_txs: Mapping[int, List[TransactionAPI]] = {}
     _mocks: Mapping[str, ContractInstance] = {}
@@ -26,6 +55,8 @@ class BaseRunner(BaseModel):
     _backtester_name: ClassVar[str] = ""
     _backtester: Optional[ContractInstance] = None
     _initialized: bool = False
+    _shardable: ClassVar[bool] = False  # strategy re-init at shard boundary ok
+    _use_sources: bool = True  # whether refs state read from local sources if set
 
     @validator("ref_addrs")
     def ref_addrs_has_keys(cls, v):
@@ -39,7 +70,10 @@ class BaseRunner(BaseModel):
         instances of reference addresses.
         """
         super().__init__(**data)
-        self._refs = {k: Contract(ref_addr) for k, ref_addr in self.ref_addrs.items()}
+        self._refs = {
+            k: get_contract(ref_addr, self.get_ref_interface(k))
+            for k, ref_addr in self.ref_addrs.items()
+        }
 
         # set either as impersonated account or test account
         test_acc = get_test_account()
@@ -54,6 +88,19 @@ class BaseRunner(BaseModel):
     class Config:
         underscore_attrs_are_private = True
 
+    def get_ref_interface(self, key: str) -> Optional[str]:
+        """
+        Gets the bundled interface to get the ref contract with, if any.
+
+        Args:
+            key (str): The ref key.
+
+        Returns:
+            Optional[str]: The bundled interface name. None if resolved
+            through the registry instead.
+        """
+        return self._ref_interfaces.get(key)
+
     @property
     def acc(self):
         if self._acc is None:
@@ -73,12 +120,15 @@ class BaseRunner(BaseModel):
         if self._acc.balance < self._initial_acc_balance:
             fund_account(self._acc.address, self._initial_acc_balance)
 
-    def setup(self, mocking: bool = True):
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
         """
         Sets up the runner for testing.
 
         Args:
             mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
         """
         raise NotImplementedError("setup not implemented.")
 
@@ -148,6 +198,32 @@ class BaseRunner(BaseModel):
         """
         raise NotImplementedError("update_strategy not implemented.")
 
+    def get_values(self) -> List[int]:
+        """
+        Gets the current values of the strategy from the backtester.
+
+        Returns:
+            List[int]: The values of the backtester.
+        """
+        return self.backtester.values()
+
+    def get_record(
+        self, number: int, state: Mapping, values: List[int]
+    ) -> Mapping[str, int]:
+        """
+        Gets the record row of the value and possibly some state at the
+        given block.
+
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+            values (List[int]): The values from the backtester for the state.
+
+        Returns:
+            Mapping[str, int]: The record row by column name.
+        """
+        raise NotImplementedError("get_record not implemented.")
+
     def record(self, path: str, number: int, state: Mapping, values: List[int]):
         """
         Records the value and possibly some state at the given block.
@@ -158,7 +234,29 @@ class BaseRunner(BaseModel):
             state (Mapping): The state of references at block number.
             values (List[int]): The values from the backtester for the state.
         """
-        raise NotImplementedError("record not implemented.")
+        CSVSink(path=path).write(self.get_record(number, state, values))
+
+    def get_record_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of each column recorded to csv by the runner.
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        raise NotImplementedError("get_record_decimals not implemented.")
+
+    def save_results(self, path: str, out_dir: str):
+        """
+        Saves the csv record as typed fixed-point columns for exact and
+        fast loads with :func:`backtest_ape.results.load_results`.
+
+        Args:
+            path (str): The path to the csv file the runner recorded to.
+            out_dir (str): The directory to save the typed columns in.
+        """
+        from backtest_ape.results import save_results
+
+        save_results(path, out_dir, self.get_record_decimals())
 
     def snapshot(self) -> (SnapshotID, Mapping):
         """
@@ -219,15 +317,38 @@ class BaseRunner(BaseModel):
         Args:
             number (Optional[int]): The block number.
         """
-        ecosystem_name = chain.provider.network.ecosystem.name
-        upstream_name = chain.provider.config.fork[ecosystem_name][
-            "mainnet"
-        ].upstream_provider
-        with networks.parse_network_choice(
-            f"{ecosystem_name}:mainnet:{upstream_name}"
-        ) as provider:
+        with networks.parse_network_choice(get_upstream_network_choice()) as provider:
             return provider.get_block(block_id=number).transactions
 
+    def get_refs_divergence(self, number: int, state: Mapping) -> float:
+        """
+        Gets the divergence of the given refs state on the fork from the refs
+        state upstream at the same historical block.
+
+        NOTE: Compares the runner's selected refs state rather than eth_getProof
+        storage roots, as local forks only hold the storage slots they have
+        fetched so cannot report the full storage root of forked contracts.
+
+        Reads the upstream refs state straight from the archive node, bypassing
+        any local sources of refs state set on the runner, e.g. event replayers,
+        tick stores or round indexes.
+
+        Args:
+            number (int): The historical block number.
+            state (Mapping): The state of references on the fork.
+
+        Returns:
+            float: The max relative deviation over numeric leaves of the state.
+        """
+        self._use_sources = False
+        try:
+            with networks.parse_network_choice(get_upstream_network_choice()):
+                upstream_state = self.get_refs_state(number)
+        finally:
+            self._use_sources = True
+
+        return get_state_divergence(state, upstream_state)
+
     def submit_tx(self, tx: TransactionAPI):
         """
         Submits a transaction, silently handling reverts.
@@ -254,6 +375,116 @@ class BaseRunner(BaseModel):
         for tx in txs:
             self.submit_tx(tx)
 
+    def get_backtest_numbers(self, start: int, stop: int, step: int) -> Sequence[int]:
+        """
+        Gets the block numbers to process when backtesting between start and
+        stop blocks. Override to skip blocks, e.g. without ref state changes.
+
+        Args:
+            start (int): The start block number.
+            stop (int): The stop block number.
+            step (int): The step interval size.
+
+        Returns:
+            Sequence[int]: The block numbers, in ascending order.
+        """
+        return range(start + 1, stop, step)
+
+    def iter_backtest(
+        self,
+        start: int,
+        stop: Optional[int] = None,
+        step: Optional[int] = 1,
+        sinks: Optional[List[BaseSink]] = None,
+    ) -> Iterator[Mapping[str, int]]:
+        """
+        Backtests strategy between start and stop blocks using mocks,
+        yielding each record row as it is produced.
+
+        Consumers can stop iterating early, e.g. once a strategy has
+        liquidated, without recording the rest of the range.
+
+        Args:
+            start (int): The start block number.
+            stop (Optional[int]): The stop block number.
+            step (Optional[int]): The step interval size.
+            sinks (Optional[List[:class:`backtest_ape.sinks.BaseSink`]]):
+                The sinks to also write each record row to.
+
+        Yields:
+            Mapping[str, int]: The record row by column name.
+        """
+        if chain.provider.network.name != "mainnet-fork":
+            raise Exception("network not mainnet-fork.")
+
+        if stop is None:
+            stop = chain.blocks.head.number
+
+        if start > stop:
+            raise ValueError("start block after stop block.")
+
+        sinks = sinks or []
+
+        click.echo("Setting up runner ...")
+        self.setup(mocking=True, number=start)
+
+        if not self._initialized:
+            raise Exception("runner not initialized.")
+
+        click.echo(f"Initializing state of mocks from block number {start} ...")
+        self.init_mocks_state(start, self.get_refs_state(start))
+
+        click.echo(
+            f"Iterating from block number {start+1} to {stop} with step size {step} ..."
+        )
+        try:
+            for number in self.get_backtest_numbers(start, stop, step):
+                click.echo(f"Processing block {number} ...")
+
+                # snapshot in case contract logic error revert
+                (snapshot_chain_id, snapshot_runner_kwargs) = self.snapshot()
+
+                try:
+                    # get the state of refs for vars care about at block.number
+                    refs_state = self.get_refs_state(number)
+                    click.echo(f"State of refs at block {number}: {refs_state}")
+
+                    # set the state of mocks to refs state for vars
+                    self.set_mocks_state(refs_state)
+
+                    # record values function on backtester and any additional state
+                    values = self.get_values()
+                    click.echo(f"Backtester values at block {number}: {values}")
+                    row = self.get_record(number, refs_state, values)
+                    for sink in sinks:
+                        sink.write(row)
+
+                    # update backtested strategy based off new mock state, if needed
+                    click.echo(f"Updating strategy at block {number} ...")
+                    self.update_strategy(number, refs_state)
+
+                    # replenish funds for acc
+                    click.echo("Replenishing funds in account ...")
+                    self.fund_account()
+                except ContractLogicError:
+                    # backtest can keep going on next iteration given mocking chain
+                    # state from ref at next block
+                    click.secho(
+                        f"Failed to process block {number}",
+                        blink=True,
+                        bold=True,
+                    )
+                    click.echo(
+                        "Reverting runner and chain state to prior iteration ..."
+                    )
+                    self.restore(snapshot_chain_id, snapshot_runner_kwargs)
+                    continue
+
+                yield row
+        finally:
+            for sink in sinks:
+                sink.close()
+
     def backtest(
         self,
         path: str,
@@ -270,6 +501,40 @@ class BaseRunner(BaseModel):
             stop (Optional[int]): The stop block number.
             step (Optional[int]): The step interval size.
         """
+        sinks = [CSVSink(path=path)]
+        for _ in self.iter_backtest(start, stop, step, sinks=sinks):
+            pass
+
+    def iter_replay(
+        self,
+        start: int,
+        stop: Optional[int] = None,
+        check_every: Optional[int] = None,
+        max_divergence: float = 0.0,
+        halt_on_divergence: bool = True,
+        sinks: Optional[List[BaseSink]] = None,
+    ) -> Iterator[Mapping[str, int]]:
+        """
+        Replays strategy against full history of chain between start and
+        stop blocks, yielding each record row as it is produced.
+
+        SEE: BaseRunner::replay for caveats on replayed history and
+        divergence checks.
+
+        Args:
+            start (int): The start block number.
+            stop (Optional[int]): The stop block number.
+            check_every (Optional[int]): The interval in blocks at which to
+                check refs state divergence. If None, never checks.
+            max_divergence (float): The max relative deviation of refs state
+                from upstream before flagging divergence.
+            halt_on_divergence (bool): Whether to stop replay on divergence.
+            sinks (Optional[List[:class:`backtest_ape.sinks.BaseSink`]]):
+                The sinks to also write each record row to.
+
+        Yields:
+            Mapping[str, int]: The record row by column name.
+        """
         if chain.provider.network.name != "mainnet-fork":
             raise Exception("network not mainnet-fork.")
 
@@ -279,60 +544,83 @@ class BaseRunner(BaseModel):
         if start > stop:
             raise ValueError("start block after stop block.")
 
+        if check_every is not None and check_every < 1:
+            raise ValueError("check_every < 1.")
+
+        sinks = sinks or []
+
+        click.echo(f"Resetting fork to block number {start} ...")
+        self.reset_fork(start)
+
         click.echo("Setting up runner ...")
-        self.setup(mocking=True)
+        self.setup(mocking=False)
 
         if not self._initialized:
             raise Exception("runner not initialized.")
 
-        click.echo(f"Initializing state of mocks from block number {start} ...")
-        self.init_mocks_state(start, self.get_refs_state(start))
+        click.echo(f"Initializing state of strategy at block number {start} ...")
+        self.init_strategy()
 
         click.echo(
-            f"Iterating from block number {start+1} to {stop} with step size {step} ..."
+            f"Iterating from block number {start+1} to {stop} with step size 1 ..."
         )
-        for number in range(start + 1, stop, step):
-            click.echo(f"Processing block {number} ...")
-
-            # snapshot in case contract logic error revert
-            (snapshot_chain_id, snapshot_runner_kwargs) = self.snapshot()
+        try:
+            for number in range(start + 1, stop, 1):
+                click.echo(f"Processing block {number} ...")
 
-            try:
-                # get the state of refs for vars care about at block.number
-                refs_state = self.get_refs_state(number)
+                # get the state of refs for vars care about at current chain state
+                refs_state = self.get_refs_state()
                 click.echo(f"State of refs at block {number}: {refs_state}")
 
-                # set the state of mocks to refs state for vars
-                self.set_mocks_state(refs_state)
+                # check fork state prior to block txs against upstream at prior block
+                if check_every is not None and (number - start) % check_every == 0:
+                    divergence = self.get_refs_divergence(number - 1, refs_state)
+                    click.echo(f"Divergence of refs at block {number}: {divergence}")
+                    if divergence > max_divergence:
+                        click.secho(
+                            f"State of refs diverged from history at block {number}",
+                            blink=True,
+                            bold=True,
+                        )
+                        if halt_on_divergence:
+                            raise Exception(
+                                f"refs state divergence {divergence} > "
+                                f"{max_divergence}."
+                            )
+
+                # get the ref network txs at historical block.number and submit
+                ref_txs = self.get_ref_txs(number)
+                click.echo(f"Submitting {len(ref_txs)} ref txs from block {number} ...")
+                self.submit_txs(ref_txs)
 
                 # record values function on backtester and any additional state
-                values = self.backtester.values()
+                values = self.get_values()
                 click.echo(f"Backtester values at block {number}: {values}")
-                self.record(path, number, refs_state, values)
+                row = self.get_record(number, refs_state, values)
+                for sink in sinks:
+                    sink.write(row)
 
-                # update backtested strategy based off new mock state, if needed
+                # update backtested strategy based off current chain state, if needed
                 click.echo(f"Updating strategy at block {number} ...")
                 self.update_strategy(number, refs_state)
 
                 # replenish funds for acc
                 click.echo("Replenishing funds in account ...")
                 self.fund_account()
-            except ContractLogicError:
-                # backtest can keep going on next iteration given mocking chain
-                # state from ref at next block
-                click.secho(
-                    f"Failed to process block {number}",
-                    blink=True,
-                    bold=True,
-                )
-                click.echo("Reverting runner and chain state to prior iteration ...")
-                self.restore(snapshot_chain_id, snapshot_runner_kwargs)
+
+                yield row
+        finally:
+            for sink in sinks:
+                sink.close()
 
     def replay(
         self,
         path: str,
         start: int,
         stop: Optional[int] = None,
+        check_every: Optional[int] = None,
+        max_divergence: float = 0.0,
+        halt_on_divergence: bool = True,
     ):
         """
         Replays strategy against full history of chain between start and
@@ -345,11 +633,62 @@ class BaseRunner(BaseModel):
         txs from the actual chain history will cause the strategy to
         not replay as it would have historically.
 
+        To detect this early, set check_every to sample every N blocks whether
+        the refs state on the fork has diverged from upstream at the same
+        historical block by more than max_divergence. Strategies that trade
+        against or provide liquidity to refs move refs state by design, so
+        max_divergence should allow for the size of the strategy.
+
+        Args:
+            path (str): The path to the csv file to write the record to.
+            start (int): The start block number.
+            stop (Optional[int]): The stop block number.
+            check_every (Optional[int]): The interval in blocks at which to
+                check refs state divergence. If None, never checks.
+            max_divergence (float): The max relative deviation of refs state
+                from upstream before flagging divergence.
+            halt_on_divergence (bool): Whether to stop replay on divergence.
+        """
+        rows = self.iter_replay(
+            start,
+            stop,
+            check_every=check_every,
+            max_divergence=max_divergence,
+            halt_on_divergence=halt_on_divergence,
+            sinks=[CSVSink(path=path)],
+        )
+        for _ in rows:
+            pass
+
+    def replay_sharded(
+        self,
+        path: str,
+        start: int,
+        stop: Optional[int] = None,
+        num_shards: int = 2,
+    ):
+        """
+        Replays strategy against full history of chain between start and
+        stop blocks, splitting the range into shards replayed in parallel.
+
+        Each shard runs in a separate process on its own local fork reset
+        to the shard start block, where the strategy is initialized anew
+        through init_strategy. Shard records are merged in block order
+        into the csv file at path.
+
+        WARNING: Strategy state is *not* carried across shard boundaries, so
+        only runners that declare _shardable (i.e. the strategy can be
+        re-initialized at any block) can replay sharded.
+
         Args:
             path (str): The path to the csv file to write the record to.
             start (int): The start block number.
             stop (Optional[int]): The stop block number.
+            num_shards (int): The number of shards to replay in parallel.
         """
+        if not self._shardable:
+            raise Exception("runner strategy not re-initializable at shards.")
+
         if chain.provider.network.name != "mainnet-fork":
             raise Exception("network not mainnet-fork.")
 
@@ -359,47 +698,37 @@ class BaseRunner(BaseModel):
         if start > stop:
             raise ValueError("start block after stop block.")
 
-        click.echo(f"Resetting fork to block number {start} ...")
-        self.reset_fork(start)
-
-        click.echo("Setting up runner ...")
-        self.setup(mocking=False)
-
-        if not self._initialized:
-            raise Exception("runner not initialized.")
-
-        click.echo(f"Initializing state of strategy at block number {start} ...")
-        self.init_strategy()
+        shards = get_shards(start, stop, num_shards)
+        shard_paths = [get_shard_path(path, i) for i in range(len(shards))]
+        network_choice = get_connection_name()
+        runner_kwargs = dict(self)
 
         click.echo(
-            f"Iterating from block number {start+1} to {stop} with step size 1 ..."
+            f"Replaying from block number {start} to {stop} in {len(shards)} shards ..."
         )
-        for number in range(start + 1, stop, 1):
-            click.echo(f"Processing block {number} ...")
-
-            # get the state of refs for vars care about at current chain state
-            refs_state = self.get_refs_state()
-            click.echo(f"State of refs at block {number}: {refs_state}")
-
-            # get the ref network txs at historical block.number and submit to chain
-            ref_txs = self.get_ref_txs(number)
-            click.echo(f"Submitting {len(ref_txs)} ref txs from block {number} ...")
-            self.submit_txs(ref_txs)
-
-            # record values function on backtester and any additional state
-            values = self.backtester.values()
-            click.echo(f"Backtester values at block {number}: {values}")
-            self.record(path, number, refs_state, values)
-
-            # update backtested strategy based off current chain state, if needed
-            click.echo(f"Updating strategy at block {number} ...")
-            self.update_strategy(number, refs_state)
+        with ProcessPoolExecutor(
+            max_workers=len(shards), mp_context=mp.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(
+                    replay_shard,
+                    type(self),
+                    runner_kwargs,
+                    network_choice,
+                    shard_paths[i],
+                    shard_start,
+                    shard_stop,
+                )
+                for i, (shard_start, shard_stop) in enumerate(shards)
+            ]
+            for i, future in enumerate(futures):
+                future.result()
+                click.echo(f"Replayed shard {i} between blocks {shards[i]} ...")
 
-            # replenish funds for acc
-            click.echo("Replenishing funds in account ...")
-            self.fund_account()
+        click.echo(f"Merging shard records into {path} ...")
+        merge_records(shard_paths, path)
 
-    def forwardtest(self, data: pd.DataFrame) -> pd.DataFrame:
+    def forwardtest(self, data: "pd.DataFrame") -> "pd.DataFrame":
         """
         Forwardtests strategy against Monte Carlo simulated data.
 
@@ -1,7 +1,23 @@
-from backtest_ape.curve.v2.base import BaseCurveV2Runner
-from backtest_ape.curve.v2.lp import CurveV2LPRunner
+from typing import TYPE_CHECKING
+
+from backtest_ape._lazy import lazy_module
+
+if TYPE_CHECKING:
+    from backtest_ape.curve.v2.base import BaseCurveV2Runner
+    from backtest_ape.curve.v2.lp import CurveV2LPRunner
+    from backtest_ape.curve.v2.multi import CurveV2MultiLPRunner
+
+_modules = {
+    "BaseCurveV2Runner": "backtest_ape.curve.v2.base",
+    "CurveV2LPRunner": "backtest_ape.curve.v2.lp",
+    "CurveV2MultiLPRunner": "backtest_ape.curve.v2.multi",
+}
 
 __all__ = [
     "BaseCurveV2Runner",
     "CurveV2LPRunner",
+    "CurveV2MultiLPRunner",
 ]
+
+
+__getattr__, __dir__ = lazy_module(_modules, globals())
@@ -1,16 +1,35 @@
-from typing import Any, ClassVar, List
+from typing import Any, ClassVar, Dict, List, Mapping, Optional, Tuple
 
 import click
-from ape import Contract
 
 from backtest_ape.base import BaseRunner
 from backtest_ape.curve.v2.setup import deploy_mock_lp, deploy_mock_pool
+from backtest_ape.registry import get_contract, get_symbol
 from backtest_ape.setup import deploy_mock_erc20
+from backtest_ape.utils import get_block_identifier, multicall
+
+# pool parameters read from the ref pool to deploy mocks with
+POOL_PARAM_NAMES = [
+    "A",
+    "gamma",
+    "mid_fee",
+    "out_fee",
+    "allowed_extra_profit",
+    "fee_gamma",
+    "adjustment_step",
+    "admin_fee",
+    "ma_half_time",
+]
+
+# bundled ref pool interfaces by number of coins in pool
+POOL_INTERFACE_NAMES: Mapping[int, str] = {2: "CurveCryptoSwap2", 3: "CurveTricrypto2"}
 
 
 class BaseCurveV2Runner(BaseRunner):
     num_coins: int = 0
     _ref_keys: ClassVar[List[str]] = ["pool"]
+    _decimals: List[int] = []
+    _pool_params: Dict[Optional[int], Mapping[str, Any]] = {}  # by block
 
     def __init__(self, **data: Any):
         """
@@ -21,7 +40,8 @@ class BaseCurveV2Runner(BaseRunner):
 
         # store coin contracts in _refs
         pool = self._refs["pool"]
-        self._refs["coins"] = [Contract(pool.coins(i)) for i in range(self.num_coins)]
+        coin_addrs = multicall([(pool.coins, i) for i in range(self.num_coins)])
+        self._refs["coins"] = [get_contract(addr, "ERC20") for addr in coin_addrs]
 
         # check num coins matches pool
         matches = False
@@ -34,57 +54,130 @@ class BaseCurveV2Runner(BaseRunner):
             raise ValueError("num_coins not same as pool.N_COINS")
 
         # store pool lp token in _refs
-        self._refs["lp"] = Contract(pool.token())
+        self._refs["lp"] = get_contract(pool.token(), "ERC20")
 
-    def setup(self, mocking: bool = True):
+    def get_ref_interface(self, key: str) -> Optional[str]:
+        """
+        Overrides BaseRunner to get the ref pool with the bundled interface
+        for the number of coins in the pool.
+
+        Args:
+            key (str): The ref key.
+
+        Returns:
+            Optional[str]: The bundled interface name. None if resolved
+            through the registry instead.
+        """
+        if key == "pool":
+            return POOL_INTERFACE_NAMES.get(self.num_coins)
+        return super().get_ref_interface(key)
+
+    def get_decimals(self) -> List[int]:
+        """
+        Gets the decimals of the ref coins, reading once then caching.
+
+        Returns:
+            List[int]: The decimals of each coin in the pool.
+        """
+        if len(self._decimals) == 0:
+            self._decimals = multicall(
+                [(coin.decimals,) for coin in self._refs["coins"]]
+            )
+        return self._decimals
+
+    def get_precisions(self) -> List[int]:
+        """
+        Gets the multipliers to convert each coin amount to 18 decimals.
+
+        Returns:
+            List[int]: The precision of each coin in the pool.
+        """
+        return [10 ** (18 - d) for d in self.get_decimals()]
+
+    def get_price_calls(self, name: str) -> List[Tuple]:
+        """
+        Gets the calls to read a price of each coin relative to coin0 from
+        the ref pool.
+
+        NOTE: 2 coin pools store a single price, read without an index.
+
+        Args:
+            name (str): The name of the price method, e.g. price_oracle.
+
+        Returns:
+            List[Tuple]: The calls as (contract method, *args) tuples.
+        """
+        method = getattr(self._refs["pool"], name)
+        if self.num_coins == 2:
+            return [(method,)]
+        return [(method, k) for k in range(self.num_coins - 1)]
+
+    def get_pool_params(self, number: Optional[int] = None) -> Mapping[str, Any]:
+        """
+        Gets the parameters of the ref pool at given block, reading once per
+        block then caching.
+
+        Args:
+            number (Optional[int]): The block number. If None, then last block
+                from current provider chain.
+
+        Returns:
+            Mapping[str, Any]: The pool parameters by name, with the price
+            scale of each coin relative to coin0 under prices.
+        """
+        if number not in self._pool_params:
+            pool = self._refs["pool"]
+            calls = [(getattr(pool, name),) for name in POOL_PARAM_NAMES]
+            calls += self.get_price_calls("price_scale")
+            results = iter(multicall(calls, get_block_identifier(number)))
+
+            params = {name: next(results) for name in POOL_PARAM_NAMES}
+            params["prices"] = list(results)
+            self._pool_params[number] = params
+        return self._pool_params[number]
+
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
         """
         Sets up Curve V2 runner for testing. Deploys mock ERC20 tokens needed
         for pool and mock Curve V2 pool, if mocking.
 
         Args:
             mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
         """
         if mocking:
-            self.deploy_mocks()
+            self.deploy_mocks(number)
 
-    def deploy_mocks(self):
+    def deploy_mocks(self, number: Optional[int] = None):
         """
         Deploys the mock contracts.
+
+        Args:
+            number (Optional[int]): The block number to read the ref pool
+                params to deploy the mock pool with at. If None, then last
+                block from current provider chain.
         """
         # deploy the mock erc20s
         click.echo("Deploying mock ERC20 tokens ...")
+        decimals = self.get_decimals()
         mock_coins = [
-            deploy_mock_erc20(f"Mock Coin{i}", coin.symbol(), coin.decimals(), self.acc)
+            deploy_mock_erc20(f"Mock Coin{i}", get_symbol(coin), decimals[i], self.acc)
             for i, coin in enumerate(self._refs["coins"])
         ]
 
         # deploy the mock lp token and mint existing liquidity tokens
-        mock_lp = deploy_mock_lp("Mock Curve V2 LP", "crv3m", self.acc)
-
-        # deploy the mock curve v2 pool
-        A = 1000000  # 10**6
-        gamma = 10000000000000  # 10**13
-        mid_fee = 5000000  # 5 bps
-        out_fee = 30000000  # 3 bps
-        allowed_extra_profit = 2000000000000  # 2 * 10**12
-        fee_gamma = 500000000000000
-        adjustment_step = 2000000000000000
-        admin_fee = 5000000000
-        ma_half_time = 600
-        price = 1000000000000000000  # 1 wad
+        mock_lp = deploy_mock_lp("Mock Curve V2 LP", f"crv{self.num_coins}m", self.acc)
+
+        # deploy the mock curve v2 pool with the ref pool params
+        params = self.get_pool_params(number)
         mock_pool = deploy_mock_pool(
             mock_coins,
             mock_lp,
-            A,
-            gamma,
-            mid_fee,
-            out_fee,
-            allowed_extra_profit,
-            fee_gamma,
-            adjustment_step,
-            admin_fee,
-            ma_half_time,
-            [price, price],
+            *[params[name] for name in POOL_PARAM_NAMES],
+            params["prices"],
+            self.get_precisions(),
             self.acc,
         )
 
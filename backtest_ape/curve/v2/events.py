@@ -0,0 +1,794 @@
+from bisect import bisect_right
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import click
+from ape import chain
+from ape.contracts import ContractInstance
+from pydantic import BaseModel, validator
+
+from backtest_ape.curve.v2.base import POOL_INTERFACE_NAMES
+from backtest_ape.curve.v2.math import (
+    PRECISION,
+    geometric_mean,
+    halfpow,
+    newton_D,
+    newton_y,
+    reduction_coefficient,
+    sqrt_int,
+)
+from backtest_ape.registry import get_contract
+from backtest_ape.utils import multicall
+
+EVENT_NAMES = [
+    "TokenExchange",
+    "AddLiquidity",
+    "RemoveLiquidity",
+    "RemoveLiquidityOne",
+    "ClaimAdminFee",
+    "NewParameters",
+    "RampAgamma",
+    "StopRampA",
+]
+
+# pool parameters changed through NewParameters logs
+PARAM_NAMES = [
+    "admin_fee",
+    "mid_fee",
+    "out_fee",
+    "fee_gamma",
+    "allowed_extra_profit",
+    "adjustment_step",
+    "ma_half_time",
+]
+
+FEE_DENOMINATOR = 10**10
+
+
+def get_pool_logs(pool: ContractInstance, start: int, stop: int) -> List[Tuple]:
+    """
+    Gets the logs of a pool that change its state between blocks in a few
+    bulk log queries.
+
+    Args:
+        pool (:class:`ape.contracts.ContractInstance`): The Curve V2 pool.
+        start (int): The first block number.
+        stop (int): The last block number, inclusive.
+
+    Returns:
+        List[Tuple]: The (block number, log index, event name, log) of each
+        log with name in EVENT_NAMES in chain order.
+    """
+    logs = []
+    for name in EVENT_NAMES:
+        for log in getattr(pool, name).range(start, stop + 1):
+            logs.append((log.block_number, log.log_index, name, log))
+
+    return sorted(
+        (log for log in logs if log[0] <= stop), key=lambda log: (log[0], log[1])
+    )
+
+
+def pack_A_gamma(A: int, gamma: int) -> int:
+    """
+    Packs A and gamma into one word, as the pool stores them.
+    """
+    return (A << 128) | gamma
+
+
+class PoolEventReplayer(BaseModel):
+    """
+    Reconstructs the state of a Curve V2 tricrypto pool at each block by
+    folding its TokenExchange, AddLiquidity, RemoveLiquidity*,
+    ClaimAdminFee, NewParameters and A gamma ramp logs with the pool math,
+    seeded from one full state read.
+
+    Replays the invariant D, the price scale adjustment and the price
+    oracle EMA off-chain. Logs are fetched ahead in bulk queries of
+    log_chunk_size blocks. Every check_interval blocks, the reconstructed
+    state is spot checked against the pool within check_rtol and re-seeded
+    on any drift.
+
+    NOTE: Block timestamps for the oracle EMA and A gamma ramps are
+    interpolated between the block of each bulk log query, so the price
+    oracle can differ slightly from the pool until the next spot check.
+    """
+
+    pool_addr: str
+    num_coins: int = 3
+    check_interval: Optional[int] = 1000  # blocks between spot checks
+    check_rtol: float = 1e-6  # relative tolerance of spot checks
+    log_chunk_size: int = 10000  # blocks per bulk log query
+
+    _pool: Optional[ContractInstance] = None
+    _lp: Optional[ContractInstance] = None
+    _precisions: List[int] = []
+    _number: Optional[int] = None  # block number state folded through
+    _fetched: Optional[int] = None  # last block number logs fetched through
+    _logs: List[Tuple] = []  # fetched logs not yet folded
+    _anchors: List[Tuple[int, int]] = []  # (block number, timestamp) read
+    _last_check: Optional[int] = None
+    _reads: int = 0  # upstream read requests
+    _drifts: int = 0  # spot checks that found drift
+
+    _params: Dict[str, int] = {}
+    _balances: List[int] = []
+    _D: int = 0
+    _A_gamma: List[int] = []  # initial, future, initial time, future time
+    _price_scale: List[int] = []
+    _price_oracle: List[int] = []
+    _last_prices: List[int] = []
+    _last_prices_timestamp: int = 0
+    _xcp_profit: int = 0
+    _xcp_profit_a: int = 0
+    _virtual_price: int = 0
+    _not_adjusted: bool = False
+    _total_supply: int = 0
+
+    class Config:
+        underscore_attrs_are_private = True
+
+    @validator("num_coins")
+    def num_coins_has_math(cls, v):
+        if v != 3:
+            raise ValueError(f"no replay math for num_coins {v}")
+        return v
+
+    def __init__(self, **data: Any):
+        """
+        Overrides BaseModel init to store the ape Contract instances of the
+        pool and LP token, and the precisions of the pool coins.
+        """
+        super().__init__(**data)
+        pool = get_contract(self.pool_addr, POOL_INTERFACE_NAMES[self.num_coins])
+        coin_addrs = multicall([(pool.coins, i) for i in range(self.num_coins)])
+        coins = [get_contract(addr, "ERC20") for addr in coin_addrs]
+        decimals = multicall([(coin.decimals,) for coin in coins])
+        self._reads += 3
+
+        self._pool = pool
+        self._lp = get_contract(pool.token(), "ERC20")
+        self._precisions = [10 ** (18 - d) for d in decimals]
+
+    @property
+    def number(self) -> Optional[int]:
+        """
+        The block number the state is reconstructed through.
+        """
+        return self._number
+
+    @property
+    def reads(self) -> int:
+        """
+        The number of upstream read requests made.
+        """
+        return self._reads
+
+    @property
+    def drifts(self) -> int:
+        """
+        The number of spot checks that found the state drifted.
+        """
+        return self._drifts
+
+    def get_price_calls(self, name: str) -> List[Tuple]:
+        """
+        Gets the calls to read a price of each coin relative to coin0 from
+        the pool.
+
+        Args:
+            name (str): The name of the price method, e.g. price_oracle.
+
+        Returns:
+            List[Tuple]: The calls as (contract method, *args) tuples.
+        """
+        method = getattr(self._pool, name)
+        return [(method, k) for k in range(self.num_coins - 1)]
+
+    def get_state_calls(self) -> List[Tuple]:
+        """
+        Gets the view calls to read the state to spot check through, in the
+        order of the refs state of an LP runner followed by the price scale.
+
+        Returns:
+            List[Tuple]: The calls as (contract method, *args) tuples.
+        """
+        pool = self._pool
+        calls = [(pool.balances, i) for i in range(self.num_coins)]
+        calls += [
+            (pool.D,),
+            (pool.initial_A_gamma,),
+            (pool.future_A_gamma,),
+            (pool.initial_A_gamma_time,),
+            (pool.future_A_gamma_time,),
+        ]
+        calls += self.get_price_calls("price_oracle")
+        calls += [(self._lp.totalSupply,)]
+        calls += self.get_price_calls("price_scale")
+        return calls
+
+    def seed(self, number: int):
+        """
+        Seeds the state with a full read of the pool at a block.
+
+        Args:
+            number (int): The block number.
+        """
+        click.echo(f"Seeding pool state from block {number} ...")
+        pool = self._pool
+        calls = self.get_state_calls()
+        calls += self.get_price_calls("last_prices")
+        calls += [
+            (pool.last_prices_timestamp,),
+            (pool.xcp_profit,),
+            (pool.xcp_profit_a,),
+            (pool.virtual_price,),
+        ]
+        calls += [(getattr(pool, name),) for name in PARAM_NAMES]
+        results = iter(multicall(calls, number))
+        timestamp = chain.blocks[number].timestamp
+        self._reads += 2
+
+        k = self.num_coins - 1
+        self._balances = [next(results) for _ in range(self.num_coins)]
+        self._D = next(results)
+        self._A_gamma = [next(results) for _ in range(4)]
+        self._price_oracle = [next(results) for _ in range(k)]
+        self._total_supply = next(results)
+        self._price_scale = [next(results) for _ in range(k)]
+        self._last_prices = [next(results) for _ in range(k)]
+        self._last_prices_timestamp = next(results)
+        self._xcp_profit = next(results)
+        self._xcp_profit_a = next(results)
+        self._virtual_price = next(results)
+        self._params = {name: next(results) for name in PARAM_NAMES}
+        self._not_adjusted = False  # not public, so re-derived on next tweak
+
+        self._number = number
+        self._fetched = number
+        self._logs = []
+        self._anchors = [(number, timestamp)]
+        self._last_check = number
+
+    def fetch(self, stop: int):
+        """
+        Fetches the logs of the pool after those already fetched through at
+        least the given block, in bulk queries of log_chunk_size blocks. Reads
+        the timestamp of the last block of each query to interpolate by.
+
+        Args:
+            stop (int): The block number to fetch through.
+        """
+        head = chain.blocks.head.number
+        while self._fetched < stop:
+            start = self._fetched + 1
+            end = min(self._fetched + self.log_chunk_size, max(stop, head))
+            self._logs += get_pool_logs(self._pool, start, end)
+            self._anchors.append((end, chain.blocks[end].timestamp))
+            self._reads += len(EVENT_NAMES) + 1
+            self._fetched = end
+
+    def advance(self, number: int):
+        """
+        Folds the logs of the pool through the given block into the state.
+        Seeds if not yet seeded or the block is prior to the current state.
+
+        Args:
+            number (int): The block number.
+        """
+        if self._number is None or number < self._number:
+            self.seed(number)
+            return
+
+        self.fetch(number)
+        i = 0
+        for i, (block_number, _, name, log) in enumerate(self._logs):
+            if block_number > number:
+                break
+            self.apply(name, log, self.get_timestamp(block_number))
+        else:
+            i = len(self._logs)
+
+        self._logs = self._logs[i:]
+        self._number = number
+
+    def get_timestamp(self, number: int) -> int:
+        """
+        Gets the timestamp of a block, interpolated between the blocks with
+        timestamps read.
+
+        Args:
+            number (int): The block number.
+
+        Returns:
+            int: The timestamp of the block.
+        """
+        i = bisect_right(self._anchors, (number, 2**256))
+        if i == 0:
+            return self._anchors[0][1]
+        elif i == len(self._anchors):
+            return self._anchors[-1][1]
+
+        (n0, t0), (n1, t1) = self._anchors[i - 1], self._anchors[i]
+        return t0 + (t1 - t0) * (number - n0) // (n1 - n0)
+
+    def apply(self, name: str, log: Any, timestamp: int):
+        """
+        Folds a log into the state.
+
+        Args:
+            name (str): The event name.
+            log (Any): The log.
+            timestamp (int): The timestamp of the block of the log.
+        """
+        if name == "TokenExchange":
+            self.exchange(
+                log.sold_id,
+                log.tokens_sold,
+                log.bought_id,
+                log.tokens_bought,
+                timestamp,
+            )
+        elif name == "AddLiquidity":
+            self.add_liquidity(list(log.token_amounts), log.token_supply, timestamp)
+        elif name == "RemoveLiquidity":
+            self.remove_liquidity(list(log.token_amounts), log.token_supply)
+        elif name == "RemoveLiquidityOne":
+            self.remove_liquidity_one_coin(
+                log.token_amount, log.coin_index, log.coin_amount, timestamp
+            )
+        elif name == "ClaimAdminFee":
+            self.claim_admin_fees(log.tokens, timestamp)
+        elif name == "NewParameters":
+            self._params = {name: getattr(log, name) for name in PARAM_NAMES}
+        elif name == "RampAgamma":
+            self._A_gamma = [
+                pack_A_gamma(log.initial_A, log.initial_gamma),
+                pack_A_gamma(log.future_A, log.future_gamma),
+                log.initial_time,
+                log.future_time,
+            ]
+        elif name == "StopRampA":
+            A_gamma = pack_A_gamma(log.current_A, log.current_gamma)
+            self._A_gamma = [A_gamma, A_gamma, log.time, log.time]
+
+    def get_A_gamma(self, timestamp: int) -> List[int]:
+        """
+        Gets the current A and gamma, ramped as of a timestamp.
+
+        Args:
+            timestamp (int): The timestamp.
+
+        Returns:
+            List[int]: The A and gamma.
+        """
+        A_gamma0, A_gamma1, t0, t1 = self._A_gamma
+        A1, gamma1 = A_gamma1 >> 128, A_gamma1 & (2**128 - 1)
+        if timestamp < t1:
+            t1 -= t0
+            t0 = timestamp - t0
+            t2 = t1 - t0
+            A1 = ((A_gamma0 >> 128) * t2 + A1 * t0) // t1
+            gamma1 = ((A_gamma0 & (2**128 - 1)) * t2 + gamma1 * t0) // t1
+        return [A1, gamma1]
+
+    def get_xp(self, balances: List[int]) -> List[int]:
+        """
+        Gets balances in price scaled units with 18 decimals.
+
+        Args:
+            balances (List[int]): The balances of the coins.
+
+        Returns:
+            List[int]: The price scaled balances.
+        """
+        xp = [balances[0] * self._precisions[0]]
+        for k, p in enumerate(self._price_scale):
+            xp.append(balances[k + 1] * p * self._precisions[k + 1] // PRECISION)
+        return xp
+
+    def get_fee(self, xp: List[int]) -> int:
+        """
+        Gets the dynamic fee for price scaled balances.
+
+        Args:
+            xp (List[int]): The price scaled balances.
+
+        Returns:
+            int: The fee, with 10 decimals.
+        """
+        f = reduction_coefficient(xp, self._params["fee_gamma"])
+        return (
+            self._params["mid_fee"] * f + self._params["out_fee"] * (PRECISION - f)
+        ) // PRECISION
+
+    def get_xcp(self, D: int, price_scale: List[int]) -> int:
+        """
+        Gets the extended constant product for an invariant D.
+
+        Args:
+            D (int): The invariant.
+            price_scale (List[int]): The price scale of coins relative
+                to coin0.
+
+        Returns:
+            int: The xcp.
+        """
+        x = [D // self.num_coins]
+        x += [D * PRECISION // (self.num_coins * p) for p in price_scale]
+        return geometric_mean(x)
+
+    def tweak_price(
+        self, A_gamma: List[int], _xp: List[int], i: int, p_i: int, new_D: int, ts: int
+    ):
+        """
+        Updates the price oracle EMA, last prices, profit counters and D,
+        adjusting the price scale towards the oracle when profitable, as the
+        pool does.
+
+        Args:
+            A_gamma (List[int]): The current A and gamma.
+            _xp (List[int]): The price scaled balances after the action.
+            i (int): The index of the coin with the new price p_i.
+            p_i (int): The new price of coin i. Zero to compute.
+            new_D (int): The new invariant. Zero to compute.
+            ts (int): The timestamp of the block.
+        """
+        n = self.num_coins
+        price_oracle = list(self._price_oracle)
+        last_prices = list(self._last_prices)
+        price_scale = list(self._price_scale)
+
+        # update MA if needed
+        if self._last_prices_timestamp < ts:
+            alpha = halfpow(
+                (ts - self._last_prices_timestamp)
+                * PRECISION
+                // self._params["ma_half_time"],
+                10**10,
+            )
+            price_oracle = [
+                (lp * (PRECISION - alpha) + po * alpha) // PRECISION
+                for lp, po in zip(last_prices, price_oracle)
+            ]
+            self._price_oracle = price_oracle
+            self._last_prices_timestamp = ts
+
+        D_unadjusted = new_D  # withdrawal methods know new D already
+        if new_D == 0:
+            D_unadjusted = newton_D(A_gamma[0], A_gamma[1], _xp)
+
+        if p_i > 0:
+            if i > 0:
+                last_prices[i - 1] = p_i
+            else:
+                # if 0th price changed, change all prices instead
+                last_prices = [p * PRECISION // p_i for p in last_prices]
+        else:
+            # calculate real prices
+            __xp = list(_xp)
+            dx_price = __xp[0] // 10**6
+            __xp[0] += dx_price
+            for k in range(n - 1):
+                y = newton_y(A_gamma[0], A_gamma[1], __xp, D_unadjusted, k + 1)
+                last_prices[k] = price_scale[k] * dx_price // (_xp[k + 1] - y)
+        self._last_prices = last_prices
+
+        total_supply = self._total_supply
+        old_xcp_profit = self._xcp_profit
+        old_virtual_price = self._virtual_price
+
+        # update profit numbers without price adjustment first
+        xcp_profit = PRECISION
+        virtual_price = PRECISION
+        if old_virtual_price > 0:
+            xcp = self.get_xcp(D_unadjusted, price_scale)
+            virtual_price = PRECISION * xcp // total_supply
+            xcp_profit = old_xcp_profit * virtual_price // old_virtual_price
+            if self._A_gamma[3] == 1:
+                self._A_gamma[3] = 0
+
+        self._xcp_profit = xcp_profit
+
+        needs_adjustment = self._not_adjusted
+        if not needs_adjustment and (
+            virtual_price * 2 - PRECISION
+            > xcp_profit + 2 * self._params["allowed_extra_profit"]
+        ):
+            needs_adjustment = True
+            self._not_adjusted = True
+
+        if needs_adjustment:
+            adjustment_step = self._params["adjustment_step"]
+            norm = 0
+            for po, ps in zip(price_oracle, price_scale):
+                ratio = po * PRECISION // ps
+                norm += (ratio - PRECISION) ** 2
+
+            if norm > adjustment_step**2 and old_virtual_price > 0:
+                norm = sqrt_int(norm // PRECISION)
+                p_new = [
+                    (ps * (norm - adjustment_step) + adjustment_step * po) // norm
+                    for po, ps in zip(price_oracle, price_scale)
+                ]
+
+                # calculate balances * prices
+                xp = [_xp[0]]
+                xp += [_xp[k + 1] * p_new[k] // price_scale[k] for k in range(n - 1)]
+
+                # calculate extended constant product invariant and virtual price
+                D = newton_D(A_gamma[0], A_gamma[1], xp)
+                new_virtual_price = PRECISION * self.get_xcp(D, p_new) // total_supply
+
+                # proceed if we've got enough profit
+                if new_virtual_price > PRECISION and (
+                    2 * new_virtual_price - PRECISION > xcp_profit
+                ):
+                    self._price_scale = p_new
+                    self._D = D
+                    self._virtual_price = new_virtual_price
+                    return
+                else:
+                    self._not_adjusted = False
+
+        # price scale adjustment did not happen, so update D and virtual price
+        self._D = D_unadjusted
+        self._virtual_price = virtual_price
+
+    def exchange(self, i: int, dx: int, j: int, dy: int, timestamp: int):
+        """
+        Replays an exchange of dx of coin i for dy of coin j.
+
+        Args:
+            i (int): The index of the coin sold.
+            dx (int): The amount of coin i sold.
+            j (int): The index of the coin bought.
+            dy (int): The amount of coin j bought, after fees.
+            timestamp (int): The timestamp of the block.
+        """
+        A_gamma = self.get_A_gamma(timestamp)
+        prec_i, prec_j = self._precisions[i], self._precisions[j]
+
+        # in case ramp is happening
+        t = self._A_gamma[3]
+        if t > 0 and timestamp >= t:
+            self._A_gamma[3] = 1
+
+        self._balances[i] += dx
+        self._balances[j] -= dy
+        xp = self.get_xp(self._balances)
+
+        # calculate price
+        ix, p = j, 0
+        if dx > 10**5 and dy > 10**5:
+            _dx, _dy = dx * prec_i, dy * prec_j
+            if i != 0 and j != 0:
+                p = self._last_prices[i - 1] * _dx // _dy
+            elif i == 0:
+                p = _dx * PRECISION // _dy
+            else:
+                p = _dy * PRECISION // _dx
+                ix = i
+
+        self.tweak_price(A_gamma, xp, ix, p, 0, timestamp)
+
+    def add_liquidity(self, amounts: List[int], token_supply: int, timestamp: int):
+        """
+        Replays a deposit of amounts of each coin.
+
+        Args:
+            amounts (List[int]): The amounts of each coin deposited.
+            token_supply (int): The LP token supply after the deposit.
+            timestamp (int): The timestamp of the block.
+        """
+        A_gamma = self.get_A_gamma(timestamp)
+        xp_old = self.get_xp(self._balances)
+        self._balances = [b + a for b, a in zip(self._balances, amounts)]
+        xx = list(self._balances)
+        xp = self.get_xp(xx)
+
+        amountsp = [0 for _ in range(self.num_coins)]
+        ix = None
+        for i, amount in enumerate(amounts):
+            if amount > 0:
+                amountsp[i] = xp[i] - xp_old[i]
+                ix = i if ix is None else self.num_coins  # more than one coin
+
+        t = self._A_gamma[3]
+        if t > 0:
+            old_D = newton_D(A_gamma[0], A_gamma[1], xp_old)
+            if timestamp >= t:
+                self._A_gamma[3] = 1
+        else:
+            old_D = self._D
+
+        D = newton_D(A_gamma[0], A_gamma[1], xp)
+        d_token = token_supply - self._total_supply
+        self._total_supply = token_supply
+        if old_D == 0:
+            self._D = D
+            self._virtual_price = PRECISION
+            self._xcp_profit = PRECISION
+            return
+
+        # calculate price
+        p = 0
+        if d_token > 10**5 and ix < self.num_coins:
+            S = self.get_price_sum(xx, ix) * d_token // token_supply
+            prec = self._precisions[ix]
+            p = (
+                S
+                * PRECISION
+                // (amounts[ix] * prec - d_token * xx[ix] * prec // token_supply)
+            )
+
+        self.tweak_price(A_gamma, xp, ix, p, D, timestamp)
+
+    def get_price_sum(self, xx: List[int], ix: int) -> int:
+        """
+        Gets the sum of balances of all coins but one in coin0 units with 18
+        decimals, valued at the last prices.
+
+        Args:
+            xx (List[int]): The balances of the coins.
+            ix (int): The index of the coin to exclude.
+
+        Returns:
+            int: The sum of balances.
+        """
+        S = 0
+        for k in range(self.num_coins):
+            if k == ix:
+                continue
+            elif k == 0:
+                S += xx[0] * self._precisions[0]
+            else:
+                S += xx[k] * self._last_prices[k - 1] * self._precisions[k] // PRECISION
+        return S
+
+    def remove_liquidity(self, amounts: List[int], token_supply: int):
+        """
+        Replays a balanced withdrawal of amounts of each coin.
+
+        Args:
+            amounts (List[int]): The amounts of each coin withdrawn.
+            token_supply (int): The LP token supply after the withdrawal.
+        """
+        total_supply = self._total_supply
+        amount = total_supply - token_supply - 1
+        self._balances = [b - a for b, a in zip(self._balances, amounts)]
+        self._D -= self._D * amount // total_supply
+        self._total_supply = token_supply
+
+    def remove_liquidity_one_coin(
+        self, token_amount: int, i: int, dy: int, timestamp: int
+    ):
+        """
+        Replays a withdrawal of dy of coin i for token_amount of LP tokens.
+
+        Args:
+            token_amount (int): The amount of LP tokens burned.
+            i (int): The index of the coin withdrawn.
+            dy (int): The amount of coin i withdrawn.
+            timestamp (int): The timestamp of the block.
+        """
+        A_gamma = self.get_A_gamma(timestamp)
+        token_supply = self._total_supply
+        xx = list(self._balances)
+        xp = self.get_xp(xx)
+
+        t = self._A_gamma[3]
+        D0 = newton_D(A_gamma[0], A_gamma[1], xp) if t > 0 else self._D
+
+        # charge the fee on D, not on y
+        fee = self.get_fee(xp)
+        dD = token_amount * D0 // token_supply
+        D = D0 - (dD - (fee * dD // (2 * FEE_DENOMINATOR) + 1))
+        xp[i] = newton_y(A_gamma[0], A_gamma[1], xp, D, i)
+
+        # calculate price
+        p = 0
+        if dy > 10**5 and token_amount > 10**5:
+            S = self.get_price_sum(xx, i) * dD // D0
+            prec = self._precisions[i]
+            p = S * PRECISION // (dy * prec - dD * xx[i] * prec // D0)
+
+        if timestamp >= t:
+            self._A_gamma[3] = 1
+
+        self._balances[i] -= dy
+        self._total_supply -= token_amount
+        self.tweak_price(A_gamma, xp, i, p, D, timestamp)
+
+    def claim_admin_fees(self, claimed: int, timestamp: int):
+        """
+        Replays a claim of admin fees minting claimed LP tokens.
+
+        Args:
+            claimed (int): The amount of LP tokens minted to the admin.
+            timestamp (int): The timestamp of the block.
+        """
+        A_gamma = self.get_A_gamma(timestamp)
+        fees = (
+            (self._xcp_profit - self._xcp_profit_a)
+            * self._params["admin_fee"]
+            // (2 * FEE_DENOMINATOR)
+        )
+        self._xcp_profit -= fees * 2
+        self._total_supply += claimed
+
+        # recalculate D
+        D = newton_D(A_gamma[0], A_gamma[1], self.get_xp(self._balances))
+        self._D = D
+        self._virtual_price = (
+            PRECISION * self.get_xcp(D, self._price_scale) // self._total_supply
+        )
+        if self._xcp_profit > self._xcp_profit_a:
+            self._xcp_profit_a = self._xcp_profit
+
+    def get_state(self) -> List[int]:
+        """
+        Gets the reconstructed state in the order of
+        :meth:`get_state_calls`.
+
+        Returns:
+            List[int]: The state values.
+        """
+        state = list(self._balances)
+        state += [self._D]
+        state += list(self._A_gamma)
+        state += list(self._price_oracle)
+        state += [self._total_supply]
+        state += list(self._price_scale)
+        return state
+
+    def check(self, number: int) -> bool:
+        """
+        Spot checks the state against the pool at the current block within
+        check_rtol, re-seeding on any drift.
+
+        Args:
+            number (int): The current block number.
+
+        Returns:
+            bool: Whether the state matched the pool.
+        """
+        expect = multicall(self.get_state_calls(), number)
+        self._reads += 1
+        self._last_check = number
+
+        actual = self.get_state()
+        if all(abs(a - e) <= self.check_rtol * abs(e) for a, e in zip(actual, expect)):
+            return True
+
+        click.secho(f"Pool state drifted at block {number}", bold=True)
+        self._drifts += 1
+        self.seed(number)
+        return False
+
+    def get_refs_state(self, number: int) -> Mapping:
+        """
+        Gets the state of references of an LP position as of a block, as
+        read by :class:`backtest_ape.curve.v2.lp.CurveV2LPRunner`.
+
+        Spot checks the state first when due.
+
+        Args:
+            number (int): The block number.
+
+        Returns:
+            Mapping: The state of references at block.
+        """
+        self.advance(number)
+        if (
+            self.check_interval is not None
+            and number - self._last_check >= self.check_interval
+        ):
+            self.check(number)
+
+        state = {}
+        state["balances"] = list(self._balances)
+        state["D"] = self._D
+        state["A_gamma"] = list(self._A_gamma)
+        state["prices"] = list(self._price_oracle)
+        state["total_supply"] = self._total_supply
+        return state
@@ -1,17 +1,18 @@
-import os
-from typing import Any, ClassVar, List, Mapping, Optional
+from typing import Any, ClassVar, List, Mapping, Optional, Tuple
 
-import pandas as pd
 from ape import chain
 from pydantic import validator
 
 from backtest_ape.curve.v2.base import BaseCurveV2Runner
-from backtest_ape.utils import get_block_identifier
+from backtest_ape.curve.v2.events import PoolEventReplayer
+from backtest_ape.utils import get_block_identifier, multicall
 
 
 class CurveV2LPRunner(BaseCurveV2Runner):
     amounts: List[int] = []
+    _pool_replayer: Optional[PoolEventReplayer] = None
     _backtester_name: ClassVar[str] = "CurveV2LPBacktest"
+    _shardable: ClassVar[bool] = True  # passive LP re-entered with amounts
 
     @validator("amounts")
     def amounts_len_equals_num_coins(cls, v, values, **kwargs):
@@ -28,12 +29,14 @@ class CurveV2LPRunner(BaseCurveV2Runner):
 
         # check balances in pool > amounts
         pool = self._refs["pool"]
-        for i, coin in enumerate(self._refs["coins"]):
-            balance = coin.balanceOf(pool.address)
+        balances = multicall(
+            [(coin.balanceOf, pool.address) for coin in self._refs["coins"]]
+        )
+        for i, balance in enumerate(balances):
             if balance < self.amounts[i]:
                 raise ValueError("amounts not less than balances")
 
-    def setup(self, mocking: bool = True):
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
         """
         Sets up Curve V2 LP runner for testing. Deploys mock ERC20 tokens needed
         for pool and mock Curve V2 pool, if mocking. Then deploys the Curve V2
@@ -41,8 +44,11 @@ class CurveV2LPRunner(BaseCurveV2Runner):
 
         Args:
             mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
         """
-        super().setup(mocking=mocking)
+        super().setup(mocking=mocking, number=number)
 
         # deploy the backtester
         pool_addr = (
@@ -51,9 +57,67 @@ class CurveV2LPRunner(BaseCurveV2Runner):
         self.deploy_strategy(*[pool_addr, self.num_coins])
         self._initialized = True
 
+    def get_refs_state_calls(self) -> List[Tuple]:
+        """
+        Gets the view calls to read the state of references through, so
+        the state of several runners can be read in one aggregated call.
+
+        Returns:
+            List[Tuple]: The calls as (contract method, *args) tuples.
+        """
+        ref_pool = self._refs["pool"]
+        ref_lp = self._refs["lp"]
+
+        calls = [(ref_pool.balances, i) for i in range(self.num_coins)]
+        calls += [
+            (ref_pool.D,),
+            (ref_pool.initial_A_gamma,),
+            (ref_pool.future_A_gamma,),
+            (ref_pool.initial_A_gamma_time,),
+            (ref_pool.future_A_gamma_time,),
+        ]
+        calls += self.get_price_calls("price_oracle")
+        calls += [(ref_lp.totalSupply,)]
+        return calls
+
+    def parse_refs_state(self, results: List[Any]) -> Mapping:
+        """
+        Parses the results of the view calls from
+        :meth:`get_refs_state_calls` into the state of references.
+
+        Args:
+            results (List[Any]): The results of each call, in order.
+
+        Returns:
+            Mapping: The state of references.
+        """
+        results = iter(results)
+        state = {}
+        state["balances"] = [next(results) for _ in range(self.num_coins)]
+        state["D"] = next(results)
+        state["A_gamma"] = [next(results) for _ in range(4)]
+        state["prices"] = [next(results) for _ in range(self.num_coins - 1)]
+        state["total_supply"] = next(results)
+        return state
+
+    def set_pool_replayer(self, replayer: Optional[PoolEventReplayer]):
+        """
+        Sets the pool event replayer to reconstruct the state of references
+        from logs at every block, instead of reading from the archive node.
+
+        Args:
+            replayer (Optional[:class:`PoolEventReplayer`]): The event
+                replayer of the ref pool. If None, unsets.
+        """
+        pool_addr = self._refs["pool"].address
+        if replayer is not None and replayer.pool_addr.lower() != pool_addr.lower():
+            raise ValueError("pool replayer pool not ref pool.")
+        self._pool_replayer = replayer
+
     def get_refs_state(self, number: Optional[int] = None) -> Mapping:
         """
-        Gets the state of references at given block.
+        Gets the state of references at given block. Reconstructs from logs
+        if a pool event replayer is set.
 
         Args:
             number (int): The block number. If None, then last block
@@ -62,29 +126,12 @@ class CurveV2LPRunner(BaseCurveV2Runner):
         Returns:
             Mapping: The state of references at block.
         """
-        block_identifier = get_block_identifier(number)
-        ref_pool = self._refs["pool"]
-        ref_lp = self._refs["lp"]
-        state = {}
+        if number is not None and self._use_sources and self._pool_replayer is not None:
+            return self._pool_replayer.get_refs_state(number)
 
-        num_coins = self.num_coins
-        state["balances"] = [
-            ref_pool.balances(i, block_identifier=block_identifier)
-            for i in range(num_coins)
-        ]
-        state["D"] = ref_pool.D(block_identifier=block_identifier)
-        state["A_gamma"] = [
-            ref_pool.initial_A_gamma(block_identifier=block_identifier),
-            ref_pool.future_A_gamma(block_identifier=block_identifier),
-            ref_pool.initial_A_gamma_time(block_identifier=block_identifier),
-            ref_pool.future_A_gamma_time(block_identifier=block_identifier),
-        ]
-        state["prices"] = [
-            ref_pool.price_oracle(i, block_identifier=block_identifier)
-            for i in range(num_coins - 1)
-        ]
-        state["total_supply"] = ref_lp.totalSupply(block_identifier=block_identifier)
-        return state
+        block_identifier = get_block_identifier(number)
+        results = multicall(self.get_refs_state_calls(), block_identifier)
+        return self.parse_refs_state(results)
 
     def init_mocks_state(self, number: int, state: Mapping):
         """
@@ -153,20 +200,18 @@ class CurveV2LPRunner(BaseCurveV2Runner):
         Args:
             state (Mapping): The new state of mocks.
         """
-        # update mock pool for state attrs
+        # update mock pool and LP token supply for state attrs in one tx,
+        # minting to or burning from acc to reach total supply
         mock_pool = self._mocks["pool"]
-        mock_pool.set_balances(state["balances"], sender=self.acc)
-        mock_pool.set_D(state["D"], sender=self.acc)
-        mock_pool.set_A_gamma(state["A_gamma"], sender=self.acc)
-        mock_pool.set_packed_prices(state["prices"], sender=self.acc)
-
-        # update mock LP token supply for state attrs
-        mock_lp = self._mocks["lp"]
-        d_supply = state["total_supply"] - mock_lp.totalSupply()
-        if d_supply >= 0:
-            mock_lp.mint(self.acc.address, abs(d_supply), sender=self.acc)
-        else:
-            mock_lp.burnFrom(self.acc.address, abs(d_supply), sender=self.acc)
+        mock_pool.set_state(
+            state["balances"],
+            state["D"],
+            state["A_gamma"],
+            state["prices"],
+            state["total_supply"],
+            self.acc.address,
+            sender=self.acc,
+        )
 
     def init_strategy(self):
         """
@@ -230,15 +275,36 @@ class CurveV2LPRunner(BaseCurveV2Runner):
         """
         pass
 
-    def record(self, path: str, number: int, state: Mapping, values: List[int]):
+    def get_record_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of each column recorded to csv by the runner.
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        decimals = self.get_decimals()
+        data = {"number": 0, "values0": decimals[0]}
+        data.update({f"balances{i}": d for i, d in enumerate(decimals)})
+        data["D"] = 18
+        data.update({f"A_gamma{i}": 0 for i in range(4)})
+        data.update({f"prices{i}": 18 for i in range(self.num_coins - 1)})
+        data["total_supply"] = 18
+        return data
+
+    def get_record(
+        self, number: int, state: Mapping, values: List[int]
+    ) -> Mapping[str, int]:
         """
-        Records the value and possibly some state at the given block.
+        Gets the record row of the value and possibly some state at the
+        given block.
 
         Args:
-            path (str): The path to the csv file to write the record to.
             number (int): The block number.
             state (Mapping): The state of references at block number.
             values (List[int]): The value of the backtester for the state.
+
+        Returns:
+            Mapping[str, int]: The record row by column name.
         """
         data = {"number": number}
         for i, value in enumerate(values):
@@ -263,7 +329,4 @@ class CurveV2LPRunner(BaseCurveV2Runner):
         # update data for unfolded list items
         data.update(updates)
 
-        # append row to csv file
-        header = not os.path.exists(path)
-        df = pd.DataFrame(data={k: [v] for k, v in data.items()})
-        df.to_csv(path, index=False, mode="a", header=header)
+        return data
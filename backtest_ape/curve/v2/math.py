@@ -0,0 +1,241 @@
+from typing import List
+
+PRECISION = 10**18
+A_MULTIPLIER = 10000
+
+# SEE: https://github.com/curvefi/curve-crypto-contract/tree/master/contracts/tricrypto
+
+
+def sort(x: List[int]) -> List[int]:
+    """
+    Sorts amounts from high to low, as the pool math does.
+    """
+    return sorted(x, reverse=True)
+
+
+def geometric_mean(unsorted_x: List[int], sort_x: bool = True) -> int:
+    """
+    Gets the geometric mean of amounts with the Newton method, exactly as
+    the pool math does.
+
+    Args:
+        unsorted_x (List[int]): The amounts.
+        sort_x (bool): Whether to sort the amounts high to low first.
+
+    Returns:
+        int: The geometric mean.
+    """
+    x = sort(unsorted_x) if sort_x else list(unsorted_x)
+    n = len(x)
+    D = x[0]
+    for _ in range(255):
+        D_prev = D
+        tmp = PRECISION
+        for _x in x:
+            tmp = tmp * _x // D
+        D = D * ((n - 1) * PRECISION + tmp) // (n * PRECISION)
+        diff = abs(D - D_prev)
+        if diff <= 1 or diff * PRECISION < D:
+            return D
+    raise ValueError("geometric mean did not converge.")
+
+
+def reduction_coefficient(x: List[int], fee_gamma: int) -> int:
+    """
+    Gets the coefficient fee_gamma / (fee_gamma + (1 - K)) to blend the mid
+    and out fees by, with K = prod(x) / (sum(x) / N)**N.
+
+    Args:
+        x (List[int]): The balances in price scaled units.
+        fee_gamma (int): The fee gamma of the pool.
+
+    Returns:
+        int: The reduction coefficient.
+    """
+    n = len(x)
+    K = PRECISION
+    S = sum(x)
+    for x_i in x:
+        K = K * n * x_i // S
+    if fee_gamma > 0:
+        K = fee_gamma * PRECISION // (fee_gamma + PRECISION - K)
+    return K
+
+
+def newton_D(ANN: int, gamma: int, x_unsorted: List[int]) -> int:
+    """
+    Gets the invariant D of balances with the Newton method, exactly as the
+    pool math does.
+
+    Args:
+        ANN (int): The amplification A * N**N, times A_MULTIPLIER.
+        gamma (int): The gamma of the pool.
+        x_unsorted (List[int]): The balances in price scaled units.
+
+    Returns:
+        int: The invariant D.
+    """
+    x = sort(x_unsorted)
+    n = len(x)
+    D = n * geometric_mean(x, False)
+    S = sum(x)
+
+    for _ in range(255):
+        D_prev = D
+
+        K0 = PRECISION
+        for _x in x:
+            K0 = K0 * _x * n // D
+
+        _g1k0 = gamma + PRECISION
+        _g1k0 = abs(_g1k0 - K0) + 1
+
+        # D / (A * N**N) * _g1k0**2 / gamma**2
+        mul1 = PRECISION * D // gamma * _g1k0 // gamma * _g1k0 * A_MULTIPLIER // ANN
+
+        # 2*N*K0 / _g1k0
+        mul2 = (2 * PRECISION) * n * K0 // _g1k0
+
+        neg_fprime = (S + S * mul2 // PRECISION) + mul1 * n // K0
+        neg_fprime -= mul2 * D // PRECISION
+
+        # D -= f / fprime
+        D_plus = D * (neg_fprime + S) // neg_fprime
+        D_minus = D * D // neg_fprime
+        if PRECISION > K0:
+            D_minus += D * (mul1 // neg_fprime) // PRECISION * (PRECISION - K0) // K0
+        else:
+            D_minus -= D * (mul1 // neg_fprime) // PRECISION * (K0 - PRECISION) // K0
+
+        D = D_plus - D_minus if D_plus > D_minus else (D_minus - D_plus) // 2
+        if abs(D - D_prev) * 10**14 < max(10**16, D):
+            return D
+    raise ValueError("newton_D did not converge.")
+
+
+def newton_y(ANN: int, gamma: int, x: List[int], D: int, i: int) -> int:
+    """
+    Gets the balance of coin i given the others and the invariant D with the
+    Newton method, exactly as the pool math does.
+
+    Args:
+        ANN (int): The amplification A * N**N, times A_MULTIPLIER.
+        gamma (int): The gamma of the pool.
+        x (List[int]): The balances in price scaled units.
+        D (int): The invariant.
+        i (int): The index of the coin to solve for.
+
+    Returns:
+        int: The balance of coin i in price scaled units.
+    """
+    n = len(x)
+    y = D // n
+    K0_i = PRECISION
+    S_i = 0
+
+    x_sorted = list(x)
+    x_sorted[i] = 0
+    x_sorted = sort(x_sorted)
+
+    convergence_limit = max(x_sorted[0] // 10**14, D // 10**14, 100)
+    for j in range(2, n + 1):
+        _x = x_sorted[n - j]
+        y = y * D // (_x * n)  # small _x first
+        S_i += _x
+    for j in range(n - 1):
+        K0_i = K0_i * x_sorted[j] * n // D  # large _x first
+
+    for _ in range(255):
+        y_prev = y
+
+        K0 = K0_i * y * n // D
+        S = S_i + y
+
+        _g1k0 = gamma + PRECISION
+        _g1k0 = abs(_g1k0 - K0) + 1
+
+        # D / (A * N**N) * _g1k0**2 / gamma**2
+        mul1 = PRECISION * D // gamma * _g1k0 // gamma * _g1k0 * A_MULTIPLIER // ANN
+
+        # 2*K0 / _g1k0
+        mul2 = PRECISION + (2 * PRECISION) * K0 // _g1k0
+
+        yfprime = PRECISION * y + S * mul2 + mul1
+        _dyfprime = D * mul2
+        if yfprime < _dyfprime:
+            y = y_prev // 2
+            continue
+        yfprime -= _dyfprime
+        fprime = yfprime // y
+
+        # y -= f / f_prime; y = (y * fprime - f) / fprime
+        y_minus = mul1 // fprime
+        y_plus = (yfprime + PRECISION * D) // fprime + y_minus * PRECISION // K0
+        y_minus += PRECISION * S // fprime
+
+        y = y_prev // 2 if y_plus < y_minus else y_plus - y_minus
+        if abs(y - y_prev) < max(convergence_limit, y // 10**14):
+            return y
+    raise ValueError("newton_y did not converge.")
+
+
+def halfpow(power: int, precision: int) -> int:
+    """
+    Gets 1e18 * 0.5 ** (power / 1e18), exactly as the pool math does.
+
+    Args:
+        power (int): The power, with 18 decimals.
+        precision (int): The size of the last series term to stop at.
+
+    Returns:
+        int: The power of one half.
+    """
+    intpow = power // PRECISION
+    otherpow = power - intpow * PRECISION
+    if intpow > 59:
+        return 0
+    result = PRECISION // (2**intpow)
+    if otherpow == 0:
+        return result
+
+    term = PRECISION
+    x = 5 * 10**17
+    S = PRECISION
+    neg = False
+    for i in range(1, 256):
+        K = i * PRECISION
+        c = K - PRECISION
+        if otherpow > c:
+            c = otherpow - c
+            neg = not neg
+        else:
+            c -= otherpow
+        term = term * (c * x // PRECISION) // K
+        S = S - term if neg else S + term
+        if term < precision:
+            return result * S // PRECISION
+    raise ValueError("halfpow did not converge.")
+
+
+def sqrt_int(x: int) -> int:
+    """
+    Gets the square root of x with 18 decimals, exactly as the pool math
+    does.
+
+    Args:
+        x (int): The value, with 18 decimals.
+
+    Returns:
+        int: The square root, with 18 decimals.
+    """
+    if x == 0:
+        return 0
+
+    z = (x + PRECISION) // 2
+    y = x
+    for _ in range(256):
+        if z == y:
+            return y
+        y = z
+        z = (x * PRECISION // z + z) // 2
+    raise ValueError("sqrt_int did not converge.")
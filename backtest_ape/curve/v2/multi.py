@@ -0,0 +1,175 @@
+from typing import Any, ClassVar, List, Mapping, Optional
+
+from pydantic import validator
+
+from backtest_ape.base import BaseRunner
+from backtest_ape.curve.v2.lp import CurveV2LPRunner
+from backtest_ape.utils import get_block_identifier, multicall
+
+
+class CurveV2MultiLPRunner(BaseRunner):
+    """
+    Backtests LP positions in several Curve V2 pools at once over the same
+    blocks.
+
+    Reads the state of all pools in one aggregated call per block and
+    records to one table, with values{j} the coin0 value of the LP position
+    in pool j and the state columns of pool j prefixed with pool{j}_.
+    """
+
+    pools: List[Mapping[str, Any]] = []  # CurveV2LPRunner kwargs for each pool
+    _runners: List[CurveV2LPRunner] = []
+    _shardable: ClassVar[bool] = True  # passive LPs re-entered with amounts
+
+    @validator("pools")
+    def pools_not_empty(cls, v):
+        if len(v) == 0:
+            raise ValueError("len(pools) == 0")
+        return v
+
+    def __init__(self, **data: Any):
+        """
+        Overrides BaseRunner init to also create the LP runner for each pool,
+        sharing the runner account.
+        """
+        super().__init__(**data)
+        self._runners = [
+            CurveV2LPRunner(**{"acc_addr": self.acc_addr, **kwargs})
+            for kwargs in self.pools
+        ]
+
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
+        """
+        Sets up the LP runner for each pool for testing. Deploys mocks for
+        each pool, if mocking, then each Curve V2 LP backtester.
+
+        Args:
+            mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
+        """
+        for runner in self._runners:
+            runner.setup(mocking=mocking, number=number)
+
+        self._initialized = True
+
+    def get_values(self) -> List[int]:
+        """
+        Gets the current values of the backtesters of all pools in one
+        aggregated call.
+
+        Returns:
+            List[int]: The values of the backtesters, in pool order.
+        """
+        results = multicall([(runner.backtester.values,) for runner in self._runners])
+        return [value for values in results for value in values]
+
+    def get_refs_state(self, number: Optional[int] = None) -> Mapping:
+        """
+        Gets the state of references of all pools at given block in one
+        aggregated call.
+
+        Args:
+            number (int): The block number. If None, then last block
+                from current provider chain.
+
+        Returns:
+            Mapping: The state of references of each pool under pools.
+        """
+        block_identifier = get_block_identifier(number)
+        calls = [runner.get_refs_state_calls() for runner in self._runners]
+        results = iter(
+            multicall([call for cs in calls for call in cs], block_identifier)
+        )
+
+        state = {"pools": []}
+        for runner, cs in zip(self._runners, calls):
+            state["pools"].append(runner.parse_refs_state([next(results) for _ in cs]))
+        return state
+
+    def init_mocks_state(self, number: int, state: Mapping):
+        """
+        Initializes the state of mocks for each pool.
+
+        Args:
+            number (int): The init block number.
+            state (Mapping): The init state of mocks at block number.
+        """
+        for runner, pool_state in zip(self._runners, state["pools"]):
+            runner.init_mocks_state(number, pool_state)
+
+    def set_mocks_state(self, state: Mapping):
+        """
+        Sets the state of mocks for each pool.
+
+        Args:
+            state (Mapping): The new state of mocks.
+        """
+        for runner, pool_state in zip(self._runners, state["pools"]):
+            runner.set_mocks_state(pool_state)
+
+    def init_strategy(self):
+        """
+        Initializes the LP strategy in each pool through its backtester
+        contract at the given block.
+        """
+        for runner in self._runners:
+            runner.init_strategy()
+
+    def update_strategy(self, number: int, state: Mapping):
+        """
+        Updates the LP strategy in each pool through its backtester contract.
+
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+        """
+        for runner, pool_state in zip(self._runners, state["pools"]):
+            runner.update_strategy(number, pool_state)
+
+    def get_record_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of each column recorded to csv by the runner.
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        data = {"number": 0}
+        decimals = [runner.get_record_decimals() for runner in self._runners]
+        data.update({f"values{j}": d["values0"] for j, d in enumerate(decimals)})
+        for j, d in enumerate(decimals):
+            data.update(
+                {
+                    f"pool{j}_{k}": v
+                    for k, v in d.items()
+                    if k != "number" and not k.startswith("values")
+                }
+            )
+        return data
+
+    def get_record(
+        self, number: int, state: Mapping, values: List[int]
+    ) -> Mapping[str, int]:
+        """
+        Gets the record row of the value and possibly some state at the
+        given block.
+
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+            values (List[int]): The values of the backtesters for the state.
+
+        Returns:
+            Mapping[str, int]: The record row by column name.
+        """
+        data = {"number": number}
+        for i, value in enumerate(values):
+            data[f"values{i}"] = value
+
+        # add the unfolded state of each pool with prefix
+        for j, (runner, pool_state) in enumerate(zip(self._runners, state["pools"])):
+            row = runner.get_record(number, pool_state, [])
+            data.update({f"pool{j}_{k}": v for k, v in row.items() if k != "number"})
+
+        return data
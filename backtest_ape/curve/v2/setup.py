@@ -1,9 +1,12 @@
-from typing import List
+from typing import List, Mapping
 
 from ape import project
 from ape.api.accounts import AccountAPI
 from ape.contracts import ContractInstance
 
+# mock pool contract names by number of coins in pool
+MOCK_POOL_NAMES: Mapping[int, str] = {2: "MockCurveCryptoSwap2", 3: "MockTricrypto2"}
+
 
 def deploy_mock_lp(name: str, symbol: str, acc: AccountAPI) -> ContractInstance:
     """
@@ -28,14 +31,19 @@ def deploy_mock_pool(
     admin_fee: int,
     ma_half_time: int,
     prices: List[int],
+    precisions: List[int],
     acc: AccountAPI,
 ) -> ContractInstance:
     """
-    Deploys mock Curve V2 pool.
+    Deploys mock Curve V2 pool with the number of coins given.
 
     Returns:
         :class:`ape.contracts.ContractInstance`
     """
+    num_coins = len(coins)
+    if num_coins not in MOCK_POOL_NAMES:
+        raise ValueError(f"no mock pool for num_coins {num_coins}")
+
     params = (
         acc.address,
         acc.address,
@@ -51,6 +59,7 @@ def deploy_mock_pool(
         admin_fee,
         ma_half_time,
         prices,
+        precisions,
     )
-    pool = project.MockTricrypto2.deploy(*params, sender=acc)
+    pool = getattr(project, MOCK_POOL_NAMES[num_coins]).deploy(*params, sender=acc)
     return pool
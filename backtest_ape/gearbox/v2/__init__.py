@@ -1,7 +1,23 @@
-from backtest_ape.gearbox.v2.base import BaseGearboxV2Runner
-from backtest_ape.gearbox.v2.steth import GearboxV2STETHRunner
+from typing import TYPE_CHECKING
+
+from backtest_ape._lazy import lazy_module
+
+if TYPE_CHECKING:
+    from backtest_ape.gearbox.v2.base import BaseGearboxV2Runner
+    from backtest_ape.gearbox.v2.multi import GearboxV2MultiSTETHRunner
+    from backtest_ape.gearbox.v2.steth import GearboxV2STETHRunner
+
+_modules = {
+    "BaseGearboxV2Runner": "backtest_ape.gearbox.v2.base",
+    "GearboxV2MultiSTETHRunner": "backtest_ape.gearbox.v2.multi",
+    "GearboxV2STETHRunner": "backtest_ape.gearbox.v2.steth",
+}
 
 __all__ = [
     "BaseGearboxV2Runner",
+    "GearboxV2MultiSTETHRunner",
     "GearboxV2STETHRunner",
 ]
+
+
+__getattr__, __dir__ = lazy_module(_modules, globals())
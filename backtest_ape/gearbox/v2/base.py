@@ -1,41 +1,347 @@
-import os
-from enum import Enum
-from typing import Any, ClassVar, List, Mapping, Optional, Tuple
+from typing import Any, ClassVar, Dict, List, Mapping, Optional, Sequence, Tuple
 
 import click
-import pandas as pd
-from ape import Contract, chain
+import numpy as np
+from ape import chain
 from ape.contracts import ContractInstance
+from ape.types import SnapshotID
 from ape.utils import ZERO_ADDRESS
 
 from backtest_ape.base import BaseRunner
-from backtest_ape.gearbox.v2.setup import deploy_mock_feed
+from backtest_ape.gearbox.v2.feeds import (
+    FeedDescriptor,
+    PriceFeedType,
+    get_feed_descriptors,
+    get_feeds_round_data,
+    get_value_calls,
+)
+from backtest_ape.gearbox.v2.rounds import RoundIndex
+from backtest_ape.gearbox.v2.setup import (
+    deploy_mock_feed,
+    deploy_mock_feed_coordinator,
+)
+from backtest_ape.registry import get_contract
 from backtest_ape.utils import (
     fund_account,
     get_block_identifier,
     get_impersonated_account,
+    multicall,
 )
 
+# cached credit manager refs by (manager address, block number)
+_manager_refs: Dict[Tuple[str, int], Mapping] = {}
+
+
+def get_manager_refs(manager: ContractInstance, number: int) -> Mapping:
+    """
+    Gets the credit facade, price oracle, collateral tokens and the price
+    feed of each collateral token for a credit manager.
+
+    Reads through a few aggregated calls, resolving the contract of each
+    distinct address once and caching by (manager, block).
+
+    Args:
+        manager (:class:`ape.contracts.ContractInstance`): The credit manager.
+        number (int): The block number.
+
+    Returns:
+        Mapping: The facade and price_oracle contracts, the collaterals
+        addresses and the feed contracts by collateral address.
+    """
+    key = (manager.address, number)
+    if key in _manager_refs:
+        return _manager_refs[key]
+
+    facade_addr, price_oracle_addr, count = multicall(
+        [
+            (manager.creditFacade,),
+            (manager.priceOracle,),
+            (manager.collateralTokensCount,),
+        ],
+        number,
+    )
+    collateral_tokens = multicall(
+        [(manager.collateralTokens, i) for i in range(count)], number
+    )
+    collateral_addrs = [collateral_token[0] for collateral_token in collateral_tokens]
+
+    price_oracle = get_contract(price_oracle_addr, "GearboxPriceOracleV2")
+    feed_addrs = multicall(
+        [(price_oracle.priceFeeds, addr) for addr in collateral_addrs], number
+    )
+    feeds = {addr: get_contract(addr) for addr in dict.fromkeys(feed_addrs)}
+
+    refs = {
+        "facade": get_contract(facade_addr, "GearboxCreditFacadeV2"),
+        "price_oracle": price_oracle,
+        "collaterals": collateral_addrs,
+        "feeds": {
+            addr: feeds[feed_addr]
+            for addr, feed_addr in zip(collateral_addrs, feed_addrs)
+        },
+    }
+    _manager_refs[key] = refs
+    return refs
+
+
+class BaseGearboxV2FeedsRunner(BaseRunner):
+    """
+    Base runner mocking a set of Gearbox V2 price feeds, updated through one
+    mock feed coordinator transaction per block.
+
+    Holds the feed, round index and mock round logic shared by runners of
+    one or several credit accounts. Subclasses resolve the feeds through
+    :meth:`get_feed_descriptors`.
+    """
+
+    skip_unchanged_rounds: bool = False  # backtest only blocks with new rounds
+    _feed_descriptors: List[FeedDescriptor] = []
+    _mock_rounds: List[Tuple] = []  # round data last set on each mock feed
+    _round_index: Optional[RoundIndex] = None
+
+    def get_feed_descriptors(self) -> List[FeedDescriptor]:
+        """
+        Gets the descriptors of the feeds mocked by the runner.
+
+        Returns:
+            List[:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`]: The
+            descriptor of each feed.
+        """
+        raise NotImplementedError("get_feed_descriptors not implemented.")
+
+    def get_feed_columns(self) -> List[str]:
+        """
+        Gets the record column name of the answer of each feed.
+
+        Returns:
+            List[str]: The column names, the feed descriptions by default.
+        """
+        return [descriptor.description for descriptor in self.get_feed_descriptors()]
+
+    def get_feed_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of the record column of each feed.
+
+        Returns:
+            Mapping[str, int]: The decimals by feed column name.
+        """
+        return {
+            k: descriptor.decimals
+            for k, descriptor in zip(
+                self.get_feed_columns(), self.get_feed_descriptors()
+            )
+        }
+
+    def set_round_index(self, index: Optional[RoundIndex]):
+        """
+        Sets the round index to look up the round data of feeds from at
+        blocks it has fetched, instead of the archive node.
+
+        Args:
+            index (Optional[:class:`backtest_ape.gearbox.v2.rounds.RoundIndex`]):
+                The round index of the feed sources. If None, unsets.
+        """
+        sources = [s for d in self.get_feed_descriptors() for s in d.sources]
+        if index is not None and not set(sources).issubset(index.sources):
+            raise ValueError("round index sources not feed sources.")
+        self._round_index = index
+
+    def get_round_index(self, start: int, stop: int) -> RoundIndex:
+        """
+        Gets a round index of the sources of all feeds fetched between
+        start and stop.
+
+        Args:
+            start (int): The start block number.
+            stop (int): The stop block number, inclusive.
+
+        Returns:
+            :class:`backtest_ape.gearbox.v2.rounds.RoundIndex`: The round
+            index.
+        """
+        sources = [s for d in self.get_feed_descriptors() for s in d.sources]
+        index = RoundIndex(sources=sources)
+        index.fetch(start, stop)
+        return index
+
+    def get_backtest_numbers(self, start: int, stop: int, step: int) -> Sequence[int]:
+        """
+        Gets the block numbers to process when backtesting between start and
+        stop blocks. If skipping unchanged rounds, only those at which a feed
+        source reported a new round since the prior block processed, fetching
+        a round index over the blocks if the one set does not cover them.
+
+        NOTE: Mocks only change with feed rounds, so skipped blocks would
+        record the same values.
+
+        Args:
+            start (int): The start block number.
+            stop (int): The stop block number.
+            step (int): The step interval size.
+
+        Returns:
+            Sequence[int]: The block numbers, in ascending order.
+        """
+        numbers = super().get_backtest_numbers(start, stop, step)
+        if not self.skip_unchanged_rounds or len(numbers) == 0:
+            return numbers
+
+        if len(get_value_calls(self.get_feed_descriptors())) > 0:
+            raise ValueError("feeds read value sources each block.")
+
+        index = self._round_index
+        if index is None or not (index.covers(start) and index.covers(numbers[-1])):
+            index = self.get_round_index(start, numbers[-1])
+            self.set_round_index(index)
 
-class PriceFeedType(Enum):
-    CHAINLINK_ORACLE = 0
-    YEARN_ORACLE = 1
-    CURVE_2LP_ORACLE = 2
-    CURVE_3LP_ORACLE = 3
-    CURVE_4LP_ORACLE = 4
-    ZERO_ORACLE = 5
-    WSTETH_ORACLE = 6
-    BOUNDED_ORACLE = 7
-    COMPOSITE_ETH_ORACLE = 8
+        return index.get_changed_numbers(start, numbers)
 
+    def deploy_mocks(self):
+        """
+        Deploys a mock feed per feed and the mock feed coordinator.
+        """
+        # deploy the mock Chainlink feed
+        click.echo("Deploying mock feeds ...")
+        mock_feeds = [
+            deploy_mock_feed(
+                descriptor.description,
+                descriptor.decimals,
+                descriptor.version,
+                self.acc,
+            )
+            for descriptor in self.get_feed_descriptors()
+        ]
+
+        # deploy the coordinator to update all mock feeds in one call
+        click.echo("Deploying mock feed coordinator ...")
+        mock_coordinator = deploy_mock_feed_coordinator(self.acc)
+        self._mocks = {"feeds": mock_feeds, "coordinator": mock_coordinator}
+
+    def set_mock_rounds(self, rounds: List[Tuple]):
+        """
+        Sets the round data last set on each mock feed, for mocks whose state
+        was set elsewhere, so unchanged rounds are not set again.
+
+        Args:
+            rounds (List[Tuple]): The round data of each mock feed.
+        """
+        if len(rounds) != len(self._mocks["feeds"]):
+            raise ValueError("len(rounds) != len(mock feeds).")
+        self._mock_rounds = list(rounds)
+
+    def get_refs_state(self, number: Optional[int] = None) -> Mapping:
+        """
+        Gets the state of references at given block. Looks up feed rounds in
+        the round index if set and covering the block.
+
+        Args:
+            number (int): The block number. If None, then last block
+                from current provider chain.
+
+        Returns:
+            Mapping: The state of references at block.
+        """
+        block_identifier = get_block_identifier(number)
+        descriptors = self.get_feed_descriptors()
+
+        state = {}
+        state["feeds"] = get_feeds_round_data(
+            descriptors,
+            block_identifier,
+            self._round_index if self._use_sources else None,
+        )
+        return state
+
+    def set_mocks_state(self, state: Mapping):
+        """
+        Sets the state of mocks.
+
+        Args:
+            state (Mapping): The new state of mocks.
+        """
+        mock_feeds = self._mocks["feeds"]
+        if len(self._mock_rounds) != len(mock_feeds):
+            self._mock_rounds = [tuple() for _ in mock_feeds]
+
+        # only update feeds with round data changed since last set
+        feeds, rounds = [], []
+        for i, mock_feed in enumerate(mock_feeds):
+            round_data = state["feeds"][i]  # round data tuple
+            if round_data == tuple() or round_data == self._mock_rounds[i]:
+                continue
+
+            feeds.append(mock_feed.address)
+            rounds.append(round_data)
+
+        if len(feeds) == 0:
+            return
+
+        # stores latest round data and sets latest round id on all in one tx
+        self._mocks["coordinator"].setRounds(feeds, rounds, sender=self.acc)
+        for i, mock_feed in enumerate(mock_feeds):
+            if mock_feed.address in feeds:
+                self._mock_rounds[i] = state["feeds"][i]
+
+    def restore(self, snapshot_chain_id: SnapshotID, snapshot_runner_kwargs: Mapping):
+        """
+        Restores the state of chain and runner to given snapshot. Also clears
+        the cache of round data last set on mocks, as the chain may revert
+        those rounds.
+
+        Args:
+            snapshot_chain_id (ape.types.SnapshotID): The snapshot ID generated
+                for chain.
+            snapshot_runner_kwargs (Mapping): State of runner kwargs at chain
+                snapshot.
+        """
+        super().restore(snapshot_chain_id, snapshot_runner_kwargs)
+        self._mock_rounds = []
+
+    def get_record(
+        self, number: int, state: Mapping, values: List[int]
+    ) -> Mapping[str, int]:
+        """
+        Gets the record row of the value and possibly some state at the
+        given block.
 
-class BaseGearboxV2Runner(BaseRunner):
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+            values (List[int]): The values of the backtesters for the state.
+
+        Returns:
+            Mapping[str, int]: The record row by column name.
+        """
+        data = {"number": number}
+        for i, value in enumerate(values):
+            data[f"values{i}"] = value
+
+        # only add value from oracle feed
+        columns = self.get_feed_columns()
+        for i in range(len(columns)):
+            round_data = state["feeds"][i]
+            if round_data == tuple():
+                continue
+
+            data[columns[i]] = round_data[1]  # round_data.answer
+
+        return data
+
+
+class BaseGearboxV2Runner(BaseGearboxV2FeedsRunner):
     collateral_addrs: ClassVar[List[str]] = []
     supported_feed_types: ClassVar[List[int]] = [
         PriceFeedType.CHAINLINK_ORACLE.value,
+        PriceFeedType.YEARN_ORACLE.value,
+        PriceFeedType.CURVE_2LP_ORACLE.value,
+        PriceFeedType.CURVE_3LP_ORACLE.value,
+        PriceFeedType.CURVE_4LP_ORACLE.value,
+        PriceFeedType.WSTETH_ORACLE.value,
+        PriceFeedType.BOUNDED_ORACLE.value,
         PriceFeedType.COMPOSITE_ETH_ORACLE.value,
     ]
     _ref_keys: ClassVar[List[str]] = ["manager"]
+    _ref_interfaces: ClassVar[Mapping[str, str]] = {"manager": "GearboxCreditManagerV2"}
 
     def __init__(self, **data: Any):
         """
@@ -47,29 +353,49 @@ class BaseGearboxV2Runner(BaseRunner):
 
         # store the facade contract in _refs
         # NOTE: assumes debt taken from only one credit manager
-        # TODO: allow for multiple credit managers
+        # SEE: GearboxV2MultiSTETHRunner for accounts across credit managers
         manager = self._refs["manager"]
-        self._refs["facade"] = Contract(manager.creditFacade())
+        refs = get_manager_refs(manager, chain.blocks.head.number)
+        self._refs["facade"] = refs["facade"]
 
         # store price oracle contract in _refs
-        price_oracle = Contract(manager.priceOracle())
-        self._refs["price_oracle"] = price_oracle
+        self._refs["price_oracle"] = refs["price_oracle"]
 
         # store supported collateral contracts in _refs
-        collaterals = [
-            Contract(manager.collateralTokens(i).token)
-            for i in range(manager.collateralTokensCount())
-            if manager.collateralTokens(i).token in self.collateral_addrs
+        collateral_addrs = [
+            addr for addr in refs["collaterals"] if addr in self.collateral_addrs
+        ]
+        self._refs["collaterals"] = [
+            get_contract(addr, "ERC20") for addr in collateral_addrs
         ]
-        self._refs["collaterals"] = collaterals
 
         # store feeds associated with collateral tokens in _refs
-        self._refs["feeds"] = [
-            Contract(price_oracle.priceFeeds(collateral.address))
-            for collateral in collaterals
-        ]
+        self._refs["feeds"] = [refs["feeds"][addr] for addr in collateral_addrs]
 
-    def setup(self, mocking: bool = True):
+    def get_feed_descriptors(self) -> List[FeedDescriptor]:
+        """
+        Gets the descriptors of the ref feeds, resolving once then caching.
+
+        Returns:
+            List[:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`]: The
+            descriptor of each feed.
+        """
+        if len(self._feed_descriptors) == 0:
+            self._feed_descriptors = get_feed_descriptors(
+                self._refs["feeds"], self.supported_feed_types
+            )
+        return self._feed_descriptors
+
+    def get_decimals(self) -> List[int]:
+        """
+        Gets the decimals of the ref feeds, reading once then caching.
+
+        Returns:
+            List[int]: The decimals of each feed.
+        """
+        return [descriptor.decimals for descriptor in self.get_feed_descriptors()]
+
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
         """
         Sets up Gearbox V2 runner for testing. Deploys mock Chainlink
         oracles, if mocking, and sets mocks as feeds on price oracle
@@ -77,87 +403,66 @@ class BaseGearboxV2Runner(BaseRunner):
 
         Args:
             mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
         """
         if mocking:
             self.deploy_mocks()
 
-    def deploy_mocks(self):
+    def set_mocks(self, mocks: Mapping[str, Any]):
         """
-        Deploys the mock contracts.
-        """
-        # deploy the mock Chainlink feed
-        click.echo("Deploying mock feeds ...")
-        mock_feeds = [
-            deploy_mock_feed(
-                feed.description(),
-                feed.decimals(),
-                feed.version(),
-                self.acc,
-            )
-            for i, feed in enumerate(self._refs["feeds"])
-        ]
-        self._mocks = {"feeds": mock_feeds}
-
-    def _get_feed_data(self, feed: ContractInstance, number: int) -> Tuple:
-        """
-        Gets reference feed data to be set in associated mock. Transforms
-        the fetched data from reference feeds if needed to consolidate
-        Gearbox oracle types into Chainlink only X/USD oracle.
+        Sets mock contracts deployed elsewhere instead of deploying, e.g. mock
+        feeds shared across the runners of several accounts.
 
         Args:
-            feed (:class:`ape.contracts.ContractInstance`): The reference feed.
-            number (int): The reference block number.
-
-        Returns:
-            Tuple: The Chainlink round data.
+            mocks (Mapping[str, Any]): The mock feeds, in ref feed order, and
+                the mock feed coordinator.
         """
-        price_feed_type = (
-            feed.priceFeedType()
-            if hasattr(feed, "priceFeedType")
-            else PriceFeedType.CHAINLINK_ORACLE.value
-        )
-        if price_feed_type not in self.supported_feed_types:
-            raise ValueError(f"feed {feed.address} not supported type")
-
-        data = tuple()
-        if price_feed_type == PriceFeedType.CHAINLINK_ORACLE.value:
-            data = tuple(feed.latestRoundData(block_identifier=number))
-        elif price_feed_type == PriceFeedType.COMPOSITE_ETH_ORACLE.value:
-            # query the underlying eth/usd and x/eth feeds at number
-            feed_eth_usd = Contract(feed.ethUsdPriceFeed())
-            feed_target = Contract(feed.targetEthPriceFeed())
-            answer_denom = feed.answerDenominator()
-
-            # return target relative to USD at number
-            round_data_target = feed_target.latestRoundData(block_identifier=number)
-            round_data = feed_eth_usd.latestRoundData(block_identifier=number)
-            round_data.answer = int(
-                round_data.answer * round_data_target.answer / answer_denom
-            )
-
-            data = tuple(round_data)
-
-        return data
-
-    def get_refs_state(self, number: Optional[int] = None) -> Mapping:
+        if len(mocks["feeds"]) != len(self._refs["feeds"]):
+            raise ValueError("len(mock feeds) != len(ref feeds).")
+        self._mocks = {
+            "feeds": list(mocks["feeds"]),
+            "coordinator": mocks["coordinator"],
+        }
+        self._mock_rounds = []
+
+    def get_feed_answers(self, numbers: Sequence[int]) -> np.ndarray:
         """
-        Get the state of references at given block.
+        Gets the answers of the ref feeds at each block as a price path for
+        off-chain computations. Looks up feed rounds in the round index if set
+        and covering the blocks, else fetches a round index over the blocks
+        from logs in bulk rather than reading rounds at each block.
+
+        NOTE: Values of wrapper feed value sources are still read at each
+        block, in one aggregated call per block.
 
         Args:
-            number (int): The block number. If None, then last block
-                from current provider chain.
+            numbers (Sequence[int]): The block numbers.
 
         Returns:
-            Mapping: The state of references at block.
+            :class:`numpy.ndarray`: The answer of each feed at each block, of
+            shape (blocks, feeds).
         """
-        block_identifier = get_block_identifier(number)
-        feeds = self._refs["feeds"]
-
-        state = {}
-        state["feeds"] = [
-            self._get_feed_data(feed, block_identifier) for i, feed in enumerate(feeds)
+        descriptors = self.get_feed_descriptors()
+        if len(numbers) == 0:
+            return np.empty((0, len(descriptors)), dtype=np.float64)
+
+        start, stop = min(numbers), max(numbers)
+        index = self._round_index
+        if index is None or not (index.covers(start) and index.covers(stop)):
+            index = self.get_round_index(start, stop)
+
+        answers = [
+            [
+                round_data[1]
+                for round_data in get_feeds_round_data(descriptors, number, index)
+            ]
+            for number in numbers
         ]
-        return state
+        return np.array(answers, dtype=np.float64).reshape(
+            len(numbers), len(descriptors)
+        )
 
     def init_mocks_state(self, number: int, state: Mapping):
         """
@@ -169,7 +474,7 @@ class BaseGearboxV2Runner(BaseRunner):
         """
         facade = self._refs["facade"]
         price_oracle = self._refs["price_oracle"]
-        acl = Contract(price_oracle._acl())
+        acl = get_contract(price_oracle._acl(), "GearboxACL")
         configurator = get_impersonated_account(acl.owner())
         fund_account(configurator.address, self._initial_acc_balance)
 
@@ -186,43 +491,11 @@ class BaseGearboxV2Runner(BaseRunner):
 
         # mints a degen NFT to backtester if needed for whitelist
         if facade.degenNFT() != ZERO_ADDRESS:
-            degen_nft = Contract(facade.degenNFT())
+            degen_nft = get_contract(facade.degenNFT(), "GearboxDegenNFT")
             minter = get_impersonated_account(degen_nft.minter())
             fund_account(minter, self._initial_acc_balance)
             degen_nft.mint(self.backtester.address, 1, sender=minter)
 
-    def set_mocks_state(self, state: Mapping):
-        """
-        Sets the state of mocks.
-
-        Args:
-            state (Mapping): The new state of mocks.
-        """
-        mock_feeds = self._mocks["feeds"]
-        ecosystem = chain.provider.network.ecosystem
-
-        for i, mock_feed in enumerate(mock_feeds):
-            round_data = state["feeds"][i]  # round data tuple
-            if round_data == tuple():
-                continue
-
-            round_id = round_data[0]
-
-            # stores latest round data and sets latest round id
-            datas = [
-                ecosystem.encode_transaction(
-                    mock_feed.address,
-                    mock_feed.setRound.abis[0],
-                    round_data,
-                ).data,
-                ecosystem.encode_transaction(
-                    mock_feed.address,
-                    mock_feed.setLatestRoundId.abis[0],
-                    round_id,
-                ).data,
-            ]
-            mock_feed.calls(datas, sender=self.acc)
-
     def init_strategy(self):
         """
         Initializes the strategy being backtested through backtester contract
@@ -243,31 +516,15 @@ class BaseGearboxV2Runner(BaseRunner):
         """
         pass
 
-    def record(self, path: str, number: int, state: Mapping, values: List[int]):
+    def get_record_decimals(self) -> Mapping[str, int]:
         """
-        Records the value and possibly some state at the given block.
+        Gets the decimals of each column recorded to csv by the runner.
 
-        Args:
-            path (str): The path to the csv file to write the record to.
-            number (int): The block number.
-            state (Mapping): The state of references at block number.
-            values (List[int]): The values of the backtester for the state.
-        """
-        data = {"number": number}
-        for i, value in enumerate(values):
-            data[f"values{i}"] = value
+        NOTE: Health factor values are in Gearbox percentage factor terms (1e4).
 
-        # only add value from oracle feed
-        feeds = self._refs["feeds"]
-        for i, feed in enumerate(feeds):
-            round_data = state["feeds"][i]
-            if round_data == tuple():
-                continue
-
-            k = feed.description()
-            data[k] = round_data[1]  # round_data.answer
-
-        # append row to csv file
-        header = not os.path.exists(path)
-        df = pd.DataFrame(data={k: [v] for k, v in data.items()})
-        df.to_csv(path, index=False, mode="a", header=header)
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        data = {"number": 0, "values0": 4}
+        data.update(self.get_feed_decimals())
+        return data
@@ -0,0 +1,318 @@
+from enum import Enum
+from typing import List, Mapping, Optional, Tuple
+
+from ape.contracts import ContractInstance
+from pydantic import BaseModel
+
+from backtest_ape.gearbox.v2.rounds import RoundIndex
+from backtest_ape.registry import get_contract
+from backtest_ape.utils import multicall
+
+
+class PriceFeedType(Enum):
+    CHAINLINK_ORACLE = 0
+    YEARN_ORACLE = 1
+    CURVE_2LP_ORACLE = 2
+    CURVE_3LP_ORACLE = 3
+    CURVE_4LP_ORACLE = 4
+    ZERO_ORACLE = 5
+    WSTETH_ORACLE = 6
+    BOUNDED_ORACLE = 7
+    COMPOSITE_ETH_ORACLE = 8
+
+
+# getters of the params of feeds wrapping other price feeds by type
+WRAPPER_PARAMS = {
+    PriceFeedType.YEARN_ORACLE.value: [
+        "priceFeed",
+        "yVault",
+        "decimalsDivider",
+        "upperBound",
+    ],
+    PriceFeedType.CURVE_2LP_ORACLE.value: [
+        "priceFeed1",
+        "priceFeed2",
+        "curvePool",
+        "upperBound",
+    ],
+    PriceFeedType.CURVE_3LP_ORACLE.value: [
+        "priceFeed1",
+        "priceFeed2",
+        "priceFeed3",
+        "curvePool",
+        "upperBound",
+    ],
+    PriceFeedType.CURVE_4LP_ORACLE.value: [
+        "priceFeed1",
+        "priceFeed2",
+        "priceFeed3",
+        "priceFeed4",
+        "curvePool",
+        "upperBound",
+    ],
+    PriceFeedType.WSTETH_ORACLE.value: [
+        "priceFeed",
+        "wstETH",
+        "decimalsDivider",
+        "upperBound",
+    ],
+    PriceFeedType.BOUNDED_ORACLE.value: ["priceFeed", "upperBound"],
+}
+
+# getters on the value source multiplying the underlying answer by type
+VALUE_METHODS = {
+    PriceFeedType.YEARN_ORACLE.value: "pricePerShare",
+    PriceFeedType.CURVE_2LP_ORACLE.value: "get_virtual_price",
+    PriceFeedType.CURVE_3LP_ORACLE.value: "get_virtual_price",
+    PriceFeedType.CURVE_4LP_ORACLE.value: "get_virtual_price",
+    PriceFeedType.WSTETH_ORACLE.value: "stEthPerToken",
+}
+CURVE_VIRTUAL_PRICE_DENOMINATOR = 10**18
+
+
+class FeedDescriptor(BaseModel):
+    """
+    Resolved description of a Gearbox price feed, fixed for a run.
+
+    Sources are the underlying Chainlink aggregators whose latest round
+    data make up the feed answer at each block, including those of any
+    underlying feeds a wrapper feed prices off. Wrapper feeds also scale the
+    underlying answer by a value read from the value source each block, e.g.
+    the virtual price of a Curve pool, capped at the upper bound.
+    """
+
+    address: str
+    feed_type: int
+    description: str
+    decimals: int
+    version: int
+    sources: List[str] = []
+    answer_denominator: int = 1
+    feeds: List["FeedDescriptor"] = []  # underlying feeds of wrapper feeds
+    value_source: Optional[str] = None
+    upper_bound: Optional[int] = None
+
+
+FeedDescriptor.update_forward_refs()
+
+
+def get_feed_descriptors(
+    feeds: List[ContractInstance], supported_feed_types: List[int]
+) -> List[FeedDescriptor]:
+    """
+    Resolves the descriptors of Gearbox price feeds through aggregated calls.
+
+    Resolves the underlying feeds of wrapper feeds a level at a time, so
+    takes a few aggregated calls per level of nesting.
+
+    Args:
+        feeds (List[:class:`ape.contracts.ContractInstance`]): The feeds.
+        supported_feed_types (List[int]): The supported price feed types.
+
+    Returns:
+        List[:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`]: The
+        descriptor of each feed.
+    """
+    calls = []
+    for feed in feeds:
+        calls += [(feed.description,), (feed.decimals,), (feed.version,)]
+        if hasattr(feed, "priceFeedType"):
+            calls.append((feed.priceFeedType,))
+
+    results = iter(multicall(calls))
+    descriptors = []
+    for feed in feeds:
+        description, decimals, version = next(results), next(results), next(results)
+        feed_type = (
+            next(results)
+            if hasattr(feed, "priceFeedType")
+            else PriceFeedType.CHAINLINK_ORACLE.value
+        )
+        if feed_type not in supported_feed_types:
+            raise ValueError(f"feed {feed.address} not supported type")
+
+        descriptors.append(
+            FeedDescriptor(
+                address=feed.address,
+                feed_type=feed_type,
+                description=description,
+                decimals=decimals,
+                version=version,
+                sources=[feed.address],
+            )
+        )
+
+    # resolve the underlying eth/usd and x/eth feeds of composite feeds
+    composites = [
+        (feed, descriptor)
+        for feed, descriptor in zip(feeds, descriptors)
+        if descriptor.feed_type == PriceFeedType.COMPOSITE_ETH_ORACLE.value
+    ]
+    calls = []
+    for feed, _ in composites:
+        calls += [
+            (feed.ethUsdPriceFeed,),
+            (feed.targetEthPriceFeed,),
+            (feed.answerDenominator,),
+        ]
+
+    results = iter(multicall(calls))
+    for _, descriptor in composites:
+        descriptor.sources = [next(results), next(results)]  # eth/usd, x/eth
+        descriptor.answer_denominator = next(results)
+
+    # resolve the params of wrapper feeds then their underlying feeds at once
+    wrappers = [
+        (feed, descriptor)
+        for feed, descriptor in zip(feeds, descriptors)
+        if descriptor.feed_type in WRAPPER_PARAMS
+    ]
+    calls = [
+        (getattr(feed, name),)
+        for feed, descriptor in wrappers
+        for name in WRAPPER_PARAMS[descriptor.feed_type]
+    ]
+
+    results = iter(multicall(calls))
+    underlying_addrs = []
+    for _, descriptor in wrappers:
+        params = {name: next(results) for name in WRAPPER_PARAMS[descriptor.feed_type]}
+        addrs = [v for k, v in params.items() if k.startswith("priceFeed")]
+        underlying_addrs.append(addrs)
+
+        descriptor.upper_bound = params["upperBound"]
+        if descriptor.feed_type in VALUE_METHODS:
+            descriptor.value_source = next(
+                params[k] for k in ["yVault", "curvePool", "wstETH"] if k in params
+            )
+            descriptor.answer_denominator = params.get(
+                "decimalsDivider", CURVE_VIRTUAL_PRICE_DENOMINATOR
+            )
+
+    underlying = iter(
+        get_feed_descriptors(
+            [get_contract(addr) for addrs in underlying_addrs for addr in addrs],
+            supported_feed_types,
+        )
+        if len(wrappers) > 0
+        else []
+    )
+    for (_, descriptor), addrs in zip(wrappers, underlying_addrs):
+        descriptor.feeds = [next(underlying) for _ in addrs]
+        descriptor.sources = [s for d in descriptor.feeds for s in d.sources]
+
+    return descriptors
+
+
+def get_value_calls(descriptors: List[FeedDescriptor]) -> List[Tuple[str, str]]:
+    """
+    Gets the value source and getter of every wrapper feed in the feed trees
+    of the descriptors, deduped.
+
+    Args:
+        descriptors (List[:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`]):
+            The feed descriptors.
+
+    Returns:
+        List[Tuple[str, str]]: The (value source, getter name) reads.
+    """
+    calls = []
+    for descriptor in descriptors:
+        if descriptor.value_source is not None:
+            calls.append((descriptor.value_source, VALUE_METHODS[descriptor.feed_type]))
+        calls += get_value_calls(descriptor.feeds)
+    return list(dict.fromkeys(calls))
+
+
+def get_feed_round_data(
+    descriptor: FeedDescriptor,
+    round_datas: Mapping[str, Tuple],
+    values: Mapping[str, int],
+) -> Tuple:
+    """
+    Computes the Chainlink round data of a feed from the round data of its
+    sources and the values of any value sources, as the feed does on-chain.
+
+    Transforms the data if needed to consolidate Gearbox oracle types into
+    Chainlink only X/USD oracle.
+
+    Args:
+        descriptor (:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`):
+            The feed descriptor.
+        round_datas (Mapping[str, Tuple]): The round data by source.
+        values (Mapping[str, int]): The value by value source.
+
+    Returns:
+        Tuple: The round data of the feed.
+    """
+    if descriptor.feed_type == PriceFeedType.COMPOSITE_ETH_ORACLE.value:
+        # return target relative to USD
+        round_data, round_data_target = [round_datas[s] for s in descriptor.sources]
+        answer = int(
+            round_data[1] * round_data_target[1] / descriptor.answer_denominator
+        )
+        return round_data[:1] + (answer,) + round_data[2:]
+    elif descriptor.feed_type not in WRAPPER_PARAMS:
+        return round_datas[descriptor.sources[0]]
+
+    # curve lp feeds return round data of the underlying with the min answer
+    round_data = min(
+        [get_feed_round_data(d, round_datas, values) for d in descriptor.feeds],
+        key=lambda rd: rd[1],
+    )
+    answer = round_data[1]
+    if descriptor.value_source is None:
+        answer = min(answer, descriptor.upper_bound)
+    else:
+        value = min(values[descriptor.value_source], descriptor.upper_bound)
+        answer = answer * value // descriptor.answer_denominator
+
+    return round_data[:1] + (answer,) + round_data[2:]
+
+
+def get_feeds_round_data(
+    descriptors: List[FeedDescriptor],
+    number: Optional[int] = None,
+    index: Optional[RoundIndex] = None,
+) -> List[Tuple]:
+    """
+    Gets the Chainlink round data of each feed at a block, reading the
+    latest round data of all underlying sources and the values of all value
+    sources in one aggregated call, once per source shared by feeds. Looks up
+    the sources in the round index instead if it covers the block.
+
+    NOTE: Wrapper feeds revert on-chain when the value is below the lower
+    bound, whereas here the answer is still computed from the value.
+
+    Args:
+        descriptors (List[:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`]):
+            The feed descriptors.
+        number (Optional[int]): The block number. If None, then last block
+            from current provider chain.
+        index (Optional[:class:`backtest_ape.gearbox.v2.rounds.RoundIndex`]):
+            The round index of the sources.
+
+    Returns:
+        List[Tuple]: The round data of each feed.
+    """
+    sources = list(
+        dict.fromkeys(s for descriptor in descriptors for s in descriptor.sources)
+    )
+    value_reads = get_value_calls(descriptors)
+    calls = [
+        (getattr(get_contract(addr, "FeedValueSource"), method),)
+        for addr, method in value_reads
+    ]
+    if number is not None and index is not None and index.covers(number):
+        round_results = [index.get_round_data(source, number) for source in sources]
+        value_results = multicall(calls, number)
+    else:
+        aggregators = [get_contract(source, "AggregatorV3") for source in sources]
+        calls = [(agg.latestRoundData,) for agg in aggregators] + calls
+        results = multicall(calls, number)
+        n = len(sources)
+        round_results, value_results = results[:n], results[n:]
+
+    round_datas = {s: tuple(result) for s, result in zip(sources, round_results)}
+    values = {addr: value for (addr, _), value in zip(value_reads, value_results)}
+    return [get_feed_round_data(d, round_datas, values) for d in descriptors]
@@ -0,0 +1,64 @@
+from typing import List
+
+import numpy as np
+from pydantic import BaseModel, validator
+
+
+class HealthFactorEngine(BaseModel):
+    """
+    Off-chain health factor of a Gearbox V2 credit account as a function of
+    the prices of its collaterals, for whole price paths and scenario sets
+    at once.
+
+    Computes the total weighted value of collateral balances at the feed
+    prices times liquidation thresholds, divided by the debt with interest
+    valued at the underlying feed price, as the credit facade does.
+
+    NOTE: Balances and debt with interest are fixed as read, so interest
+    accrued over a price path is not included.
+    """
+
+    balances: List[int]  # collateral balances of the credit account
+    decimals: List[int]  # collateral token decimals
+    liquidation_thresholds: List[int]  # in percentage factor terms (1e4)
+    debt: int  # borrowed amount with interest, excluding fees, in underlying
+    underlying_index: int = 0  # index of the underlying in collaterals
+
+    @validator("liquidation_thresholds")
+    def lens_equal(cls, v, values, **kwargs):
+        for k in ["balances", "decimals"]:
+            if k in values and len(values[k]) != len(v):
+                raise ValueError(f"len({k}) != len(liquidation_thresholds)")
+        return v
+
+    @validator("underlying_index")
+    def underlying_index_in_collaterals(cls, v, values, **kwargs):
+        if "balances" in values and not (0 <= v < len(values["balances"])):
+            raise ValueError("underlying_index not in collaterals")
+        return v
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Computes the health factor at each set of collateral prices.
+
+        Args:
+            prices (:class:`numpy.ndarray`): The feed answers of each
+                collateral along the last axis, e.g. of shape (blocks,
+                collaterals) or (scenarios, steps, collaterals).
+
+        Returns:
+            :class:`numpy.ndarray`: The health factors in Gearbox percentage
+            factor terms (1e4), of the shape of prices without the last axis.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.shape[-1] != len(self.balances):
+            raise ValueError("prices last axis not len(balances).")
+
+        amounts = np.array(self.balances, dtype=np.float64) / np.power(
+            10.0, self.decimals
+        )
+        twv = prices @ (amounts * np.array(self.liquidation_thresholds))
+
+        debt = self.debt / 10.0 ** self.decimals[self.underlying_index]
+        debt_usd = debt * prices[..., self.underlying_index]
+        return np.floor(twv / debt_usd).astype(np.int64)
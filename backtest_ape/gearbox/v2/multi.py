@@ -0,0 +1,208 @@
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import validator
+
+from backtest_ape.gearbox.v2.base import BaseGearboxV2FeedsRunner
+from backtest_ape.gearbox.v2.feeds import FeedDescriptor
+from backtest_ape.gearbox.v2.steth import GearboxV2STETHRunner
+from backtest_ape.utils import multicall
+
+
+def get_descriptor_key(descriptor: FeedDescriptor) -> Tuple:
+    """
+    Gets the key identifying feeds with the same answer at every block, i.e.
+    the same type computed from the same underlying Chainlink sources and
+    value source.
+
+    Args:
+        descriptor (:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`):
+            The feed descriptor.
+
+    Returns:
+        Tuple: The key of the feed.
+    """
+    return (
+        descriptor.feed_type,
+        tuple(descriptor.sources),
+        descriptor.answer_denominator,
+        descriptor.value_source,
+        descriptor.upper_bound,
+    )
+
+
+class GearboxV2MultiSTETHRunner(BaseGearboxV2FeedsRunner):
+    """
+    Backtests Gearbox V2 stETH credit accounts across several credit managers
+    and leverage factors at once over the same blocks.
+
+    Dedupes the feeds of all accounts by their underlying Chainlink sources,
+    so each is fetched and mocked once, with all mocks set in one transaction
+    per block. Records values{j} as the health factor of account j, read for
+    all accounts in one aggregated call, then the answer of each unique feed
+    i as feed{i}.
+    """
+
+    accounts: List[Mapping[str, Any]] = []  # GearboxV2STETHRunner kwargs
+    _runners: List[GearboxV2STETHRunner] = []
+    _feed_indices: List[List[int]] = []  # unique feed index of each account feed
+
+    @validator("accounts")
+    def accounts_not_empty(cls, v):
+        if len(v) == 0:
+            raise ValueError("len(accounts) == 0")
+        return v
+
+    def __init__(self, **data: Any):
+        """
+        Overrides BaseRunner init to also create the stETH runner for each
+        account, sharing the runner account, and dedupe their feeds.
+        """
+        super().__init__(**data)
+        self._runners = [
+            GearboxV2STETHRunner(**{"acc_addr": self.acc_addr, **kwargs})
+            for kwargs in self.accounts
+        ]
+
+        keys: Dict[Tuple, int] = {}
+        descriptors, indices = [], []
+        for runner in self._runners:
+            runner_indices = []
+            for descriptor in runner.get_feed_descriptors():
+                key = get_descriptor_key(descriptor)
+                if key not in keys:
+                    keys[key] = len(descriptors)
+                    descriptors.append(descriptor)
+                runner_indices.append(keys[key])
+            indices.append(runner_indices)
+
+        self._feed_descriptors = descriptors
+        self._feed_indices = indices
+
+    def get_feed_descriptors(self) -> List[FeedDescriptor]:
+        """
+        Gets the descriptors of the unique feeds across accounts.
+
+        Returns:
+            List[:class:`backtest_ape.gearbox.v2.feeds.FeedDescriptor`]: The
+            descriptor of each unique feed.
+        """
+        return self._feed_descriptors
+
+    def get_feed_columns(self) -> List[str]:
+        """
+        Gets the record column name of the answer of each unique feed, keyed
+        by unique feed index as deduped feeds may share a description.
+
+        Returns:
+            List[str]: The column names.
+        """
+        return [f"feed{i}" for i in range(len(self.get_feed_descriptors()))]
+
+    def get_runner_state(self, j: int, state: Mapping) -> Mapping:
+        """
+        Gets the state of references of account j from the state of the
+        unique feeds.
+
+        Args:
+            j (int): The index of the account.
+            state (Mapping): The state of references of the unique feeds.
+
+        Returns:
+            Mapping: The state of references of the account feeds.
+        """
+        return {"feeds": [state["feeds"][i] for i in self._feed_indices[j]]}
+
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
+        """
+        Sets up the stETH runner for each account for testing. Deploys the
+        backtester of each account, then the mock feeds shared by all, if
+        mocking.
+
+        Args:
+            mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
+        """
+        for runner in self._runners:
+            runner.setup(mocking=False)
+
+        if mocking:
+            self.deploy_mocks()
+
+        self._initialized = True
+
+    def deploy_mocks(self):
+        """
+        Deploys the mock contracts, one mock feed per unique feed, and shares
+        them with the runner of each account.
+        """
+        super().deploy_mocks()
+        mock_feeds = self._mocks["feeds"]
+        mock_coordinator = self._mocks["coordinator"]
+        for runner, indices in zip(self._runners, self._feed_indices):
+            runner.set_mocks(
+                {
+                    "feeds": [mock_feeds[i] for i in indices],
+                    "coordinator": mock_coordinator,
+                }
+            )
+
+    def init_mocks_state(self, number: int, state: Mapping):
+        """
+        Initializes the state of mocks, then the mocks and credit account of
+        each account.
+
+        Args:
+            number (int): The init block number.
+            state (Mapping): The init state of mocks at block number.
+        """
+        self.set_mocks_state(state)
+        for j, runner in enumerate(self._runners):
+            runner_state = self.get_runner_state(j, state)
+            runner.set_mock_rounds(runner_state["feeds"])  # already set
+            runner.init_mocks_state(number, runner_state)
+
+    def get_values(self) -> List[int]:
+        """
+        Gets the current health factors of the credit accounts from all
+        backtesters in one aggregated call.
+
+        Returns:
+            List[int]: The values of the backtesters, in account order.
+        """
+        results = multicall([(runner.backtester.values,) for runner in self._runners])
+        return [value for values in results for value in values]
+
+    def init_strategy(self):
+        """
+        Initializes the strategy of each account through its backtester
+        contract at the given block.
+        """
+        for runner in self._runners:
+            runner.init_strategy()
+
+    def update_strategy(self, number: int, state: Mapping):
+        """
+        Updates the strategy of each account through its backtester contract.
+
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+        """
+        for j, runner in enumerate(self._runners):
+            runner.update_strategy(number, self.get_runner_state(j, state))
+
+    def get_record_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of each column recorded to csv by the runner.
+
+        NOTE: Health factor values are in Gearbox percentage factor terms (1e4).
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        data = {"number": 0}
+        data.update({f"values{j}": 4 for j in range(len(self._runners))})
+        data.update(self.get_feed_decimals())
+        return data
@@ -0,0 +1,277 @@
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import click
+import numpy as np
+from ape.contracts import ContractInstance
+from pydantic import BaseModel
+
+from backtest_ape.registry import get_contract
+from backtest_ape.utils import multicall
+
+PHASE_OFFSET = 64  # proxy round ids are (phase id << 64) | aggregator round id
+ROUND_COLUMNS = [
+    "number",
+    "roundId",
+    "answer",
+    "startedAt",
+    "updatedAt",
+    "answeredInRound",
+]
+
+
+def get_round_logs(aggregator: ContractInstance, start: int, stop: int) -> List[Tuple]:
+    """
+    Gets the rounds reported by a Chainlink aggregator between blocks from
+    its AnswerUpdated and NewRound logs.
+
+    Args:
+        aggregator (:class:`ape.contracts.ContractInstance`): The Chainlink
+            aggregator.
+        start (int): The first block number.
+        stop (int): The last block number, inclusive.
+
+    Returns:
+        List[Tuple]: The (block number, log index, round id, answer, started
+        at, updated at) of each round in chain order.
+    """
+    started = {
+        log.roundId: log.startedAt for log in aggregator.NewRound.range(start, stop + 1)
+    }
+    logs = [
+        (
+            log.block_number,
+            log.log_index,
+            log.roundId,
+            log.current,
+            started.get(log.roundId, log.updatedAt),
+            log.updatedAt,
+        )
+        for log in aggregator.AnswerUpdated.range(start, stop + 1)
+        if log.block_number <= stop
+    ]
+    return sorted(logs, key=lambda log: (log[0], log[1]))
+
+
+class RoundIndex(BaseModel):
+    """
+    Columnar index of the rounds of Chainlink feeds over a block range,
+    answering the latest round data of a feed as of any block in the range
+    without reads per block.
+
+    Stores the latest round of each feed at the first block, then every
+    round reported since, fetched from AnswerUpdated and NewRound logs in
+    bulk. Logs of proxy feeds are fetched from the aggregator of each phase
+    behind the proxy, and of feeds that are aggregators themselves from the
+    feed directly.
+
+    NOTE: Rounds reported by the prior aggregator of a proxy after it is
+    upgraded to a new phase within the range are indexed as still current.
+    """
+
+    sources: List[str]  # Chainlink proxy or aggregator addresses
+
+    _start: Optional[int] = None
+    _stop: Optional[int] = None
+    _phases: Dict[str, Optional[int]] = {}  # last phase id, None if not proxy
+    _columns: Dict[str, Dict[str, List[int]]] = {}
+    _arrays: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def __init__(self, **data: Any):
+        """
+        Overrides BaseModel init to dedupe the sources and create the empty
+        columns.
+        """
+        super().__init__(**data)
+        self.sources = list(dict.fromkeys(self.sources))
+        self._phases = {}
+        self._columns = {
+            source: {k: [] for k in ROUND_COLUMNS} for source in self.sources
+        }
+        self._arrays = {}
+
+    class Config:
+        underscore_attrs_are_private = True
+
+    def covers(self, number: int) -> bool:
+        """
+        Whether a block is within the fetched range.
+
+        Args:
+            number (int): The block number.
+
+        Returns:
+            bool: Whether the block was fetched through.
+        """
+        return self._start is not None and self._start <= number <= self._stop
+
+    def fetch(self, start: int, stop: int):
+        """
+        Fetches the rounds of every source between start and stop, continuing
+        from the last fetched block if any.
+
+        Args:
+            start (int): The start block number.
+            stop (int): The stop block number, inclusive.
+        """
+        if start > stop:
+            raise ValueError("start block after stop block.")
+
+        feeds = [get_contract(source, "AggregatorV3") for source in self.sources]
+        if self._start is None:
+            # proxies expose the aggregator of each phase, aggregators do not
+            proxies = {
+                source: hasattr(get_contract(source), "phaseAggregators")
+                for source in self.sources
+            }
+
+            click.echo(f"Fetching latest rounds at block {start} ...")
+            results = iter(
+                multicall(
+                    [(feed.latestRoundData,) for feed in feeds]
+                    + [
+                        (feed.phaseId,)
+                        for source, feed in zip(self.sources, feeds)
+                        if proxies[source]
+                    ],
+                    start,
+                )
+            )
+            for source in self.sources:
+                self.append(source, (start,) + tuple(next(results)))
+            self._phases = {
+                source: next(results) if proxies[source] else None
+                for source in self.sources
+            }
+            self._start = self._stop = start
+        elif start <= self._stop:
+            raise ValueError("start block not after last fetched block.")
+
+        if stop == self._stop:
+            return
+
+        # aggregators of every phase each proxy went through since last fetch
+        proxies = [
+            (source, feed)
+            for source, feed in zip(self.sources, feeds)
+            if self._phases[source] is not None
+        ]
+        phases = dict(
+            zip(
+                [source for source, _ in proxies],
+                multicall([(feed.phaseId,) for _, feed in proxies], stop),
+            )
+        )
+        calls = [
+            (feed.phaseAggregators, phase)
+            for source, feed in proxies
+            for phase in range(self._phases[source], phases[source] + 1)
+        ]
+        aggregator_addrs = iter(multicall(calls, stop))
+
+        click.echo(f"Fetching round logs to block {stop} ...")
+        for source, feed in zip(self.sources, feeds):
+            if self._phases[source] is None:
+                # aggregator round ids are not phased
+                logs = get_round_logs(feed, self._stop + 1, stop)
+            else:
+                logs = []
+                for phase in range(self._phases[source], phases[source] + 1):
+                    aggregator = get_contract(next(aggregator_addrs), "AggregatorV3")
+                    logs += [
+                        (number, index, (phase << PHASE_OFFSET) | round_id, *rest)
+                        for number, index, round_id, *rest in get_round_logs(
+                            aggregator, self._stop + 1, stop
+                        )
+                    ]
+                self._phases[source] = phases[source]
+
+            # round data rows as returned by latestRoundData
+            for number, _, round_id, answer, started_at, updated_at in sorted(
+                logs, key=lambda log: (log[0], log[1])
+            ):
+                self.append(
+                    source,
+                    (number, round_id, answer, started_at, updated_at, round_id),
+                )
+
+        self._stop = stop
+        self._arrays = {}
+
+    def append(self, source: str, row: Tuple):
+        """
+        Appends a round to the columns of a source.
+
+        Args:
+            source (str): The Chainlink feed address.
+            row (Tuple): The block number followed by the round data.
+        """
+        for k, v in zip(ROUND_COLUMNS, row):
+            self._columns[source][k].append(v)
+
+    def get_arrays(self) -> Mapping[str, Mapping[str, np.ndarray]]:
+        """
+        Gets the round columns of each source as arrays for lookups, building
+        once after each fetch.
+
+        Returns:
+            Mapping[str, Mapping[str, :class:`numpy.ndarray`]]: The round
+            columns by column name by source.
+        """
+        if len(self._arrays) == 0:
+            self._arrays = {
+                source: {
+                    k: np.array(v, dtype=np.int64 if k == "number" else object)
+                    for k, v in columns.items()
+                }
+                for source, columns in self._columns.items()
+            }
+        return self._arrays
+
+    def get_round_data(self, source: str, number: int) -> Tuple:
+        """
+        Gets the latest round data of a source as of a block.
+
+        Args:
+            source (str): The Chainlink feed address.
+            number (int): The block number.
+
+        Returns:
+            Tuple: The round id, answer, started at, updated at and answered
+            in round, as returned by latestRoundData.
+        """
+        if not self.covers(number):
+            raise ValueError(f"block {number} not in fetched range.")
+
+        arrays = self.get_arrays()[source]
+        i = int(np.searchsorted(arrays["number"], number, "right")) - 1
+        return tuple(int(arrays[k][i]) for k in ROUND_COLUMNS[1:])
+
+    def get_change_numbers(self) -> List[int]:
+        """
+        Gets the blocks after the first fetched block at which the round of
+        any source changed.
+
+        Returns:
+            List[int]: The block numbers, in ascending order.
+        """
+        # first row of each source is the latest round at the first block
+        numbers = [arrays["number"][1:] for arrays in self.get_arrays().values()]
+        return [int(n) for n in np.unique(np.concatenate(numbers))]
+
+    def get_changed_numbers(self, start: int, numbers: Sequence[int]) -> List[int]:
+        """
+        Gets the blocks of numbers at which the round of any source changed
+        since the prior block of numbers, or since start for the first, so
+        blocks without new rounds can be skipped.
+
+        Args:
+            start (int): The block number before the first of numbers.
+            numbers (Sequence[int]): The block numbers, in ascending order.
+
+        Returns:
+            List[int]: The block numbers with changed rounds.
+        """
+        changes = np.array(self.get_change_numbers(), dtype=np.int64)
+        numbers = np.asarray(numbers, dtype=np.int64)
+        counts = np.searchsorted(changes, np.concatenate([[start], numbers]), "right")
+        return [int(n) for n in numbers[np.diff(counts) > 0]]
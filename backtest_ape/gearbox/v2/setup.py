@@ -20,3 +20,17 @@ def deploy_mock_feed(
     """
 
     return project.MockAggregatorV3.deploy(description, decimals, version, sender=acc)
+
+
+def deploy_mock_feed_coordinator(acc: AccountAPI) -> ContractInstance:
+    """
+    Deploys mock Chainlink feed coordinator to set rounds on many mock feeds
+    in one call.
+
+    Args:
+        acc (AccountAPI): Account to deploy the mock coordinator.
+
+    Returns:
+        :class:`ape.contracts.ContractInstance`
+    """
+    return project.MockAggregatorV3Coordinator.deploy(sender=acc)
@@ -1,9 +1,15 @@
-from typing import Any, ClassVar, List, Mapping
+from typing import Any, ClassVar, List, Mapping, Optional, Sequence
 
+import click
+import numpy as np
 from ape import chain
 from ape.utils import ZERO_ADDRESS
 
 from backtest_ape.gearbox.v2.base import BaseGearboxV2Runner
+from backtest_ape.gearbox.v2.health import HealthFactorEngine
+from backtest_ape.utils import multicall
+
+LEVERAGE_DECIMALS = 100  # leverage factor of 400 borrows 4x collateral amount
 
 
 class GearboxV2STETHRunner(BaseGearboxV2Runner):
@@ -30,7 +36,7 @@ class GearboxV2STETHRunner(BaseGearboxV2Runner):
         if manager.adapterToContract(adapter.address) == ZERO_ADDRESS:
             raise ValueError("adapter not supported by manager")
 
-    def setup(self, mocking: bool = True):
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
         """
         Sets up Gearbox V2 stETH strategy runner for testing. Deploys mock
         feeds needed for collateral tokens, if mocking. Then deploys the
@@ -38,8 +44,11 @@ class GearboxV2STETHRunner(BaseGearboxV2Runner):
 
         Args:
             mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
         """
-        super().setup(mocking=mocking)
+        super().setup(mocking=mocking, number=number)
 
         # deploy the backtester
         manager_addr = self._refs["manager"].address
@@ -57,7 +66,7 @@ class GearboxV2STETHRunner(BaseGearboxV2Runner):
             number (int): The init block number.
             state (Mapping): The init state of mocks at block number.
         """
-        super().init_mocks_state(state)
+        super().init_mocks_state(number, state)
 
         ecosystem = chain.provider.network.ecosystem
         manager = self._refs["manager"]
@@ -92,3 +101,212 @@ class GearboxV2STETHRunner(BaseGearboxV2Runner):
         self.backtester.multicall(
             targets, datas, values, sender=self.acc, value=self.collateral_amount
         )
+
+    def probe(self, number: int) -> int:
+        """
+        Gets the health factor of the credit account with mocks set to the
+        state of references at a block, restoring the chain and runner after.
+
+        Args:
+            number (int): The block number.
+
+        Returns:
+            int: The health factor, in Gearbox percentage factor terms (1e4).
+        """
+        snapshot_chain_id, snapshot_runner_kwargs = self.snapshot()
+        try:
+            self.set_mocks_state(self.get_refs_state(number))
+            return self.get_values()[0]
+        finally:
+            self.restore(snapshot_chain_id, snapshot_runner_kwargs)
+
+    def get_probe_numbers(self, lo: int, hi: int) -> Sequence[int]:
+        """
+        Gets the blocks strictly between two probed blocks at which the health
+        factor may differ. Only blocks where any feed changed if the round
+        index covers the interval, else every block.
+
+        Args:
+            lo (int): The lower probed block number.
+            hi (int): The upper probed block number.
+
+        Returns:
+            Sequence[int]: The block numbers, in ascending order.
+        """
+        index = self._round_index
+        if index is not None and index.covers(lo) and index.covers(hi):
+            return [n for n in index.get_change_numbers() if lo < n < hi]
+        return range(lo + 1, hi)
+
+    def find_threshold_crossings(
+        self, start: int, stop: int, step: int, threshold: int = 10000
+    ) -> List[int]:
+        """
+        Finds the blocks between start and stop at which the health factor of
+        the credit account first drops below a threshold.
+
+        Probes every step blocks in a coarse pass, then bisects each interval
+        over which the health factor crossed below the threshold, taking
+        O(log step) probes per crossing.
+
+        Args:
+            start (int): The start block number.
+            stop (int): The stop block number, inclusive.
+            step (int): The step interval size of the coarse pass.
+            threshold (int): The health factor threshold, in Gearbox
+                percentage factor terms (1e4).
+
+        Returns:
+            List[int]: The first block number below the threshold for each
+            crossing, in ascending order.
+        """
+        if chain.provider.network.name != "mainnet-fork":
+            raise Exception("network not mainnet-fork.")
+
+        if start >= stop:
+            raise ValueError("start block not before stop block.")
+
+        if step < 1:
+            raise ValueError("step < 1.")
+
+        click.echo("Setting up runner ...")
+        self.setup(mocking=True)
+        self.init_mocks_state(start, self.get_refs_state(start))
+
+        numbers = list(range(start, stop, step)) + [stop]
+        click.echo(f"Probing health factor at {len(numbers)} blocks ...")
+        below = [self.probe(number) < threshold for number in numbers]
+
+        crossings = []
+        for i in range(len(numbers) - 1):
+            if below[i] or not below[i + 1]:
+                continue
+
+            # bisect for the first block below threshold within interval
+            candidates = self.get_probe_numbers(numbers[i], numbers[i + 1])
+            lo, hi = 0, len(candidates)  # candidates[hi] or interval end below
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.probe(candidates[mid]) < threshold:
+                    hi = mid
+                else:
+                    lo = mid + 1
+
+            number = candidates[hi] if hi < len(candidates) else numbers[i + 1]
+            click.echo(f"Health factor crossed below {threshold} at block {number}")
+            crossings.append(number)
+
+        return crossings
+
+    def get_health_factor_engine(
+        self, leverage_factor: Optional[int] = None
+    ) -> HealthFactorEngine:
+        """
+        Gets the engine to compute the health factor of the credit account
+        off-chain from collateral prices. Reads liquidation thresholds and
+        decimals, then balances and debt with interest of the backtester credit
+        account, from the credit manager in aggregated calls once.
+
+        Takes the debt as the borrowed amount with interest excluding fees,
+        as the credit facade divides by in its health factor.
+
+        If leverage factor given, instead sizes the position the strategy
+        would open with that leverage factor, for stress tests without
+        opening accounts. Assumes stETH submitted 1:1 for WETH and no
+        interest accrued yet.
+
+        Args:
+            leverage_factor (Optional[int]): The leverage factor of the
+                position to size. If None, reads the opened credit account.
+
+        Returns:
+            :class:`backtest_ape.gearbox.v2.health.HealthFactorEngine`: The
+            health factor engine, taking feed answers in collateral order.
+        """
+        manager = self._refs["manager"]
+        collaterals = self._refs["collaterals"]
+        results = multicall(
+            [(collateral.decimals,) for collateral in collaterals]
+            + [
+                (manager.liquidationThresholds, collateral.address)
+                for collateral in collaterals
+            ]
+            + [(manager.underlying,)]
+        )
+        n = len(collaterals)
+        decimals, liquidation_thresholds = list(results[:n]), list(results[n:-1])
+        underlying_addr = results[-1]
+
+        addrs = [collateral.address for collateral in collaterals]
+        if underlying_addr not in addrs:
+            raise ValueError("manager underlying not in collaterals.")
+        underlying_index = addrs.index(underlying_addr)
+
+        if leverage_factor is None:
+            credit_account_addr = manager.creditAccounts(self.backtester.address)
+            results = multicall(
+                [
+                    (collateral.balanceOf, credit_account_addr)
+                    for collateral in collaterals
+                ]
+                + [(manager.calcCreditAccountAccruedInterest, credit_account_addr)]
+            )
+            balances = list(results[:-1])
+            debt = results[-1][1]  # borrowed amount with interest, not fees
+        else:
+            debt = self.collateral_amount * leverage_factor // LEVERAGE_DECIMALS
+            balances = [0 for _ in collaterals]
+            steth_index = addrs.index(self.collateral_addrs[1])
+            balances[steth_index] = self.collateral_amount + debt
+
+        return HealthFactorEngine(
+            balances=balances,
+            decimals=decimals,
+            liquidation_thresholds=liquidation_thresholds,
+            debt=debt,
+            underlying_index=underlying_index,
+        )
+
+    def get_health_factors(
+        self,
+        numbers: Sequence[int],
+        engine: HealthFactorEngine,
+        verify_step: int = 0,
+    ) -> np.ndarray:
+        """
+        Gets the health factor of the credit account at each block, computed
+        off-chain by the engine over the feed answers at the blocks.
+
+        Verifies every verify_step blocks against the health factor from the
+        backtester with mocks set to the state of references at the block,
+        which needs the runner set up with mocks state initialized.
+
+        Args:
+            numbers (Sequence[int]): The block numbers.
+            engine (:class:`backtest_ape.gearbox.v2.health.HealthFactorEngine`):
+                The health factor engine.
+            verify_step (int): The step interval size between verified blocks.
+                If 0, does not verify.
+
+        Returns:
+            :class:`numpy.ndarray`: The health factors, in Gearbox percentage
+            factor terms (1e4).
+        """
+        if verify_step < 0:
+            raise ValueError("verify_step < 0.")
+
+        health_factors = engine.compute(self.get_feed_answers(numbers))
+        if verify_step == 0:
+            return health_factors
+
+        click.echo(f"Verifying health factors every {verify_step} blocks ...")
+        for i in range(0, len(numbers), verify_step):
+            # allow for rounding of on-chain integer math
+            value = self.probe(numbers[i])
+            if abs(int(health_factors[i]) - value) > 1:
+                raise ValueError(
+                    f"engine health factor {health_factors[i]} != {value} "
+                    + f"at block {numbers[i]}."
+                )
+
+        return health_factors
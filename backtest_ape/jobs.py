@@ -0,0 +1,264 @@
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, List, Mapping, Optional
+
+import click
+from ape import chain, networks
+from pydantic import BaseModel, validator
+
+JOB_METHODS = ["backtest", "replay"]
+REPLAY_COST_PER_BLOCK = 10  # ref txs submitted per block relative to a mock step
+
+
+class Job(BaseModel):
+    """
+    Spec of a single runner job to run non-interactively.
+    """
+
+    runner: str
+    kwargs: Mapping[str, Any] = {}
+    method: str = "backtest"
+    start: int
+    stop: Optional[int] = None
+    step: int = 1
+    path: Optional[str] = None
+
+    @validator("method")
+    def method_supported(cls, v):
+        if v not in JOB_METHODS:
+            raise ValueError(f"method not in {JOB_METHODS}")
+        return v
+
+    @validator("step")
+    def step_positive(cls, v):
+        if v < 1:
+            raise ValueError("step < 1")
+        return v
+
+    def get_path(self, out_dir: str) -> str:
+        """
+        Gets the path to the csv file the job records to.
+
+        Args:
+            out_dir (str): The directory to record to if no path in spec.
+
+        Returns:
+            str: The path to the csv file.
+        """
+        if self.path is not None:
+            return self.path
+
+        stop = self.stop if self.stop is not None else -1
+        filename = f"{self.runner}_{self.method}_{self.start}_{stop}_{self.step}.csv"
+        return os.path.join(out_dir, filename)
+
+    def get_numbers(self) -> range:
+        """
+        Gets the block numbers the job records at.
+
+        Returns:
+            range: The recorded block numbers.
+        """
+        if self.stop is None:
+            raise Exception("job stop block not resolved.")
+
+        step = self.step if self.method == "backtest" else 1
+        return range(self.start + 1, self.stop, step)
+
+    def get_cost(self) -> int:
+        """
+        Gets the estimated cost of the job for scheduling.
+
+        Replays process every block and submit each of its ref txs, so
+        cost more per recorded block than backtests against mocks.
+
+        Returns:
+            int: The estimated cost.
+        """
+        num_blocks = len(self.get_numbers())
+        if self.method == "replay":
+            return num_blocks * REPLAY_COST_PER_BLOCK
+        return num_blocks
+
+
+def load_jobs(path: str) -> List[Job]:
+    """
+    Loads job specs from a json or yaml file.
+
+    The file holds either a list of job specs or a mapping with the list
+    under "jobs".
+
+    Args:
+        path (str): The path to the json or yaml file.
+
+    Returns:
+        List[:class:`backtest_ape.jobs.Job`]: The jobs.
+    """
+    with open(path, "r") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+        else:
+            import yaml
+
+            data = yaml.safe_load(f)
+
+    if isinstance(data, Mapping):
+        data = data["jobs"]
+    return [Job(**spec) for spec in data]
+
+
+def get_marker_path(path: str) -> str:
+    """
+    Gets the path to the completion marker of the job output at path.
+
+    Args:
+        path (str): The path to the csv file the job records to.
+
+    Returns:
+        str: The path to the marker file.
+    """
+    return f"{path}.done"
+
+
+def mark_complete(job: Job, path: str):
+    """
+    Records the job output at path as complete by writing the resolved job
+    spec to its completion marker.
+
+    Args:
+        job (:class:`backtest_ape.jobs.Job`): The job, with stop resolved.
+        path (str): The path to the csv file the job records to.
+    """
+    with open(get_marker_path(path), "w") as f:
+        json.dump(job.dict(), f)
+
+
+def is_complete(job: Job, path: str) -> bool:
+    """
+    Checks whether the job output at path was recorded by a run of the same
+    job that finished, from the completion marker written after the run.
+
+    NOTE: Does not infer completion from the last recorded row, as the last
+    blocks of a job may not be recorded, e.g. if state at those reverted.
+
+    Args:
+        job (:class:`backtest_ape.jobs.Job`): The job, with stop resolved.
+        path (str): The path to the csv file the job records to.
+
+    Returns:
+        bool: Whether the job output is complete.
+    """
+    marker_path = get_marker_path(path)
+    if not os.path.exists(path) or not os.path.exists(marker_path):
+        return False
+
+    with open(marker_path, "r") as f:
+        return Job(**json.load(f)) == job
+
+
+def run_job(job: Job, network_choice: str, path: str):
+    """
+    Runs a single job on its own local fork.
+
+    Intended as the target of a separate worker process. Connects to a new
+    fork on a random local port, so jobs do not share chain state.
+
+    Args:
+        job (:class:`backtest_ape.jobs.Job`): The job.
+        network_choice (str): The network choice to connect to.
+        path (str): The path to the csv file to write the record to.
+    """
+    import backtest_ape
+
+    runner_cls = getattr(backtest_ape, job.runner)
+    with networks.parse_network_choice(
+        network_choice, provider_settings={"host": "auto"}
+    ):
+        runner = runner_cls(**job.kwargs)
+        if job.method == "replay":
+            runner.replay(path, job.start, job.stop)
+        else:
+            runner.backtest(path, job.start, job.stop, job.step)
+
+    mark_complete(job, path)
+
+
+def run_jobs(
+    jobs: List[Job],
+    network_choice: str,
+    out_dir: str,
+    max_workers: Optional[int] = None,
+):
+    """
+    Runs a queue of jobs concurrently on a worker pool of local forks.
+
+    Jobs are scheduled longest estimated cost first, so long jobs do not
+    start last and leave the rest of the pool idle. Jobs whose outputs
+    already exist and are complete are skipped. Incomplete outputs are
+    removed and the job is run again from its start block.
+
+    Raises once all jobs have run if any failed, so callers and scripts
+    exit with an error.
+
+    Args:
+        jobs (List[:class:`backtest_ape.jobs.Job`]): The jobs.
+        network_choice (str): The network choice to connect workers to.
+        out_dir (str): The directory to record to for jobs without a path.
+        max_workers (Optional[int]): The number of worker processes. If None,
+            the number of CPUs.
+    """
+    import backtest_ape
+
+    head = chain.blocks.head.number
+    queue = []
+    for job in jobs:
+        if job.runner not in backtest_ape.__all__:
+            raise ValueError(f"runner {job.runner} not in {backtest_ape.__all__}.")
+
+        # resolve path before stop so default names match interactive runs
+        path = job.get_path(out_dir)
+        if job.stop is None:
+            job = job.copy(update={"stop": head})
+
+        if is_complete(job, path):
+            click.echo(f"Skipping complete job output {path} ...")
+            continue
+
+        if os.path.exists(path):
+            click.echo(f"Removing incomplete job output {path} ...")
+            os.remove(path)
+
+        if os.path.exists(get_marker_path(path)):
+            os.remove(get_marker_path(path))
+
+        queue.append((job, path))
+
+    if len(queue) == 0:
+        click.echo("No jobs to run.")
+        return
+
+    queue.sort(key=lambda item: item[0].get_cost(), reverse=True)
+    os.makedirs(out_dir, exist_ok=True)
+
+    click.echo(f"Running {len(queue)} jobs ...")
+    failed = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=mp.get_context("spawn")
+    ) as executor:
+        futures = {
+            executor.submit(run_job, job, network_choice, path): path
+            for job, path in queue
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                future.result()
+                click.echo(f"Finished job output {path} ...")
+            except Exception as e:
+                click.secho(f"Failed job output {path}: {e}", bold=True)
+                failed.append(path)
+
+    if len(failed) > 0:
+        raise Exception(f"{len(failed)} jobs failed: {', '.join(failed)}.")
@@ -0,0 +1,129 @@
+import os
+from typing import Any, List, Mapping, Tuple, Type
+
+from ape import networks
+
+
+def get_connection_name() -> str:
+    """
+    Gets the network choice string for the currently connected provider.
+
+    Returns:
+        str: The network choice as ecosystem:network:provider.
+    """
+    ecosystem_name = networks.provider.network.ecosystem.name
+    network_name = networks.provider.network.name
+    provider_name = networks.provider.name
+    return f"{ecosystem_name}:{network_name}:{provider_name}"
+
+
+def get_shards(start: int, stop: int, num_shards: int) -> List[Tuple[int, int]]:
+    """
+    Splits the replay range [start, stop) into contiguous shards.
+
+    Each shard (shard_start, shard_stop) is meant to be passed to
+    BaseRunner::replay, which records blocks in (shard_start, shard_stop).
+    Shards overlap by one block at each checkpoint so every block in
+    (start, stop) is recorded exactly once across all shards.
+
+    Args:
+        start (int): The start block number.
+        stop (int): The stop block number.
+        num_shards (int): The number of shards to split into.
+
+    Returns:
+        List[Tuple[int, int]]: The (start, stop) block numbers of each shard.
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards < 1.")
+    if start > stop:
+        raise ValueError("start block after stop block.")
+
+    # checkpoints at which each shard resets fork and initializes strategy
+    num_shards = min(num_shards, max(stop - start - 1, 1))
+    size = (stop - start) / num_shards
+    checkpoints = [start + int(i * size) for i in range(num_shards)] + [stop]
+
+    shards = []
+    for i in range(num_shards):
+        shard_start = checkpoints[i]
+        shard_stop = checkpoints[i + 1] + 1 if i < num_shards - 1 else stop
+        shards.append((shard_start, shard_stop))
+    return shards
+
+
+def get_shard_path(path: str, index: int) -> str:
+    """
+    Gets the path to the csv file an individual shard records to.
+
+    Args:
+        path (str): The path to the merged csv file.
+        index (int): The index of the shard.
+
+    Returns:
+        str: The path to the shard csv file.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}_shard{index}{ext}"
+
+
+def merge_records(paths: List[str], path: str, remove: bool = True):
+    """
+    Merges shard csv records in order, appending to the csv file at path.
+
+    NOTE: Copies rows as text so uint256 values are not parsed and
+    re-serialized with a loss of precision.
+
+    Args:
+        paths (List[str]): The paths to the shard csv files, in block order.
+        path (str): The path to the csv file to write the merged records to.
+        remove (bool): Whether to remove the shard csv files once merged.
+    """
+    header = not os.path.exists(path)
+    with open(path, "a") as f:
+        for shard_path in paths:
+            if not os.path.exists(shard_path):
+                continue
+
+            with open(shard_path, "r") as shard_f:
+                shard_header = shard_f.readline()
+                if header:
+                    f.write(shard_header)
+                    header = False
+
+                for line in shard_f:
+                    f.write(line)
+
+    if remove:
+        for shard_path in paths:
+            if os.path.exists(shard_path):
+                os.remove(shard_path)
+
+
+def replay_shard(
+    runner_cls: Type,
+    runner_kwargs: Mapping[str, Any],
+    network_choice: str,
+    path: str,
+    start: int,
+    stop: int,
+):
+    """
+    Replays a single shard on its own local fork.
+
+    Intended as the target of a separate worker process. Connects to a new
+    fork on a random local port, so shards do not share chain state.
+
+    Args:
+        runner_cls (Type): The runner class to replay with.
+        runner_kwargs (Mapping): The kwargs to init the runner with.
+        network_choice (str): The network choice to connect to.
+        path (str): The path to the csv file to write the shard record to.
+        start (int): The shard start block number.
+        stop (int): The shard stop block number.
+    """
+    with networks.parse_network_choice(
+        network_choice, provider_settings={"host": "auto"}
+    ):
+        runner = runner_cls(**runner_kwargs)
+        runner.replay(path, start, stop)
@@ -0,0 +1,202 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from ape import Contract, chain, config
+from ape.contracts import ContractInstance
+from ape.exceptions import DecodingError
+from ape.types import ContractType, HexBytes
+from eth_abi.exceptions import DecodingError as ABIDecodingError
+from eth_utils import keccak, to_checksum_address
+
+REGISTRY_VERSION = 1
+BUNDLED_DIR = Path(__file__).parent / "contract_types"
+
+# SEE: https://eips.ethereum.org/EIPS/eip-1967
+EIP1967_IMPLEMENTATION_SLOT = (
+    int.from_bytes(keccak(text="eip1967.proxy.implementation"), "big") - 1
+)
+
+_contract_types: Dict[str, ContractType] = {}
+_address_types: Dict[str, ContractType] = {}  # resolved contract types by address
+
+
+def get_registry_dir() -> Path:
+    """
+    Gets the directory of the local registry of contract types by code hash.
+
+    Set BACKTEST_APE_REGISTRY to override the default under the ape data
+    folder.
+
+    Returns:
+        :class:`pathlib.Path`: The versioned registry directory.
+    """
+    root = os.environ.get("BACKTEST_APE_REGISTRY")
+    path = (
+        Path(root)
+        if root is not None
+        else Path(config.DATA_FOLDER) / "backtest_ape" / "registry"
+    )
+    return path / f"v{REGISTRY_VERSION}"
+
+
+def get_implementation(address: str) -> Optional[str]:
+    """
+    Gets the implementation behind an EIP-1967 proxy.
+
+    Args:
+        address (str): The address of the contract.
+
+    Returns:
+        Optional[str]: The implementation address. None if not a proxy.
+    """
+    slot = chain.provider._make_request(
+        "eth_getStorageAt", [address, hex(EIP1967_IMPLEMENTATION_SLOT), "latest"]
+    )
+    value = int.from_bytes(HexBytes(slot), "big") & (2**160 - 1)
+    if value == 0:
+        return None
+    return to_checksum_address(value.to_bytes(20, "big"))
+
+
+def get_code_hash(address: str) -> str:
+    """
+    Gets the hash of the deployed code at an address.
+
+    Args:
+        address (str): The address of the contract.
+
+    Returns:
+        str: The hex keccak256 hash of the code.
+    """
+    code = chain.provider.get_code(address)
+    return "0x" + keccak(bytes(code)).hex()
+
+
+def load_interface(name: str) -> ContractType:
+    """
+    Loads a bundled interface contract type by name.
+
+    Args:
+        name (str): The interface name, e.g. ERC20.
+
+    Returns:
+        :class:`ape.types.ContractType`: The interface contract type.
+    """
+    key = f"interface:{name}"
+    if key not in _contract_types:
+        path = BUNDLED_DIR / f"{name}.json"
+        if not path.exists():
+            raise ValueError(f"interface {name} not in registry.")
+        _contract_types[key] = ContractType.model_validate_json(path.read_text())
+    return _contract_types[key]
+
+
+def load_contract_type(code_hash: str) -> Optional[ContractType]:
+    """
+    Loads a contract type by code hash, from those bundled with the package
+    first then from the local registry.
+
+    Args:
+        code_hash (str): The hex keccak256 hash of the code.
+
+    Returns:
+        Optional[:class:`ape.types.ContractType`]: The contract type. None
+        if not registered.
+    """
+    if code_hash in _contract_types:
+        return _contract_types[code_hash]
+
+    for registry_dir in [BUNDLED_DIR, get_registry_dir()]:
+        path = registry_dir / f"{code_hash}.json"
+        if path.exists():
+            contract_type = ContractType.model_validate_json(path.read_text())
+            _contract_types[code_hash] = contract_type
+            return contract_type
+    return None
+
+
+def save_contract_type(
+    code_hash: str, contract_type: ContractType, bundled: bool = False
+):
+    """
+    Saves a contract type by code hash to the registry.
+
+    Args:
+        code_hash (str): The hex keccak256 hash of the code.
+        contract_type (:class:`ape.types.ContractType`): The contract type.
+        bundled (bool): Whether to save to the registry bundled with the
+            package instead of the local registry.
+    """
+    registry_dir = BUNDLED_DIR if bundled else get_registry_dir()
+    registry_dir.mkdir(parents=True, exist_ok=True)
+
+    data = json.loads(contract_type.model_dump_json(by_alias=True))
+    with open(registry_dir / f"{code_hash}.json", "w") as f:
+        json.dump({"contractName": data.get("contractName"), "abi": data["abi"]}, f)
+    _contract_types[code_hash] = contract_type
+
+
+def get_contract(address: str, interface: Optional[str] = None) -> ContractInstance:
+    """
+    Gets the ape Contract instance at an address without explorer lookups
+    when the contract type is registered.
+
+    Resolves EIP-1967 proxies to the code hash of their implementation.
+    Falls back to ape Contract on a registry miss and registers the resolved
+    contract type, so later lookups of any contract with the same code skip
+    the explorer. Caches the resolved contract type by address, so later
+    lookups of the same address skip the proxy and code reads too.
+
+    NOTE: Other proxies share code across implementations, so are only
+    cached by address rather than registered by code hash.
+
+    Args:
+        address (str): The address of the contract.
+        interface (Optional[str]): The bundled interface to use instead,
+            e.g. ERC20. Skips code hash resolution entirely.
+
+    Returns:
+        :class:`ape.contracts.ContractInstance`: The contract instance.
+    """
+    address = to_checksum_address(address)
+    if interface is not None:
+        return Contract(address, contract_type=load_interface(interface))
+    elif address in _address_types:
+        return Contract(address, contract_type=_address_types[address])
+
+    implementation = get_implementation(address)
+    code_hash = get_code_hash(implementation or address)
+    contract_type = load_contract_type(code_hash)
+    if contract_type is not None:
+        _address_types[address] = contract_type
+        return Contract(address, contract_type=contract_type)
+
+    contract = Contract(address)
+    is_other_proxy = (
+        implementation is None and chain.contracts.get_proxy_info(address) is not None
+    )
+    if not is_other_proxy:
+        save_contract_type(code_hash, contract.contract_type)
+
+    _address_types[address] = contract.contract_type
+    return contract
+
+
+def get_symbol(token: ContractInstance) -> str:
+    """
+    Gets the symbol of an ERC20 token, falling back to a bytes32 symbol for
+    tokens that predate string symbols, e.g. MKR.
+
+    Args:
+        token (:class:`ape.contracts.ContractInstance`): The token.
+
+    Returns:
+        str: The symbol.
+    """
+    try:
+        return token.symbol()
+    except (DecodingError, ABIDecodingError):
+        symbol = get_contract(token.address, "ERC20Bytes32").symbol()
+        return bytes(symbol).rstrip(b"\x00").decode()
@@ -0,0 +1,317 @@
+import csv
+import json
+import os
+from decimal import Decimal, localcontext
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+RESULTS_VERSION = 1
+NUM_LIMBS = 4  # uint64 limbs to hold a 256 bit word
+LIMB_BITS = 64
+LIMB_MASK = 2**LIMB_BITS - 1
+WORD_MOD = 2 ** (NUM_LIMBS * LIMB_BITS)
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+META_FILENAME = "meta.json"
+
+
+def to_limbs(values: Sequence[int]) -> np.ndarray:
+    """
+    Splits 256 bit integers into little-endian uint64 limbs. Negative
+    values are stored as two's complement.
+
+    Shifts and masks the values as a whole object array per limb.
+
+    Args:
+        values (Sequence[int]): The integer values.
+
+    Returns:
+        :class:`numpy.ndarray`: The uint64 limbs of shape (len(values), 4).
+    """
+    words = np.asarray(values, dtype=object).reshape(-1) % WORD_MOD
+    limbs = [
+        ((words >> (j * LIMB_BITS)) & LIMB_MASK).astype(np.uint64)
+        for j in range(NUM_LIMBS)
+    ]
+    return np.stack(limbs, axis=1)
+
+
+def from_limbs(limbs: np.ndarray, signed: bool = False) -> List[int]:
+    """
+    Joins little-endian uint64 limbs back into exact 256 bit integers.
+
+    Shifts and ors the limbs as whole object arrays of Python integers.
+
+    Args:
+        limbs (:class:`numpy.ndarray`): The uint64 limbs of shape (n, 4).
+        signed (bool): Whether values are two's complement signed.
+
+    Returns:
+        List[int]: The integer values.
+    """
+    limbs = np.asarray(limbs).astype(object)
+    values = np.zeros(len(limbs), dtype=object)
+    for j in range(NUM_LIMBS):
+        values |= limbs[:, j] << (j * LIMB_BITS)
+    if signed:
+        values = np.where(values >= WORD_MOD // 2, values - WORD_MOD, values)
+    return values.tolist()
+
+
+def limbs_to_float(limbs: np.ndarray, signed: bool = False) -> np.ndarray:
+    """
+    Converts little-endian uint64 limbs to float64 without going through
+    Python integers.
+
+    Args:
+        limbs (:class:`numpy.ndarray`): The uint64 limbs of shape (n, 4).
+        signed (bool): Whether values are two's complement signed.
+
+    Returns:
+        :class:`numpy.ndarray`: The float64 values.
+    """
+    weights = np.array(
+        [2.0 ** (j * LIMB_BITS) for j in range(NUM_LIMBS)], dtype=np.float64
+    )
+    values = limbs.astype(np.float64) @ weights
+    if signed:
+        # -x == ~x + 1 in two's complement, avoiding float cancellation
+        negative = limbs[:, NUM_LIMBS - 1] >= np.uint64(2 ** (LIMB_BITS - 1))
+        inverted = np.invert(limbs).astype(np.float64) @ weights + 1.0
+        values = np.where(negative, -inverted, values)
+    return values
+
+
+def read_csv_columns(path: str) -> Dict[str, List[int]]:
+    """
+    Reads a runner csv record into exact integer columns.
+
+    NOTE: Parses columns that fit as int64 arrays in one cast, and the rest
+    as object arrays of exact integers rather than through pandas, which
+    would fall back to float dtypes for uint256 values.
+
+    Args:
+        path (str): The path to the csv file the runner recorded to.
+
+    Returns:
+        Dict[str, List[int]]: The integer values by column name.
+    """
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = np.array(list(reader), dtype=str).reshape(-1, len(header))
+
+    # decimal strings, e.g. from float records, truncated through Decimal
+    parse = np.frompyfunc(
+        lambda v: int(v) if v.lstrip("-").isdigit() else int(Decimal(v)), 1, 1
+    )
+    columns = {}
+    for j, name in enumerate(header):
+        try:
+            values = rows[:, j].astype(np.int64)
+        except (ValueError, OverflowError):
+            values = parse(rows[:, j].astype(object))
+        columns[name] = values.tolist()
+    return columns
+
+
+def save_results(
+    path: str,
+    out_dir: str,
+    decimals: Mapping[str, int],
+    columns: Optional[Mapping[str, Sequence[int]]] = None,
+):
+    """
+    Saves runner record columns as typed, memory-mappable numpy arrays.
+
+    Columns that fit are stored as a scaled int64 array. Larger columns are
+    stored as split little-endian uint64 limbs. Column decimals are kept in
+    a metadata file alongside so loads return ready-to-use values.
+
+    Args:
+        path (str): The path to the csv file the runner recorded to.
+        out_dir (str): The directory to save the typed columns in.
+        decimals (Mapping[str, int]): The decimals of each column. Columns
+            missing from decimals are stored as raw integers.
+        columns (Optional[Mapping[str, Sequence[int]]]): The integer values
+            by column name. If None, reads from the csv file at path.
+    """
+    if columns is None:
+        columns = read_csv_columns(path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    meta = {"version": RESULTS_VERSION, "num_rows": 0, "columns": {}}
+    for i, (name, values) in enumerate(columns.items()):
+        fits = all(INT64_MIN <= v <= INT64_MAX for v in values)
+        arr = np.array(values, dtype=np.int64) if fits else to_limbs(values)
+        filename = f"{i}.npy"
+        np.save(os.path.join(out_dir, filename), arr)
+
+        meta["num_rows"] = len(values)
+        meta["columns"][name] = {
+            "file": filename,
+            "decimals": decimals.get(name, 0),
+            "signed": any(v < 0 for v in values),
+            "limbs": 1 if fits else NUM_LIMBS,
+        }
+
+    with open(os.path.join(out_dir, META_FILENAME), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_meta(out_dir: str) -> Mapping:
+    """
+    Loads the metadata of saved results.
+
+    Args:
+        out_dir (str): The directory the typed columns were saved in.
+
+    Returns:
+        Mapping: The metadata with decimals and storage layout by column.
+    """
+    with open(os.path.join(out_dir, META_FILENAME), "r") as f:
+        meta = json.load(f)
+
+    if meta["version"] != RESULTS_VERSION:
+        raise ValueError(f"results version {meta['version']} not supported.")
+    return meta
+
+
+def load_raw_column(out_dir: str, name: str) -> np.ndarray:
+    """
+    Loads the stored array for a column memory-mapped, without copying.
+
+    Args:
+        out_dir (str): The directory the typed columns were saved in.
+        name (str): The column name.
+
+    Returns:
+        :class:`numpy.ndarray`: The int64 array or the uint64 limbs array.
+    """
+    meta = load_meta(out_dir)
+    col = meta["columns"][name]
+    return np.load(os.path.join(out_dir, col["file"]), mmap_mode="r")
+
+
+def load_int_columns(
+    out_dir: str, columns: Optional[List[str]] = None
+) -> Dict[str, List[int]]:
+    """
+    Loads saved results as exact integers, without decimal adjustment.
+
+    Args:
+        out_dir (str): The directory the typed columns were saved in.
+        columns (Optional[List[str]]): The columns to load. If None, all.
+
+    Returns:
+        Dict[str, List[int]]: The integer values by column name.
+    """
+    meta = load_meta(out_dir)
+    names = columns if columns is not None else list(meta["columns"].keys())
+
+    results = {}
+    for name in names:
+        col = meta["columns"][name]
+        arr = np.load(os.path.join(out_dir, col["file"]), mmap_mode="r")
+        results[name] = (
+            arr.tolist() if col["limbs"] == 1 else from_limbs(arr, col["signed"])
+        )
+    return results
+
+
+def load_results(
+    out_dir: str,
+    columns: Optional[List[str]] = None,
+    exact: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Loads saved results as decimal-adjusted arrays.
+
+    Args:
+        out_dir (str): The directory the typed columns were saved in.
+        columns (Optional[List[str]]): The columns to load. If None, all.
+        exact (bool): Whether to load as exact Decimal object arrays instead
+            of float64 arrays.
+
+    Returns:
+        Dict[str, :class:`numpy.ndarray`]: The values by column name.
+    """
+    meta = load_meta(out_dir)
+    names = columns if columns is not None else list(meta["columns"].keys())
+
+    results = {}
+    for name in names:
+        col = meta["columns"][name]
+        arr = np.load(os.path.join(out_dir, col["file"]), mmap_mode="r")
+        results[name] = to_decimal(arr, col) if exact else to_float(arr, col)
+    return results
+
+
+def iter_results(
+    out_dir: str,
+    columns: Optional[List[str]] = None,
+    chunk_size: int = 1000000,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Iterates over saved results in row chunks as decimal-adjusted float64
+    arrays. Only one chunk of each column is in memory at a time.
+
+    Args:
+        out_dir (str): The directory the typed columns were saved in.
+        columns (Optional[List[str]]): The columns to load. If None, all.
+        chunk_size (int): The number of rows per chunk.
+
+    Yields:
+        Dict[str, :class:`numpy.ndarray`]: The chunk values by column name.
+    """
+    meta = load_meta(out_dir)
+    names = columns if columns is not None else list(meta["columns"].keys())
+    cols = {name: meta["columns"][name] for name in names}
+    arrs = {
+        name: np.load(os.path.join(out_dir, col["file"]), mmap_mode="r")
+        for name, col in cols.items()
+    }
+    for start in range(0, meta["num_rows"], chunk_size):
+        stop = start + chunk_size
+        yield {
+            name: to_float(arr[start:stop], cols[name]) for name, arr in arrs.items()
+        }
+
+
+def to_float(arr: np.ndarray, col: Mapping) -> np.ndarray:
+    """
+    Converts a stored column array to decimal-adjusted float64 values.
+
+    Args:
+        arr (:class:`numpy.ndarray`): The stored int64 or uint64 limbs array.
+        col (Mapping): The column metadata.
+
+    Returns:
+        :class:`numpy.ndarray`: The float64 values.
+    """
+    values = (
+        arr.astype(np.float64)
+        if col["limbs"] == 1
+        else limbs_to_float(arr, col["signed"])
+    )
+    return values / 10.0 ** col["decimals"]
+
+
+def to_decimal(arr: np.ndarray, col: Mapping) -> np.ndarray:
+    """
+    Converts a stored column array to exact decimal-adjusted Decimal values.
+
+    Args:
+        arr (:class:`numpy.ndarray`): The stored int64 or uint64 limbs array.
+        col (Mapping): The column metadata.
+
+    Returns:
+        :class:`numpy.ndarray`: The Decimal object values.
+    """
+    ints = arr.tolist() if col["limbs"] == 1 else from_limbs(arr, col["signed"])
+    with localcontext() as ctx:
+        ctx.prec = 80  # enough digits to scale 256 bit values exactly
+        return np.array(
+            [Decimal(v).scaleb(-col["decimals"]) for v in ints], dtype=object
+        )
@@ -0,0 +1,101 @@
+import os
+from collections import deque
+from typing import Any, Callable, Deque, List, Mapping, Optional
+
+from pydantic import BaseModel
+
+
+class BaseSink(BaseModel):
+    """
+    Consumes record rows as they are produced by a runner.
+    """
+
+    def write(self, row: Mapping[str, int]):
+        """
+        Writes a record row to the sink.
+
+        Args:
+            row (Mapping[str, int]): The record row by column name.
+        """
+        raise NotImplementedError("write not implemented.")
+
+    def close(self):
+        """
+        Closes the sink once the runner stops producing rows.
+        """
+        pass
+
+    class Config:
+        underscore_attrs_are_private = True
+
+
+class CSVSink(BaseSink):
+    """
+    Appends record rows to a csv file, writing the header if the file is new.
+    """
+
+    path: str
+
+    def write(self, row: Mapping[str, int]):
+        """
+        Appends a record row to the csv file.
+
+        Args:
+            row (Mapping[str, int]): The record row by column name.
+        """
+        import pandas as pd
+
+        header = not os.path.exists(self.path)
+        df = pd.DataFrame(data={k: [v] for k, v in row.items()})
+        df.to_csv(self.path, index=False, mode="a", header=header)
+
+
+class RingBufferSink(BaseSink):
+    """
+    Keeps the most recent record rows in memory.
+    """
+
+    maxlen: Optional[int] = None
+
+    _rows: Deque[Mapping[str, int]] = deque()
+
+    def __init__(self, **data: Any):
+        """
+        Overrides BaseModel init to create the buffer with maxlen.
+        """
+        super().__init__(**data)
+        self._rows = deque(maxlen=self.maxlen)
+
+    @property
+    def rows(self) -> List[Mapping[str, int]]:
+        """
+        The buffered record rows, oldest first.
+        """
+        return list(self._rows)
+
+    def write(self, row: Mapping[str, int]):
+        """
+        Appends a record row to the buffer, dropping the oldest if full.
+
+        Args:
+            row (Mapping[str, int]): The record row by column name.
+        """
+        self._rows.append(row)
+
+
+class CallbackSink(BaseSink):
+    """
+    Passes each record row to a callback, e.g. to stop early or hand rows
+    to an online statistic.
+    """
+
+    callback: Callable[[Mapping[str, int]], Any]
+
+    def write(self, row: Mapping[str, int]):
+        """
+        Calls the callback with the record row.
+
+        Args:
+            row (Mapping[str, int]): The record row by column name.
+        """
+        self.callback(row)
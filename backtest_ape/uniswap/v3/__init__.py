@@ -1,8 +1,40 @@
-from backtest_ape.uniswap.v3.base import BaseUniswapV3Runner
-from backtest_ape.uniswap.v3.lp import UniswapV3LPBaseRunner, UniswapV3LPTotalRunner
+from typing import TYPE_CHECKING
+
+from backtest_ape._lazy import lazy_module
+
+if TYPE_CHECKING:
+    from backtest_ape.uniswap.v3.base import BaseUniswapV3Runner
+    from backtest_ape.uniswap.v3.lp import (
+        UniswapV3LPBaseRunner,
+        UniswapV3LPDecomposedRunner,
+        UniswapV3LPFeeRunner,
+        UniswapV3LPLadderRunner,
+        UniswapV3LPPrincipalRunner,
+        UniswapV3LPRebalanceRunner,
+        UniswapV3LPTotalRunner,
+    )
+
+_modules = {
+    "BaseUniswapV3Runner": "backtest_ape.uniswap.v3.base",
+    "UniswapV3LPBaseRunner": "backtest_ape.uniswap.v3.lp.base",
+    "UniswapV3LPDecomposedRunner": "backtest_ape.uniswap.v3.lp.decomposed",
+    "UniswapV3LPFeeRunner": "backtest_ape.uniswap.v3.lp.fee",
+    "UniswapV3LPLadderRunner": "backtest_ape.uniswap.v3.lp.ladder",
+    "UniswapV3LPPrincipalRunner": "backtest_ape.uniswap.v3.lp.principal",
+    "UniswapV3LPRebalanceRunner": "backtest_ape.uniswap.v3.lp.rebalance",
+    "UniswapV3LPTotalRunner": "backtest_ape.uniswap.v3.lp.total",
+}
 
 __all__ = [
     "BaseUniswapV3Runner",
     "UniswapV3LPBaseRunner",
+    "UniswapV3LPDecomposedRunner",
+    "UniswapV3LPFeeRunner",
+    "UniswapV3LPLadderRunner",
+    "UniswapV3LPPrincipalRunner",
+    "UniswapV3LPRebalanceRunner",
     "UniswapV3LPTotalRunner",
 ]
+
+
+__getattr__, __dir__ = lazy_module(_modules, globals())
@@ -1,9 +1,9 @@
-from typing import Any, ClassVar, List
+from typing import Any, ClassVar, List, Mapping, Optional
 
 import click
-from ape import Contract
 
 from backtest_ape.base import BaseRunner
+from backtest_ape.registry import get_contract, get_symbol
 from backtest_ape.setup import deploy_mock_erc20
 from backtest_ape.uniswap.v3.setup import (
     create_mock_pool,
@@ -14,6 +14,8 @@ from backtest_ape.uniswap.v3.setup import (
 
 class BaseUniswapV3Runner(BaseRunner):
     _ref_keys: ClassVar[List[str]] = ["pool", "manager"]
+    _ref_interfaces: ClassVar[Mapping[str, str]] = {"pool": "UniswapV3Pool"}
+    _decimals: List[int] = []
 
     def __init__(self, **data: Any):
         """
@@ -24,9 +26,23 @@ class BaseUniswapV3Runner(BaseRunner):
 
         # store token contracts in _refs
         pool = self._refs["pool"]
-        self._refs["tokens"] = [Contract(pool.token0()), Contract(pool.token1())]
+        self._refs["tokens"] = [
+            get_contract(pool.token0(), "ERC20"),
+            get_contract(pool.token1(), "ERC20"),
+        ]
+
+    def get_decimals(self) -> List[int]:
+        """
+        Gets the decimals of the ref pool tokens, reading once then caching.
+
+        Returns:
+            List[int]: The decimals of token0 and token1.
+        """
+        if len(self._decimals) == 0:
+            self._decimals = [token.decimals() for token in self._refs["tokens"]]
+        return self._decimals
 
-    def setup(self, mocking: bool = True):
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
         """
         Sets up Uniswap V3 runner for testing. If mocking, deploys mock ERC20
         tokens needed for pool, mock Uniswap V3 factory and mock Uniswap V3 position
@@ -34,6 +50,9 @@ class BaseUniswapV3Runner(BaseRunner):
 
         Args:
             mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
         """
         if mocking:
             self.deploy_mocks()
@@ -44,9 +63,10 @@ class BaseUniswapV3Runner(BaseRunner):
         """
         # deploy the mock erc20s
         click.echo("Deploying mock ERC20 tokens ...")
+        decimals = self.get_decimals()
         mock_tokens = [
             deploy_mock_erc20(
-                f"Mock Token{i}", token.symbol(), token.decimals(), self.acc
+                f"Mock Token{i}", get_symbol(token), decimals[i], self.acc
             )
             for i, token in enumerate(self._refs["tokens"])
         ]
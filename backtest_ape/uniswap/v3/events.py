@@ -0,0 +1,464 @@
+from bisect import insort
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import click
+from ape import chain
+from ape.contracts import ContractInstance
+from pydantic import BaseModel
+
+from backtest_ape.registry import get_contract
+from backtest_ape.uniswap.v3.math import (
+    MAX_TICK,
+    MIN_TICK,
+    Q128,
+    UINT256_MOD,
+    compute_swap_step,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    mul_div,
+    next_initialized_tick_within_one_word,
+)
+from backtest_ape.uniswap.v3.ticks import (
+    BATCH_SIZE,
+    Slot0,
+    TickInfo,
+    get_initialized_ticks,
+)
+from backtest_ape.utils import multicall
+
+EVENT_NAMES = ["Swap", "Mint", "Burn", "Flash", "SetFeeProtocol"]
+
+
+def get_pool_logs(pool: ContractInstance, start: int, stop: int) -> List[Tuple]:
+    """
+    Gets the logs of a pool that change its state between blocks in a few
+    bulk log queries.
+
+    Args:
+        pool (:class:`ape.contracts.ContractInstance`): The Uniswap V3 pool.
+        start (int): The first block number.
+        stop (int): The last block number, inclusive.
+
+    Returns:
+        List[Tuple]: The (block number, log index, event name, log) of each
+        Swap, Mint, Burn, Flash and SetFeeProtocol log in chain order.
+    """
+    logs = []
+    for name in EVENT_NAMES:
+        for log in getattr(pool, name).range(start, stop + 1):
+            logs.append((log.block_number, log.log_index, name, log))
+
+    return sorted(
+        (log for log in logs if log[0] <= stop), key=lambda log: (log[0], log[1])
+    )
+
+
+class PoolEventReplayer(BaseModel):
+    """
+    Reconstructs the state of a Uniswap V3 pool at each block by folding
+    its Swap, Mint, Burn, Flash and SetFeeProtocol logs with the pool math,
+    seeded from one full state read.
+
+    Logs are fetched ahead in bulk queries of log_chunk_size blocks. Every
+    check_interval blocks, the reconstructed state is spot checked against
+    the pool and re-seeded on any drift.
+
+    NOTE: Swaps are replayed as exact input with the logged price as limit,
+    so fee growth of exact output swaps can differ by rounding until the
+    next spot check.
+    """
+
+    pool_addr: str
+    check_interval: Optional[int] = 1000  # blocks between spot checks
+    log_chunk_size: int = 10000  # blocks per bulk log query
+
+    _pool: Optional[ContractInstance] = None
+    _number: Optional[int] = None  # block number state folded through
+    _fetched: Optional[int] = None  # last block number logs fetched through
+    _logs: List[Tuple] = []  # fetched logs not yet folded
+    _last_check: Optional[int] = None
+    _reads: int = 0  # upstream read requests
+    _drifts: int = 0  # spot checks that found drift
+
+    _fee: int = 0
+    _tick_spacing: int = 0
+    _fee_protocol: int = 0
+    _sqrt_price_x96: int = 0
+    _tick: int = 0
+    _liquidity: int = 0
+    _fee_growth_globals: List[int] = []
+    _ticks: Dict[int, List[int]] = {}  # gross, net, outside0, outside1 by tick
+    _initialized: List[int] = []  # initialized ticks in ascending order
+
+    class Config:
+        underscore_attrs_are_private = True
+
+    def __init__(self, **data: Any):
+        """
+        Overrides BaseModel init to store the ape Contract instance of the
+        pool.
+        """
+        super().__init__(**data)
+        self._pool = get_contract(self.pool_addr, "UniswapV3Pool")
+
+    @property
+    def number(self) -> Optional[int]:
+        """
+        The block number the state is reconstructed through.
+        """
+        return self._number
+
+    @property
+    def reads(self) -> int:
+        """
+        The number of upstream read requests made.
+        """
+        return self._reads
+
+    @property
+    def drifts(self) -> int:
+        """
+        The number of spot checks that found the state drifted.
+        """
+        return self._drifts
+
+    def seed(self, number: int):
+        """
+        Seeds the state with a full read of the pool at a block.
+
+        Args:
+            number (int): The block number.
+        """
+        click.echo(f"Seeding pool state from block {number} ...")
+        pool = self._pool
+        slot0, liquidity, fg0, fg1, fee, tick_spacing = multicall(
+            [
+                (pool.slot0,),
+                (pool.liquidity,),
+                (pool.feeGrowthGlobal0X128,),
+                (pool.feeGrowthGlobal1X128,),
+                (pool.fee,),
+                (pool.tickSpacing,),
+            ],
+            number,
+        )
+        initialized = get_initialized_ticks(pool, tick_spacing, number)
+        infos = multicall(
+            [(pool.ticks, tick) for tick in initialized],
+            number,
+            batch_size=BATCH_SIZE,
+        )
+        self._reads += 3
+
+        self._fee = fee
+        self._tick_spacing = tick_spacing
+        self._fee_protocol = slot0.feeProtocol
+        self._sqrt_price_x96 = slot0.sqrtPriceX96
+        self._tick = slot0.tick
+        self._liquidity = liquidity
+        self._fee_growth_globals = [fg0, fg1]
+        self._ticks = {
+            tick: [
+                info.liquidityGross,
+                info.liquidityNet,
+                info.feeGrowthOutside0X128,
+                info.feeGrowthOutside1X128,
+            ]
+            for tick, info in zip(initialized, infos)
+        }
+        self._initialized = list(initialized)
+
+        self._number = number
+        self._fetched = number
+        self._logs = []
+        self._last_check = number
+
+    def fetch(self, stop: int):
+        """
+        Fetches the logs of the pool after those already fetched through at
+        least the given block, in bulk queries of log_chunk_size blocks.
+
+        Args:
+            stop (int): The block number to fetch through.
+        """
+        head = chain.blocks.head.number
+        while self._fetched < stop:
+            start = self._fetched + 1
+            end = min(self._fetched + self.log_chunk_size, max(stop, head))
+            self._logs += get_pool_logs(self._pool, start, end)
+            self._reads += len(EVENT_NAMES)
+            self._fetched = end
+
+    def advance(self, number: int):
+        """
+        Folds the logs of the pool through the given block into the state.
+        Seeds if not yet seeded or the block is prior to the current state.
+
+        Args:
+            number (int): The block number.
+        """
+        if self._number is None or number < self._number:
+            self.seed(number)
+            return
+
+        self.fetch(number)
+        i = 0
+        for i, (block_number, _, name, log) in enumerate(self._logs):
+            if block_number > number:
+                break
+            self.apply(name, log)
+        else:
+            i = len(self._logs)
+
+        self._logs = self._logs[i:]
+        self._number = number
+
+    def apply(self, name: str, log: Any):
+        """
+        Folds a log into the state.
+
+        Args:
+            name (str): The event name.
+            log (Any): The log.
+        """
+        if name == "Swap":
+            self.swap(log.amount0, log.amount1, log.sqrtPriceX96, log.tick)
+            self._liquidity = log.liquidity
+        elif name == "Mint":
+            self.modify_position(log.tickLower, log.tickUpper, log.amount)
+        elif name == "Burn":
+            self.modify_position(log.tickLower, log.tickUpper, -log.amount)
+        elif name == "Flash":
+            self.flash(log.paid0, log.paid1)
+        elif name == "SetFeeProtocol":
+            self._fee_protocol = log.feeProtocol0New + (log.feeProtocol1New << 4)
+
+    def cross(self, tick: int, fee_growth_globals: List[int]) -> int:
+        """
+        Crosses an initialized tick, flipping its fee growth outside.
+
+        Args:
+            tick (int): The tick.
+            fee_growth_globals (List[int]): The fee growth globals.
+
+        Returns:
+            int: The liquidity net of the tick.
+        """
+        info = self._ticks[tick]
+        info[2] = (fee_growth_globals[0] - info[2]) % UINT256_MOD
+        info[3] = (fee_growth_globals[1] - info[3]) % UINT256_MOD
+        return info[1]
+
+    def swap(self, amount0: int, amount1: int, sqrt_price_limit_x96: int, tick: int):
+        """
+        Replays a swap step by step through the initialized ticks, accruing
+        fee growth and crossing ticks as the pool does.
+
+        Replays as exact input of the logged input amount with the logged
+        price as limit, moving to the logged price without fees should the
+        input run out by rounding first.
+
+        Args:
+            amount0 (int): The logged delta of token0 of the pool.
+            amount1 (int): The logged delta of token1 of the pool.
+            sqrt_price_limit_x96 (int): The logged sqrt price after the swap.
+            tick (int): The logged tick after the swap.
+        """
+        zero_for_one = amount0 > 0 if amount0 != 0 else amount1 < 0
+        k = 0 if zero_for_one else 1
+        fee_protocol = (
+            self._fee_protocol % 16 if zero_for_one else self._fee_protocol >> 4
+        )
+        fee_growth_globals = list(self._fee_growth_globals)
+        remaining = max(amount0 if zero_for_one else amount1, 0)
+
+        sqrt_price_x96, current, liquidity = (
+            self._sqrt_price_x96,
+            self._tick,
+            self._liquidity,
+        )
+        while sqrt_price_x96 != sqrt_price_limit_x96:
+            tick_next, initialized = next_initialized_tick_within_one_word(
+                self._initialized, current, self._tick_spacing, zero_for_one
+            )
+            tick_next = min(max(tick_next, MIN_TICK), MAX_TICK)
+            sqrt_price_next_x96 = get_sqrt_ratio_at_tick(tick_next)
+            target = (
+                sqrt_price_limit_x96
+                if (
+                    sqrt_price_next_x96 < sqrt_price_limit_x96
+                    if zero_for_one
+                    else sqrt_price_next_x96 > sqrt_price_limit_x96
+                )
+                else sqrt_price_next_x96
+            )
+
+            sqrt_price_start_x96 = sqrt_price_x96
+            fee_amount = 0
+            if remaining > 0:
+                sqrt_price_x96, amount_in, _, fee_amount = compute_swap_step(
+                    sqrt_price_x96, target, liquidity, remaining, self._fee
+                )
+                remaining -= amount_in + fee_amount
+            else:
+                sqrt_price_x96 = target
+
+            if fee_protocol > 0:
+                fee_amount -= fee_amount // fee_protocol
+            if liquidity > 0:
+                fee_growth_globals[k] = (
+                    fee_growth_globals[k] + mul_div(fee_amount, Q128, liquidity)
+                ) % UINT256_MOD
+
+            if sqrt_price_x96 == sqrt_price_next_x96:
+                if initialized:
+                    liquidity_net = self.cross(tick_next, fee_growth_globals)
+                    liquidity += -liquidity_net if zero_for_one else liquidity_net
+                current = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price_x96 != sqrt_price_start_x96:
+                current = get_tick_at_sqrt_ratio(sqrt_price_x96)
+
+        self._fee_growth_globals = fee_growth_globals
+        self._sqrt_price_x96 = sqrt_price_limit_x96
+        self._tick = tick
+
+    def modify_position(self, tick_lower: int, tick_upper: int, delta: int):
+        """
+        Adds or removes liquidity in a tick range, initializing or clearing
+        the boundary ticks as the pool does.
+
+        Args:
+            tick_lower (int): The lower tick of the range.
+            tick_upper (int): The upper tick of the range.
+            delta (int): The liquidity delta.
+        """
+        if delta == 0:
+            return
+
+        for tick, upper in [(tick_lower, False), (tick_upper, True)]:
+            info = self._ticks.get(tick, [0, 0, 0, 0])
+            gross_before = info[0]
+            if gross_before == 0 and tick <= self._tick:
+                # by convention, all growth before initializing happened below
+                info[2], info[3] = self._fee_growth_globals
+
+            info[0] = gross_before + delta
+            info[1] += -delta if upper else delta
+            if info[0] == 0:
+                self._ticks.pop(tick, None)
+                self._initialized.remove(tick)
+            elif gross_before == 0:
+                self._ticks[tick] = info
+                insort(self._initialized, tick)
+
+        if tick_lower <= self._tick < tick_upper:
+            self._liquidity += delta
+
+    def flash(self, paid0: int, paid1: int):
+        """
+        Accrues the fees paid on a flash loan.
+
+        Args:
+            paid0 (int): The logged fees of token0 paid.
+            paid1 (int): The logged fees of token1 paid.
+        """
+        fee_protocols = [self._fee_protocol % 16, self._fee_protocol >> 4]
+        for k, paid in enumerate([paid0, paid1]):
+            if paid == 0:
+                continue
+
+            fees = paid // fee_protocols[k] if fee_protocols[k] != 0 else 0
+            self._fee_growth_globals[k] = (
+                self._fee_growth_globals[k]
+                + mul_div(paid - fees, Q128, self._liquidity)
+            ) % UINT256_MOD
+
+    def get_tick_info(self, tick: int, number: int) -> TickInfo:
+        """
+        Gets the info of a tick as of a block. Zero if the tick is not
+        initialized, as the pool reads.
+
+        Args:
+            tick (int): The tick.
+            number (int): The block number.
+
+        Returns:
+            :class:`backtest_ape.uniswap.v3.ticks.TickInfo`: The liquidity
+            gross and fee growth outside.
+        """
+        self.advance(number)
+        gross, _, outside0, outside1 = self._ticks.get(tick, [0, 0, 0, 0])
+        return TickInfo(gross, outside0, outside1)
+
+    def check(self, number: int, ticks: List[int]) -> bool:
+        """
+        Spot checks the state against the pool at the current block,
+        re-seeding on any drift.
+
+        Args:
+            number (int): The current block number.
+            ticks (List[int]): The ticks to also check.
+
+        Returns:
+            bool: Whether the state matched the pool.
+        """
+        pool = self._pool
+        slot0, liquidity, fg0, fg1, *infos = multicall(
+            [
+                (pool.slot0,),
+                (pool.liquidity,),
+                (pool.feeGrowthGlobal0X128,),
+                (pool.feeGrowthGlobal1X128,),
+            ]
+            + [(pool.ticks, tick) for tick in ticks],
+            number,
+        )
+        self._reads += 1
+        self._last_check = number
+
+        expect = [slot0.sqrtPriceX96, slot0.tick, liquidity, fg0, fg1]
+        actual = [self._sqrt_price_x96, self._tick, self._liquidity]
+        actual += self._fee_growth_globals
+        for tick, info in zip(ticks, infos):
+            expect += [info.feeGrowthOutside0X128, info.feeGrowthOutside1X128]
+            actual += list(self.get_tick_info(tick, number)[1:])
+
+        if actual == expect:
+            return True
+
+        click.secho(f"Pool state drifted at block {number}", bold=True)
+        self._drifts += 1
+        self.seed(number)
+        return False
+
+    def get_refs_state(self, number: int, tick_lower: int, tick_upper: int) -> Mapping:
+        """
+        Gets the state of references for an LP position in a tick range as
+        of a block, as read by
+        :meth:`backtest_ape.uniswap.v3.lp.base.UniswapV3LPBaseRunner.get_refs_state`.
+
+        Spot checks the state first when due.
+
+        Args:
+            number (int): The block number.
+            tick_lower (int): The lower tick of the range.
+            tick_upper (int): The upper tick of the range.
+
+        Returns:
+            Mapping: The state of references at block.
+        """
+        self.advance(number)
+        if (
+            self.check_interval is not None
+            and number - self._last_check >= self.check_interval
+        ):
+            self.check(number, [tick_lower, tick_upper])
+
+        state = {}
+        state["slot0"] = Slot0(self._sqrt_price_x96, self._tick)
+        state["liquidity"] = self._liquidity
+        state["fee_growth_global0_x128"] = self._fee_growth_globals[0]
+        state["fee_growth_global1_x128"] = self._fee_growth_globals[1]
+        state["tick_info_lower"] = self.get_tick_info(tick_lower, number)
+        state["tick_info_upper"] = self.get_tick_info(tick_upper, number)
+        return state
@@ -1,7 +1,35 @@
-from backtest_ape.uniswap.v3.lp.base import UniswapV3LPBaseRunner
-from backtest_ape.uniswap.v3.lp.total import UniswapV3LPTotalRunner
+from typing import TYPE_CHECKING
+
+from backtest_ape._lazy import lazy_module
+
+if TYPE_CHECKING:
+    from backtest_ape.uniswap.v3.lp.base import UniswapV3LPBaseRunner
+    from backtest_ape.uniswap.v3.lp.decomposed import UniswapV3LPDecomposedRunner
+    from backtest_ape.uniswap.v3.lp.fee import UniswapV3LPFeeRunner
+    from backtest_ape.uniswap.v3.lp.ladder import UniswapV3LPLadderRunner
+    from backtest_ape.uniswap.v3.lp.principal import UniswapV3LPPrincipalRunner
+    from backtest_ape.uniswap.v3.lp.rebalance import UniswapV3LPRebalanceRunner
+    from backtest_ape.uniswap.v3.lp.total import UniswapV3LPTotalRunner
+
+_modules = {
+    "UniswapV3LPBaseRunner": "backtest_ape.uniswap.v3.lp.base",
+    "UniswapV3LPDecomposedRunner": "backtest_ape.uniswap.v3.lp.decomposed",
+    "UniswapV3LPFeeRunner": "backtest_ape.uniswap.v3.lp.fee",
+    "UniswapV3LPLadderRunner": "backtest_ape.uniswap.v3.lp.ladder",
+    "UniswapV3LPPrincipalRunner": "backtest_ape.uniswap.v3.lp.principal",
+    "UniswapV3LPRebalanceRunner": "backtest_ape.uniswap.v3.lp.rebalance",
+    "UniswapV3LPTotalRunner": "backtest_ape.uniswap.v3.lp.total",
+}
 
 __all__ = [
     "UniswapV3LPBaseRunner",
+    "UniswapV3LPDecomposedRunner",
+    "UniswapV3LPFeeRunner",
+    "UniswapV3LPLadderRunner",
+    "UniswapV3LPPrincipalRunner",
+    "UniswapV3LPRebalanceRunner",
     "UniswapV3LPTotalRunner",
 ]
+
+
+__getattr__, __dir__ = lazy_module(_modules, globals())
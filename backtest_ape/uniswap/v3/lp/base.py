@@ -1,11 +1,10 @@
-import os
-from typing import ClassVar, List, Mapping, Optional
-
-import pandas as pd
+from typing import ClassVar, List, Mapping, Optional, Tuple, Union
 
 from backtest_ape.uniswap.v3.base import BaseUniswapV3Runner
-from backtest_ape.uniswap.v3.lp.mgmt import mint_lp_position
+from backtest_ape.uniswap.v3.events import PoolEventReplayer
+from backtest_ape.uniswap.v3.lp.mgmt import mint_lp_positions
 from backtest_ape.uniswap.v3.lp.setup import approve_mock_tokens, mint_mock_tokens
+from backtest_ape.uniswap.v3.ticks import TickStore
 from backtest_ape.utils import get_block_identifier
 
 
@@ -15,8 +14,10 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
     amount0: int = 0
     amount1: int = 0
     _backtester_name: ClassVar[str] = "UniswapV3LPBacktest"
+    _tick_store: Optional[TickStore] = None
+    _pool_replayer: Optional[PoolEventReplayer] = None
 
-    def setup(self, mocking: bool = True):
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
         """
         Sets up Uniswap V3 LP runner for testing.
 
@@ -28,8 +29,11 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
 
         Args:
             mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
         """
-        super().setup(mocking=mocking)
+        super().setup(mocking=mocking, number=number)
 
         # deploy the backtester
         manager_addr = (
@@ -38,6 +42,69 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
         self.deploy_strategy(*[manager_addr])
         self._initialized = True
 
+    def set_tick_store(self, store: Optional[TickStore]):
+        """
+        Sets the tick store to read the state of references from at blocks
+        it has fetched, instead of the archive node.
+
+        Args:
+            store (Optional[:class:`backtest_ape.uniswap.v3.ticks.TickStore`]):
+                The tick store of the ref pool. If None, unsets.
+        """
+        pool_addr = self._refs["pool"].address
+        if store is not None and store.pool_addr.lower() != pool_addr.lower():
+            raise ValueError("tick store pool not ref pool.")
+        self._tick_store = store
+
+    def set_pool_replayer(self, replayer: Optional[PoolEventReplayer]):
+        """
+        Sets the pool event replayer to reconstruct the state of references
+        from logs at every block, instead of reading from the archive node.
+
+        Args:
+            replayer (Optional[:class:`PoolEventReplayer`]): The event
+                replayer of the ref pool. If None, unsets.
+        """
+        pool_addr = self._refs["pool"].address
+        if replayer is not None and replayer.pool_addr.lower() != pool_addr.lower():
+            raise ValueError("pool replayer pool not ref pool.")
+        self._pool_replayer = replayer
+
+    def get_state_source(
+        self, number: Optional[int] = None
+    ) -> Optional[Union[PoolEventReplayer, TickStore]]:
+        """
+        Gets the source to read the state of references from at given block
+        instead of the archive node, if any.
+
+        Args:
+            number (int): The block number. If None, then last block from
+                current provider chain.
+
+        Returns:
+            Optional[Union[:class:`PoolEventReplayer`, :class:`TickStore`]]:
+            The pool event replayer if set, else the tick store if fetched the
+            block. None if neither or reading straight from the archive node.
+        """
+        if number is None or not self._use_sources:
+            return None
+        elif self._pool_replayer is not None:
+            return self._pool_replayer
+
+        store = self._tick_store
+        if store is not None and number in store.numbers:
+            return store
+        return None
+
+    def get_ticks(self) -> Tuple[int, int]:
+        """
+        Gets the lower and upper ticks of the current LP position.
+
+        Returns:
+            Tuple[int, int]: The lower and upper ticks.
+        """
+        return (self.tick_lower, self.tick_upper)
+
     def get_refs_state(self, number: Optional[int] = None) -> Mapping:
         """
         Gets the state of references at given block.
@@ -49,6 +116,11 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
         Returns:
             Mapping: The state of references at block.
         """
+        tick_lower, tick_upper = self.get_ticks()
+        source = self.get_state_source(number)
+        if source is not None:
+            return source.get_refs_state(number, tick_lower, tick_upper)
+
         block_identifier = get_block_identifier(number)
         ref_pool = self._refs["pool"]
         state = {}
@@ -62,10 +134,10 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
             block_identifier=block_identifier
         )
         state["tick_info_lower"] = ref_pool.ticks(
-            self.tick_lower, block_identifier=block_identifier
+            tick_lower, block_identifier=block_identifier
         )
         state["tick_info_upper"] = ref_pool.ticks(
-            self.tick_upper, block_identifier=block_identifier
+            tick_upper, block_identifier=block_identifier
         )
         return state
 
@@ -100,19 +172,15 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
             self.acc,
         )
 
-        # then mint the LP position
-        mint_lp_position(
+        # then mint the LP position and store token id in backtester
+        mint_lp_positions(
             mock_manager,
             mock_pool,
             self.backtester,
-            [self.tick_lower, self.tick_upper],
-            [self.amount0, self.amount1],
+            [list(self.get_ticks())],
+            [[self.amount0, self.amount1]],
             self.acc,
         )
-        token_id = self.backtester.count() + 1
-
-        # store token id in backtester
-        self.backtester.push(token_id, sender=self.acc)
 
         # set the mock state
         self.set_mocks_state(state)
@@ -125,6 +193,7 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
             state (Mapping): The new state of mocks.
         """
         mock_pool = self._mocks["pool"]
+        tick_lower, tick_upper = self.get_ticks()
         datas = [
             mock_pool.setSqrtPriceX96.as_transaction(state["slot0"].sqrtPriceX96).data,
             mock_pool.setLiquidity.as_transaction(state["liquidity"]).data,
@@ -132,12 +201,12 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
                 state["fee_growth_global0_x128"], state["fee_growth_global1_x128"]
             ).data,
             mock_pool.setFeeGrowthOutsideX128.as_transaction(
-                self.tick_lower,
+                tick_lower,
                 state["tick_info_lower"].feeGrowthOutside0X128,
                 state["tick_info_lower"].feeGrowthOutside1X128,
             ).data,
             mock_pool.setFeeGrowthOutsideX128.as_transaction(
-                self.tick_upper,
+                tick_upper,
                 state["tick_info_upper"].feeGrowthOutside0X128,
                 state["tick_info_upper"].feeGrowthOutside1X128,
             ).data,
@@ -156,15 +225,48 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
         """
         pass
 
-    def record(self, path: str, number: int, state: Mapping, values: List[int]):
+    def get_record_decimals(self) -> Mapping[str, int]:
         """
-        Records the value and possibly some state at the given block.
+        Gets the decimals of each column recorded to csv by the runner.
+
+        NOTE: Q64.96 and Q128.128 fixed point columns are recorded raw.
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        decimals = self.get_decimals()
+        data = {"number": 0, "values0": decimals[0], "values1": decimals[1]}
+        data.update(
+            {
+                k: 0
+                for k in [
+                    "sqrtPriceX96",
+                    "liquidity",
+                    "feeGrowthGlobal0X128",
+                    "feeGrowthGlobal1X128",
+                    "tickLowerFeeGrowthOutside0X128",
+                    "tickLowerFeeGrowthOutside1X128",
+                    "tickUpperFeeGrowthOutside0X128",
+                    "tickUpperFeeGrowthOutside1X128",
+                ]
+            }
+        )
+        return data
+
+    def get_record(
+        self, number: int, state: Mapping, values: List[int]
+    ) -> Mapping[str, int]:
+        """
+        Gets the record row of the value and possibly some state at the
+        given block.
 
         Args:
-            path (str): The path to the csv file to write the record to.
             number (int): The block number.
             state (Mapping): The state of references at block number.
             values (List[int]): The values of the backtester for the state.
+
+        Returns:
+            Mapping[str, int]: The record row by column name.
         """
         data = {"number": number}
         for i, value in enumerate(values):
@@ -191,6 +293,4 @@ class UniswapV3LPBaseRunner(BaseUniswapV3Runner):
             }
         )
 
-        header = not os.path.exists(path)
-        df = pd.DataFrame(data={k: [v] for k, v in data.items()})
-        df.to_csv(path, index=False, mode="a", header=header)
+        return data
@@ -0,0 +1,105 @@
+from typing import ClassVar, List, Mapping, Optional
+
+from ape import project
+from ape.contracts import ContractInstance
+
+from backtest_ape.uniswap.v3.lp.base import UniswapV3LPBaseRunner
+from backtest_ape.utils import multicall
+
+
+class UniswapV3LPDecomposedRunner(UniswapV3LPBaseRunner):
+    """
+    Backtests an LP position reporting its total, fee and principal values
+    in one pass.
+
+    Deploys the fee and principal backtesters alongside the total backtester,
+    all tracking the same position against the same mocks, and reads the
+    values of all three in one aggregated call per block. Records values0,
+    values1 as total, values2, values3 as fees and values4, values5 as
+    principal (token0, token1) amounts.
+    """
+
+    _backtester_name: ClassVar[str] = "UniswapV3LPTotalBacktest"
+    _component_backtester_names: ClassVar[List[str]] = [
+        "UniswapV3LPFeeBacktest",
+        "UniswapV3LPPrincipalBacktest",
+    ]
+    _component_backtesters: List[ContractInstance] = []
+
+    def setup(self, mocking: bool = True, number: Optional[int] = None):
+        """
+        Sets up Uniswap V3 LP runner for testing.
+
+        Deploys the mocks, if mocking, and the total backtester, then the
+        fee and principal backtesters on the same position manager.
+
+        Args:
+            mocking (bool): Whether to deploy mocks.
+            number (Optional[int]): The block number to deploy mocks
+                with ref params at. If None, then last block from
+                current provider chain.
+        """
+        super().setup(mocking=mocking, number=number)
+
+        manager_addr = self.backtester.manager()
+        self._component_backtesters = [
+            getattr(project, name).deploy(manager_addr, sender=self.acc)
+            for name in self._component_backtester_names
+        ]
+
+    @property
+    def backtesters(self) -> List[ContractInstance]:
+        """
+        The total, fee and principal backtesters, in record order.
+        """
+        return [self.backtester] + self._component_backtesters
+
+    def init_mocks_state(self, number: int, state: Mapping):
+        """
+        Initializes the state of mocks. Mints the LP position to the total
+        backtester then tracks the same position on the fee and principal
+        backtesters.
+
+        Args:
+            number (int): The init block number.
+            state (Mapping): The init state of mocks at block number.
+        """
+        super().init_mocks_state(number, state)
+
+        token_id = self.backtester.tokenIds(self.backtester.count() - 1)
+        for backtester in self._component_backtesters:
+            backtester.push(token_id, sender=self.acc)
+
+    def get_values(self) -> List[int]:
+        """
+        Gets the current total, fee and principal values of the LP position
+        in one aggregated call.
+
+        Returns:
+            List[int]: The (token0, token1) values of the total, fee and
+            principal backtesters, flattened.
+        """
+        results = multicall([(backtester.values,) for backtester in self.backtesters])
+        return [value for values in results for value in values]
+
+    def get_record_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of each column recorded to csv by the runner.
+
+        NOTE: Q64.96 and Q128.128 fixed point columns are recorded raw.
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        decimals = self.get_decimals()
+        count = 2 * (1 + len(self._component_backtester_names))
+        data = {"number": 0}
+        data.update({f"values{i}": decimals[i % 2] for i in range(count)})
+        data.update(
+            {
+                k: v
+                for k, v in super().get_record_decimals().items()
+                if k != "number" and not k.startswith("values")
+            }
+        )
+        return data
@@ -0,0 +1,7 @@
+from typing import ClassVar
+
+from backtest_ape.uniswap.v3.lp.base import UniswapV3LPBaseRunner
+
+
+class UniswapV3LPFeeRunner(UniswapV3LPBaseRunner):
+    _backtester_name: ClassVar[str] = "UniswapV3LPFeeBacktest"
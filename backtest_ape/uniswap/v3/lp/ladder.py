@@ -0,0 +1,223 @@
+from typing import ClassVar, List, Mapping, Optional
+
+from pydantic import validator
+
+from backtest_ape.uniswap.v3.lp.base import UniswapV3LPBaseRunner
+from backtest_ape.uniswap.v3.lp.mgmt import mint_lp_positions
+from backtest_ape.uniswap.v3.lp.setup import approve_mock_tokens, mint_mock_tokens
+from backtest_ape.utils import get_block_identifier, multicall
+
+POSITION_KEYS = ["tick_lower", "tick_upper", "amount0", "amount1"]
+
+
+class UniswapV3LPLadderRunner(UniswapV3LPBaseRunner):
+    """
+    Backtests a ladder of LP positions over several tick ranges in the same
+    pool, reporting the total (token0, token1) values summed over all.
+
+    Records the fee growth outside of each distinct boundary tick in
+    ascending tick order as tick{i}FeeGrowthOutside0X128 and
+    tick{i}FeeGrowthOutside1X128.
+    """
+
+    positions: List[Mapping[str, int]] = []  # tick_lower, tick_upper, amount0, amount1
+    _backtester_name: ClassVar[str] = "UniswapV3LPTotalBacktest"
+
+    @validator("positions")
+    def positions_valid(cls, v):
+        if len(v) == 0:
+            raise ValueError("len(positions) == 0")
+        for position in v:
+            if set(POSITION_KEYS) > set(position.keys()):
+                raise ValueError(f"position keys not {POSITION_KEYS}")
+            elif position["tick_lower"] >= position["tick_upper"]:
+                raise ValueError("position tick_lower >= tick_upper")
+        return v
+
+    def get_ticks(self) -> List[int]:
+        """
+        Gets the distinct boundary ticks of the positions.
+
+        Returns:
+            List[int]: The boundary ticks in ascending order.
+        """
+        return sorted(
+            set(p["tick_lower"] for p in self.positions)
+            | set(p["tick_upper"] for p in self.positions)
+        )
+
+    def get_refs_state(self, number: Optional[int] = None) -> Mapping:
+        """
+        Gets the state of references at given block, reading the pool state
+        and the info of every boundary tick in one aggregated call.
+
+        Args:
+            number (int): The block number. If None, then last block
+                from current provider chain.
+
+        Returns:
+            Mapping: The state of references at block, with tick info by
+            boundary tick under tick_infos.
+        """
+        ticks = self.get_ticks()
+        source = self.get_state_source(number)
+        if source is not None:
+            state = dict(source.get_refs_state(number, ticks[0], ticks[-1]))
+            state.pop("tick_info_lower")
+            state.pop("tick_info_upper")
+            state["tick_infos"] = {t: source.get_tick_info(t, number) for t in ticks}
+            return state
+
+        block_identifier = get_block_identifier(number)
+        ref_pool = self._refs["pool"]
+        results = multicall(
+            [
+                (ref_pool.slot0,),
+                (ref_pool.liquidity,),
+                (ref_pool.feeGrowthGlobal0X128,),
+                (ref_pool.feeGrowthGlobal1X128,),
+            ]
+            + [(ref_pool.ticks, t) for t in ticks],
+            block_identifier,
+        )
+
+        state = {}
+        state["slot0"] = results[0]
+        state["liquidity"] = results[1]
+        state["fee_growth_global0_x128"] = results[2]
+        state["fee_growth_global1_x128"] = results[3]
+        state["tick_infos"] = dict(zip(ticks, results[4:]))
+        return state
+
+    def init_mocks_state(self, number: int, state: Mapping):
+        """
+        Initializes the state of mocks. Mints all the LP positions in one
+        backtester multicall.
+
+        Args:
+            number (int): The init block number.
+            state (Mapping): The init state of mocks at block number.
+        """
+        mock_tokens = self._mocks["tokens"]
+        mock_manager = self._mocks["manager"]
+        mock_pool = self._mocks["pool"]
+
+        # set the tick first for position manager add liquidity to work properly
+        mock_pool.setSqrtPriceX96(state["slot0"].sqrtPriceX96, sender=self.acc)
+
+        # approve manager for infinite spend on mock tokens
+        approve_mock_tokens(
+            mock_tokens,
+            self.backtester,
+            mock_manager,
+            self.acc,
+        )
+
+        # mint the tokens for all positions to backtester
+        mint_mock_tokens(
+            mock_tokens,
+            self.backtester,
+            [
+                sum(p["amount0"] for p in self.positions),
+                sum(p["amount1"] for p in self.positions),
+            ],
+            self.acc,
+        )
+
+        # then mint the LP positions and store token ids in backtester
+        mint_lp_positions(
+            mock_manager,
+            mock_pool,
+            self.backtester,
+            [[p["tick_lower"], p["tick_upper"]] for p in self.positions],
+            [[p["amount0"], p["amount1"]] for p in self.positions],
+            self.acc,
+        )
+
+        # set the mock state
+        self.set_mocks_state(state)
+
+    def set_mocks_state(self, state: Mapping):
+        """
+        Sets the state of mocks, including the fee growth outside of every
+        boundary tick, in one transaction.
+
+        Args:
+            state (Mapping): The new state of mocks.
+        """
+        mock_pool = self._mocks["pool"]
+        datas = [
+            mock_pool.setSqrtPriceX96.as_transaction(state["slot0"].sqrtPriceX96).data,
+            mock_pool.setLiquidity.as_transaction(state["liquidity"]).data,
+            mock_pool.setFeeGrowthGlobalX128.as_transaction(
+                state["fee_growth_global0_x128"], state["fee_growth_global1_x128"]
+            ).data,
+        ]
+        datas += [
+            mock_pool.setFeeGrowthOutsideX128.as_transaction(
+                tick, info.feeGrowthOutside0X128, info.feeGrowthOutside1X128
+            ).data
+            for tick, info in state["tick_infos"].items()
+        ]
+        mock_pool.calls(datas, sender=self.acc)
+
+    def get_record_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of each column recorded to csv by the runner.
+
+        NOTE: Q64.96 and Q128.128 fixed point columns are recorded raw.
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        decimals = self.get_decimals()
+        data = {"number": 0, "values0": decimals[0], "values1": decimals[1]}
+        data.update(
+            {
+                k: 0
+                for k in [
+                    "sqrtPriceX96",
+                    "liquidity",
+                    "feeGrowthGlobal0X128",
+                    "feeGrowthGlobal1X128",
+                ]
+            }
+        )
+        for i, _ in enumerate(self.get_ticks()):
+            data[f"tick{i}FeeGrowthOutside0X128"] = 0
+            data[f"tick{i}FeeGrowthOutside1X128"] = 0
+        return data
+
+    def get_record(
+        self, number: int, state: Mapping, values: List[int]
+    ) -> Mapping[str, int]:
+        """
+        Gets the record row of the value and possibly some state at the
+        given block.
+
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+            values (List[int]): The values of the backtester for the state.
+
+        Returns:
+            Mapping[str, int]: The record row by column name.
+        """
+        data = {"number": number}
+        for i, value in enumerate(values):
+            data[f"values{i}"] = value
+
+        data.update(
+            {
+                "sqrtPriceX96": state["slot0"].sqrtPriceX96,
+                "liquidity": state["liquidity"],
+                "feeGrowthGlobal0X128": state["fee_growth_global0_x128"],
+                "feeGrowthGlobal1X128": state["fee_growth_global1_x128"],
+            }
+        )
+        for i, tick in enumerate(self.get_ticks()):
+            info = state["tick_infos"][tick]
+            data[f"tick{i}FeeGrowthOutside0X128"] = info.feeGrowthOutside0X128
+            data[f"tick{i}FeeGrowthOutside1X128"] = info.feeGrowthOutside1X128
+
+        return data
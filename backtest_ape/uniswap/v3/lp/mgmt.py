@@ -21,28 +21,100 @@ def mint_lp_position(
     elif len(amounts) != 2:
         raise ValueError("len(amounts) != 2 for minting lp")
 
-    ecosystem = chain.provider.network.ecosystem
     target = manager.address
-    params = (
-        pool.token0(),
-        pool.token1(),
-        pool.fee(),
-        ticks[0],  # tick_lower
-        ticks[1],  # tick_upper
-        amounts[0],  # amount0
-        amounts[1],  # amount1
-        0,
-        0,
-        backtester.address,
-        chain.blocks.head.timestamp + 86400,
-    )
-    data = ecosystem.encode_transaction(
-        manager.address, manager.mint.abis[0], params
-    ).data
+    data = get_mint_data(manager, pool, backtester, [ticks], [amounts])[0]
     value = 0
     backtester.execute(target, data, value, sender=acc)
 
 
+def mint_lp_positions(
+    manager: ContractInstance,
+    pool: ContractInstance,
+    backtester: ContractInstance,
+    ticks: List[List[int]],
+    amounts: List[List[int]],
+    acc: AccountAPI,
+) -> List[int]:
+    """
+    Mints new LP positions to backtester in one backtester multicall, then
+    pushes their token ids to backtester in another.
+
+    Reads the token ids back from the IncreaseLiquidity logs of the manager
+    in the mint receipt, rather than assuming the order ids are minted in.
+
+    Returns:
+        List[int]: The token ids of the minted positions.
+    """
+    if len(ticks) != len(amounts):
+        raise ValueError("len(ticks) != len(amounts) for minting lps")
+
+    ecosystem = chain.provider.network.ecosystem
+    datas = get_mint_data(manager, pool, backtester, ticks, amounts)
+    targets = [manager.address for _ in datas]
+    values = [0 for _ in targets]
+    receipt = backtester.multicall(targets, datas, values, sender=acc)
+
+    token_ids = [
+        log.tokenId
+        for log in manager.IncreaseLiquidity.from_receipt(receipt)
+        if log.contract_address == manager.address
+    ]
+    if len(token_ids) != len(ticks):
+        raise Exception("minted token ids not in receipt logs.")
+
+    targets = [backtester.address for _ in token_ids]
+    datas = [
+        ecosystem.encode_transaction(
+            backtester.address, backtester.push.abis[0], token_id
+        ).data
+        for token_id in token_ids
+    ]
+    values = [0 for _ in targets]
+    backtester.multicall(targets, datas, values, sender=acc)
+    return token_ids
+
+
+def get_mint_data(
+    manager: ContractInstance,
+    pool: ContractInstance,
+    backtester: ContractInstance,
+    ticks: List[List[int]],
+    amounts: List[List[int]],
+) -> List[bytes]:
+    """
+    Gets the calldata to mint each LP position to backtester.
+    """
+    if any(len(t) != 2 for t in ticks):
+        raise ValueError("len(ticks) != 2 for minting lp")
+    elif any(len(a) != 2 for a in amounts):
+        raise ValueError("len(amounts) != 2 for minting lp")
+
+    ecosystem = chain.provider.network.ecosystem
+    token0, token1, fee = pool.token0(), pool.token1(), pool.fee()
+    deadline = chain.blocks.head.timestamp + 86400
+    datas = []
+    for t, a in zip(ticks, amounts):
+        params = (
+            token0,
+            token1,
+            fee,
+            t[0],  # tick_lower
+            t[1],  # tick_upper
+            a[0],  # amount0
+            a[1],  # amount1
+            0,
+            0,
+            backtester.address,
+            deadline,
+        )
+        datas.append(
+            ecosystem.encode_transaction(
+                manager.address, manager.mint.abis[0], params
+            ).data
+        )
+    return datas
+
+
 def collect_fees_from_lp_position(
     manager: ContractInstance,
     backtester: ContractInstance,
@@ -80,3 +152,28 @@ def remove_liquidity_from_lp_position(
     ).data
     value = 0
     backtester.execute(target, data, value, sender=acc)
+
+
+def burn_lp_position(
+    manager: ContractInstance,
+    backtester: ContractInstance,
+    token_id: int,
+    acc: AccountAPI,
+):
+    """
+    Burns the emptied last LP position owned by backtester and pops its token
+    id from backtester in one backtester multicall, so it is no longer valued.
+    """
+    if backtester.tokenIds(backtester.count() - 1) != token_id:
+        raise ValueError("token id not last pushed to backtester")
+
+    ecosystem = chain.provider.network.ecosystem
+    targets = [manager.address, backtester.address]
+    datas = [
+        ecosystem.encode_transaction(
+            manager.address, manager.burn.abis[0], token_id
+        ).data,
+        ecosystem.encode_transaction(backtester.address, backtester.pop.abis[0]).data,
+    ]
+    values = [0 for _ in targets]
+    backtester.multicall(targets, datas, values, sender=acc)
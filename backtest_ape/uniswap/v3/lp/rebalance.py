@@ -0,0 +1,449 @@
+from typing import ClassVar, Dict, List, Mapping, Optional, Tuple
+
+import click
+from ape.types import SnapshotID
+
+from backtest_ape.uniswap.v3.lp.base import UniswapV3LPBaseRunner
+from backtest_ape.uniswap.v3.lp.mgmt import (
+    burn_lp_position,
+    collect_fees_from_lp_position,
+    mint_lp_positions,
+    remove_liquidity_from_lp_position,
+)
+from backtest_ape.uniswap.v3.lp.setup import set_mock_token_balances
+from backtest_ape.uniswap.v3.ticks import UINT256_MOD, TickInfo
+from backtest_ape.utils import get_block_identifier, multicall
+
+
+class UniswapV3LPRebalanceRunner(UniswapV3LPBaseRunner):
+    """
+    Backtests an LP position re-centered around the current tick when price
+    leaves the range or drifts from the range center by more than
+    drift_ticks, keeping the initial range width.
+
+    The trigger is evaluated off-chain from the fetched slot0 so that
+    rebalance transactions are only sent on trigger blocks. On rebalance,
+    removes liquidity and collects fees then burns the old position, so the
+    backtester only values the current one. Then swaps at the current price,
+    without fees or slippage, to the amounts for the new range before
+    minting it.
+
+    The range of the current position is kept apart from the configured
+    tick_lower and tick_upper, which stay the range of the initial position.
+
+    Fee growth outside of the boundary ticks is set on the mock pool shifted
+    by an offset fixed at mint, so the mock pool fee growth inside changes
+    as the ref pool does from the mint block on.
+
+    NOTE: Boundary ticks uninitialized in the ref pool read zero fee growth
+    outside, so fees are only tracked exactly across crossings of those ticks
+    when reading from a :class:`backtest_ape.uniswap.v3.ticks.TickStore`.
+    """
+
+    drift_ticks: Optional[int] = None  # max ticks from center before re-centering
+    _backtester_name: ClassVar[str] = "UniswapV3LPTotalBacktest"
+    _tick_spacing: Optional[int] = None
+    _tick_infos: Dict[int, TickInfo] = {}  # cached tick info at last read block
+    _tick_infos_number: Optional[int] = None
+    _tick_offsets: Dict[int, Tuple[int, int]] = {}  # fee growth below offsets
+    _ticks: Optional[Tuple[int, int]] = None  # range of the current position
+
+    def get_tick_spacing(self) -> int:
+        """
+        Gets the tick spacing of the ref pool, reading once then caching.
+
+        Returns:
+            int: The tick spacing.
+        """
+        if self._tick_spacing is None:
+            self._tick_spacing = self._refs["pool"].tickSpacing()
+        return self._tick_spacing
+
+    def get_ticks(self) -> Tuple[int, int]:
+        """
+        Gets the lower and upper ticks of the current LP position, which is
+        the initial range until the first rebalance.
+
+        Returns:
+            Tuple[int, int]: The lower and upper ticks.
+        """
+        if self._ticks is None:
+            return (self.tick_lower, self.tick_upper)
+        return self._ticks
+
+    def get_tick_infos(
+        self, ticks: List[int], number: Optional[int] = None
+    ) -> List[TickInfo]:
+        """
+        Gets the info of ticks as of a block, reading only those not already
+        cached for the block in one aggregated call.
+
+        Args:
+            ticks (List[int]): The ticks.
+            number (int): The block number. If None, then last block
+                from current provider chain.
+
+        Returns:
+            List[:class:`backtest_ape.uniswap.v3.ticks.TickInfo`]: The info
+            of each tick.
+        """
+        if number is None or number != self._tick_infos_number:
+            self._tick_infos = {}
+            self._tick_infos_number = number
+
+        missing = [tick for tick in ticks if tick not in self._tick_infos]
+        source = self.get_state_source(number)
+        if len(missing) == 0:
+            pass
+        elif source is not None:
+            infos = [source.get_tick_info(tick, number) for tick in missing]
+            self._tick_infos.update(zip(missing, infos))
+        else:
+            ref_pool = self._refs["pool"]
+            infos = multicall(
+                [(ref_pool.ticks, tick) for tick in missing],
+                get_block_identifier(number),
+            )
+            self._tick_infos.update(zip(missing, infos))
+
+        return [self._tick_infos[tick] for tick in ticks]
+
+    def get_refs_state(self, number: Optional[int] = None) -> Mapping:
+        """
+        Gets the state of references at given block, reading the pool state
+        in one aggregated call and the boundary ticks through the cached
+        tick info reader.
+
+        Args:
+            number (int): The block number. If None, then last block
+                from current provider chain.
+
+        Returns:
+            Mapping: The state of references at block.
+        """
+        if self.get_state_source(number) is not None:
+            return super().get_refs_state(number)
+
+        ref_pool = self._refs["pool"]
+        slot0, liquidity, fee_growth_global0, fee_growth_global1 = multicall(
+            [
+                (ref_pool.slot0,),
+                (ref_pool.liquidity,),
+                (ref_pool.feeGrowthGlobal0X128,),
+                (ref_pool.feeGrowthGlobal1X128,),
+            ],
+            get_block_identifier(number),
+        )
+        tick_info_lower, tick_info_upper = self.get_tick_infos(
+            list(self.get_ticks()), number
+        )
+
+        state = {}
+        state["slot0"] = slot0
+        state["liquidity"] = liquidity
+        state["fee_growth_global0_x128"] = fee_growth_global0
+        state["fee_growth_global1_x128"] = fee_growth_global1
+        state["tick_info_lower"] = tick_info_lower
+        state["tick_info_upper"] = tick_info_upper
+        return state
+
+    def get_fee_growth_below(
+        self, tick: int, info: TickInfo, state: Mapping
+    ) -> Tuple[int, int]:
+        """
+        Gets the fee growth below a tick from its fee growth outside.
+
+        Args:
+            tick (int): The tick.
+            info (:class:`backtest_ape.uniswap.v3.ticks.TickInfo`): The info
+                of the tick.
+            state (Mapping): The state of references.
+
+        Returns:
+            Tuple[int, int]: The fee growth below of token0 and token1.
+        """
+        current = state["slot0"].tick
+        outsides = (info.feeGrowthOutside0X128, info.feeGrowthOutside1X128)
+        below = []
+        for k, outside in enumerate(outsides):
+            fee_growth_global = state[f"fee_growth_global{k}_x128"]
+            below.append(
+                outside
+                if current >= tick
+                else (fee_growth_global - outside) % UINT256_MOD
+            )
+        return tuple(below)
+
+    def set_tick_offsets(
+        self, ticks: List[int], infos: List[TickInfo], state: Mapping, mocked: Mapping
+    ):
+        """
+        Sets the offsets between the mock and ref pool fee growth below ticks
+        for positions minted when the mock fee growth globals are mocked.
+
+        A tick initialized on mint has mock fee growth below equal to the mock
+        fee growth global.
+
+        Args:
+            ticks (List[int]): The boundary ticks.
+            infos (List[:class:`backtest_ape.uniswap.v3.ticks.TickInfo`]): The
+                ref info of each tick.
+            state (Mapping): The state of references.
+            mocked (Mapping): The fee growth globals of the mock pool on mint.
+        """
+        offsets = {}
+        for tick, info in zip(ticks, infos):
+            below = self.get_fee_growth_below(tick, info, state)
+            offsets[tick] = tuple(
+                (mocked[f"fee_growth_global{k}_x128"] - below[k]) % UINT256_MOD
+                for k in range(2)
+            )
+        self._tick_offsets = offsets
+
+    def get_mock_tick_info(self, tick: int, info: TickInfo, state: Mapping) -> TickInfo:
+        """
+        Gets the info of a boundary tick to set on the mock pool, shifting
+        the ref fee growth below by the tick offset.
+
+        Args:
+            tick (int): The tick.
+            info (:class:`backtest_ape.uniswap.v3.ticks.TickInfo`): The ref
+                info of the tick.
+            state (Mapping): The state of references.
+
+        Returns:
+            :class:`backtest_ape.uniswap.v3.ticks.TickInfo`: The mock info.
+        """
+        current = state["slot0"].tick
+        below = self.get_fee_growth_below(tick, info, state)
+        offsets = self._tick_offsets.get(tick, (0, 0))
+
+        outsides = []
+        for k in range(2):
+            fee_growth_global = state[f"fee_growth_global{k}_x128"]
+            b = (below[k] + offsets[k]) % UINT256_MOD
+            outsides.append(
+                b if current >= tick else (fee_growth_global - b) % UINT256_MOD
+            )
+        return TickInfo(info.liquidityGross, outsides[0], outsides[1])
+
+    def init_mocks_state(self, number: int, state: Mapping):
+        """
+        Initializes the state of mocks.
+
+        Args:
+            number (int): The init block number.
+            state (Mapping): The init state of mocks at block number.
+        """
+        # mock pool fee growth globals are zero on mint of the initial position
+        self._ticks = (self.tick_lower, self.tick_upper)
+        self.set_tick_offsets(
+            list(self._ticks),
+            [state["tick_info_lower"], state["tick_info_upper"]],
+            state,
+            {"fee_growth_global0_x128": 0, "fee_growth_global1_x128": 0},
+        )
+        super().init_mocks_state(number, state)
+
+    def set_mocks_state(self, state: Mapping):
+        """
+        Sets the state of mocks.
+
+        Args:
+            state (Mapping): The new state of mocks.
+        """
+        mock_state = dict(state)
+        for k, tick in zip(["tick_info_lower", "tick_info_upper"], self.get_ticks()):
+            mock_state[k] = self.get_mock_tick_info(tick, state[k], state)
+        super().set_mocks_state(mock_state)
+
+    def should_rebalance(self, tick: int) -> bool:
+        """
+        Checks whether to re-center the range given the current tick.
+
+        Args:
+            tick (int): The current tick.
+
+        Returns:
+            bool: Whether to rebalance.
+        """
+        tick_lower, tick_upper = self.get_ticks()
+        if tick < tick_lower or tick >= tick_upper:
+            return True
+
+        center = (tick_lower + tick_upper) // 2
+        return self.drift_ticks is not None and abs(tick - center) > self.drift_ticks
+
+    def get_range(self, tick: int) -> Tuple[int, int]:
+        """
+        Gets the range of the same width centered around the current tick,
+        aligned to the tick spacing.
+
+        Args:
+            tick (int): The current tick.
+
+        Returns:
+            Tuple[int, int]: The lower and upper ticks of the range.
+        """
+        spacing = self.get_tick_spacing()
+        width = self.tick_upper - self.tick_lower
+        tick_lower = ((tick - width // 2) // spacing) * spacing
+        return (tick_lower, tick_lower + width)
+
+    def get_amounts(
+        self, sqrt_price_x96: int, ticks: Tuple[int, int], balances: List[int]
+    ) -> List[int]:
+        """
+        Gets the amounts of token0 and token1 of equal value to balances at
+        the current price in the ratio needed to mint the range.
+
+        Args:
+            sqrt_price_x96 (int): The current sqrt price.
+            ticks (Tuple[int, int]): The lower and upper ticks of the range.
+            balances (List[int]): The balances of token0 and token1.
+
+        Returns:
+            List[int]: The amounts of token0 and token1.
+        """
+        sp = sqrt_price_x96 / 2**96
+        sa, sb = (1.0001 ** (tick / 2) for tick in ticks)
+        sp = min(max(sp, sa), sb)
+
+        # amounts per unit liquidity
+        a0 = (sb - sp) / (sp * sb)
+        a1 = sp - sa
+
+        price = sp**2  # token1 per token0
+        liquidity = (balances[0] * price + balances[1]) / (a0 * price + a1)
+        return [int(liquidity * a0), int(liquidity * a1)]
+
+    def update_strategy(self, number: int, state: Mapping):
+        """
+        Updates the strategy being backtested through backtester contract.
+
+        Re-centers the LP position if triggered by the current tick.
+
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+        """
+        tick = state["slot0"].tick
+        if not self.should_rebalance(tick):
+            return
+
+        click.echo(f"Rebalancing LP position around tick {tick} ...")
+        mock_tokens = self._mocks["tokens"]
+        mock_manager = self._mocks["manager"]
+        mock_pool = self._mocks["pool"]
+
+        # top up mock pool to cover principal and fees owed at current price
+        owed, *pool_balances = multicall(
+            [(self.backtester.values,)]
+            + [(token.balanceOf, mock_pool.address) for token in mock_tokens]
+        )
+        set_mock_token_balances(
+            mock_tokens,
+            self.backtester,
+            mock_pool.address,
+            pool_balances,
+            [max(b, o + 1) for b, o in zip(pool_balances, owed)],  # 1 wei rounding
+            self.acc,
+        )
+
+        # remove all liquidity from current position and collect with fees,
+        # then burn it so the per block valuation covers one position only
+        token_id = self.backtester.tokenIds(self.backtester.count() - 1)
+        liquidity = mock_manager.positions(token_id).liquidity
+        remove_liquidity_from_lp_position(
+            mock_manager, self.backtester, token_id, liquidity, self.acc
+        )
+        collect_fees_from_lp_position(mock_manager, self.backtester, token_id, self.acc)
+        burn_lp_position(mock_manager, self.backtester, token_id, self.acc)
+
+        # swap to the amounts for the new range at current price
+        ticks = self.get_range(tick)
+        balances = multicall(
+            [(token.balanceOf, self.backtester.address) for token in mock_tokens]
+        )
+        amounts = self.get_amounts(state["slot0"].sqrtPriceX96, ticks, balances)
+        set_mock_token_balances(
+            mock_tokens,
+            self.backtester,
+            self.backtester.address,
+            balances,
+            amounts,
+            self.acc,
+        )
+
+        # fetch new boundaries on demand to offset against mock on mint
+        infos = self.get_tick_infos(list(ticks), number)
+        self.set_tick_offsets(list(ticks), infos, state, state)
+
+        # mint the new position and store token id in backtester
+        mint_lp_positions(
+            mock_manager,
+            mock_pool,
+            self.backtester,
+            [list(ticks)],
+            [amounts],
+            self.acc,
+        )
+        self._ticks = ticks
+
+    def get_values(self) -> List[int]:
+        """
+        Gets the current values of the LP positions from the backtester plus
+        any tokens held idle by the backtester, in one aggregated call.
+
+        Returns:
+            List[int]: The (token0, token1) values of the backtester.
+        """
+        tokens = self._mocks.get("tokens", self._refs["tokens"])
+        values, balance0, balance1 = multicall(
+            [(self.backtester.values,)]
+            + [(token.balanceOf, self.backtester.address) for token in tokens]
+        )
+        return [values[0] + balance0, values[1] + balance1]
+
+    def snapshot(self) -> (SnapshotID, Mapping):
+        """
+        Snapshot current state of chain and runner, including the range and
+        tick offsets of the current position.
+        """
+        snapshot_chain_id, snapshot_runner_kwargs = super().snapshot()
+        snapshot_runner_kwargs["_ticks"] = self._ticks
+        snapshot_runner_kwargs["_tick_offsets"] = dict(self._tick_offsets)
+        return (snapshot_chain_id, snapshot_runner_kwargs)
+
+    def get_record_decimals(self) -> Mapping[str, int]:
+        """
+        Gets the decimals of each column recorded to csv by the runner.
+
+        NOTE: Q64.96 and Q128.128 fixed point columns are recorded raw.
+
+        Returns:
+            Mapping[str, int]: The decimals by record column name.
+        """
+        data = dict(super().get_record_decimals())
+        data.update({"tickLower": 0, "tickUpper": 0})
+        return data
+
+    def get_record(
+        self, number: int, state: Mapping, values: List[int]
+    ) -> Mapping[str, int]:
+        """
+        Gets the record row of the value and possibly some state at the
+        given block, including the range of the current position.
+
+        Args:
+            number (int): The block number.
+            state (Mapping): The state of references at block number.
+            values (List[int]): The values of the backtester for the state.
+
+        Returns:
+            Mapping[str, int]: The record row by column name.
+        """
+        data = dict(super().get_record(number, state, values))
+        tick_lower, tick_upper = self.get_ticks()
+        data.update({"tickLower": tick_lower, "tickUpper": tick_upper})
+        return data
@@ -74,3 +74,43 @@ def mint_mock_tokens(
     ]
     values = [0, 0]
     backtester.multicall(targets, datas, values, sender=acc)
+
+
+def set_mock_token_balances(
+    tokens: List[ContractInstance],
+    backtester: ContractInstance,
+    holder: str,
+    balances: List[int],
+    targets: List[int],
+    acc: AccountAPI,
+):
+    """
+    Mints or burns holder's mock tokens from current balances to target
+    balances via backtester multicall. Swaps between tokens at no cost when
+    targets are of equal value to balances.
+    """
+    if len(tokens) != 2:
+        raise ValueError("len(tokens) != 2 for setting balances")
+
+    ecosystem = chain.provider.network.ecosystem
+    targets_, datas = [], []
+    for token, balance, target in zip(tokens, balances, targets):
+        if target == balance:
+            continue
+
+        fn = token.mint if target > balance else token.burn
+        targets_.append(token.address)
+        datas.append(
+            ecosystem.encode_transaction(
+                token.address,
+                fn.abis[0],
+                holder,
+                abs(target - balance),
+            ).data
+        )
+
+    if len(datas) == 0:
+        return
+
+    values = [0 for _ in datas]
+    backtester.multicall(targets_, datas, values, sender=acc)
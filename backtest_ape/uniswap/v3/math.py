@@ -0,0 +1,346 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+Q96 = 2**96
+Q128 = 2**128
+UINT256_MOD = 2**256
+FEE_PIPS = 1000000
+
+# SEE: https://github.com/Uniswap/v3-core/blob/main/contracts/libraries/TickMath.sol
+_TICK_RATIOS = [
+    (0x2, 0xFFF97272373D413259A46990580E213A),
+    (0x4, 0xFFF2E50F5F656932EF12357CF3C7FDCC),
+    (0x8, 0xFFE5CACA7E10E4E61C3624EAA0941CD0),
+    (0x10, 0xFFCB9843D60F6159C9DB58835C926644),
+    (0x20, 0xFF973B41FA98C081472E6896DFB254C0),
+    (0x40, 0xFF2EA16466C96A3843EC78B326B52861),
+    (0x80, 0xFE5DEE046A99A2A811C461F1969C3053),
+    (0x100, 0xFCBE86C7900A88AEDCFFC83B479AA3A4),
+    (0x200, 0xF987A7253AC413176F2B074CF7815E54),
+    (0x400, 0xF3392B0822B70005940C7A398E4B70F3),
+    (0x800, 0xE7159475A2C29B7443B29C7FA6E889D9),
+    (0x1000, 0xD097F3BDFD2022B8845AD8F792AA5825),
+    (0x2000, 0xA9F746462D870FDF8A65DC1F90E061E5),
+    (0x4000, 0x70D869A156D2A1B890BB3DF62BAF32F7),
+    (0x8000, 0x31BE135F97D08FD981231505542FCFA6),
+    (0x10000, 0x9AA508B5B7A84E1C677DE54F3E99BC9),
+    (0x20000, 0x5D6AF8DEDB81196699C329225EE604),
+    (0x40000, 0x2216E584F5FA1EA926041BEDFE98),
+    (0x80000, 0x48A170391F7DC42444E8FA2),
+]
+
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    """
+    Multiplies then divides rounding down, without intermediate overflow.
+    """
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    """
+    Multiplies then divides rounding up, without intermediate overflow.
+    """
+    return -(-a * b // denominator)
+
+
+def div_rounding_up(a: int, b: int) -> int:
+    """
+    Divides rounding up.
+    """
+    return -(-a // b)
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """
+    Gets the Q64.96 sqrt price ratio at a tick, exactly as the pool does.
+
+    Args:
+        tick (int): The tick.
+
+    Returns:
+        int: The sqrt price ratio.
+    """
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError("tick out of range.")
+
+    ratio = (
+        0xFFFCB933BD6FAD37AA2D162D1A594001
+        if abs_tick & 0x1 != 0
+        else 0x100000000000000000000000000000000
+    )
+    for bit, multiplier in _TICK_RATIOS:
+        if abs_tick & bit != 0:
+            ratio = (ratio * multiplier) >> 128
+
+    if tick > 0:
+        ratio = (UINT256_MOD - 1) // ratio
+
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """
+    Gets the greatest tick whose sqrt price ratio is at most the given ratio.
+
+    Args:
+        sqrt_price_x96 (int): The Q64.96 sqrt price ratio.
+
+    Returns:
+        int: The tick.
+    """
+    if sqrt_price_x96 < MIN_SQRT_RATIO or sqrt_price_x96 >= MAX_SQRT_RATIO:
+        raise ValueError("sqrt price out of range.")
+
+    lo, hi = MIN_TICK, MAX_TICK
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if get_sqrt_ratio_at_tick(mid) <= sqrt_price_x96:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def get_next_sqrt_price_from_amount0_rounding_up(
+    sqrt_price_x96: int, liquidity: int, amount: int, add: bool
+) -> int:
+    """
+    Gets the next sqrt price given a delta of token0.
+    """
+    if amount == 0:
+        return sqrt_price_x96
+
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price_x96
+    if add:
+        if product < UINT256_MOD and numerator1 + product < UINT256_MOD:
+            return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 + product)
+        return div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount)
+
+    if product >= UINT256_MOD or numerator1 <= product:
+        raise ValueError("not enough liquidity for token0 out.")
+    return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 - product)
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(
+    sqrt_price_x96: int, liquidity: int, amount: int, add: bool
+) -> int:
+    """
+    Gets the next sqrt price given a delta of token1.
+    """
+    if add:
+        return sqrt_price_x96 + mul_div(amount, Q96, liquidity)
+
+    quotient = mul_div_rounding_up(amount, Q96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("not enough liquidity for token1 out.")
+    return sqrt_price_x96 - quotient
+
+
+def get_next_sqrt_price_from_input(
+    sqrt_price_x96: int, liquidity: int, amount_in: int, zero_for_one: bool
+) -> int:
+    """
+    Gets the next sqrt price given an input amount of token0 or token1.
+    """
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(
+            sqrt_price_x96, liquidity, amount_in, True
+        )
+    return get_next_sqrt_price_from_amount1_rounding_down(
+        sqrt_price_x96, liquidity, amount_in, True
+    )
+
+
+def get_next_sqrt_price_from_output(
+    sqrt_price_x96: int, liquidity: int, amount_out: int, zero_for_one: bool
+) -> int:
+    """
+    Gets the next sqrt price given an output amount of token0 or token1.
+    """
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount1_rounding_down(
+            sqrt_price_x96, liquidity, amount_out, False
+        )
+    return get_next_sqrt_price_from_amount0_rounding_up(
+        sqrt_price_x96, liquidity, amount_out, False
+    )
+
+
+def get_amount0_delta(
+    sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool
+) -> int:
+    """
+    Gets the amount of token0 between two sqrt prices for liquidity.
+    """
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_ratio_b_x96 - sqrt_ratio_a_x96
+    if round_up:
+        return div_rounding_up(
+            mul_div_rounding_up(numerator1, numerator2, sqrt_ratio_b_x96),
+            sqrt_ratio_a_x96,
+        )
+    return mul_div(numerator1, numerator2, sqrt_ratio_b_x96) // sqrt_ratio_a_x96
+
+
+def get_amount1_delta(
+    sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool
+) -> int:
+    """
+    Gets the amount of token1 between two sqrt prices for liquidity.
+    """
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+    return mul_div(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+
+
+def compute_swap_step(
+    sqrt_ratio_current_x96: int,
+    sqrt_ratio_target_x96: int,
+    liquidity: int,
+    amount_remaining: int,
+    fee_pips: int,
+) -> Tuple[int, int, int, int]:
+    """
+    Computes the result of swapping some amount in or out within a single
+    tick range, exactly as the pool does.
+
+    See https://github.com/Uniswap/v3-core/blob/main/contracts/libraries/SwapMath.sol  # noqa: E501
+
+    Args:
+        sqrt_ratio_current_x96 (int): The current sqrt price.
+        sqrt_ratio_target_x96 (int): The sqrt price that cannot be exceeded.
+        liquidity (int): The usable liquidity.
+        amount_remaining (int): The amount remaining to be swapped in
+            (positive) or out (negative).
+        fee_pips (int): The fee taken from the input amount in hundredths
+            of a bip.
+
+    Returns:
+        Tuple[int, int, int, int]: The next sqrt price, amount in, amount
+        out and fee amount.
+    """
+    zero_for_one = sqrt_ratio_current_x96 >= sqrt_ratio_target_x96
+    exact_in = amount_remaining >= 0
+    amount_in, amount_out = 0, 0
+
+    if exact_in:
+        amount_remaining_less_fee = mul_div(
+            amount_remaining, FEE_PIPS - fee_pips, FEE_PIPS
+        )
+        amount_in = (
+            get_amount0_delta(
+                sqrt_ratio_target_x96, sqrt_ratio_current_x96, liquidity, True
+            )
+            if zero_for_one
+            else get_amount1_delta(
+                sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, True
+            )
+        )
+        sqrt_ratio_next_x96 = (
+            sqrt_ratio_target_x96
+            if amount_remaining_less_fee >= amount_in
+            else get_next_sqrt_price_from_input(
+                sqrt_ratio_current_x96,
+                liquidity,
+                amount_remaining_less_fee,
+                zero_for_one,
+            )
+        )
+    else:
+        amount_out = (
+            get_amount1_delta(
+                sqrt_ratio_target_x96, sqrt_ratio_current_x96, liquidity, False
+            )
+            if zero_for_one
+            else get_amount0_delta(
+                sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, False
+            )
+        )
+        sqrt_ratio_next_x96 = (
+            sqrt_ratio_target_x96
+            if -amount_remaining >= amount_out
+            else get_next_sqrt_price_from_output(
+                sqrt_ratio_current_x96, liquidity, -amount_remaining, zero_for_one
+            )
+        )
+
+    is_max = sqrt_ratio_target_x96 == sqrt_ratio_next_x96
+    if zero_for_one:
+        if not (is_max and exact_in):
+            amount_in = get_amount0_delta(
+                sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, True
+            )
+        if not (is_max and not exact_in):
+            amount_out = get_amount1_delta(
+                sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, False
+            )
+    else:
+        if not (is_max and exact_in):
+            amount_in = get_amount1_delta(
+                sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, True
+            )
+        if not (is_max and not exact_in):
+            amount_out = get_amount0_delta(
+                sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, False
+            )
+
+    # cap the output amount to not exceed the remaining output amount
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+
+    if exact_in and sqrt_ratio_next_x96 != sqrt_ratio_target_x96:
+        # didn't reach the target, so take the remainder of the max input as fee
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, FEE_PIPS - fee_pips)
+
+    return (sqrt_ratio_next_x96, amount_in, amount_out, fee_amount)
+
+
+def next_initialized_tick_within_one_word(
+    initialized: List[int], tick: int, tick_spacing: int, lte: bool
+) -> Tuple[int, bool]:
+    """
+    Gets the next initialized tick contained in the same word of the tick
+    bitmap as the given tick, either to the left (less than or equal to) or
+    right (greater than), as the pool does.
+
+    Args:
+        initialized (List[int]): The initialized ticks in ascending order.
+        tick (int): The starting tick.
+        tick_spacing (int): The tick spacing of the pool.
+        lte (bool): Whether to search to the left.
+
+    Returns:
+        Tuple[int, bool]: The next tick and whether it is initialized.
+    """
+    compressed = tick // tick_spacing
+    if lte:
+        # all the ticks at or to the right of the bit position in the word
+        first = (compressed - (compressed & 0xFF)) * tick_spacing
+        i = bisect_right(initialized, compressed * tick_spacing)
+        if i > 0 and initialized[i - 1] >= first:
+            return (initialized[i - 1], True)
+        return (first, False)
+
+    # start from the word of the next tick, since the current tick state
+    # doesn't matter
+    compressed += 1
+    last = (compressed + (0xFF - (compressed & 0xFF))) * tick_spacing
+    i = bisect_left(initialized, compressed * tick_spacing)
+    if i < len(initialized) and initialized[i] <= last:
+        return (initialized[i], True)
+    return (last, False)
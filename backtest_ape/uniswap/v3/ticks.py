@@ -0,0 +1,563 @@
+import json
+import os
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import click
+import numpy as np
+from ape.contracts import ContractInstance
+from pydantic import BaseModel
+
+from backtest_ape.registry import get_contract
+from backtest_ape.results import load_int_columns, save_results
+from backtest_ape.utils import multicall
+
+TICK_STORE_VERSION = 1
+MIN_TICK = -887272
+MAX_TICK = 887272
+BATCH_SIZE = 500  # calls per aggregated read
+UINT256_MOD = 2**256
+STORE_META_FILENAME = "store.json"
+
+BLOCK_COLUMNS = [
+    "number",
+    "sqrtPriceX96",
+    "tick",
+    "liquidity",
+    "feeGrowthGlobal0X128",
+    "feeGrowthGlobal1X128",
+]
+TICK_COLUMNS = [
+    "number",
+    "tick",
+    "liquidityGross",
+    "feeGrowthOutside0X128",
+    "feeGrowthOutside1X128",
+]
+
+
+class Slot0(NamedTuple):
+    sqrtPriceX96: int
+    tick: int
+
+
+class TickInfo(NamedTuple):
+    liquidityGross: int
+    feeGrowthOutside0X128: int
+    feeGrowthOutside1X128: int
+
+
+def get_initialized_ticks(
+    pool: ContractInstance, tick_spacing: int, block_identifier: Optional[int] = None
+) -> List[int]:
+    """
+    Gets the initialized ticks of a pool by reading every word of the tick
+    bitmap through aggregated calls.
+
+    See https://github.com/Uniswap/v3-core/blob/main/contracts/libraries/TickBitmap.sol  # noqa: E501
+
+    Args:
+        pool (:class:`ape.contracts.ContractInstance`): The Uniswap V3 pool.
+        tick_spacing (int): The tick spacing of the pool.
+        block_identifier (Optional[int]): The block number. If None, then
+            last block from current provider chain.
+
+    Returns:
+        List[int]: The initialized ticks in ascending order.
+    """
+    # compressed ticks round towards negative infinity, as python floor div
+    positions = range(
+        (MIN_TICK // tick_spacing) >> 8, ((MAX_TICK // tick_spacing) >> 8) + 1
+    )
+    words = multicall(
+        [(pool.tickBitmap, position) for position in positions],
+        block_identifier,
+        batch_size=BATCH_SIZE,
+    )
+
+    ticks = []
+    for position, word in zip(positions, words):
+        if word == 0:
+            continue
+
+        ticks += [
+            ((position << 8) + bit) * tick_spacing
+            for bit in range(256)
+            if (word >> bit) & 1
+        ]
+    return ticks
+
+
+def get_tick_logs(pool: ContractInstance, start: int, stop: int) -> List[Tuple]:
+    """
+    Gets the logs of a pool that touch or cross ticks between blocks in a
+    few bulk log queries.
+
+    Args:
+        pool (:class:`ape.contracts.ContractInstance`): The Uniswap V3 pool.
+        start (int): The first block number.
+        stop (int): The last block number, inclusive.
+
+    Returns:
+        List[Tuple]: The (block number, log index, event name, ticks,
+        liquidity delta) of each Swap, Mint and Burn log in chain order, with
+        the ticks being the tick after the swap or the boundary ticks of the
+        position, and the liquidity delta zero for swaps.
+    """
+    logs = []
+    for log in pool.Swap.range(start, stop + 1):
+        logs.append((log.block_number, log.log_index, "Swap", [log.tick], 0))
+
+    for event, sign in [(pool.Mint, 1), (pool.Burn, -1)]:
+        for log in event.range(start, stop + 1):
+            ticks = [log.tickLower, log.tickUpper]
+            delta = sign * log.amount
+            logs.append((log.block_number, log.log_index, event.name, ticks, delta))
+
+    return sorted(log for log in logs if log[0] <= stop)
+
+
+class TickStore(BaseModel):
+    """
+    Columnar history of the state of a Uniswap V3 pool needed to evaluate
+    LP positions in any tick range.
+
+    Stores slot0, liquidity and fee growth globals at each fetched block,
+    and the fee growth outside of every initialized tick as a log of
+    changes. Ticks are discovered from the tick bitmap at the first block,
+    then only ticks touched by Mint and Burn logs or crossed by Swap logs
+    since the prior fetched block are read again. Folds the liquidity deltas
+    of Mint and Burn logs to also log when ticks are cleared between fetched
+    blocks, even if initialized again by the next read.
+    """
+
+    pool_addr: str
+    tick_spacing: int = 0
+
+    _blocks: Dict[str, List[int]] = {}
+    _changes: Dict[str, List[int]] = {}
+    _liquidity_gross: Dict[int, int] = {}  # of initialized ticks at last block
+    _arrays: Dict[str, np.ndarray] = {}
+
+    def __init__(self, **data: Any):
+        """
+        Overrides BaseModel init to create the empty columns.
+        """
+        super().__init__(**data)
+        self._blocks = {k: [] for k in BLOCK_COLUMNS}
+        self._changes = {k: [] for k in TICK_COLUMNS}
+        self._liquidity_gross = {}
+        self._arrays = {}
+
+    class Config:
+        underscore_attrs_are_private = True
+
+    @property
+    def numbers(self) -> List[int]:
+        """
+        The fetched block numbers, in ascending order.
+        """
+        return self._blocks["number"]
+
+    @property
+    def initialized_ticks(self) -> List[int]:
+        """
+        The ticks initialized at the last fetched block, in ascending order.
+        """
+        return sorted(self._liquidity_gross)
+
+    def get_column(self, name: str) -> List[int]:
+        """
+        Gets a column of the state at each fetched block.
+
+        Args:
+            name (str): The column name, e.g. feeGrowthGlobal0X128.
+
+        Returns:
+            List[int]: The values at each fetched block.
+        """
+        return self._blocks[name]
+
+    def fetch(self, start: int, stop: int, step: int = 1):
+        """
+        Fetches the state of the pool at each block between start and stop,
+        continuing from the last fetched block if any.
+
+        Args:
+            start (int): The start block number.
+            stop (int): The stop block number, exclusive.
+            step (int): The step interval size.
+        """
+        if start >= stop:
+            raise ValueError("start block not before stop block.")
+
+        if step < 1:
+            raise ValueError("step < 1.")
+
+        numbers = list(range(start, stop, step))
+        if len(self.numbers) > 0 and numbers[0] <= self.numbers[-1]:
+            raise ValueError("start block not after last fetched block.")
+
+        pool = get_contract(self.pool_addr, "UniswapV3Pool")
+        if len(self.numbers) == 0:
+            click.echo(f"Discovering initialized ticks at block {start} ...")
+            self.tick_spacing = pool.tickSpacing()
+            ticks = get_initialized_ticks(pool, self.tick_spacing, start)
+            self.append(pool, start, ticks)
+            numbers = numbers[1:]
+
+        if len(numbers) == 0:
+            return
+
+        click.echo(f"Fetching tick logs to block {numbers[-1]} ...")
+        logs = iter(get_tick_logs(pool, self.numbers[-1] + 1, numbers[-1]))
+        log = next(logs, None)
+        for number in numbers:
+            click.echo(f"Fetching pool state at block {number} ...")
+
+            # ticks crossed by swaps lie within range of ticks moved through
+            lo = hi = self._blocks["tick"][-1]
+            touched = set()
+            gross: Dict[int, int] = {}
+            cleared = []
+            while log is not None and log[0] <= number:
+                n, _, name, ticks, delta = log
+                if name == "Swap":
+                    lo, hi = min(lo, ticks[0]), max(hi, ticks[0])
+                else:
+                    touched.update(ticks)
+                    for tick in ticks:
+                        gross.setdefault(tick, self._liquidity_gross.get(tick, 0))
+                        gross[tick] += delta
+                        if delta != 0 and gross[tick] == 0:
+                            cleared.append((n, tick))
+                log = next(logs, None)
+
+            crossed = [tick for tick in self._liquidity_gross if lo < tick <= hi]
+            self.append(pool, number, sorted(touched.union(crossed)), cleared)
+
+    def append(
+        self,
+        pool: ContractInstance,
+        number: int,
+        ticks: List[int],
+        cleared: Optional[List[Tuple[int, int]]] = None,
+    ):
+        """
+        Reads and appends the state of the pool at a block, with the info of
+        the given ticks in one aggregated call.
+
+        Args:
+            pool (:class:`ape.contracts.ContractInstance`): The Uniswap V3 pool.
+            number (int): The block number.
+            ticks (List[int]): The ticks to read the info of.
+            cleared (Optional[List[Tuple[int, int]]]): The (block number, tick)
+                of each tick cleared since the prior fetched block, logged
+                with zero info before the info read.
+        """
+        calls = [
+            (pool.slot0,),
+            (pool.liquidity,),
+            (pool.feeGrowthGlobal0X128,),
+            (pool.feeGrowthGlobal1X128,),
+        ]
+        calls += [(pool.ticks, tick) for tick in ticks]
+        results = multicall(calls, number, batch_size=BATCH_SIZE)
+
+        slot0, liquidity, fee_growth_global0, fee_growth_global1 = results[:4]
+        row = [
+            number,
+            slot0[0],  # sqrtPriceX96
+            slot0[1],  # tick
+            liquidity,
+            fee_growth_global0,
+            fee_growth_global1,
+        ]
+        for k, v in zip(BLOCK_COLUMNS, row):
+            self._blocks[k].append(v)
+
+        rows = [[n, tick, 0, 0, 0] for n, tick in cleared or []]
+        for tick, info in zip(ticks, results[4:]):
+            # info: liquidityGross, liquidityNet, feeGrowthOutside0X128, ...
+            rows.append([number, tick, info[0], info[2], info[3]])
+            if info[0] > 0:
+                self._liquidity_gross[tick] = info[0]
+            else:
+                self._liquidity_gross.pop(tick, None)
+
+        for row in rows:
+            for k, v in zip(TICK_COLUMNS, row):
+                self._changes[k].append(v)
+
+        self._arrays = {}
+
+    def get_index(self, number: int) -> int:
+        """
+        Gets the index of the last fetched block at or before a block.
+
+        Args:
+            number (int): The block number.
+
+        Returns:
+            int: The index into the fetched blocks.
+        """
+        index = int(np.searchsorted(self.get_arrays()["number"], number, "right")) - 1
+        if index < 0:
+            raise ValueError(f"block {number} before first fetched block.")
+        return index
+
+    def get_arrays(self) -> Mapping[str, np.ndarray]:
+        """
+        Gets the fetched block numbers and tick change log as arrays sorted
+        for lookups, building once after each fetch.
+
+        Returns:
+            Mapping[str, :class:`numpy.ndarray`]: The block numbers, and the
+            tick change log columns sorted by tick then block number.
+        """
+        if len(self._arrays) == 0:
+            changes = {
+                k: np.array(v, dtype=np.int64 if k in ["number", "tick"] else object)
+                for k, v in self._changes.items()
+            }
+            order = np.lexsort((changes["number"], changes["tick"]))
+            self._arrays = {f"changes_{k}": v[order] for k, v in changes.items()}
+            self._arrays["number"] = np.array(self.numbers, dtype=np.int64)
+        return self._arrays
+
+    def get_tick_changes(self, tick: int) -> List[Tuple[int, TickInfo]]:
+        """
+        Gets the logged changes of the info of a tick.
+
+        Args:
+            tick (int): The tick.
+
+        Returns:
+            List[Tuple[int, :class:`TickInfo`]]: The (block number, tick info)
+            of each read of the tick, in block order.
+        """
+        arrays = self.get_arrays()
+        lo = np.searchsorted(arrays["changes_tick"], tick, side="left")
+        hi = np.searchsorted(arrays["changes_tick"], tick, side="right")
+        return [
+            (
+                int(arrays["changes_number"][i]),
+                TickInfo(
+                    arrays["changes_liquidityGross"][i],
+                    arrays["changes_feeGrowthOutside0X128"][i],
+                    arrays["changes_feeGrowthOutside1X128"][i],
+                ),
+            )
+            for i in range(lo, hi)
+        ]
+
+    def get_fee_growth_outside(self, tick: int) -> Tuple[List[int], List[int]]:
+        """
+        Gets the fee growth outside of a tick at each fetched block.
+
+        Values are as stored in the pool while the tick has stayed
+        initialized since the first fetched block. Otherwise, continues them
+        as a position with the tick as boundary would: initialized at the
+        first fetched block then flipped when the tick is crossed between
+        fetched blocks. Continues through any later re-initialization of the
+        tick, whereas the pool resets the values by the tick <= current
+        convention, as :class:`backtest_ape.uniswap.v3.events.PoolEventReplayer`
+        does, so fee growth inside ranges stays continuous over all blocks.
+
+        NOTE: Continued values are exact only to the resolution of fetched
+        blocks, so fetch with step 1 for exact values on uninitialized ticks.
+
+        Args:
+            tick (int): The tick.
+
+        Returns:
+            Tuple[List[int], List[int]]: The fee growth outside of token0 and
+            token1 at each fetched block.
+        """
+        changes = self.get_tick_changes(tick)
+        ticks = self._blocks["tick"]
+        fee_growth_globals = (
+            self._blocks["feeGrowthGlobal0X128"],
+            self._blocks["feeGrowthGlobal1X128"],
+        )
+
+        outside0, outside1 = [], []
+        stored = True
+        latest = None
+        k = 0
+        for i, number in enumerate(self.numbers):
+            while k < len(changes) and changes[k][0] <= number:
+                latest = changes[k][1]
+                stored = stored and latest.liquidityGross > 0  # not cleared
+                k += 1
+
+            if stored and latest is not None:
+                value0 = latest.feeGrowthOutside0X128
+                value1 = latest.feeGrowthOutside1X128
+            elif i == 0:
+                # initialized as all growth below if tick at or below current
+                below = tick <= ticks[0]
+                value0 = fee_growth_globals[0][0] if below else 0
+                value1 = fee_growth_globals[1][0] if below else 0
+                stored = False
+            else:
+                if (ticks[i - 1] < tick) != (ticks[i] < tick):
+                    value0 = (fee_growth_globals[0][i] - value0) % UINT256_MOD
+                    value1 = (fee_growth_globals[1][i] - value1) % UINT256_MOD
+                stored = False
+
+            outside0.append(value0)
+            outside1.append(value1)
+
+        return outside0, outside1
+
+    def get_fee_growth_below(self, ticks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the fee growth below each of the given ticks at each fetched
+        block, relative to the first fetched block.
+
+        Fee growth inside a range is then the fee growth below its upper
+        tick less that below its lower tick, so ranges sharing boundaries
+        share the work. Differences are taken exactly before converting to
+        floats.
+
+        Args:
+            ticks (:class:`numpy.ndarray`): The ticks.
+
+        Returns:
+            Tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]: The fee
+            growth below of token0 and token1 as Q128.128 floats of shape
+            (len(numbers), len(ticks)).
+        """
+        current = self._blocks["tick"]
+        fee_growth_globals = (
+            self._blocks["feeGrowthGlobal0X128"],
+            self._blocks["feeGrowthGlobal1X128"],
+        )
+        below = [
+            np.zeros((len(self.numbers), len(ticks)), dtype=np.float64)
+            for _ in range(2)
+        ]
+        for j, tick in enumerate(ticks):
+            for k, outside in enumerate(self.get_fee_growth_outside(int(tick))):
+                values = [
+                    v if c >= tick else g - v
+                    for v, c, g in zip(outside, current, fee_growth_globals[k])
+                ]
+                below[k][:, j] = [(v - values[0]) % UINT256_MOD for v in values]
+
+        return below[0], below[1]
+
+    def get_history(self) -> Mapping[str, np.ndarray]:
+        """
+        Gets the state of the pool at each fetched block as arrays for
+        :func:`backtest_ape.analytics.uniswap.sweep_uniswap_v3_lp`.
+
+        Returns:
+            Mapping[str, :class:`numpy.ndarray`]: The block numbers, price,
+            tick and fee growth globals relative to the first fetched block.
+        """
+        history = {
+            "number": np.array(self.numbers, dtype=np.int64),
+            "sqrtPriceX96": np.array(self._blocks["sqrtPriceX96"], dtype=np.float64),
+            "tick": np.array(self._blocks["tick"], dtype=np.int64),
+        }
+        for k in ["feeGrowthGlobal0X128", "feeGrowthGlobal1X128"]:
+            values = self._blocks[k]
+            history[k] = np.array(
+                [(v - values[0]) % UINT256_MOD for v in values], dtype=np.float64
+            )
+        return history
+
+    def get_tick_info(self, tick: int, number: int) -> TickInfo:
+        """
+        Gets the info of a tick as of a block.
+
+        Args:
+            tick (int): The tick.
+            number (int): The block number.
+
+        Returns:
+            :class:`TickInfo`: The liquidity gross and fee growth outside.
+        """
+        index = self.get_index(number)
+        outside0, outside1 = self.get_fee_growth_outside(tick)
+
+        liquidity_gross = 0
+        for n, info in self.get_tick_changes(tick):
+            if n <= self.numbers[index]:
+                liquidity_gross = info.liquidityGross
+        return TickInfo(liquidity_gross, outside0[index], outside1[index])
+
+    def get_refs_state(self, number: int, tick_lower: int, tick_upper: int) -> Mapping:
+        """
+        Gets the state of references for an LP position in a tick range as
+        of a block, as read by
+        :meth:`backtest_ape.uniswap.v3.lp.base.UniswapV3LPBaseRunner.get_refs_state`.
+
+        Args:
+            number (int): The block number.
+            tick_lower (int): The lower tick of the range.
+            tick_upper (int): The upper tick of the range.
+
+        Returns:
+            Mapping: The state of references at block.
+        """
+        index = self.get_index(number)
+        state = {}
+        state["slot0"] = Slot0(
+            self._blocks["sqrtPriceX96"][index], self._blocks["tick"][index]
+        )
+        state["liquidity"] = self._blocks["liquidity"][index]
+        state["fee_growth_global0_x128"] = self._blocks["feeGrowthGlobal0X128"][index]
+        state["fee_growth_global1_x128"] = self._blocks["feeGrowthGlobal1X128"][index]
+        state["tick_info_lower"] = self.get_tick_info(tick_lower, number)
+        state["tick_info_upper"] = self.get_tick_info(tick_upper, number)
+        return state
+
+    def save(self, out_dir: str):
+        """
+        Saves the store as typed columns with
+        :func:`backtest_ape.results.save_results`.
+
+        Args:
+            out_dir (str): The directory to save the store in.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        save_results("", os.path.join(out_dir, "blocks"), {}, self._blocks)
+        save_results("", os.path.join(out_dir, "ticks"), {}, self._changes)
+
+        meta = {
+            "version": TICK_STORE_VERSION,
+            "pool_addr": self.pool_addr,
+            "tick_spacing": self.tick_spacing,
+            "initialized": self.initialized_ticks,
+        }
+        with open(os.path.join(out_dir, STORE_META_FILENAME), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, out_dir: str) -> "TickStore":
+        """
+        Loads a store saved with :meth:`save`.
+
+        Args:
+            out_dir (str): The directory the store was saved in.
+
+        Returns:
+            :class:`TickStore`: The store.
+        """
+        with open(os.path.join(out_dir, STORE_META_FILENAME), "r") as f:
+            meta = json.load(f)
+
+        if meta["version"] != TICK_STORE_VERSION:
+            raise ValueError(f"tick store version {meta['version']} not supported.")
+
+        store = cls(pool_addr=meta["pool_addr"], tick_spacing=meta["tick_spacing"])
+        store._blocks = load_int_columns(os.path.join(out_dir, "blocks"))
+        store._changes = load_int_columns(os.path.join(out_dir, "ticks"))
+
+        # liquidity gross of initialized ticks from their last logged change
+        changes = zip(store._changes["tick"], store._changes["liquidityGross"])
+        gross = dict(changes)
+        store._liquidity_gross = {tick: gross[tick] for tick in meta["initialized"]}
+        return store
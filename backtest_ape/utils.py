@@ -1,8 +1,14 @@
-from typing import Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+import click
 from ape import accounts, chain
 from ape.api.accounts import AccountAPI
 
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# earliest block Multicall3 found deployed and latest found not, by chain id
+_multicall_blocks: Dict[int, Dict[str, Optional[int]]] = {}
+
 
 def get_test_account() -> AccountAPI:
     """
@@ -41,3 +47,148 @@ def get_block_identifier(number: Optional[int] = None) -> int:
             to latest block of current provider chain.
     """
     return number if number is not None else chain.blocks.head.number
+
+
+def get_upstream_network_choice() -> str:
+    """
+    Gets the network choice for the upstream provider of the current fork.
+
+    Returns:
+        str: The upstream network choice as ecosystem:mainnet:provider.
+    """
+    ecosystem_name = chain.provider.network.ecosystem.name
+    upstream_name = chain.provider.config.fork[ecosystem_name][
+        "mainnet"
+    ].upstream_provider
+    return f"{ecosystem_name}:mainnet:{upstream_name}"
+
+
+def flatten_state(state: Any) -> List[int]:
+    """
+    Flattens the numeric leaves of a (nested) refs state in order.
+
+    Args:
+        state (Any): The state, nested through mappings, structs,
+            lists and tuples.
+
+    Returns:
+        List[int]: The numeric leaves of the state.
+    """
+    if isinstance(state, bool):
+        return [int(state)]
+    elif isinstance(state, int):
+        return [state]
+    elif isinstance(state, (str, bytes)):
+        return []
+    elif isinstance(state, Mapping) or hasattr(state, "items"):
+        return [leaf for v in state.values() for leaf in flatten_state(v)]
+
+    return [leaf for v in state for leaf in flatten_state(v)]
+
+
+def get_state_divergence(state: Any, ref_state: Any) -> float:
+    """
+    Gets the max relative deviation of a state from a reference state
+    over all numeric leaves.
+
+    Args:
+        state (Any): The state.
+        ref_state (Any): The reference state.
+
+    Returns:
+        float: The divergence. Infinite if states differ in shape.
+    """
+    leaves = flatten_state(state)
+    ref_leaves = flatten_state(ref_state)
+    if len(leaves) != len(ref_leaves):
+        return float("inf")
+
+    return max(
+        [abs(x - y) / max(abs(y), 1) for x, y in zip(leaves, ref_leaves)],
+        default=0.0,
+    )
+
+
+def is_multicall_deployed(block_identifier: int) -> bool:
+    """
+    Checks whether Multicall3 is deployed at the given block, caching the
+    earliest block found deployed and the latest found not deployed.
+
+    Args:
+        block_identifier (int): The block number.
+
+    Returns:
+        bool: Whether Multicall3 has code at the block.
+    """
+    blocks = _multicall_blocks.setdefault(
+        chain.chain_id, {"deployed": None, "not_deployed": None}
+    )
+    if blocks["deployed"] is not None and block_identifier >= blocks["deployed"]:
+        return True
+    elif (
+        blocks["not_deployed"] is not None
+        and block_identifier <= blocks["not_deployed"]
+    ):
+        return False
+
+    code = chain.provider.get_code(MULTICALL3_ADDRESS, block_id=block_identifier)
+    if len(code) > 0:
+        blocks["deployed"] = block_identifier
+        return True
+
+    blocks["not_deployed"] = block_identifier
+    return False
+
+
+def multicall(
+    calls: List[Tuple],
+    block_identifier: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> List[Any]:
+    """
+    Aggregates view calls into a single eth_call through Multicall3.
+
+    Falls back to calling each sequentially only if Multicall3 is
+    unavailable, i.e. at blocks before it was deployed or on chains it does
+    not support. Errors from the calls themselves are raised.
+
+    Args:
+        calls (List[Tuple]): The calls as (contract method, *args) tuples.
+        block_identifier (Optional[int]): The block number to call at. If
+            None, defaults to latest block of current provider chain.
+        batch_size (Optional[int]): The max number of calls per aggregated
+            call, to stay under provider gas and response size limits. If
+            None, aggregates all calls into one.
+
+    Returns:
+        List[Any]: The decoded results of each call, in order.
+    """
+    if len(calls) == 0:
+        return []
+
+    if batch_size is not None and len(calls) > batch_size:
+        results = []
+        for start in range(0, len(calls), batch_size):
+            stop = start + batch_size
+            results += multicall(calls[start:stop], block_identifier)
+        return results
+
+    from ape_ethereum import multicall as mc
+    from ape_ethereum.multicall.exceptions import UnsupportedChainError
+
+    block_identifier = get_block_identifier(block_identifier)
+    if is_multicall_deployed(block_identifier):
+        try:
+            call = mc.Call()
+            for method, *args in calls:
+                call.add(method, *args, allowFailure=False)
+
+            return list(call(block_identifier=block_identifier))
+        except UnsupportedChainError:
+            pass
+
+    click.echo(
+        f"Multicall3 unavailable at block {block_identifier}, "
+        f"calling {len(calls)} methods sequentially ..."
+    )
+    return [method(*args, block_identifier=block_identifier) for method, *args in calls]
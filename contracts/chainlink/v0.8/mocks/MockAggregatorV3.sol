@@ -54,4 +54,9 @@ contract MockAggregatorV3 is Setter, AggregatorV3Interface {
         require(rounds[_roundId].roundId == _roundId, "round does not exist");
         latestRoundId = _roundId;
     }
+
+    function setLatestRound(RoundData memory _round) external {
+        rounds[_round.roundId] = _round;
+        latestRoundId = _round.roundId;
+    }
 }
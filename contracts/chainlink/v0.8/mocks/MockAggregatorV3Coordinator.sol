@@ -0,0 +1,18 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import {MockAggregatorV3} from "./MockAggregatorV3.sol";
+
+/// @title Mock Aggregator V3 Coordinator
+/// @notice Sets the latest rounds on many mock aggregators in one call
+contract MockAggregatorV3Coordinator {
+    /// @notice Stores the round data and sets the latest round ID on each feed
+    /// @param feeds The mock aggregators to update
+    /// @param rounds The latest round data for each feed
+    function setRounds(MockAggregatorV3[] calldata feeds, MockAggregatorV3.RoundData[] calldata rounds) external {
+        require(feeds.length == rounds.length, "feeds and rounds length mismatch");
+        for (uint256 i = 0; i < feeds.length; i++) {
+            feeds[i].setLatestRound(rounds[i]);
+        }
+    }
+}
@@ -44,7 +44,8 @@ contract CurveV2LPBacktest is Backtest {
             }
 
             // convert values to coin0 denom using oracle price
-            uint256 price = pool.price_oracle(i - 1);
+            // NOTE: 2 coin pools only have one price oracle, taking no index
+            uint256 price = numCoins == 2 ? pool.price_oracle() : pool.price_oracle(i - 1);
             values_[0] += ((price * balance * 10 ** decimals[0]) / (10 ** (18 + decimals[i]))); // mulDiv and decimal conversion
         }
     }
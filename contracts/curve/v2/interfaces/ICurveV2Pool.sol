@@ -6,6 +6,8 @@ interface ICurveV2Pool {
 
     function balances(uint256) external view returns (uint256);
 
+    function price_oracle() external view returns (uint256);
+
     function price_oracle(uint256 k) external view returns (uint256);
 
     function token() external view returns (address);
@@ -26,4 +26,15 @@ contract MockCurveToken is ERC20 {
         _burn(_to, _value);
         return true;
     }
+
+    /// @notice Mints to or burns from _to so total supply equals _supply
+    function set_total_supply(address _to, uint256 _supply) external returns (bool) {
+        uint256 supply = totalSupply();
+        if (_supply > supply) {
+            _mint(_to, _supply - supply);
+        } else if (_supply < supply) {
+            _burn(_to, supply - _supply);
+        }
+        return true;
+    }
 }
@@ -12,6 +12,7 @@ interface CurveToken:
     def mint(_to: address, _value: uint256) -> bool: nonpayable
     def mint_relative(_to: address, frac: uint256) -> uint256: nonpayable
     def burnFrom(_to: address, _value: uint256) -> bool: nonpayable
+    def set_total_supply(_to: address, _supply: uint256) -> bool: nonpayable
 
 
 interface Math:
@@ -183,11 +184,8 @@ PRICE_MASK: constant(uint256) = 2**PRICE_SIZE - 1
 # N_COINS = 3 -> 1  (10**18 -> 10**18)
 # N_COINS = 4 -> 10**8  (10**18 -> 10**10)
 # PRICE_PRECISION_MUL: constant(uint256) = 1
-PRECISIONS: constant(uint256[N_COINS]) = [
-    1000000000000,
-    10000000000,
-    1,
-]
+# NOTE: mock sets coin precisions on deploy from coin decimals
+coin_precisions: public(uint256[N_COINS])
 
 INF_COINS: constant(uint256) = 15
 
@@ -207,9 +205,11 @@ def __init__(
     adjustment_step: uint256,
     admin_fee: uint256,
     ma_half_time: uint256,
-    initial_prices: uint256[N_COINS-1]
+    initial_prices: uint256[N_COINS-1],
+    precisions: uint256[N_COINS]
 ):
     self.owner = owner
+    self.coin_precisions = precisions
     
     # set coin and token addresses
     self.token = token
@@ -278,9 +278,9 @@ def xp() -> uint256[N_COINS]:
     result: uint256[N_COINS] = self.balances
     packed_prices: uint256 = self.price_scale_packed
 
-    precisions: uint256[N_COINS] = PRECISIONS
+    precisions: uint256[N_COINS] = self.coin_precisions
 
-    result[0] *= PRECISIONS[0]
+    result[0] *= self.coin_precisions[0]
     for i in range(1, N_COINS):
         p: uint256 = bitwise_and(packed_prices, PRICE_MASK) * precisions[i]  # * PRICE_PRECISION_MUL
         result[i] = result[i] * p / PRECISION
@@ -602,8 +602,8 @@ def exchange(i: uint256, j: uint256, dx: uint256, min_dy: uint256, use_eth: bool
             price_scale[k] = bitwise_and(packed_prices, PRICE_MASK)  # * PRICE_PRECISION_MUL
             packed_prices = shift(packed_prices, -PRICE_SIZE)
 
-        precisions: uint256[N_COINS] = PRECISIONS
-        xp[0] *= PRECISIONS[0]
+        precisions: uint256[N_COINS] = self.coin_precisions
+        xp[0] *= self.coin_precisions[0]
         for k in range(1, N_COINS):
             xp[k] = xp[k] * price_scale[k-1] * precisions[k] / PRECISION
 
@@ -727,10 +727,10 @@ def add_liquidity(amounts: uint256[N_COINS], min_mint_amount: uint256):
             self.balances[i] = bal
         xx = xp
 
-        precisions: uint256[N_COINS] = PRECISIONS
+        precisions: uint256[N_COINS] = self.coin_precisions
         packed_prices: uint256 = self.price_scale_packed
-        xp[0] *= PRECISIONS[0]
-        xp_old[0] *= PRECISIONS[0]
+        xp[0] *= self.coin_precisions[0]
+        xp_old[0] *= self.coin_precisions[0]
         for i in range(1, N_COINS):
             price_scale: uint256 = bitwise_and(packed_prices, PRICE_MASK) * precisions[i]  # * PRICE_PRECISION_MUL
             xp[i] = xp[i] * price_scale / PRECISION
@@ -780,14 +780,14 @@ def add_liquidity(amounts: uint256[N_COINS], min_mint_amount: uint256):
                 S: uint256 = 0
                 last_prices: uint256[N_COINS-1] = empty(uint256[N_COINS-1])
                 packed_prices: uint256 = self.last_prices_packed
-                precisions: uint256[N_COINS] = PRECISIONS
+                precisions: uint256[N_COINS] = self.coin_precisions
                 for k in range(N_COINS-1):
                     last_prices[k] = bitwise_and(packed_prices, PRICE_MASK)  # * PRICE_PRECISION_MUL
                     packed_prices = shift(packed_prices, -PRICE_SIZE)
                 for i in range(N_COINS):
                     if i != ix:
                         if i == 0:
-                            S += xx[0] * PRECISIONS[0]
+                            S += xx[0] * self.coin_precisions[0]
                         else:
                             S += xx[i] * last_prices[i-1] * precisions[i] / PRECISION
                 S = S * d_token / token_supply
@@ -847,10 +847,10 @@ def _calc_withdraw_one_coin(A_gamma: uint256[2], token_amount: uint256, i: uint2
     assert i < N_COINS  # dev: coin out of range
 
     xx: uint256[N_COINS] = self.balances
-    xp: uint256[N_COINS] = PRECISIONS
+    xp: uint256[N_COINS] = self.coin_precisions
     D0: uint256 = 0
 
-    price_scale_i: uint256 = PRECISION * PRECISIONS[0]
+    price_scale_i: uint256 = PRECISION * self.coin_precisions[0]
     if True:  # To remove packed_prices from memory
         packed_prices: uint256 = self.price_scale_packed
         xp[0] *= xx[0]
@@ -881,7 +881,7 @@ def _calc_withdraw_one_coin(A_gamma: uint256[2], token_amount: uint256, i: uint2
     if calc_price and dy > 10**5 and token_amount > 10**5:
         # p_i = dD / D0 * sum'(p_k * x_k) / (dy - dD / D0 * y0)
         S: uint256 = 0
-        precisions: uint256[N_COINS] = PRECISIONS
+        precisions: uint256[N_COINS] = self.coin_precisions
         last_prices: uint256[N_COINS-1] = empty(uint256[N_COINS-1])
         packed_prices: uint256 = self.last_prices_packed
         for k in range(N_COINS-1):
@@ -890,7 +890,7 @@ def _calc_withdraw_one_coin(A_gamma: uint256[2], token_amount: uint256, i: uint2
         for k in range(N_COINS):
             if k != i:
                 if k == 0:
-                    S += xx[0] * PRECISIONS[0]
+                    S += xx[0] * self.coin_precisions[0]
                 else:
                     S += xx[k] * last_prices[k-1] * precisions[k] / PRECISION
         S = S * dD / D0
@@ -1152,16 +1152,16 @@ def set_D(_D: uint256):
     self.D = _D
 
 
-@external
-def set_A_gamma(_A_gamma: uint256[4]):
+@internal
+def _set_A_gamma(_A_gamma: uint256[4]):
     self.initial_A_gamma = _A_gamma[0]
     self.future_A_gamma = _A_gamma[1]
     self.initial_A_gamma_time = _A_gamma[2]
     self.future_A_gamma_time = _A_gamma[3]
 
 
-@external
-def set_packed_prices(_prices: uint256[N_COINS-1]):
+@internal
+def _set_packed_prices(_prices: uint256[N_COINS-1]):
     # NOTE: same as __init__ so might be wrong
     packed_prices: uint256 = 0
     for k in range(N_COINS-1):
@@ -1175,3 +1175,34 @@ def set_packed_prices(_prices: uint256[N_COINS-1]):
     self.last_prices_packed = packed_prices
     self.last_prices_timestamp = block.timestamp
 
+
+@external
+def set_A_gamma(_A_gamma: uint256[4]):
+    self._set_A_gamma(_A_gamma)
+
+
+@external
+def set_packed_prices(_prices: uint256[N_COINS-1]):
+    self._set_packed_prices(_prices)
+
+
+@external
+def set_state(
+    _balances: uint256[N_COINS],
+    _D: uint256,
+    _A_gamma: uint256[4],
+    _prices: uint256[N_COINS-1],
+    _total_supply: uint256,
+    _supply_holder: address
+):
+    """
+    @notice Sets the whole pool state, including LP token total supply,
+            in one call
+    @param _total_supply Target total supply of the LP token
+    @param _supply_holder Address to mint to or burn from to reach target
+    """
+    self.balances = _balances
+    self.D = _D
+    self._set_A_gamma(_A_gamma)
+    self._set_packed_prices(_prices)
+    CurveToken(self.token).set_total_supply(_supply_holder, _total_supply)
@@ -26,6 +26,11 @@ abstract contract UniswapV3LPBacktest is Backtest {
         tokenIds.push(tokenId);
     }
 
+    /// @notice Pops the last token id from storage to stop tracking its NFT position
+    function pop() external {
+        tokenIds.pop();
+    }
+
     /// @notice Number of token ids pushed to list
     function count() external view returns (uint256) {
         return tokenIds.length;
@@ -5,6 +5,7 @@ from ape import networks
 from typing_inspect import get_origin
 
 import backtest_ape
+from backtest_ape.parallel import get_connection_name
 
 
 def main():
@@ -12,14 +13,11 @@ def main():
     Main backtester script.
     """
     # echo provider setup
-    ecosystem_name = networks.provider.network.ecosystem.name
-    network_name = networks.provider.network.name
-    provider_name = networks.provider.name
-    connection_name = f"{ecosystem_name}:{network_name}:{provider_name}"
+    connection_name = get_connection_name()
     click.echo(f"You are connected to provider network {connection_name}.")
 
     # fail if not mainnet-fork
-    if network_name != "mainnet-fork":
+    if networks.provider.network.name != "mainnet-fork":
         raise ValueError("not connected to mainnet-fork.")
 
     # prompt user which backtest runner to use
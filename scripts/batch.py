@@ -0,0 +1,34 @@
+import click
+from ape.cli import ConnectedProviderCommand
+
+from backtest_ape.jobs import load_jobs, run_jobs
+from backtest_ape.parallel import get_connection_name
+
+
+@click.command(cls=ConnectedProviderCommand)
+@click.argument("spec", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--out-dir",
+    default="scripts/results",
+    help="Directory to record to for jobs without a path.",
+)
+@click.option(
+    "--max-workers",
+    type=int,
+    default=None,
+    help="Number of local forks to run jobs on. Defaults to number of CPUs.",
+)
+def cli(spec, out_dir, max_workers):
+    """
+    Runs a queue of runner jobs from a json or yaml job spec file.
+    """
+    connection_name = get_connection_name()
+    click.echo(f"You are connected to provider network {connection_name}.")
+
+    # fail if not mainnet-fork
+    if "mainnet-fork" not in connection_name:
+        raise ValueError("not connected to mainnet-fork.")
+
+    jobs = load_jobs(spec)
+    click.echo(f"Loaded {len(jobs)} jobs from {spec} ...")
+    run_jobs(jobs, connection_name, out_dir, max_workers)
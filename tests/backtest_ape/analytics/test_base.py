@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from backtest_ape.analytics.base import (
+    get_drawdowns,
+    get_returns,
+    get_rolling_volatility,
+    summarize,
+)
+
+
+def test_get_returns():
+    returns = get_returns(np.array([100.0, 110.0, 99.0]))
+    np.testing.assert_allclose(returns, [np.nan, 0.1, -0.1])
+
+    returns = get_returns(np.array([110.0]), prev=100.0)
+    np.testing.assert_allclose(returns, [0.1])
+
+
+def test_get_drawdowns():
+    values = np.array([100.0, 120.0, 90.0, 130.0, 117.0])
+    drawdowns, peak = get_drawdowns(values)
+    np.testing.assert_allclose(drawdowns, [0.0, 0.0, -0.25, 0.0, -0.1])
+    assert peak == 130.0
+
+
+def test_get_drawdowns_when_chunked():
+    values = np.array([100.0, 120.0, 90.0, 130.0, 117.0])
+    drawdowns0, peak = get_drawdowns(values[:2])
+    drawdowns1, peak = get_drawdowns(values[2:], peak)
+    np.testing.assert_allclose(
+        np.concatenate([drawdowns0, drawdowns1]), [0.0, 0.0, -0.25, 0.0, -0.1]
+    )
+
+
+def test_get_rolling_volatility_when_chunked():
+    returns = np.random.default_rng(42).normal(0.0, 0.01, 1000)
+    window = 24
+    expect = pd.Series(returns).rolling(window).std().to_numpy()
+
+    actual, history = [], None
+    for chunk in np.array_split(returns, 10):
+        vol, history = get_rolling_volatility(chunk, window, history)
+        actual.append(vol)
+    np.testing.assert_allclose(np.concatenate(actual), expect, rtol=1e-6)
+
+
+def test_summarize():
+    values = 100.0 * np.cumprod(1.0 + np.random.default_rng(7).normal(0, 0.01, 500))
+    numbers = np.arange(16000000, 16000000 + 300 * len(values), 300)
+
+    chunks = (
+        {"number": n, "value": v}
+        for n, v in zip(np.array_split(numbers, 8), np.array_split(values, 8))
+    )
+    frames = []
+    summary = summarize(chunks, "value", callback=frames.append)
+    df = pd.concat(frames, ignore_index=True)
+    assert len(df) == len(values)
+    np.testing.assert_allclose(summary["max_drawdown"], df["drawdown"].min())
+
+    returns = pd.Series(values).pct_change().dropna()
+    periods_per_year = 2628000 / 300
+    assert summary["total_return"] == values[-1] / values[0] - 1.0
+    np.testing.assert_allclose(
+        summary["max_drawdown"], (values / np.maximum.accumulate(values) - 1).min()
+    )
+    np.testing.assert_allclose(
+        summary["sharpe"],
+        returns.mean() / returns.std(ddof=0) * np.sqrt(periods_per_year),
+    )
+
+
+def test_summarize_when_empty():
+    summary = summarize(iter([]), "value")
+    assert np.isnan(summary["total_return"])
+    assert np.isnan(summary["max_drawdown"])
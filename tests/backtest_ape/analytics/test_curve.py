@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from backtest_ape.analytics.curve import analyze_curve_v2_lp, get_virtual_price
+from backtest_ape.results import save_results
+
+
+def test_analyze_curve_v2_lp(tmp_path):
+    amounts = [1000000000000, 5946382600, 820567784927637667840]
+    columns = {
+        "number": [16048833, 16049133, 16049433],
+        "values0": [2999000000000, 3030000000000, 3010000000000],
+        "balances0": [0, 0, 0],
+        "balances1": [0, 0, 0],
+        "balances2": [0, 0, 0],
+        "D": [
+            248436312426862035648921020,
+            250000000000000000000000000,
+            249000000000000000000000000,
+        ],
+        "prices0": [
+            16816946825680501806263,
+            17000000000000000000000,
+            16900000000000000000000,
+        ],
+        "prices1": [
+            1218668363989192860592,
+            1230000000000000000000,
+            1220000000000000000000,
+        ],
+        "total_supply": [
+            222394811393421542137548,
+            222400000000000000000000,
+            222300000000000000000000,
+        ],
+    }
+    decimals = {
+        "values0": 6,
+        "balances0": 6,
+        "balances1": 8,
+        "balances2": 18,
+        "prices0": 18,
+        "prices1": 18,
+        "D": 18,
+        "total_supply": 18,
+    }
+    out_dir = str(tmp_path / "lp")
+    save_results("", out_dir, decimals, columns=columns)
+
+    frames = []
+    summary = analyze_curve_v2_lp(
+        out_dir, {"amounts": amounts}, chunk_size=2, callback=frames.append
+    )
+    df = pd.concat(frames, ignore_index=True)
+    assert list(df["number"]) == columns["number"]
+
+    hold = [
+        1e6 + 59.463826 * p0 / 1e18 + 820.56778492763766784 * p1 / 1e18
+        for p0, p1 in zip(columns["prices0"], columns["prices1"])
+    ]
+    value = [v / 1e6 for v in columns["values0"]]
+    np.testing.assert_allclose(df["hold"], hold)
+    np.testing.assert_allclose(df["lp_vs_hold"], np.array(value) / hold - 1.0)
+    np.testing.assert_allclose(
+        summary["excess_return_vs_hold"],
+        (value[-1] / value[0] - 1.0) - (hold[-1] / hold[0] - 1.0),
+    )
+
+    # fees from growth of virtual price, principal the rest
+    prices = [np.array(columns[f"prices{i}"], dtype=float) / 1e18 for i in range(2)]
+    virtual_price = get_virtual_price(
+        np.array(columns["D"], dtype=float) / 1e18,
+        prices,
+        np.array(columns["total_supply"], dtype=float) / 1e18,
+    )
+    fees = np.array(value) * (1.0 - virtual_price[0] / virtual_price)
+    np.testing.assert_allclose(df["fees"], fees)
+    np.testing.assert_allclose(
+        df["impermanent_loss"], (np.array(value) - fees) / hold - 1.0
+    )
+    np.testing.assert_allclose(summary["fee_yield"], fees[-1] / hold[-1])
+
+
+def test_get_virtual_price():
+    # balanced pool of 3 coins at prices 1, 4, 16 with D = 3 * 40
+    virtual_price = get_virtual_price(
+        np.array([120.0]), [np.array([4.0]), np.array([16.0])], np.array([10.0])
+    )
+    np.testing.assert_allclose(virtual_price, [1.0])
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from backtest_ape.analytics.uniswap import (
+    Q96,
+    get_fee_growth_below,
+    load_uniswap_v3_history,
+    sweep_uniswap_v3_lp,
+)
+from backtest_ape.results import save_results
+
+
+@pytest.fixture
+def history():
+    n = 5
+    return {
+        "number": np.arange(16254713, 16254713 + n),
+        "sqrtPriceX96": np.full(n, Q96),  # 1 token1 wei per token0 wei
+        "tick": np.zeros(n, dtype=np.int64),
+        "feeGrowthGlobal0X128": np.arange(n) * 2.0**128 * 1e-3,
+        "feeGrowthGlobal1X128": np.arange(n) * 2.0**128 * 1e-3,
+    }
+
+
+def test_get_fee_growth_below():
+    tick = np.array([0, 70, 70, -10])
+    fee_growth_global = np.array([0.0, 50.0, 100.0, 160.0])
+    below = get_fee_growth_below(tick, fee_growth_global, np.array([-30, 30, 60]))
+    np.testing.assert_equal(
+        below,
+        [[0.0, 0.0, 0.0], [0.0, 50.0, 50.0], [0.0, 50.0, 50.0], [0.0, 50.0, 50.0]],
+    )
+
+
+def test_sweep_uniswap_v3_lp(history):
+    tick_lower = np.array([600, -60])
+    tick_upper = np.array([1200, 60])
+    amount = int(1e18)
+    df = sweep_uniswap_v3_lp(history, tick_lower, tick_upper, amount, amount)
+
+    # in range position earns fees so ranks first
+    assert list(df["tick_lower"]) == [-60, 600]
+    assert df["fees"].iloc[0] > 0
+    assert df["return"].iloc[0] > 0
+    assert df["time_in_range"].iloc[0] == 1.0
+    np.testing.assert_allclose(df["max_drawdown"], [0.0, 0.0])
+
+    # out of range position only holds token0 at constant price
+    assert df["fees"].iloc[1] == 0
+    assert df["time_in_range"].iloc[1] == 0.0
+    np.testing.assert_allclose(df["return"].iloc[1], 0.0, atol=1e-12)
+
+    # same results when evaluated in chunks
+    chunked = sweep_uniswap_v3_lp(
+        history, tick_lower, tick_upper, amount, amount, chunk_size=1
+    )
+    np.testing.assert_allclose(chunked["value"], df["value"])
+
+
+def test_sweep_uniswap_v3_lp_when_ticks_not_ordered(history):
+    with pytest.raises(ValueError):
+        sweep_uniswap_v3_lp(history, np.array([60]), np.array([-60]), 1, 1)
+
+
+def test_load_uniswap_v3_history(tmp_path):
+    columns = {
+        "number": [16254713, 16254714],
+        "values0": [1, 1],
+        "sqrtPriceX96": [2271115536847293636470521670171130] * 2,
+        "feeGrowthGlobal0X128": [2**256 - 10, 5],  # wraps
+        "feeGrowthGlobal1X128": [
+            1330797012137927971917418324177509306984464,
+            1330797012137927971917418324177509306984474,
+        ],
+    }
+    out_dir = str(tmp_path / "lp")
+    save_results("", out_dir, {}, columns=columns)
+
+    history = load_uniswap_v3_history(out_dir)
+    np.testing.assert_equal(history["number"], columns["number"])
+    np.testing.assert_equal(history["tick"], [205279, 205279])
+    np.testing.assert_equal(history["feeGrowthGlobal0X128"], [0.0, 15.0])
+    np.testing.assert_equal(history["feeGrowthGlobal1X128"], [0.0, 10.0])
@@ -1,4 +1,5 @@
 import pytest
+from ape import chain
 
 from backtest_ape.curve.v2.base import BaseCurveV2Runner
 
@@ -11,6 +12,14 @@ def runner():
     )
 
 
+@pytest.fixture
+def two_coin_runner():
+    return BaseCurveV2Runner(
+        ref_addrs={"pool": "0x8301AE4fc9c624d1D396cbDAa1ed877821D7C511"},
+        num_coins=2,
+    )
+
+
 def test_setup(runner):
     runner.setup()
 
@@ -25,8 +34,71 @@ def test_setup(runner):
     assert set([coin.symbol() for coin in mocks["coins"]]) == set(
         ["USDT", "WBTC", "WETH"]
     )
-    assert mocks["pool"].A() == 1000000
+    params = runner.get_pool_params()
+    assert mocks["pool"].A() == params["A"]
+    assert mocks["pool"].gamma() == params["gamma"]
+    assert mocks["pool"].mid_fee() == params["mid_fee"]
+    assert mocks["pool"].ma_half_time() == params["ma_half_time"]
+    assert [mocks["pool"].coin_precisions(i) for i in range(runner.num_coins)] == [
+        1000000000000,
+        10000000000,
+        1,
+    ]
     assert set([mocks["pool"].coins(i) for i in range(runner.num_coins)]) == set(
         [coin.address for coin in mocks["coins"]]
     )
     assert mocks["pool"].token() == mocks["lp"].address
+
+
+def test_get_ref_interface(runner, two_coin_runner):
+    assert runner.get_ref_interface("pool") == "CurveTricrypto2"
+    assert runner._refs["pool"].contract_type.name == "CurveTricrypto2"
+    assert two_coin_runner.get_ref_interface("pool") == "CurveCryptoSwap2"
+    assert two_coin_runner._refs["pool"].price_oracle() > 0
+
+
+def test_get_precisions(runner):
+    assert runner.get_decimals() == [6, 8, 18]
+    assert runner.get_precisions() == [1000000000000, 10000000000, 1]
+
+
+def test_get_pool_params(runner):
+    params = runner.get_pool_params()
+    pool = runner._refs["pool"]
+    assert params["A"] == pool.A()
+    assert params["gamma"] == pool.gamma()
+    assert params["mid_fee"] == pool.mid_fee()
+    assert params["out_fee"] == pool.out_fee()
+    assert params["allowed_extra_profit"] == pool.allowed_extra_profit()
+    assert params["fee_gamma"] == pool.fee_gamma()
+    assert params["adjustment_step"] == pool.adjustment_step()
+    assert params["admin_fee"] == pool.admin_fee()
+    assert params["ma_half_time"] == pool.ma_half_time()
+    assert params["prices"] == [pool.price_scale(i) for i in range(2)]
+
+
+def test_setup_when_two_coins(two_coin_runner):
+    two_coin_runner.setup()
+
+    mocks = two_coin_runner._mocks
+    assert set([coin.symbol() for coin in mocks["coins"]]) == set(["WETH", "CRV"])
+    params = two_coin_runner.get_pool_params()
+    assert mocks["pool"].A() == params["A"]
+    assert mocks["pool"].gamma() == params["gamma"]
+    assert mocks["pool"].price_scale() == params["prices"][0]
+    assert mocks["pool"].token() == mocks["lp"].address
+
+
+def test_get_pool_params_when_number(runner):
+    number = chain.blocks.head.number - 100000
+    params = runner.get_pool_params(number)
+    pool = runner._refs["pool"]
+    assert params["A"] == pool.A(block_identifier=number)
+    assert params["mid_fee"] == pool.mid_fee(block_identifier=number)
+    assert params["prices"] == [
+        pool.price_scale(k, block_identifier=number) for k in range(2)
+    ]
+
+    # cached by block
+    assert runner.get_pool_params(number) is params
+    assert runner._pool_params.keys() == {number}
@@ -0,0 +1,77 @@
+import pytest
+
+from backtest_ape.curve.v2.events import PoolEventReplayer, get_pool_logs
+from backtest_ape.curve.v2.lp import CurveV2LPRunner
+from backtest_ape.registry import get_contract
+
+POOL_ADDR = "0xD51a44d3FaE010294C616388b506AcdA1bfAAE46"
+START = 16254713
+STOP = 16255713
+RTOL = 1e-6
+
+
+@pytest.fixture
+def replayer():
+    return PoolEventReplayer(pool_addr=POOL_ADDR, check_interval=None)
+
+
+@pytest.fixture
+def runner():
+    amount_usd = int(1e12)  # 1M USD
+    amount_weth = int((1e24 / 1218668363989192860592) * 1e18)
+    amount_wbtc = int((1e24 / 16816946825680501806263) * 1e8)
+    amounts = [amount_usd, amount_wbtc, amount_weth]
+    return CurveV2LPRunner(
+        ref_addrs={"pool": POOL_ADDR},
+        num_coins=len(amounts),
+        amounts=amounts,
+    )
+
+
+def test_get_pool_logs():
+    pool = get_contract(POOL_ADDR)
+    logs = get_pool_logs(pool, START, STOP)
+    assert len(logs) > 0
+    assert [log[:2] for log in logs] == sorted(log[:2] for log in logs)
+    assert all(START <= log[0] <= STOP for log in logs)
+
+
+def test_get_refs_state(replayer, runner):
+    for number in [START, START + 1, START + 500, STOP]:
+        state = replayer.get_refs_state(number)
+        expect = runner.get_refs_state(number)
+        assert state["balances"] == expect["balances"]
+        assert state["A_gamma"] == expect["A_gamma"]
+        assert state["total_supply"] == expect["total_supply"]
+        assert state["D"] == pytest.approx(expect["D"], rel=RTOL)
+        assert state["prices"] == pytest.approx(expect["prices"], rel=RTOL)
+
+    # one seed and one bulk log query per event
+    assert replayer.number == STOP
+    assert replayer.reads < 20
+
+
+def test_check(replayer):
+    replayer.advance(START)
+    assert replayer.check(STOP) is False  # not advanced
+    assert replayer.drifts == 1
+    assert replayer.number == STOP
+
+    replayer.advance(STOP + 100)
+    assert replayer.check(STOP + 100) is True
+
+
+def test_set_pool_replayer(replayer, runner):
+    runner.set_pool_replayer(replayer)
+    state = runner.get_refs_state(START)
+    assert state == replayer.get_refs_state(START)
+
+    with pytest.raises(ValueError):
+        runner.set_pool_replayer(
+            PoolEventReplayer(pool_addr="0x80466c64868E1ab14a1Ddf27A676C3fcBE638Fe5")
+        )
+
+
+def test_replayer_num_coins():
+    with pytest.raises(ValueError):
+        PoolEventReplayer(pool_addr=POOL_ADDR, num_coins=2)
@@ -142,6 +142,13 @@ def test_set_mocks_state(runner):
     runner.set_mocks_state(state)
     assert mock_lp.balanceOf(runner._acc.address) == state["total_supply"]
 
+    # check all state set in a single tx
+    nonce = runner.acc.nonce
+    state["total_supply"] += 200
+    runner.set_mocks_state(state)
+    assert runner.acc.nonce == nonce + 1
+    assert mock_lp.totalSupply() == state["total_supply"]
+
 
 def test_record(runner, path):
     runner.setup()
@@ -205,3 +212,48 @@ def test_record(runner, path):
     assert int(row["A_gamma3"]) == int(state["A_gamma"][3])
     assert int(row["prices0"]) == int(state["prices"][0])
     assert int(row["prices1"]) == int(state["prices"][1])
+
+
+def test_get_record_decimals(runner):
+    decimals = runner.get_record_decimals()
+    assert decimals == {
+        "number": 0,
+        "values0": 6,
+        "balances0": 6,
+        "balances1": 8,
+        "balances2": 18,
+        "D": 18,
+        "A_gamma0": 0,
+        "A_gamma1": 0,
+        "A_gamma2": 0,
+        "A_gamma3": 0,
+        "prices0": 18,
+        "prices1": 18,
+        "total_supply": 18,
+    }
+
+
+def test_get_record(runner):
+    number = 16254713
+    state = {
+        "balances": [51444788313173, 306130683764, 42421274934619665540607],
+        "D": 154655480528709339739900799,
+        "A_gamma": [
+            183752478137306770270222288013175834186240000,
+            581076037942835227425498917514114728328226821,
+            1633548703,
+            0,
+        ],
+        "prices": [16816946825680501806263, 1218668363989192860592],
+        "total_supply": 183341149725574822964704,
+    }
+    values = [3000000000]
+    row = runner.get_record(number, state, values)
+    assert row["number"] == number
+    assert row["values0"] == values[0]
+    assert row["D"] == state["D"]
+    assert row["total_supply"] == state["total_supply"]
+    assert [row[f"balances{i}"] for i in range(3)] == state["balances"]
+    assert [row[f"A_gamma{i}"] for i in range(4)] == state["A_gamma"]
+    assert [row[f"prices{i}"] for i in range(2)] == state["prices"]
+    assert "balances" not in row
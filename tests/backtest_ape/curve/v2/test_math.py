@@ -0,0 +1,57 @@
+from backtest_ape.curve.v2.math import (
+    PRECISION,
+    geometric_mean,
+    halfpow,
+    newton_D,
+    newton_y,
+    reduction_coefficient,
+    sqrt_int,
+)
+
+A = 1707629
+GAMMA = 11809167828997
+
+
+def test_geometric_mean():
+    assert geometric_mean([PRECISION, PRECISION, PRECISION]) == PRECISION
+    mean = geometric_mean([PRECISION, 8 * PRECISION, PRECISION])
+    assert abs(mean - 2 * PRECISION) <= 1
+
+
+def test_reduction_coefficient():
+    x = [PRECISION, PRECISION, PRECISION]
+    assert reduction_coefficient(x, 0) == PRECISION
+    assert reduction_coefficient(x, 5 * 10**14) == PRECISION
+    assert reduction_coefficient(
+        [PRECISION, 2 * PRECISION, PRECISION], 5 * 10**14
+    ) < (PRECISION)
+
+
+def test_newton_D():
+    x = [10**24, 10**24, 10**24]
+    assert newton_D(A, GAMMA, x) == 3 * 10**24
+
+    x = [10**24, 2 * 10**24, 10**24]
+    D = newton_D(A, GAMMA, x)
+    assert sum(x) > D > 3 * geometric_mean(x)
+
+
+def test_newton_y():
+    x = [10**24, 2 * 10**24, 10**24]
+    D = newton_D(A, GAMMA, x)
+    for i in range(len(x)):
+        y = newton_y(A, GAMMA, x, D, i)
+        assert abs(y - x[i]) * 10**12 < x[i]
+
+
+def test_halfpow():
+    assert halfpow(0, 10**10) == PRECISION
+    assert halfpow(PRECISION, 10**10) == PRECISION // 2
+    assert halfpow(60 * PRECISION, 10**10) == 0
+    assert abs(halfpow(PRECISION // 2, 10**10) - 707106781186547524) < 10**10
+
+
+def test_sqrt_int():
+    assert sqrt_int(0) == 0
+    assert sqrt_int(4 * PRECISION) == 2 * PRECISION
+    assert sqrt_int(PRECISION // 100) == PRECISION // 10
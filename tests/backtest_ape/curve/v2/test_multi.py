@@ -0,0 +1,82 @@
+import pytest
+
+from backtest_ape.curve.v2.lp import CurveV2LPRunner
+from backtest_ape.curve.v2.multi import CurveV2MultiLPRunner
+
+
+@pytest.fixture
+def pools():
+    amount_usd = int(1e12)  # 1M USD
+    amount_weth = int((1e24 / 1218668363989192860592) * 1e18)
+    amount_wbtc = int((1e24 / 16816946825680501806263) * 1e8)
+    amounts = [amount_usd, amount_wbtc, amount_weth]
+    return [
+        {
+            "ref_addrs": {"pool": "0xD51a44d3FaE010294C616388b506AcdA1bfAAE46"},
+            "num_coins": len(amounts),
+            "amounts": amounts,
+        },
+        {
+            "ref_addrs": {"pool": "0xD51a44d3FaE010294C616388b506AcdA1bfAAE46"},
+            "num_coins": len(amounts),
+            "amounts": [amount // 2 for amount in amounts],
+        },
+    ]
+
+
+@pytest.fixture
+def runner(pools):
+    return CurveV2MultiLPRunner(pools=pools)
+
+
+def test_init_when_no_pools():
+    with pytest.raises(ValueError):
+        CurveV2MultiLPRunner(pools=[])
+
+
+def test_get_refs_state(runner, pools):
+    number = 16254713
+    state = runner.get_refs_state(number)
+    assert len(state["pools"]) == len(pools)
+    for kwargs, pool_state in zip(pools, state["pools"]):
+        assert pool_state == CurveV2LPRunner(**kwargs).get_refs_state(number)
+
+
+def test_set_mocks_state(runner):
+    runner.setup()
+    number = 16254713
+    state = runner.get_refs_state(number)
+    runner.set_mocks_state(state)
+
+    for pool_runner, pool_state in zip(runner._runners, state["pools"]):
+        mock_pool = pool_runner._mocks["pool"]
+        mock_lp = pool_runner._mocks["lp"]
+        assert [
+            mock_pool.balances(i) for i in range(pool_runner.num_coins)
+        ] == pool_state["balances"]
+        assert mock_pool.D() == pool_state["D"]
+        assert mock_lp.totalSupply() == pool_state["total_supply"]
+
+
+def test_get_record_decimals(runner):
+    decimals = runner.get_record_decimals()
+    assert decimals["number"] == 0
+    assert decimals["values0"] == 6
+    assert decimals["values1"] == 6
+    assert decimals["pool0_balances1"] == 8
+    assert decimals["pool1_total_supply"] == 18
+    assert "pool0_values0" not in decimals
+
+
+def test_get_record(runner):
+    number = 16254713
+    state = runner.get_refs_state(number)
+    values = [3000000000, 1500000000]
+    row = runner.get_record(number, state, values)
+    assert row["number"] == number
+    assert row["values0"] == values[0]
+    assert row["values1"] == values[1]
+    for j, pool_state in enumerate(state["pools"]):
+        assert row[f"pool{j}_D"] == pool_state["D"]
+        assert [row[f"pool{j}_balances{i}"] for i in range(3)] == pool_state["balances"]
+    assert set(row.keys()) == set(runner.get_record_decimals().keys())
@@ -1,3 +1,4 @@
+import pytest
 from ape.contracts import ContractInstance
 
 from backtest_ape.curve.v2.setup import deploy_mock_lp, deploy_mock_pool
@@ -26,6 +27,15 @@ def test_deploy_mock_lp(acc):
     assert receipt.return_value is True
     assert tok.balanceOf(acc) == 910
 
+    # try setting total supply up then down
+    tok.set_total_supply(acc.address, 1000, sender=acc)
+    assert tok.totalSupply() == 1000
+    assert tok.balanceOf(acc) == 1000
+
+    tok.set_total_supply(acc.address, 500, sender=acc)
+    assert tok.totalSupply() == 500
+    assert tok.balanceOf(acc) == 500
+
 
 def test_deploy_mock_pool(acc):
     coins = [deploy_mock_erc20(f"Mock {i}", f"MOK{i}", 18, acc) for i in range(3)]
@@ -54,6 +64,7 @@ def test_deploy_mock_pool(acc):
         admin_fee,
         ma_half_time,
         [price, price],
+        [1, 1, 1],
         acc,
     )
 
@@ -69,3 +80,71 @@ def test_deploy_mock_pool(acc):
     assert pool.admin_fee() == admin_fee
     assert pool.ma_half_time() == ma_half_time
     assert [pool.price_oracle(i) for i in range(2)] == [price, price]
+    assert [pool.coin_precisions(i) for i in range(3)] == [1, 1, 1]
+
+
+def test_deploy_mock_pool_when_no_mock(acc):
+    coins = [deploy_mock_erc20(f"Mock {i}", f"MOK{i}", 18, acc) for i in range(4)]
+    lp = deploy_mock_lp("Mock Curve", "crv4m", acc)
+    with pytest.raises(ValueError):
+        deploy_mock_pool(coins, lp, 0, 0, 0, 0, 0, 0, 0, 0, 0, [], [], acc)
+
+
+def test_deploy_mock_pool_when_two_coins(acc):
+    coins = [deploy_mock_erc20(f"Mock {i}", f"MOK{i}", 18, acc) for i in range(2)]
+    lp = deploy_mock_lp("Mock Curve", "crv2m", acc)
+
+    A = 400000  # 4 * 10**5
+    gamma = 145000000000000  # 1.45 * 10**14
+    mid_fee = 26000000  # 26 bps
+    out_fee = 45000000  # 45 bps
+    allowed_extra_profit = 2000000000000  # 2 * 10**12
+    fee_gamma = 230000000000000
+    adjustment_step = 146000000000000
+    admin_fee = 5000000000
+    ma_half_time = 600
+    price = 1000000000000000000  # 1 wad
+    pool = deploy_mock_pool(
+        coins,
+        lp,
+        A,
+        gamma,
+        mid_fee,
+        out_fee,
+        allowed_extra_profit,
+        fee_gamma,
+        adjustment_step,
+        admin_fee,
+        ma_half_time,
+        [price],
+        [1, 1],
+        acc,
+    )
+
+    assert [pool.coins(i) for i in range(2)] == [coin.address for coin in coins]
+    assert pool.token() == lp.address
+    assert pool.A() == A
+    assert pool.gamma() == gamma
+    assert pool.mid_fee() == mid_fee
+    assert pool.out_fee() == out_fee
+    assert pool.ma_half_time() == ma_half_time
+    assert pool.price_oracle() == price
+    assert pool.price_scale() == price
+    assert [pool.coin_precisions(i) for i in range(2)] == [1, 1]
+
+    # try setting the whole pool state
+    A_gamma = [pool.initial_A_gamma(), pool.future_A_gamma(), 0, 0]
+    pool.set_state(
+        [10**21, 10**21],
+        2 * 10**21,
+        A_gamma,
+        [2 * price],
+        10**21,
+        acc.address,
+        sender=acc,
+    )
+    assert [pool.balances(i) for i in range(2)] == [10**21, 10**21]
+    assert pool.D() == 2 * 10**21
+    assert pool.price_oracle() == 2 * price
+    assert pool.price_scale() == 2 * price
+    assert lp.totalSupply() == 10**21
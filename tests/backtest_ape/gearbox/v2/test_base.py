@@ -1,8 +1,10 @@
 from typing import ClassVar, List
 
 import pytest
+from ape import chain
 
-from backtest_ape.gearbox.v2.base import BaseGearboxV2Runner
+from backtest_ape.gearbox.v2 import base
+from backtest_ape.gearbox.v2.base import BaseGearboxV2Runner, get_manager_refs
 
 
 class Runner(BaseGearboxV2Runner):
@@ -25,7 +27,7 @@ def test_setup(runner):
 
     # check mock feeds
     mocks = runner._mocks
-    assert set(mocks.keys()) == set(["feeds"])
+    assert set(mocks.keys()) == set(["feeds", "coordinator"])
     assert len(mocks["feeds"]) == len(runner._refs["feeds"])
     assert [feed.description() for feed in mocks["feeds"]] == [
         feed.description() for feed in runner._refs["feeds"]
@@ -36,3 +38,47 @@ def test_setup(runner):
     assert [feed.version() for feed in mocks["feeds"]] == [
         feed.version() for feed in runner._refs["feeds"]
     ]
+
+
+def test_get_manager_refs(runner):
+    manager = runner._refs["manager"]
+    number = chain.blocks.head.number
+    refs = get_manager_refs(manager, number)
+    assert refs["facade"].address == manager.creditFacade()
+    assert refs["price_oracle"].address == manager.priceOracle()
+
+    count = manager.collateralTokensCount()
+    assert refs["collaterals"] == [
+        manager.collateralTokens(i).token for i in range(count)
+    ]
+
+    price_oracle = runner._refs["price_oracle"]
+    assert {addr: feed.address for addr, feed in refs["feeds"].items()} == {
+        addr: price_oracle.priceFeeds(addr) for addr in refs["collaterals"]
+    }
+    assert runner._refs["feeds"][0] is refs["feeds"][runner.collateral_addrs[0]]
+    assert runner._refs["price_oracle"] is refs["price_oracle"]
+
+    # check cached by manager and block
+    assert (manager.address, number) in base._manager_refs
+    assert get_manager_refs(manager, number) is refs
+
+
+def test_set_mocks(runner):
+    setup = Runner(ref_addrs=runner.ref_addrs)
+    setup.setup()
+
+    # share the mocks deployed by the other runner
+    mocks = setup._mocks
+    runner.set_mocks(mocks)
+    assert runner._mocks == mocks
+
+    rounds = [(1, 100, 0, 0, 1) for _ in mocks["feeds"]]
+    runner.set_mock_rounds(rounds)
+    assert runner._mock_rounds == rounds
+
+    with pytest.raises(ValueError):
+        runner.set_mocks({"feeds": [], "coordinator": mocks["coordinator"]})
+
+    with pytest.raises(ValueError):
+        runner.set_mock_rounds([])
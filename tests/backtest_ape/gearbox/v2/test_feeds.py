@@ -0,0 +1,142 @@
+import pytest
+
+from backtest_ape.gearbox.v2.feeds import (
+    FeedDescriptor,
+    PriceFeedType,
+    get_feed_descriptors,
+    get_feed_round_data,
+    get_feeds_round_data,
+    get_value_calls,
+)
+from backtest_ape.gearbox.v2.steth import GearboxV2STETHRunner
+
+
+@pytest.fixture
+def runner():
+    return GearboxV2STETHRunner(
+        ref_addrs={
+            "manager": "0x5887ad4Cb2352E7F01527035fAa3AE0Ef2cE2b9B",
+            "adapter": "0x2aed5E59E3730d88c8a1d0C25A50a239DeF70275",
+        },
+        collateral_amount=100000000000000000000,  # 100 WETH
+        leverage_factor=400,  # 400 WETH borrow
+    )
+
+
+def test_get_feed_descriptors(runner):
+    feeds = runner._refs["feeds"]
+    descriptors = get_feed_descriptors(feeds, runner.supported_feed_types)
+    assert len(descriptors) == len(feeds)
+    for feed, descriptor in zip(feeds, descriptors):
+        assert descriptor.address == feed.address
+        assert descriptor.description == feed.description()
+        assert descriptor.decimals == feed.decimals()
+        assert descriptor.version == feed.version()
+        assert descriptor.feed_type in runner.supported_feed_types
+        if descriptor.feed_type == PriceFeedType.COMPOSITE_ETH_ORACLE.value:
+            assert descriptor.sources == [
+                feed.ethUsdPriceFeed(),
+                feed.targetEthPriceFeed(),
+            ]
+            assert descriptor.answer_denominator == feed.answerDenominator()
+        else:
+            assert descriptor.sources == [feed.address]
+
+
+def test_get_feed_descriptors_when_not_supported(runner):
+    with pytest.raises(ValueError):
+        get_feed_descriptors(runner._refs["feeds"], [])
+
+
+def test_get_feeds_round_data(runner):
+    number = 16254713
+    descriptors = runner.get_feed_descriptors()
+    data = get_feeds_round_data(descriptors, number)
+    assert data == runner.get_refs_state(number)["feeds"]
+    for descriptor, round_data in zip(descriptors, data):
+        if descriptor.feed_type == PriceFeedType.CHAINLINK_ORACLE.value:
+            feed = runner._refs["feeds"][descriptors.index(descriptor)]
+            assert round_data == tuple(feed.latestRoundData(block_identifier=number))
+
+
+@pytest.fixture
+def wrapper_descriptors():
+    def chainlink(address, description):
+        return FeedDescriptor(
+            address=address,
+            feed_type=PriceFeedType.CHAINLINK_ORACLE.value,
+            description=description,
+            decimals=8,
+            version=4,
+            sources=[address],
+        )
+
+    usdc = chainlink("0x8fFfFfd4AfB6115b954Bd326cbe7B4BA576818f6", "USDC / USD")
+    dai = chainlink("0xAed0c38402a5d19df6E4c03F4E2DceD6e29c1ee9", "DAI / USD")
+    steth = chainlink("0xCfE54B5cD566aB89272946F602D76Ea879CAb4a8", "STETH / USD")
+    return [
+        FeedDescriptor(
+            address="0x0000000000000000000000000000000000000001",
+            feed_type=PriceFeedType.WSTETH_ORACLE.value,
+            description="wstETH / USD",
+            decimals=8,
+            version=1,
+            sources=steth.sources,
+            answer_denominator=10**18,
+            feeds=[steth],
+            value_source="0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0",
+            upper_bound=1200000000000000000,
+        ),
+        FeedDescriptor(
+            address="0x0000000000000000000000000000000000000002",
+            feed_type=PriceFeedType.CURVE_2LP_ORACLE.value,
+            description="Curve 2LP / USD",
+            decimals=8,
+            version=1,
+            sources=usdc.sources + dai.sources,
+            answer_denominator=10**18,
+            feeds=[usdc, dai],
+            value_source="0x0000000000000000000000000000000000000003",
+            upper_bound=1050000000000000000,
+        ),
+        FeedDescriptor(
+            address="0x0000000000000000000000000000000000000004",
+            feed_type=PriceFeedType.BOUNDED_ORACLE.value,
+            description="Bounded DAI / USD",
+            decimals=8,
+            version=1,
+            sources=dai.sources,
+            feeds=[dai],
+            upper_bound=99980000,
+        ),
+    ]
+
+
+def test_get_value_calls(wrapper_descriptors):
+    assert get_value_calls(wrapper_descriptors + wrapper_descriptors) == [
+        ("0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0", "stEthPerToken"),
+        ("0x0000000000000000000000000000000000000003", "get_virtual_price"),
+    ]
+
+
+def test_get_feed_round_data_when_wrapper(wrapper_descriptors):
+    wsteth, curve_lp, bounded = wrapper_descriptors
+    round_datas = {wsteth.sources[0]: (2, 119000000000, 3, 4, 2)}  # steth
+    round_datas[curve_lp.sources[0]] = (5, 100010000, 6, 7, 5)  # usdc
+    round_datas[curve_lp.sources[1]] = (8, 99990000, 9, 10, 8)  # dai
+    values = {
+        wsteth.value_source: 1100000000000000000,
+        curve_lp.value_source: 1100000000000000000,  # capped at upper bound
+    }
+
+    # answer of underlying times value
+    result = get_feed_round_data(wsteth, round_datas, values)
+    assert result == (2, 130900000000, 3, 4, 2)
+
+    # round data of min underlying answer times bounded value
+    result = get_feed_round_data(curve_lp, round_datas, values)
+    assert result == (8, 104989500, 9, 10, 8)
+
+    # answer bounded above
+    result = get_feed_round_data(bounded, round_datas, values)
+    assert result == (8, 99980000, 9, 10, 8)
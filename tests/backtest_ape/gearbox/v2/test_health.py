@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from backtest_ape.gearbox.v2.health import HealthFactorEngine
+
+
+@pytest.fixture
+def engine():
+    return HealthFactorEngine(
+        balances=[0, 500000000000000000000],  # 500 stETH
+        decimals=[18, 18],
+        liquidation_thresholds=[9300, 9000],
+        debt=400000000000000000000,  # 400 WETH
+        underlying_index=0,
+    )
+
+
+def test_compute(engine):
+    prices = np.array([121963000000, 120786558687])
+    result = engine.compute(prices)
+    expect = (500 * 120786558687 * 9000) // (400 * 121963000000)
+    assert result.shape == ()
+    assert int(result) == expect
+
+
+def test_compute_when_scenarios(engine):
+    # (scenarios, steps, collaterals) with stETH depegging over steps
+    prices = np.empty((3, 4, 2))
+    prices[..., 0] = 121963000000
+    prices[..., 1] = np.linspace(1.0, 0.8, 4) * np.array([[1.0], [0.95], [0.9]])
+    prices[..., 1] *= 121963000000
+
+    result = engine.compute(prices)
+    assert result.shape == (3, 4)
+
+    expect = np.floor(500 * prices[..., 1] * 9000 / (400 * prices[..., 0]))
+    np.testing.assert_array_equal(result, expect.astype(np.int64))
+    assert np.all(np.diff(result, axis=-1) < 0)
+
+
+def test_compute_raises_when_prices_not_collaterals(engine):
+    with pytest.raises(ValueError):
+        engine.compute(np.array([121963000000]))
+
+
+def test_init_raises_when_lens_not_equal():
+    with pytest.raises(ValueError):
+        HealthFactorEngine(
+            balances=[0, 500000000000000000000],
+            decimals=[18],
+            liquidation_thresholds=[9300, 9000],
+            debt=400000000000000000000,
+        )
+
+
+def test_init_raises_when_underlying_not_collateral():
+    with pytest.raises(ValueError):
+        HealthFactorEngine(
+            balances=[0, 500000000000000000000],
+            decimals=[18, 18],
+            liquidation_thresholds=[9300, 9000],
+            debt=400000000000000000000,
+            underlying_index=2,
+        )
@@ -0,0 +1,96 @@
+import pytest
+
+from backtest_ape.gearbox.v2.multi import GearboxV2MultiSTETHRunner
+from backtest_ape.gearbox.v2.steth import GearboxV2STETHRunner
+
+
+@pytest.fixture
+def accounts():
+    ref_addrs = {
+        "manager": "0x5887ad4Cb2352E7F01527035fAa3AE0Ef2cE2b9B",
+        "adapter": "0x2aed5E59E3730d88c8a1d0C25A50a239DeF70275",
+    }
+    return [
+        {
+            "ref_addrs": ref_addrs,
+            "collateral_amount": 100000000000000000000,  # 100 WETH
+            "leverage_factor": 400,  # 400 WETH borrow
+        },
+        {
+            "ref_addrs": ref_addrs,
+            "collateral_amount": 100000000000000000000,  # 100 WETH
+            "leverage_factor": 200,  # 200 WETH borrow
+        },
+    ]
+
+
+@pytest.fixture
+def runner(accounts):
+    return GearboxV2MultiSTETHRunner(accounts=accounts)
+
+
+def test_init_when_no_accounts():
+    with pytest.raises(ValueError):
+        GearboxV2MultiSTETHRunner(accounts=[])
+
+
+def test_get_feed_descriptors(runner, accounts):
+    # feeds of accounts on the same manager deduped
+    descriptors = runner.get_feed_descriptors()
+    expect = GearboxV2STETHRunner(**accounts[0]).get_feed_descriptors()
+    assert descriptors == expect
+    assert runner._feed_indices == [[0, 1], [0, 1]]
+
+
+def test_get_refs_state(runner, accounts):
+    number = 16254713
+    state = runner.get_refs_state(number)
+    for j, kwargs in enumerate(accounts):
+        runner_state = runner.get_runner_state(j, state)
+        assert runner_state == GearboxV2STETHRunner(**kwargs).get_refs_state(number)
+
+
+def test_setup(runner):
+    runner.setup()
+    assert len(runner._mocks["feeds"]) == len(runner.get_feed_descriptors())
+
+    # check mocks shared with the runner of each account
+    for j, account_runner in enumerate(runner._runners):
+        assert account_runner._mocks["coordinator"] == runner._mocks["coordinator"]
+        assert account_runner._mocks["feeds"] == [
+            runner._mocks["feeds"][i] for i in runner._feed_indices[j]
+        ]
+
+
+def test_set_mocks_state(runner):
+    runner.setup()
+    number = 16254713
+    state = runner.get_refs_state(number)
+    runner.set_mocks_state(state)
+
+    # check no tx sent when round data unchanged
+    nonce = runner.acc.nonce
+    runner.set_mocks_state(state)
+    assert runner.acc.nonce == nonce
+
+    for i, mock_feed in enumerate(runner._mocks["feeds"]):
+        assert mock_feed.latestRoundData() == state["feeds"][i]
+
+
+def test_get_record(runner):
+    number = 16254713
+    state = runner.get_refs_state(number)
+    values = [11141, 14855]
+    row = runner.get_record(number, state, values)
+    assert row == {
+        "number": number,
+        "values0": values[0],
+        "values1": values[1],
+        "feed0": state["feeds"][0][1],
+        "feed1": state["feeds"][1][1],
+    }
+    assert set(runner.get_record_decimals().keys()) == set(row.keys())
+    assert runner.get_feed_decimals() == {
+        "feed0": runner.get_feed_descriptors()[0].decimals,
+        "feed1": runner.get_feed_descriptors()[1].decimals,
+    }
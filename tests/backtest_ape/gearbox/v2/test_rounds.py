@@ -0,0 +1,107 @@
+import pytest
+
+from backtest_ape.gearbox.v2.feeds import get_feeds_round_data
+from backtest_ape.gearbox.v2.rounds import RoundIndex
+from backtest_ape.gearbox.v2.steth import GearboxV2STETHRunner
+from backtest_ape.registry import get_contract
+
+START = 16254713
+STOP = 16264713
+
+
+@pytest.fixture
+def runner():
+    return GearboxV2STETHRunner(
+        ref_addrs={
+            "manager": "0x5887ad4Cb2352E7F01527035fAa3AE0Ef2cE2b9B",
+            "adapter": "0x2aed5E59E3730d88c8a1d0C25A50a239DeF70275",
+        },
+        collateral_amount=100000000000000000000,  # 100 WETH
+        leverage_factor=400,  # 400 WETH borrow
+    )
+
+
+@pytest.fixture
+def index(runner):
+    return runner.get_round_index(START, STOP)
+
+
+def test_fetch(runner, index):
+    sources = [s for d in runner.get_feed_descriptors() for s in d.sources]
+    assert set(index.sources) == set(sources)
+    assert index.covers(START) and index.covers(STOP)
+    assert not index.covers(START - 1) and not index.covers(STOP + 1)
+
+    with pytest.raises(ValueError):
+        index.fetch(STOP, STOP + 10)
+
+
+def test_get_round_data(index):
+    numbers = index.get_change_numbers()
+    assert len(numbers) > 0
+    assert all(START < n <= STOP for n in numbers)
+
+    for source in index.sources:
+        proxy = get_contract(source, "AggregatorV3")
+        for number in [START, numbers[0] - 1, numbers[0], STOP]:
+            assert index.get_round_data(source, number) == tuple(
+                proxy.latestRoundData(block_identifier=number)
+            )
+
+    with pytest.raises(ValueError):
+        index.get_round_data(index.sources[0], STOP + 1)
+
+
+def test_get_feeds_round_data(runner, index):
+    descriptors = runner.get_feed_descriptors()
+    for number in [START, START + 5000, STOP]:
+        assert get_feeds_round_data(descriptors, number, index) == (
+            get_feeds_round_data(descriptors, number)
+        )
+
+
+def test_set_round_index(runner, index):
+    runner.set_round_index(index)
+    state = runner.get_refs_state(STOP)
+    assert state["feeds"] == get_feeds_round_data(
+        runner.get_feed_descriptors(), STOP, index
+    )
+
+    with pytest.raises(ValueError):
+        runner.set_round_index(RoundIndex(sources=[]))
+
+
+def test_fetch_when_not_proxy(index):
+    proxy = get_contract(index.sources[0], "AggregatorV3")
+    aggregator_addr = proxy.aggregator(block_identifier=START)
+    aggregator_index = RoundIndex(sources=[aggregator_addr])
+    aggregator_index.fetch(START, STOP)
+
+    aggregator = get_contract(aggregator_addr, "AggregatorV3")
+    for number in [START] + index.get_change_numbers()[:2] + [STOP]:
+        assert aggregator_index.get_round_data(aggregator_addr, number) == tuple(
+            aggregator.latestRoundData(block_identifier=number)
+        )
+
+
+def test_get_changed_numbers(index):
+    changes = index.get_change_numbers()
+    numbers = list(range(START + 1, STOP, 100))
+    changed = index.get_changed_numbers(START, numbers)
+    assert set(changed).issubset(numbers)
+
+    # each kept block has a change since the prior block in numbers
+    for prev, number in zip([START] + numbers[:-1], numbers):
+        has_change = any(prev < n <= number for n in changes)
+        assert (number in changed) == has_change
+
+
+def test_get_backtest_numbers_when_skip_unchanged_rounds(runner, index):
+    numbers = runner.get_backtest_numbers(START, STOP, 100)
+    assert list(numbers) == list(range(START + 1, STOP, 100))
+
+    runner.skip_unchanged_rounds = True
+    runner.set_round_index(index)
+    assert runner.get_backtest_numbers(START, STOP, 100) == (
+        index.get_changed_numbers(START, numbers)
+    )
@@ -1,6 +1,9 @@
 from ape.contracts import ContractInstance
 
-from backtest_ape.gearbox.v2.setup import deploy_mock_feed
+from backtest_ape.gearbox.v2.setup import (
+    deploy_mock_feed,
+    deploy_mock_feed_coordinator,
+)
 
 
 def test_deploy_mock_feed(acc):
@@ -14,3 +17,19 @@ def test_deploy_mock_feed(acc):
     round = (1, 1000000, 1676127515, 1676127527, 1)
     feed.setRound(round, sender=acc)
     assert feed.rounds(1) == round
+
+
+def test_deploy_mock_feed_coordinator(acc):
+    coordinator = deploy_mock_feed_coordinator(acc)
+    assert isinstance(coordinator, ContractInstance) is True
+
+    # try setting latest rounds of data in feeds
+    feeds = [deploy_mock_feed(f"Mock Feed {i}", 6, 1, acc) for i in range(2)]
+    rounds = [
+        (1, 1000000, 1676127515, 1676127527, 1),
+        (2, 2000000, 1676127515, 1676127527, 2),
+    ]
+    coordinator.setRounds([feed.address for feed in feeds], rounds, sender=acc)
+    for feed, round in zip(feeds, rounds):
+        assert feed.latestRoundId() == round[0]
+        assert feed.latestRoundData() == round
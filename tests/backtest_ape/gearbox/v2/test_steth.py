@@ -1,9 +1,11 @@
 import os
+from types import SimpleNamespace
 
 import numpy as np
 import pandas as pd
 import pytest
 
+from backtest_ape.gearbox.v2 import steth
 from backtest_ape.gearbox.v2.steth import GearboxV2STETHRunner
 
 
@@ -120,6 +122,46 @@ def test_set_mocks_state(runner):
         assert mock_feed.latestRoundData() == state_feed
 
 
+def test_set_mocks_state_when_unchanged(runner):
+    runner.setup()
+    state_feeds = [
+        (
+            92233720368547797298,
+            121963000000,
+            1671882923,
+            1671882923,
+            92233720368547797298,
+        ),
+        (
+            92233720368547797298,
+            120786558687,
+            1671882923,
+            1671882923,
+            92233720368547797298,
+        ),
+    ]
+    state = {"feeds": state_feeds}
+    runner.set_mocks_state(state)
+
+    # check no tx sent when round data unchanged
+    nonce = runner.acc.nonce
+    runner.set_mocks_state(state)
+    assert runner.acc.nonce == nonce
+
+    # check only changed feed updated
+    state_feeds[1] = (
+        92233720368547797299,
+        120786558688,
+        1671882924,
+        1671882924,
+        92233720368547797299,
+    )
+    runner.set_mocks_state({"feeds": state_feeds})
+    assert runner.acc.nonce == nonce + 1
+    for i, mock_feed in enumerate(runner._mocks["feeds"]):
+        assert mock_feed.latestRoundData() == state_feeds[i]
+
+
 def test_record(runner, path):
     runner.setup()
     number = 16254713
@@ -155,3 +197,122 @@ def test_record(runner, path):
     assert int(row["values0"]) == int(values[0])
     assert int(row["ETH / USD"]) == int(state["feeds"][0][1])
     assert int(row["STETH / ETH ETH/USD Composite"]) == int(state["feeds"][1][1])
+
+
+def test_find_threshold_crossings(runner, monkeypatch):
+    start, stop, step = 16254713, 16255713, 100
+    crossings = [16254850, 16255399]  # first blocks below threshold
+    probes = []
+
+    def probe(self, number):
+        probes.append(number)
+        below = (crossings[0] <= number < 16255000) or number >= crossings[1]
+        return 9000 if below else 11000
+
+    cls = GearboxV2STETHRunner
+    monkeypatch.setattr(cls, "setup", lambda self, mocking: None)
+    monkeypatch.setattr(cls, "init_mocks_state", lambda self, number, state: None)
+    monkeypatch.setattr(cls, "get_refs_state", lambda self, number: {})
+    monkeypatch.setattr(cls, "probe", probe)
+
+    assert runner.find_threshold_crossings(start, stop, step) == crossings
+
+    # coarse pass plus log2(step) probes per crossing
+    assert len(probes) <= (stop - start) // step + 1 + 2 * 8
+
+    with pytest.raises(ValueError):
+        runner.find_threshold_crossings(stop, start, step)
+
+
+def test_get_health_factor_engine_when_leverage_factor(runner):
+    engine = runner.get_health_factor_engine(leverage_factor=400)
+    assert engine.underlying_index == 0
+    assert engine.decimals == [18, 18]
+    assert engine.balances == [0, 500000000000000000000]
+    assert engine.debt == 400000000000000000000
+    assert all(0 < lt < 10000 for lt in engine.liquidation_thresholds)
+
+
+def test_get_health_factor_engine_when_account_opened(runner, monkeypatch):
+    credit_account = SimpleNamespace(address="0x" + "11" * 20)
+    interest = (
+        400000000000000000000,  # borrowed amount
+        400100000000000000000,  # with interest
+        400200000000000000000,  # with interest and fees
+    )
+    results = iter(
+        [
+            [18, 18, 9000, 9000, runner._refs["collaterals"][0].address],
+            [0, 500000000000000000000, interest],
+        ]
+    )
+    monkeypatch.setattr(steth, "multicall", lambda calls: next(results))
+    monkeypatch.setattr(
+        GearboxV2STETHRunner, "backtester", property(lambda self: credit_account)
+    )
+    manager = runner._refs["manager"]
+    runner._refs["manager"] = SimpleNamespace(
+        liquidationThresholds=None,
+        underlying=None,
+        creditAccounts=lambda addr: addr,
+        calcCreditAccountAccruedInterest=None,
+    )
+    try:
+        engine = runner.get_health_factor_engine()
+    finally:
+        runner._refs["manager"] = manager
+
+    # facade health factor divides by borrowed amount with interest, not fees
+    assert engine.debt == interest[1]
+    assert engine.balances == [0, 500000000000000000000]
+
+
+def test_get_feed_answers(runner, monkeypatch):
+    numbers = [16254713, 16254714, 16254715]
+    fetched = []
+    get_round_index = GearboxV2STETHRunner.get_round_index
+
+    def fetch(self, start, stop):
+        fetched.append((start, stop))
+        return get_round_index(self, start, stop)
+
+    monkeypatch.setattr(GearboxV2STETHRunner, "get_round_index", fetch)
+    answers = runner.get_feed_answers(numbers)
+    assert fetched == [(numbers[0], numbers[-1])]
+    np.testing.assert_array_equal(
+        answers,
+        [
+            [rd[1] for rd in runner.get_refs_state(number)["feeds"]]
+            for number in numbers
+        ],
+    )
+
+    # uses the set round index when covering
+    runner.set_round_index(get_round_index(runner, numbers[0], numbers[-1]))
+    runner.get_feed_answers(numbers)
+    assert len(fetched) == 1
+
+
+def test_get_health_factors(runner, monkeypatch):
+    numbers = [16254713, 16254714, 16254715]
+    engine = runner.get_health_factor_engine(leverage_factor=400)
+    answers = runner.get_feed_answers(numbers)
+    assert answers.shape == (3, 2)
+
+    result = runner.get_health_factors(numbers, engine)
+    np.testing.assert_array_equal(result, engine.compute(answers))
+
+    # verify against backtester values only every verify_step blocks
+    probes = []
+
+    def probe(self, number):
+        probes.append(number)
+        return int(result[numbers.index(number)])
+
+    monkeypatch.setattr(GearboxV2STETHRunner, "probe", probe)
+    runner.get_health_factors(numbers, engine, verify_step=2)
+    assert probes == [16254713, 16254715]
+
+    monkeypatch.setattr(GearboxV2STETHRunner, "probe", lambda self, number: 0)
+    with pytest.raises(ValueError):
+        runner.get_health_factors(numbers, engine, verify_step=2)
@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 0.5  # seconds
+
+_script = """
+import json
+import sys
+import time
+
+t = time.perf_counter()
+import backtest_ape
+
+elapsed = time.perf_counter() - t
+print(json.dumps({"elapsed": elapsed, "modules": list(sys.modules.keys())}))
+"""
+
+
+def _import_in_subprocess():
+    # NOTE: fresh interpreter so modules already imported by tests don't count
+    out = subprocess.run(
+        [sys.executable, "-c", _script], capture_output=True, check=True, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_lazy():
+    result = _import_in_subprocess()
+    modules = set(result["modules"])
+    for name in ["ape", "pandas", "backtest_ape.base", "backtest_ape.curve"]:
+        assert name not in modules
+
+
+def test_import_time_budget():
+    result = _import_in_subprocess()
+    assert result["elapsed"] < IMPORT_TIME_BUDGET
+
+
+def test_getattr():
+    import backtest_ape
+    from backtest_ape.curve.v2.lp import CurveV2LPRunner
+
+    assert backtest_ape.CurveV2LPRunner is CurveV2LPRunner
+    assert set(backtest_ape.__all__) <= set(dir(backtest_ape))
+    assert all(getattr(backtest_ape, name) is not None for name in backtest_ape.__all__)
@@ -0,0 +1,116 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backtest_ape import jobs
+from backtest_ape.jobs import (
+    Job,
+    get_marker_path,
+    is_complete,
+    load_jobs,
+    mark_complete,
+    run_jobs,
+)
+
+
+@pytest.fixture
+def path():
+    p = "tests/results/jobs.csv"
+    for q in [p, get_marker_path(p)]:
+        if os.path.exists(q):
+            os.remove(q)
+    return p
+
+
+@pytest.fixture
+def spec_path():
+    p = "tests/results/jobs.json"
+    specs = [
+        {
+            "runner": "CurveV2LPRunner",
+            "kwargs": {"num_coins": 3},
+            "start": 16219691,
+            "stop": 16435691,
+            "step": 2400,
+        },
+        {
+            "runner": "CurveV2LPRunner",
+            "method": "replay",
+            "start": 16219691,
+            "stop": 16220691,
+        },
+    ]
+    with open(p, "w") as f:
+        json.dump({"jobs": specs}, f)
+    yield p
+    os.remove(p)
+
+
+def test_load_jobs(spec_path):
+    jobs = load_jobs(spec_path)
+    assert len(jobs) == 2
+    assert jobs[0].method == "backtest"
+    assert jobs[0].kwargs == {"num_coins": 3}
+    assert jobs[1].method == "replay"
+    assert jobs[1].step == 1
+
+
+def test_job_method_supported():
+    with pytest.raises(ValueError):
+        Job(runner="CurveV2LPRunner", method="forwardtest", start=0, stop=10)
+
+
+def test_job_get_path():
+    job = Job(runner="CurveV2LPRunner", start=16219691, step=300)
+    path = job.get_path("scripts/results")
+    assert path == "scripts/results/CurveV2LPRunner_backtest_16219691_-1_300.csv"
+
+    job = Job(runner="CurveV2LPRunner", start=16219691, path="out.csv")
+    assert job.get_path("scripts/results") == "out.csv"
+
+
+def test_job_get_cost():
+    backtest = Job(runner="CurveV2LPRunner", start=0, stop=1001, step=10)
+    replay = Job(runner="CurveV2LPRunner", method="replay", start=0, stop=101)
+    assert list(backtest.get_numbers()) == list(range(1, 1001, 10))
+    assert backtest.get_cost() == 100
+    assert replay.get_cost() > backtest.get_cost()
+
+
+def test_is_complete(path):
+    job = Job(runner="CurveV2LPRunner", start=100, stop=110, step=3)
+    assert not is_complete(job, path)
+
+    # last rows recorded through stop but run not finished
+    with open(path, "w") as f:
+        f.write("number,values0\n")
+        for number in [101, 104, 107]:
+            f.write(f"{number},1\n")
+    assert not is_complete(job, path)
+
+    # last block reverted so not recorded but run finished
+    mark_complete(job, path)
+    assert is_complete(job, path)
+
+    # marker from a different job
+    assert not is_complete(job.copy(update={"stop": 120}), path)
+
+
+def test_run_jobs_when_failed(path, monkeypatch):
+    def raise_run(job, network_choice, path):
+        raise ValueError("reverted.")
+
+    # run in process as workers would
+    monkeypatch.setattr(
+        jobs,
+        "ProcessPoolExecutor",
+        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+    )
+    monkeypatch.setattr(jobs, "run_job", raise_run)
+
+    job = Job(runner="CurveV2LPRunner", start=100, stop=110, path=path)
+    with pytest.raises(Exception, match="1 jobs failed"):
+        run_jobs([job], "ethereum:mainnet-fork:foundry", "tests/results")
+    assert not is_complete(job, path)
@@ -0,0 +1,43 @@
+import pytest
+
+from backtest_ape.parallel import get_shard_path, get_shards, merge_records
+
+
+def test_get_shards():
+    shards = get_shards(100, 200, 4)
+    assert shards == [(100, 126), (125, 151), (150, 176), (175, 200)]
+
+    # check each block in (start, stop) replayed exactly once across shards
+    numbers = [n for (start, stop) in shards for n in range(start + 1, stop)]
+    assert numbers == list(range(101, 200))
+
+
+def test_get_shards_when_more_shards_than_blocks():
+    shards = get_shards(100, 103, 10)
+    assert shards == [(100, 102), (101, 103)]
+
+
+def test_get_shards_when_start_after_stop():
+    with pytest.raises(ValueError):
+        get_shards(200, 100, 4)
+
+
+def test_get_shard_path():
+    assert get_shard_path("results/lp.csv", 2) == "results/lp_shard2.csv"
+
+
+def test_merge_records(tmp_path):
+    paths = [str(tmp_path / f"lp_shard{i}.csv") for i in range(2)]
+    with open(paths[0], "w") as f:
+        f.write("number,values0\n101,1000000000000000000000000000001\n")
+    with open(paths[1], "w") as f:
+        f.write("number,values0\n102,1000000000000000000000000000002\n")
+
+    path = str(tmp_path / "lp.csv")
+    merge_records(paths, path)
+    with open(path, "r") as f:
+        assert f.read() == (
+            "number,values0\n"
+            "101,1000000000000000000000000000001\n"
+            "102,1000000000000000000000000000002\n"
+        )
@@ -0,0 +1,104 @@
+import pytest
+
+from backtest_ape import registry
+from backtest_ape.registry import (
+    get_code_hash,
+    get_contract,
+    get_implementation,
+    get_registry_dir,
+    get_symbol,
+    load_contract_type,
+    load_interface,
+)
+
+
+@pytest.fixture
+def registry_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("BACKTEST_APE_REGISTRY", str(tmp_path))
+    monkeypatch.setattr(registry, "_contract_types", {})
+    monkeypatch.setattr(registry, "_address_types", {})
+    return get_registry_dir()
+
+
+@pytest.fixture
+def pool_addr():
+    return "0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8"
+
+
+@pytest.fixture
+def usdc_addr():
+    return "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+
+@pytest.fixture
+def mkr_addr():
+    return "0x9f8F72aA9304c8B593d555F12eF6589cC3A579A2"
+
+
+def test_load_interface():
+    contract_type = load_interface("ERC20")
+    names = [abi.name for abi in contract_type.abi]
+    assert "decimals" in names
+    assert "balanceOf" in names
+
+    with pytest.raises(ValueError):
+        load_interface("NotAnInterface")
+
+
+@pytest.mark.parametrize(
+    "name,method",
+    [
+        ("CurveCryptoSwap2", "price_oracle"),
+        ("CurveTricrypto2", "price_oracle"),
+        ("GearboxCreditManagerV2", "calcCreditAccountAccruedInterest"),
+        ("GearboxCreditFacadeV2", "degenNFT"),
+        ("GearboxPriceOracleV2", "priceFeeds"),
+        ("ERC20Bytes32", "symbol"),
+    ],
+)
+def test_load_interface_when_bundled_refs(name, method):
+    contract_type = load_interface(name)
+    assert method in [abi.name for abi in contract_type.abi]
+
+
+def test_get_contract_with_interface(usdc_addr):
+    usdc = get_contract(usdc_addr, "ERC20")
+    assert usdc.decimals() == 6
+
+
+def test_get_implementation_when_not_proxy(pool_addr):
+    assert get_implementation(pool_addr) is None
+
+
+def test_get_contract_registers(registry_dir, pool_addr):
+    code_hash = get_code_hash(pool_addr)
+    assert load_contract_type(code_hash) is None
+
+    pool = get_contract(pool_addr)
+    assert (registry_dir / f"{code_hash}.json").exists()
+
+    # clear in-memory cache to load from registry dir
+    registry._contract_types.clear()
+    contract_type = load_contract_type(code_hash)
+    assert contract_type is not None
+    assert [abi.name for abi in contract_type.abi] == [
+        abi.name for abi in pool.contract_type.abi
+    ]
+    assert get_contract(pool_addr).liquidity() == pool.liquidity()
+
+
+def test_get_contract_caches_by_address(registry_dir, pool_addr, monkeypatch):
+    pool = get_contract(pool_addr)
+
+    # later lookups of the address skip the proxy and code reads
+    def raise_read(address):
+        raise Exception("read")
+
+    monkeypatch.setattr(registry, "get_implementation", raise_read)
+    monkeypatch.setattr(registry, "get_code_hash", raise_read)
+    assert get_contract(pool_addr).liquidity() == pool.liquidity()
+
+
+def test_get_symbol(usdc_addr, mkr_addr):
+    assert get_symbol(get_contract(usdc_addr, "ERC20")) == "USDC"
+    assert get_symbol(get_contract(mkr_addr, "ERC20")) == "MKR"
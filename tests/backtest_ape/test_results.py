@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+import numpy as np
+
+from backtest_ape.results import (
+    from_limbs,
+    limbs_to_float,
+    load_int_columns,
+    load_raw_column,
+    load_results,
+    read_csv_columns,
+    save_results,
+    to_limbs,
+)
+
+
+def test_to_limbs_from_limbs():
+    values = [0, 1, 2**64, 2**256 - 1, 1330797012137927971917418324177509306984464]
+    limbs = to_limbs(values)
+    assert limbs.shape == (len(values), 4)
+    assert limbs.dtype == np.uint64
+    assert from_limbs(limbs) == values
+
+
+def test_to_limbs_from_limbs_when_signed():
+    values = [-1, -(2**255), 2**255 - 1, -3747086165587011074]
+    assert from_limbs(to_limbs(values), signed=True) == values
+
+
+def test_limbs_to_float():
+    values = [1, 2**200, -1, -(2**130)]
+    actual = limbs_to_float(to_limbs(values), signed=True)
+    np.testing.assert_allclose(actual, [float(v) for v in values])
+
+
+def test_read_csv_columns(tmp_path):
+    path = str(tmp_path / "lp.csv")
+    with open(path, "w") as f:
+        f.write("number,values0,feeGrowthGlobal0X128\n")
+        f.write(f"16254713,-2.5,{2**256 - 1}\n")
+        f.write("16254714,7,1\n")
+
+    columns = read_csv_columns(path)
+    assert columns == {
+        "number": [16254713, 16254714],
+        "values0": [-2, 7],
+        "feeGrowthGlobal0X128": [2**256 - 1, 1],
+    }
+    assert all(type(v) is int for v in columns["feeGrowthGlobal0X128"])
+
+
+def test_save_results_load_results(tmp_path):
+    path = str(tmp_path / "lp.csv")
+    with open(path, "w") as f:
+        f.write("number,values0,total_supply\n")
+        f.write("16254713,2981325191662,183341149725574822964704\n")
+        f.write("16254714,2981325191663,183341149725574822964705\n")
+
+    out_dir = str(tmp_path / "lp")
+    save_results(path, out_dir, {"values0": 6, "total_supply": 18})
+
+    # check int64 column stored as is and large column stored as limbs
+    assert load_raw_column(out_dir, "values0").dtype == np.int64
+    assert load_raw_column(out_dir, "total_supply").shape == (2, 4)
+
+    results = load_results(out_dir)
+    np.testing.assert_equal(results["number"], [16254713.0, 16254714.0])
+    np.testing.assert_allclose(results["values0"], [2981325.191662, 2981325.191663])
+    np.testing.assert_allclose(
+        results["total_supply"], [183341.149725574822964704, 183341.149725574822964705]
+    )
+
+    results = load_results(out_dir, columns=["total_supply"], exact=True)
+    assert list(results.keys()) == ["total_supply"]
+    assert results["total_supply"][1] == Decimal("183341.149725574822964705")
+
+
+def test_load_int_columns(tmp_path):
+    columns = {
+        "number": [16254713, 16254714],
+        "values0": [-3747086165587011074, 5],
+        "feeGrowthGlobal0X128": [
+            2**256 - 1,
+            1330797012137927971917418324177509306984464,
+        ],
+    }
+    out_dir = str(tmp_path / "ints")
+    save_results("", out_dir, {}, columns=columns)
+
+    assert load_int_columns(out_dir) == columns
+    assert load_int_columns(out_dir, ["values0"]) == {"values0": columns["values0"]}
@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+import pytest
+
+from backtest_ape.sinks import CallbackSink, CSVSink, RingBufferSink
+
+
+@pytest.fixture
+def path():
+    p = "tests/results/sinks.csv"
+    if os.path.exists(p):
+        os.remove(p)
+    return p
+
+
+@pytest.fixture
+def rows():
+    return [
+        {"number": 16513665, "values0": 100, "liquidity": 2**200},
+        {"number": 16513666, "values0": 101, "liquidity": 2**200 + 1},
+        {"number": 16513667, "values0": 102, "liquidity": 2**200 + 2},
+    ]
+
+
+def test_csv_sink_write(path, rows):
+    sink = CSVSink(path=path)
+    for row in rows:
+        sink.write(row)
+    sink.close()
+
+    df = pd.read_csv(path, dtype=str)
+    assert list(df.columns) == ["number", "values0", "liquidity"]
+    assert [int(v) for v in df["number"]] == [row["number"] for row in rows]
+    assert [int(v) for v in df["liquidity"]] == [row["liquidity"] for row in rows]
+
+
+def test_ring_buffer_sink_write(rows):
+    sink = RingBufferSink(maxlen=2)
+    for row in rows:
+        sink.write(row)
+    assert sink.rows == rows[1:]
+
+    sink = RingBufferSink()
+    for row in rows:
+        sink.write(row)
+    assert sink.rows == rows
+
+
+def test_callback_sink_write(rows):
+    written = []
+    sink = CallbackSink(callback=written.append)
+    for row in rows:
+        sink.write(row)
+    assert written == rows
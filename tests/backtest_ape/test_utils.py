@@ -0,0 +1,62 @@
+import math
+
+from ape import Contract
+
+from backtest_ape.utils import (
+    flatten_state,
+    get_state_divergence,
+    is_multicall_deployed,
+    multicall,
+)
+
+
+def test_flatten_state():
+    state = {
+        "balances": [1, 2, 3],
+        "D": 4,
+        "slot0": (5, -6, True),
+        "nested": {"a": [7, (8,)]},
+    }
+    assert flatten_state(state) == [1, 2, 3, 4, 5, -6, 1, 7, 8]
+
+
+def test_get_state_divergence():
+    ref_state = {"balances": [1000, 2000], "D": 0}
+    assert get_state_divergence(ref_state, ref_state) == 0.0
+
+    state = {"balances": [1000, 2100], "D": 0}
+    assert get_state_divergence(state, ref_state) == 0.05
+
+
+def test_get_state_divergence_when_shapes_differ():
+    ref_state = {"balances": [1000, 2000]}
+    state = {"balances": [1000]}
+    assert math.isinf(get_state_divergence(state, ref_state))
+
+
+def test_multicall():
+    pool = Contract("0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8")
+    number = 16513664
+    results = multicall(
+        [(pool.token0,), (pool.token1,), (pool.ticks, 0)], block_identifier=number
+    )
+    assert results[0] == pool.token0()
+    assert results[1] == pool.token1()
+    assert tuple(results[2]) == tuple(pool.ticks(0, block_identifier=number))
+    assert multicall([]) == []
+
+    # check results same in order when split into batches
+    calls = [(pool.ticks, tick) for tick in range(-10, 10)]
+    assert multicall(calls, number, batch_size=3) == multicall(calls, number)
+
+
+def test_multicall_when_not_deployed():
+    pool = Contract("0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8")
+    number = 12500000  # before Multicall3 deployed at 14353601
+    assert not is_multicall_deployed(number)
+    assert is_multicall_deployed(16513664)
+
+    # falls back to sequential calls
+    results = multicall([(pool.token0,), (pool.slot0,)], block_identifier=number)
+    assert results[0] == pool.token0()
+    assert tuple(results[1]) == tuple(pool.slot0(block_identifier=number))
@@ -0,0 +1,90 @@
+import pytest
+from ape import Contract
+
+from backtest_ape.uniswap.v3.events import PoolEventReplayer, get_pool_logs
+from backtest_ape.uniswap.v3.lp import UniswapV3LPTotalRunner
+
+POOL_ADDR = "0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8"
+START = 16254713
+STOP = 16254813
+TICK_LOWER = 200280
+TICK_UPPER = 207240
+
+
+@pytest.fixture
+def replayer():
+    return PoolEventReplayer(pool_addr=POOL_ADDR, check_interval=None)
+
+
+@pytest.fixture
+def runner():
+    return UniswapV3LPTotalRunner(
+        ref_addrs={
+            "pool": POOL_ADDR,
+            "manager": "0xC36442b4a4522E871399CD717aBDD847Ab11FE88",
+        },
+        tick_lower=TICK_LOWER,
+        tick_upper=TICK_UPPER,
+        amount0=34427240000,
+        amount1=67000000000000000000,
+    )
+
+
+def test_get_pool_logs():
+    pool = Contract(POOL_ADDR)
+    logs = get_pool_logs(pool, START, STOP)
+    assert len(logs) > 0
+    assert [log[:2] for log in logs] == sorted(log[:2] for log in logs)
+    assert all(START <= log[0] <= STOP for log in logs)
+
+
+def test_get_refs_state(replayer, runner):
+    for number in [START, START + 1, START + 50, STOP]:
+        state = replayer.get_refs_state(number, TICK_LOWER, TICK_UPPER)
+        expect = runner.get_refs_state(number)
+        assert state["slot0"].sqrtPriceX96 == expect["slot0"].sqrtPriceX96
+        assert state["slot0"].tick == expect["slot0"].tick
+        assert state["liquidity"] == expect["liquidity"]
+        assert state["fee_growth_global0_x128"] == expect["fee_growth_global0_x128"]
+        assert state["fee_growth_global1_x128"] == expect["fee_growth_global1_x128"]
+        for k in ["tick_info_lower", "tick_info_upper"]:
+            assert state[k].feeGrowthOutside0X128 == expect[k].feeGrowthOutside0X128
+            assert state[k].feeGrowthOutside1X128 == expect[k].feeGrowthOutside1X128
+
+    # one seed and one bulk log query per event
+    assert replayer.number == STOP
+    assert replayer.reads < 10
+
+
+def test_check(replayer):
+    replayer.advance(START)
+    assert replayer.check(START + 20, [TICK_LOWER]) is False  # not advanced
+    assert replayer.drifts == 1
+    assert replayer.number == START + 20
+
+    replayer.advance(STOP)
+    assert replayer.check(STOP, [TICK_LOWER, TICK_UPPER]) is True
+
+
+def test_set_pool_replayer(replayer, runner):
+    runner.set_pool_replayer(replayer)
+    assert runner.get_state_source(START) == replayer
+
+    state = runner.get_refs_state(START)
+    assert state == replayer.get_refs_state(START, TICK_LOWER, TICK_UPPER)
+
+    with pytest.raises(ValueError):
+        runner.set_pool_replayer(PoolEventReplayer(pool_addr=POOL_ADDR[:-1] + "0"))
+
+
+def test_get_refs_divergence_bypasses_replayer(replayer, runner, monkeypatch):
+    runner.set_pool_replayer(replayer)
+    state = runner.get_refs_state(START)
+
+    # upstream read straight from archive node rather than replayer
+    def raise_refs_state(*args, **kwargs):
+        raise Exception("replayer read")
+
+    monkeypatch.setattr(PoolEventReplayer, "get_refs_state", raise_refs_state)
+    assert runner.get_refs_divergence(START, state) == 0.0
+    assert runner.get_state_source(START) == replayer
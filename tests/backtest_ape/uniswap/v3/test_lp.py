@@ -4,7 +4,27 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from backtest_ape.uniswap.v3.lp import UniswapV3LPTotalRunner
+from backtest_ape.uniswap.v3.lp import (
+    UniswapV3LPDecomposedRunner,
+    UniswapV3LPFeeRunner,
+    UniswapV3LPLadderRunner,
+    UniswapV3LPPrincipalRunner,
+    UniswapV3LPRebalanceRunner,
+    UniswapV3LPTotalRunner,
+)
+from backtest_ape.uniswap.v3.lp.mgmt import mint_lp_position, mint_lp_positions
+from backtest_ape.uniswap.v3.lp.setup import mint_mock_tokens
+
+RUNNER_KWARGS = {
+    "ref_addrs": {
+        "pool": "0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8",
+        "manager": "0xC36442b4a4522E871399CD717aBDD847Ab11FE88",
+    },
+    "tick_lower": 200280,
+    "tick_upper": 207240,
+    "amount0": 34427240000,
+    "amount1": 67000000000000000000,
+}
 
 
 @pytest.fixture
@@ -114,6 +134,40 @@ def test_init_mocks_state(runner):
     assert pytest.approx(balance1_pool) == runner.amount1
 
 
+def test_mint_lp_positions_when_not_all_pushed(runner):
+    runner.setup()
+    number = 16254713
+    runner.init_mocks_state(number, runner.get_refs_state(number))
+
+    # mint a position to backtester not pushed to it first
+    mock_manager = runner._mocks["manager"]
+    mock_pool = runner._mocks["pool"]
+    amounts = [runner.amount0, runner.amount1]
+    mint_mock_tokens(runner._mocks["tokens"], runner.backtester, amounts, runner.acc)
+    mint_lp_position(
+        mock_manager,
+        mock_pool,
+        runner.backtester,
+        [runner.tick_lower, runner.tick_upper],
+        [amount // 2 for amount in amounts],
+        runner.acc,
+    )
+
+    # token ids read from the manager rather than following backtester count
+    token_ids = mint_lp_positions(
+        mock_manager,
+        mock_pool,
+        runner.backtester,
+        [[runner.tick_lower, runner.tick_upper]],
+        [[amount // 2 for amount in amounts]],
+        runner.acc,
+    )
+    assert token_ids == [3]
+    assert runner.backtester.count() == 2
+    assert runner.backtester.tokenIds(1) == 3
+    assert mock_manager.positions(3).liquidity > 0
+
+
 def test_set_mocks_state(runner):
     runner.setup()
     number = 16254713
@@ -208,3 +262,223 @@ def test_record(runner, path):
     assert int(row["tickUpperFeeGrowthOutside1X128"]) == int(
         state["tick_info_upper"].feeGrowthOutside1X128
     )
+
+
+@pytest.fixture
+def decomposed_runner():
+    return UniswapV3LPDecomposedRunner(**RUNNER_KWARGS)
+
+
+def test_fee_principal_runners():
+    number = 16254713
+    for cls in [UniswapV3LPFeeRunner, UniswapV3LPPrincipalRunner]:
+        runner = cls(**RUNNER_KWARGS)
+        runner.setup()
+        runner.init_mocks_state(number, runner.get_refs_state(number))
+
+        values = runner.get_values()
+        if cls == UniswapV3LPFeeRunner:
+            assert values == [0, 0]  # no fees accrued since mint
+        else:
+            assert pytest.approx(values[0]) == runner.amount0
+            assert pytest.approx(values[1]) == runner.amount1
+
+
+def test_decomposed_get_values(decomposed_runner):
+    decomposed_runner.setup()
+    assert len(decomposed_runner.backtesters) == 3
+
+    number = 16254713
+    decomposed_runner.init_mocks_state(number, decomposed_runner.get_refs_state(number))
+    token_id = decomposed_runner.backtester.tokenIds(0)
+    for backtester in decomposed_runner.backtesters:
+        assert backtester.count() == 1
+        assert backtester.tokenIds(0) == token_id
+
+    # accrue fees then check total is fees plus principal
+    decomposed_runner.set_mocks_state(decomposed_runner.get_refs_state(number + 100))
+    values = decomposed_runner.get_values()
+    assert len(values) == 6
+    assert values[2] > 0 or values[3] > 0
+    assert values[0] == values[2] + values[4]
+    assert values[1] == values[3] + values[5]
+    assert values == [
+        value
+        for backtester in decomposed_runner.backtesters
+        for value in backtester.values()
+    ]
+
+
+def test_decomposed_get_record_decimals(decomposed_runner):
+    decimals = decomposed_runner.get_record_decimals()
+    assert list(decimals.keys())[:7] == ["number"] + [f"values{i}" for i in range(6)]
+    assert [decimals[f"values{i}"] for i in range(6)] == [6, 18, 6, 18, 6, 18]
+    assert decimals["sqrtPriceX96"] == 0
+
+
+@pytest.fixture
+def ladder_runner():
+    kwargs = {k: v for k, v in RUNNER_KWARGS.items() if k == "ref_addrs"}
+    return UniswapV3LPLadderRunner(
+        positions=[
+            {
+                "tick_lower": 200280,
+                "tick_upper": 203760,
+                "amount0": 0,  # range below price so only WETH
+                "amount1": 33500000000000000000,
+            },
+            {
+                "tick_lower": 203760,
+                "tick_upper": 207240,
+                "amount0": 34427240000,
+                "amount1": 33500000000000000000,
+            },
+        ],
+        **kwargs,
+    )
+
+
+def test_ladder_positions_valid():
+    kwargs = {k: v for k, v in RUNNER_KWARGS.items() if k == "ref_addrs"}
+    with pytest.raises(ValueError):
+        UniswapV3LPLadderRunner(positions=[], **kwargs)
+
+    position = {"tick_lower": 207240, "tick_upper": 200280, "amount0": 1, "amount1": 1}
+    with pytest.raises(ValueError):
+        UniswapV3LPLadderRunner(positions=[position], **kwargs)
+
+
+def test_ladder_get_refs_state(ladder_runner):
+    assert ladder_runner.get_ticks() == [200280, 203760, 207240]
+
+    number = 16254713
+    ref_pool = ladder_runner._refs["pool"]
+    state = ladder_runner.get_refs_state(number)
+    assert state["slot0"] == ref_pool.slot0(block_identifier=number)
+    assert state["liquidity"] == 12591259481453220445
+    assert list(state["tick_infos"].keys()) == ladder_runner.get_ticks()
+    for tick, info in state["tick_infos"].items():
+        assert info == ref_pool.ticks(tick, block_identifier=number)
+
+
+def test_ladder_init_set_mocks_state(ladder_runner):
+    ladder_runner.setup()
+    number = 16254713
+    state = ladder_runner.get_refs_state(number)
+    ladder_runner.init_mocks_state(number, state)
+
+    # check all positions minted and pushed to backtest contract
+    mock_manager = ladder_runner._mocks["manager"]
+    assert ladder_runner.backtester.count() == len(ladder_runner.positions)
+    for i, position in enumerate(ladder_runner.positions):
+        token_id = ladder_runner.backtester.tokenIds(i)
+        assert token_id == i + 1
+        info = mock_manager.positions(token_id)
+        assert info.tickLower == position["tick_lower"]
+        assert info.tickUpper == position["tick_upper"]
+
+    # check all boundary ticks set in a single tx
+    nonce = ladder_runner.acc.nonce
+    state = ladder_runner.get_refs_state(number + 100)
+    ladder_runner.set_mocks_state(state)
+    assert ladder_runner.acc.nonce == nonce + 1
+
+    mock_pool = ladder_runner._mocks["pool"]
+    for tick, info in state["tick_infos"].items():
+        assert mock_pool.ticks(tick).feeGrowthOutside0X128 == info.feeGrowthOutside0X128
+        assert mock_pool.ticks(tick).feeGrowthOutside1X128 == info.feeGrowthOutside1X128
+
+
+def test_ladder_get_record(ladder_runner):
+    number = 16254713
+    state = ladder_runner.get_refs_state(number)
+    row = ladder_runner.get_record(number, state, [1, 2])
+    assert list(row.keys()) == list(ladder_runner.get_record_decimals().keys())
+    assert row["tick2FeeGrowthOutside1X128"] == (
+        state["tick_infos"][207240].feeGrowthOutside1X128
+    )
+
+
+@pytest.fixture
+def rebalance_runner():
+    kwargs = {**RUNNER_KWARGS, "tick_lower": 205200, "tick_upper": 205380}
+    return UniswapV3LPRebalanceRunner(drift_ticks=60, **kwargs)
+
+
+def test_rebalance_should_rebalance(rebalance_runner):
+    assert rebalance_runner.should_rebalance(205290) is False
+    assert rebalance_runner.should_rebalance(205199) is True  # below range
+    assert rebalance_runner.should_rebalance(205380) is True  # above range
+    assert rebalance_runner.should_rebalance(205360) is True  # drifted
+
+    rebalance_runner.drift_ticks = None
+    assert rebalance_runner.should_rebalance(205360) is False
+
+
+def test_rebalance_get_range(rebalance_runner):
+    assert rebalance_runner.get_range(205279) == (205140, 205320)
+    assert rebalance_runner.get_range(205500) == (205380, 205560)
+
+
+def test_rebalance_get_amounts(rebalance_runner):
+    sqrt_price_x96 = 2271115536847293636470521670171130
+    ticks = (205140, 205320)
+    balances = [34427240000, 67000000000000000000]
+    amounts = rebalance_runner.get_amounts(sqrt_price_x96, ticks, balances)
+
+    # same value at current price
+    price = (sqrt_price_x96 / 2**96) ** 2
+    value = balances[0] * price + balances[1]
+    assert pytest.approx(amounts[0] * price + amounts[1], rel=1e-9) == value
+
+
+def test_rebalance_get_tick_infos(rebalance_runner, monkeypatch):
+    number = 16254713
+    ref_pool = rebalance_runner._refs["pool"]
+    ticks = [rebalance_runner.tick_lower, rebalance_runner.tick_upper]
+    infos = rebalance_runner.get_tick_infos(ticks, number)
+    assert infos == [ref_pool.ticks(t, block_identifier=number) for t in ticks]
+
+    # cached for the block so no further reads
+    def fail(*args, **kwargs):
+        raise Exception("tick info not cached")
+
+    monkeypatch.setattr("backtest_ape.uniswap.v3.lp.rebalance.multicall", fail)
+    assert rebalance_runner.get_tick_infos(ticks[::-1], number) == infos[::-1]
+
+
+def test_rebalance_backtest(rebalance_runner):
+    start, stop = 16254713, 16254913
+    rows = list(rebalance_runner.iter_backtest(start, stop, 20))
+    assert len(rows) > 0
+
+    # re-centered around the current tick on each trigger
+    for row in rows:
+        assert row["tickUpper"] - row["tickLower"] == 180
+        assert row["tickLower"] % 60 == 0
+        assert row["values0"] > 0 or row["values1"] > 0
+
+    # configured range kept as the initial range
+    assert (rebalance_runner.tick_lower, rebalance_runner.tick_upper) == (
+        205200,
+        205380,
+    )
+
+    # old positions burned on rebalance so only the current one is valued
+    backtester = rebalance_runner.backtester
+    assert backtester.count() == 1
+    token_id = backtester.tokenIds(0)
+    position = rebalance_runner._mocks["manager"].positions(token_id)
+    assert (position.tickLower, position.tickUpper) == rebalance_runner.get_ticks()
+
+
+def test_rebalance_restore(rebalance_runner):
+    assert rebalance_runner.get_ticks() == (205200, 205380)
+    snapshot_chain_id, snapshot_runner_kwargs = rebalance_runner.snapshot()
+
+    # live range moved on rebalance, restored with the snapshot
+    rebalance_runner._ticks = (205140, 205320)
+    assert rebalance_runner.should_rebalance(205339) is True
+    rebalance_runner.restore(snapshot_chain_id, snapshot_runner_kwargs)
+    assert rebalance_runner.get_ticks() == (205200, 205380)
+    assert rebalance_runner.should_rebalance(205339) is False
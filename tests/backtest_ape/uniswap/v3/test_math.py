@@ -0,0 +1,99 @@
+from math import isqrt
+
+import pytest
+
+from backtest_ape.uniswap.v3.math import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    compute_swap_step,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    next_initialized_tick_within_one_word,
+)
+
+
+def encode_price_sqrt(reserve1: int, reserve0: int) -> int:
+    return isqrt(reserve1 * 2**192 // reserve0)
+
+
+def test_get_sqrt_ratio_at_tick():
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(0) == 2**96
+
+    with pytest.raises(ValueError):
+        get_sqrt_ratio_at_tick(MAX_TICK + 1)
+
+
+def test_get_tick_at_sqrt_ratio():
+    assert get_tick_at_sqrt_ratio(MIN_SQRT_RATIO) == MIN_TICK
+    assert get_tick_at_sqrt_ratio(MAX_SQRT_RATIO - 1) == MAX_TICK - 1
+    assert get_tick_at_sqrt_ratio(2271115536847293636470521670171130) == 205279
+    for tick in [-50000, -1, 0, 1, 205280]:
+        sqrt_ratio = get_sqrt_ratio_at_tick(tick)
+        assert get_tick_at_sqrt_ratio(sqrt_ratio) == tick
+        assert get_tick_at_sqrt_ratio(sqrt_ratio - 1) == tick - 1
+
+
+def test_compute_swap_step():
+    # SEE: https://github.com/Uniswap/v3-core/blob/main/test/SwapMath.spec.ts
+    price = encode_price_sqrt(1, 1)
+    price_target = encode_price_sqrt(101, 100)
+    liquidity = 2 * 10**18
+
+    # exact amount in that gets capped at price target
+    sqrt_q, amount_in, amount_out, fee_amount = compute_swap_step(
+        price, price_target, liquidity, 10**18, 600
+    )
+    assert (amount_in, amount_out, fee_amount) == (
+        9975124224178055,
+        9925619580021728,
+        5988667735148,
+    )
+    assert sqrt_q == price_target
+
+    # exact amount in that is fully spent
+    price_target = encode_price_sqrt(1000, 100)
+    sqrt_q, amount_in, amount_out, fee_amount = compute_swap_step(
+        price, price_target, liquidity, 10**18, 600
+    )
+    assert (amount_in, amount_out, fee_amount) == (
+        999400000000000000,
+        666399946655997866,
+        600000000000000,
+    )
+    assert sqrt_q < price_target
+
+
+def test_next_initialized_tick_within_one_word():
+    initialized = [-200, -55, -4, 70, 78, 84, 139, 240, 535]
+
+    # to the left, inclusive of the current tick
+    assert next_initialized_tick_within_one_word(initialized, 78, 1, True) == (
+        78,
+        True,
+    )
+    assert next_initialized_tick_within_one_word(initialized, 79, 1, True) == (
+        78,
+        True,
+    )
+    assert next_initialized_tick_within_one_word(initialized, 258, 1, True) == (
+        256,
+        False,
+    )
+
+    # to the right, exclusive of the current tick
+    assert next_initialized_tick_within_one_word(initialized, 78, 1, False) == (
+        84,
+        True,
+    )
+    assert next_initialized_tick_within_one_word(initialized, -257, 1, False) == (
+        -200,
+        True,
+    )
+    assert next_initialized_tick_within_one_word(initialized, 255, 1, False) == (
+        511,
+        False,
+    )
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+from ape import Contract
+
+from backtest_ape.uniswap.v3.lp import UniswapV3LPTotalRunner
+from backtest_ape.uniswap.v3.ticks import TickStore, get_initialized_ticks
+
+POOL_ADDR = "0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8"
+START = 16254713
+STOP = 16254716
+
+
+@pytest.fixture(scope="module")
+def store():
+    s = TickStore(pool_addr=POOL_ADDR)
+    s.fetch(START, STOP)
+    return s
+
+
+@pytest.fixture
+def runner():
+    return UniswapV3LPTotalRunner(
+        ref_addrs={
+            "pool": POOL_ADDR,
+            "manager": "0xC36442b4a4522E871399CD717aBDD847Ab11FE88",
+        },
+        tick_lower=200280,
+        tick_upper=207240,
+        amount0=34427240000,
+        amount1=67000000000000000000,
+    )
+
+
+def test_get_initialized_ticks():
+    pool = Contract(POOL_ADDR)
+    ticks = get_initialized_ticks(pool, 60, START)
+    assert len(ticks) > 0
+    assert ticks == sorted(ticks)
+    assert all(tick % 60 == 0 for tick in ticks)
+    assert all(pool.ticks(tick, block_identifier=START).initialized for tick in ticks)
+
+
+def test_fetch(store):
+    assert store.tick_spacing == 60
+    assert store.numbers == list(range(START, STOP))
+
+    with pytest.raises(ValueError):
+        store.fetch(START, STOP)
+
+
+def test_get_refs_state(store, runner):
+    for number in store.numbers:
+        state = store.get_refs_state(number, runner.tick_lower, runner.tick_upper)
+        expect = runner.get_refs_state(number)
+        assert state["slot0"].sqrtPriceX96 == expect["slot0"].sqrtPriceX96
+        assert state["liquidity"] == expect["liquidity"]
+        assert state["fee_growth_global0_x128"] == expect["fee_growth_global0_x128"]
+        assert state["fee_growth_global1_x128"] == expect["fee_growth_global1_x128"]
+        for k in ["tick_info_lower", "tick_info_upper"]:
+            assert state[k].feeGrowthOutside0X128 == expect[k].feeGrowthOutside0X128
+            assert state[k].feeGrowthOutside1X128 == expect[k].feeGrowthOutside1X128
+
+
+def test_get_fee_growth_outside_when_uninitialized(store):
+    # tick far above price initializes to zero and is never crossed
+    tick = 887220
+    outside0, outside1 = store.get_fee_growth_outside(tick)
+    assert outside0 == [0 for _ in store.numbers]
+    assert outside1 == [0 for _ in store.numbers]
+
+    # tick far below price initializes to all growth and is never crossed
+    tick = -887220
+    outside0, _ = store.get_fee_growth_outside(tick)
+    assert outside0 == [store.get_column("feeGrowthGlobal0X128")[0]] * len(
+        store.numbers
+    )
+
+
+def test_get_fee_growth_outside_when_reinitialized():
+    s = TickStore(pool_addr=POOL_ADDR, tick_spacing=60)
+    s._blocks = {
+        "number": [1, 2, 3],
+        "sqrtPriceX96": [0, 0, 0],
+        "tick": [0, 120, 120],
+        "liquidity": [0, 0, 0],
+        "feeGrowthGlobal0X128": [100, 200, 300],
+        "feeGrowthGlobal1X128": [10, 20, 30],
+    }
+
+    # crossed at block 2, then cleared and initialized again at block 3 with
+    # all growth below by convention
+    s._changes = {
+        "number": [1, 2, 3, 3],
+        "tick": [60, 60, 60, 60],
+        "liquidityGross": [1, 1, 0, 1],
+        "feeGrowthOutside0X128": [40, 160, 0, 300],
+        "feeGrowthOutside1X128": [4, 16, 0, 30],
+    }
+    outside0, outside1 = s.get_fee_growth_outside(60)
+    assert outside0 == [40, 160, 160]
+    assert outside1 == [4, 16, 16]
+    assert s.get_tick_info(60, 3) == (1, 160, 16)
+
+
+def test_get_fee_growth_below(store):
+    ticks = np.array([-887220, 200280, 887220])
+    below0, below1 = store.get_fee_growth_below(ticks)
+    assert below0.shape == (len(store.numbers), len(ticks))
+    assert np.all(below0[0] == 0) and np.all(below1[0] == 0)
+
+    # never crossed ticks far away from price see no growth below and all
+    history = store.get_history()
+    np.testing.assert_equal(below0[:, 0], np.zeros(len(store.numbers)))
+    np.testing.assert_equal(below0[:, 2], history["feeGrowthGlobal0X128"])
+    np.testing.assert_equal(below1[:, 2], history["feeGrowthGlobal1X128"])
+
+
+def test_set_tick_store(store, runner):
+    runner.set_tick_store(store)
+    state = runner.get_refs_state(START)
+    assert state == store.get_refs_state(START, runner.tick_lower, runner.tick_upper)
+
+    with pytest.raises(ValueError):
+        runner.set_tick_store(TickStore(pool_addr=POOL_ADDR[:-1] + "0"))
+
+
+def test_save_load(store, tmp_path):
+    out_dir = str(tmp_path / "store")
+    store.save(out_dir)
+
+    loaded = TickStore.load(out_dir)
+    assert loaded.pool_addr == store.pool_addr
+    assert loaded.tick_spacing == store.tick_spacing
+    assert loaded.numbers == store.numbers
+    assert loaded.initialized_ticks == store.initialized_ticks
+    assert loaded.get_refs_state(START, 200280, 207240) == store.get_refs_state(
+        START, 200280, 207240
+    )